@@ -0,0 +1,256 @@
+"""
+Per-model circuit breaker for LLM calls.
+
+A breaker tracks the outcome and latency of recent calls to one model. When the
+error rate or the slow-call rate over the rolling window crosses its threshold
+the breaker opens and calls fail fast with CircuitOpenError. After a cooldown a
+single half-open probe is let through: success closes the breaker, failure
+re-opens it. State transitions are logged and exported to the metrics registry.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from backend.logger import logger
+from backend.metrics import metrics
+
+
+class CircuitState(str, Enum):
+    """Possible states of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+# Numeric encoding used for the state gauge
+_STATE_GAUGE_VALUES = {
+    CircuitState.CLOSED: 0.0,
+    CircuitState.HALF_OPEN: 1.0,
+    CircuitState.OPEN: 2.0,
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the model's circuit is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit breaker for '{name}' is open; call rejected.")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker.
+
+    Each recorded call contributes a (failed, slow) sample to a fixed-size window.
+    The breaker only evaluates its thresholds once at least `min_calls` samples
+    are present, so a single early failure does not trip it.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 30.0,
+        slow_call_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes the breaker in the closed state.
+
+        Args:
+            name: Identifier of the protected resource (the model name).
+            failure_rate_threshold: Fraction of failed calls in the window that opens the breaker.
+            slow_call_seconds: Calls taking at least this long count as slow.
+            slow_call_rate_threshold: Fraction of slow calls in the window that opens the breaker.
+            window_size: Number of most recent calls considered.
+            min_calls: Minimum samples in the window before thresholds are evaluated.
+            cooldown_seconds: Time spent open before a half-open probe is allowed.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CircuitState.CLOSED
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        metrics.set_gauge(
+            "llm_circuit_state", _STATE_GAUGE_VALUES[self._state], {"model": name}
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the cooldown has elapsed."""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _transition(self, new_state: CircuitState, reason: str) -> None:
+        """Moves to a new state (caller must hold the lock)."""
+        old_state = self._state
+        if old_state == new_state:
+            return
+        self._state = new_state
+        if new_state == CircuitState.OPEN:
+            self._opened_at = self._clock()
+        if new_state == CircuitState.CLOSED:
+            self._window.clear()
+        self._probe_in_flight = False
+        log = logger.info if new_state == CircuitState.CLOSED else logger.warning
+        log(
+            f"Circuit breaker '{self.name}' transitioned {old_state.value} -> "
+            f"{new_state.value}: {reason}"
+        )
+        metrics.increment(
+            "llm_circuit_transitions_total",
+            {"model": self.name, "from_state": old_state.value, "to_state": new_state.value},
+        )
+        metrics.set_gauge(
+            "llm_circuit_state", _STATE_GAUGE_VALUES[new_state], {"model": self.name}
+        )
+
+    def _maybe_half_open(self) -> None:
+        """Moves an open breaker to half-open when its cooldown has elapsed."""
+        if (
+            self._state == CircuitState.OPEN
+            and self._opened_at is not None
+            and self._clock() - self._opened_at >= self.cooldown_seconds
+        ):
+            self._transition(CircuitState.HALF_OPEN, "cooldown elapsed, allowing probe")
+
+    def allow_request(self) -> bool:
+        """
+        Returns True if a call may proceed.
+
+        In the half-open state only one probe call is allowed at a time; the
+        probe's outcome decides whether the breaker closes or re-opens.
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+        metrics.increment("llm_circuit_rejected_total", {"model": self.name})
+        return False
+
+    def record_success(self, duration_seconds: float) -> None:
+        """Records a successful call and its latency."""
+        self._record(failed=False, duration_seconds=duration_seconds)
+
+    def record_failure(self, duration_seconds: float) -> None:
+        """Records a failed call and its latency."""
+        self._record(failed=True, duration_seconds=duration_seconds)
+
+    def _record(self, failed: bool, duration_seconds: float) -> None:
+        """Adds a sample to the window and re-evaluates the breaker state."""
+        slow = duration_seconds >= self.slow_call_seconds
+        outcome = "failure" if failed else ("slow" if slow else "success")
+        metrics.increment("llm_circuit_calls_total", {"model": self.name, "outcome": outcome})
+
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                if failed or slow:
+                    self._transition(CircuitState.OPEN, f"half-open probe {outcome}")
+                else:
+                    self._transition(CircuitState.CLOSED, "half-open probe succeeded")
+                return
+            if self._state == CircuitState.OPEN:
+                # Late result from a call started before the breaker opened
+                return
+
+            self._window.append((failed, slow))
+            if len(self._window) < self.min_calls:
+                return
+            total = len(self._window)
+            failure_rate = sum(1 for f, _ in self._window if f) / total
+            slow_rate = sum(1 for _, s in self._window if s) / total
+            if failure_rate >= self.failure_rate_threshold:
+                self._transition(
+                    CircuitState.OPEN,
+                    f"failure rate {failure_rate:.0%} over last {total} calls",
+                )
+            elif slow_rate >= self.slow_call_rate_threshold:
+                self._transition(
+                    CircuitState.OPEN,
+                    f"slow-call rate {slow_rate:.0%} over last {total} calls",
+                )
+
+    def reset(self) -> None:
+        """Forces the breaker back to the closed state."""
+        with self._lock:
+            self._transition(CircuitState.CLOSED, "manual reset")
+            self._window.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a JSON-serializable view of the breaker."""
+        with self._lock:
+            self._maybe_half_open()
+            total = len(self._window)
+            return {
+                "name": self.name,
+                "state": self._state.value,
+                "window_calls": total,
+                "failure_rate": (
+                    sum(1 for f, _ in self._window if f) / total if total else 0.0
+                ),
+                "slow_call_rate": (
+                    sum(1 for _, s in self._window if s) / total if total else 0.0
+                ),
+            }
+
+
+# --- Registry of breakers, one per model name ---
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    """Reads a float from the environment, falling back to a default."""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        logger.warning(f"Invalid value for {name}; using default {default}.")
+        return default
+
+
+def get_breaker(model_name: str) -> CircuitBreaker:
+    """Returns the shared breaker for a model, creating it from env config if needed."""
+    with _breakers_lock:
+        breaker = _breakers.get(model_name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name=model_name,
+                failure_rate_threshold=_env_float("LLM_BREAKER_FAILURE_RATE", 0.5),
+                slow_call_seconds=_env_float("LLM_BREAKER_SLOW_CALL_SECONDS", 30.0),
+                slow_call_rate_threshold=_env_float("LLM_BREAKER_SLOW_CALL_RATE", 0.5),
+                window_size=int(_env_float("LLM_BREAKER_WINDOW", 20)),
+                min_calls=int(_env_float("LLM_BREAKER_MIN_CALLS", 5)),
+                cooldown_seconds=_env_float("LLM_BREAKER_COOLDOWN_SECONDS", 30.0),
+            )
+            _breakers[model_name] = breaker
+        return breaker
+
+
+def get_breaker_snapshots() -> Dict[str, Dict[str, Any]]:
+    """Returns snapshots of all breakers created so far, keyed by model name."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
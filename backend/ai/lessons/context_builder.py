@@ -0,0 +1,192 @@
+"""
+Token-budgeted context assembly for lesson prompts.
+
+Each lesson prompt has a total token budget. The fixed parts of the prompt (the
+template text and values such as the user's message) are charged first; the
+remainder is shared out by priority: the active task, then the rolling
+summary of earlier turns and the recent conversation history (newest messages
+first, whole messages only), then the lesson exposition, which fills whatever
+is left. Chat prompts pass the exposition chunks retrieved for the user's
+message (backend/ai/lessons/exposition_index.py); other prompts get the
+beginning of the exposition.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from backend.ai.prompt_loader import prompt_registry
+from backend.ai.token_budget import ContextBudget, estimate_tokens
+from backend.logger import logger
+from backend.models import AssessmentQuestion, Exercise, GeneratedLessonContent
+
+
+# pylint: disable=too-few-public-methods
+@dataclass(frozen=True)
+class PromptBudget:
+    """Token budget for one prompt and the caps applied to its sections."""
+
+    total_tokens: int
+    active_task_max_tokens: int = 300
+    history_share: float = 0.0  # Fraction of the remaining budget history may use
+    summary_max_tokens: int = 300  # Cap on the conversation summary (within history)
+    # Sections the template has no placeholder for are not built
+    include_active_task: bool = True
+    include_exposition: bool = True
+
+
+PROMPT_BUDGETS: Dict[str, PromptBudget] = {
+    # The template only carries the history and the user's message
+    "intent_classification": PromptBudget(
+        total_tokens=1200, history_share=1.0, include_active_task=False, include_exposition=False
+    ),
+    "chat_response": PromptBudget(total_tokens=4000, history_share=0.4),
+    "classify_and_respond": PromptBudget(total_tokens=4000, history_share=0.4),
+    "generate_exercises": PromptBudget(total_tokens=3500),
+    "generate_assessment": PromptBudget(total_tokens=3500),
+}
+
+DEFAULT_PROMPT_BUDGET = PromptBudget(total_tokens=3000, history_share=0.4)
+
+# Never leave the variable sections with less than this, even for large templates
+MIN_SECTION_TOKENS = 200
+
+# Marks the gaps between retrieved exposition excerpts
+EXCERPT_SEPARATOR = "\n\n[...]\n\n"
+
+
+@dataclass
+class LessonPromptContext:
+    """Context sections sized to fit a prompt's budget."""
+
+    exposition: str = ""
+    history: List[Dict[str, Any]] = field(default_factory=list)
+    summary: str = ""
+    formatted_history: str = ""
+    active_task: str = "None"
+    allocations: Dict[str, int] = field(default_factory=dict)
+
+
+def format_history_message(message: Dict[str, Any]) -> str:
+    """Formats one conversation message as a prompt line."""
+    role = message.get("role", "unknown")
+    content = message.get("content", "")
+    return f"{role.capitalize()}: {content}"
+
+
+def format_history(history: List[Dict[str, Any]], summary: str = "") -> str:
+    """Formats conversation history, led by the summary of earlier turns, for prompts."""
+    lines = [f"Summary of earlier conversation: {summary}"] if summary else []
+    lines.extend(format_history_message(message) for message in history)
+    return "\n".join(lines)
+
+
+def format_active_task(
+    active_exercise: Optional[Exercise], active_assessment: Optional[AssessmentQuestion]
+) -> str:
+    """Describes the task the user is currently working on, or 'None'."""
+    if active_exercise:
+        return (
+            f"Active Exercise: {active_exercise.type} - "
+            f"{active_exercise.instructions or active_exercise.question}"
+        )
+    if active_assessment:
+        return (
+            f"Active Assessment Question: {active_assessment.type} - "
+            f"{active_assessment.question_text}"
+        )
+    return "None"
+
+
+def _take_excerpts(budget: ContextBudget, chunks: Sequence[str]) -> str:
+    """Takes whole excerpts, best first, while they fit; a lone first one may be cut."""
+    selected: List[str] = []
+    for chunk in chunks:
+        candidate = EXCERPT_SEPARATOR.join(selected + [chunk])
+        if selected and estimate_tokens(candidate) > budget.remaining:
+            break
+        selected.append(chunk)
+    return budget.take_text("exposition", EXCERPT_SEPARATOR.join(selected))
+
+
+def _template_text(prompt_name: str) -> str:
+    """Returns the raw template text, or '' if it cannot be loaded."""
+    try:
+        return prompt_registry.get(prompt_name).template.template
+    except (FileNotFoundError, ValueError) as e:
+        logger.warning(f"Could not size template '{prompt_name}' for budgeting: {e}")
+        return ""
+
+
+def build_lesson_context(
+    prompt_name: str,
+    state: Dict[str, Any],
+    history: Optional[List[Dict[str, Any]]] = None,
+    fixed_text: Sequence[str] = (),
+    exposition_chunks: Optional[Sequence[str]] = None,
+) -> LessonPromptContext:
+    """
+    Builds the variable context for a lesson prompt within its token budget.
+
+    Args:
+        prompt_name: Name of the prompt template (selects the budget).
+        state: The current lesson state (exposition, active task and the
+            conversation summary are read from it).
+        history: Conversation history to include, oldest first (excluding the
+            latest user message, which belongs in `fixed_text`). When the state
+            has a conversation summary, only the turns after it.
+        fixed_text: Other values inserted verbatim into the prompt; they are
+            charged against the budget before any section is allocated.
+        exposition_chunks: Exposition excerpts relevant to the user's message,
+            best first; when empty, the beginning of the exposition is used.
+
+    Returns:
+        A LessonPromptContext with the exposition, history and active task fitted
+        to the budget.
+    """
+    budget_config = PROMPT_BUDGETS.get(prompt_name, DEFAULT_PROMPT_BUDGET)
+    budget = ContextBudget(budget_config.total_tokens)
+    budget.reserve("template", _template_text(prompt_name))
+    for text in fixed_text:
+        budget.reserve("fixed", text)
+    if budget.remaining < MIN_SECTION_TOKENS:
+        budget.remaining = MIN_SECTION_TOKENS
+
+    context = LessonPromptContext()
+
+    # 1. Active task (small, always most relevant)
+    if budget_config.include_active_task:
+        active_task = format_active_task(
+            state.get("active_exercise"), state.get("active_assessment")
+        )
+        context.active_task = budget.take_text(
+            "active_task", active_task, max_tokens=budget_config.active_task_max_tokens
+        ) or "None"
+
+    # 2. Summary of earlier turns, then recent history, newest messages first
+    if budget_config.history_share > 0:
+        history_tokens = int(budget.remaining * budget_config.history_share)
+        summary = state.get("conversation_summary")
+        if summary:
+            context.summary = budget.take_text(
+                "summary", summary, max_tokens=min(budget_config.summary_max_tokens, history_tokens)
+            )
+            history_tokens -= budget.allocations["summary"]
+        if history:
+            context.history = budget.take_messages(
+                "history", history, format_history_message, max_tokens=history_tokens
+            )
+        context.formatted_history = format_history(context.history, context.summary)
+
+    # 3. Exposition fills the rest: the relevant excerpts, else the beginning of the lesson
+    generated_content: Optional[GeneratedLessonContent] = state.get("generated_content")
+    if budget_config.include_exposition:
+        if exposition_chunks:
+            context.exposition = _take_excerpts(budget, exposition_chunks)
+        elif generated_content and generated_content.exposition_content:
+            context.exposition = budget.take_text(
+                "exposition", str(generated_content.exposition_content)
+            )
+
+    context.allocations = dict(budget.allocations)
+    logger.debug(f"Context allocation for '{prompt_name}': {context.allocations}")
+    return context
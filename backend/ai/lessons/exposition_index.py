@@ -0,0 +1,178 @@
+# backend/ai/lessons/exposition_index.py
+"""
+Local retrieval index over a lesson's exposition.
+
+Chat prompts cannot carry a whole lesson, and the head of the exposition
+rarely answers a question about a later section. The exposition is therefore
+split into paragraph-aligned chunks when it is saved, and each chunk is
+embedded with a hashing TF-IDF vectorizer: word unigrams and bigrams are
+hashed into a fixed number of buckets, weighted by their inverse frequency
+across the lesson's chunks and L2-normalized. No model or network call is
+involved, so a query is one small matrix-vector product.
+
+The chunk vectors are stored as a float16 matrix (see `to_bytes`);
+`index_record` builds the form the database stores.
+"""
+
+import hashlib
+import io
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Hash buckets per vector; 2048 float16 values are 4 KB per chunk
+N_FEATURES = 2048
+# Target chunk size; paragraphs are merged up to this and longer ones split
+CHUNK_MAX_CHARS = 800
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def content_hash(text: str) -> str:
+    """Identifies the exposition an index was built from."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _split_long(paragraph: str, max_chars: int) -> List[str]:
+    """Splits a paragraph longer than `max_chars` on sentence boundaries."""
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_exposition(text: str, max_chars: int = CHUNK_MAX_CHARS) -> List[str]:
+    """
+    Splits exposition text into chunks of about `max_chars` characters.
+
+    Consecutive paragraphs are merged while they fit, so headings stay with
+    the paragraphs that follow them; a paragraph longer than `max_chars` is
+    split on sentence boundaries.
+    """
+    chunks: List[str] = []
+    current = ""
+    for paragraph in _PARAGRAPH_BREAK.split(text or ""):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_long(paragraph, max_chars))
+        elif current and len(current) + 2 + len(paragraph) > max_chars:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _term_counts(text: str) -> Counter:
+    """Counts the hash buckets of the text's unigrams and bigrams."""
+    tokens = _TOKEN.findall(text.lower())
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return Counter(zlib.crc32(term.encode("utf-8")) % N_FEATURES for term in terms)
+
+
+class ExpositionIndex:
+    """Chunks of one exposition and their normalized TF-IDF vectors."""
+
+    def __init__(self, chunks: List[str], vectors: "np.ndarray") -> None:
+        """
+        Wraps prebuilt chunk vectors; use `build` or `from_bytes` to create one.
+
+        Args:
+            chunks: The chunk texts, in document order.
+            vectors: One L2-normalized row per chunk (N_FEATURES columns).
+        """
+        self.chunks = chunks
+        self.vectors = vectors.astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @classmethod
+    def build(cls, text: str, max_chars: int = CHUNK_MAX_CHARS) -> "ExpositionIndex":
+        """Chunks and embeds an exposition."""
+        chunks = chunk_exposition(text, max_chars)
+        counts = [_term_counts(chunk) for chunk in chunks]
+        vectors = np.zeros((len(chunks), N_FEATURES), dtype=np.float32)
+        for row, chunk_counts in enumerate(counts):
+            for bucket, count in chunk_counts.items():
+                vectors[row, bucket] = 1.0 + math.log(count)
+        # Buckets present in every chunk get zero weight and cannot decide a match
+        document_frequency = np.count_nonzero(vectors, axis=0)
+        vectors *= np.log((1.0 + len(chunks)) / (1.0 + document_frequency))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1.0)
+        return cls(chunks, vectors)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Returns up to `top_k` (chunk index, score) pairs, best match first.
+
+        Chunks sharing no weighted term with the query are never returned.
+        """
+        if not self.chunks or top_k <= 0:
+            return []
+        query_vector = np.zeros(N_FEATURES, dtype=np.float32)
+        for bucket, count in _term_counts(query).items():
+            query_vector[bucket] = 1.0 + math.log(count)
+        scores = self.vectors @ query_vector
+        top_k = min(top_k, len(self.chunks))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in ranked if scores[i] > 0]
+
+    def to_bytes(self) -> bytes:
+        """Serializes the vectors as a float16 .npy blob (chunks are stored separately)."""
+        buffer = io.BytesIO()
+        np.save(buffer, self.vectors.astype(np.float16), allow_pickle=False)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, chunks: List[str], blob: bytes) -> Optional["ExpositionIndex"]:
+        """Restores an index from `to_bytes` output; None if it does not match the chunks."""
+        vectors = np.load(io.BytesIO(blob), allow_pickle=False)
+        if vectors.shape != (len(chunks), N_FEATURES):
+            return None
+        return cls(chunks, vectors)
+
+
+def index_record(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Builds the stored form of an exposition's index.
+
+    Returns:
+        'content_hash', the 'chunks' list and the 'vectors' blob, as
+        SQLiteDatabaseService.save_exposition_index expects them; None if the
+        text has no chunks.
+    """
+    index = ExpositionIndex.build(text)
+    if not index.chunks:
+        return None
+    return {"content_hash": content_hash(text), "chunks": index.chunks, "vectors": index.to_bytes()}
@@ -0,0 +1,259 @@
+"""
+Local, deterministic grading for objective lesson items.
+
+Multiple-choice, true/false and ordering items carry their answer key
+(`correct_answer_id`, `correct_answer`, `Option` ids and `items`), so they can
+be graded without an LLM call. The user's free-text submission is normalized
+("b)", "Option B", "The answer is b", or the option's text all select option
+B; ordering answers may use item text, 1-based numbers or letters) and scored:
+choice items are right or wrong, ordering items get partial credit for the
+fraction of item pairs in the correct relative order.
+
+`grade_answer` returns None whenever the item is free-text, the answer key is
+incomplete, or the submission cannot be mapped unambiguously; the caller then
+falls back to LLM evaluation.
+"""
+
+import re
+from typing import List, Optional, Sequence, Union
+
+from backend.models import AssessmentQuestion, EvaluationResult, Exercise, Option
+
+CHOICE_TYPES = frozenset({"multiple_choice", "true_false"})
+ORDERING_TYPES = frozenset({"ordering"})
+OBJECTIVE_TYPES = CHOICE_TYPES | ORDERING_TYPES
+
+_TRUE_WORDS = frozenset({"true", "t", "yes", "y", "correct", "right"})
+_FALSE_WORDS = frozenset({"false", "f", "no", "n", "incorrect", "wrong"})
+
+# Leading phrases that wrap the actual choice ("The answer is B", "I think it's b)")
+_ANSWER_PREFIX = re.compile(
+    r"^((i think|i guess|i'?d say|i choose|i pick|my answer is|the answer is|answer( is)?:?|"
+    r"it'?s|it is|option|choice)\s*)+"
+)
+_ORDER_SEPARATORS = re.compile(r"\s*(?:,|;|\n|->|=>|→|>)\s*")
+
+
+def _normalize(text: str) -> str:
+    """Lowercases, collapses whitespace and strips surrounding punctuation."""
+    text = re.sub(r"\s+", " ", str(text).strip().lower())
+    return text.strip(" .!?:;\"'")
+
+
+def _normalize_choice(answer: str) -> str:
+    """Reduces a choice submission to its core token ("The answer is (B)." -> "b")."""
+    text = _ANSWER_PREFIX.sub("", _normalize(answer))
+    return text.strip(" .!?:;\"'()[]")
+
+
+def _find_option(answer: str, options: Sequence[Option]) -> Optional[Option]:
+    """Maps a submission to an option by id first, then by option text."""
+    core = _normalize_choice(answer)
+    if not core:
+        return None
+    by_id = [opt for opt in options if _normalize_choice(opt.id) == core]
+    if len(by_id) == 1:
+        return by_id[0]
+    # A trailing ")" or "." after the id is common: "b) recursion"
+    leading = re.match(r"^([a-z0-9]+)[).]\s", core + " ")
+    if leading:
+        by_id = [opt for opt in options if _normalize_choice(opt.id) == leading.group(1)]
+        if len(by_id) == 1:
+            return by_id[0]
+    by_text = [
+        opt for opt in options
+        if _normalize(opt.text) in (core, _normalize(answer))
+    ]
+    return by_text[0] if len(by_text) == 1 else None
+
+
+def _parse_bool(text: str) -> Optional[bool]:
+    """Parses a true/false submission or key."""
+    core = _normalize_choice(text)
+    if core in _TRUE_WORDS:
+        return True
+    if core in _FALSE_WORDS:
+        return False
+    return None
+
+
+def _format_option(option: Option) -> str:
+    """Formats an option as "B) text"."""
+    return f"{option.id}) {option.text}"
+
+
+def _grade_choice(
+    answer: str,
+    options: Optional[List[Option]],
+    correct_answer_id: Optional[str],
+    correct_answer: Optional[Union[str, List[str]]],
+    explanation: Optional[str],
+    misconceptions: Optional[dict],
+) -> Optional[EvaluationResult]:
+    """Grades a multiple-choice or true/false submission."""
+    if options:
+        correct: Optional[Option] = None
+        if correct_answer_id:
+            correct = _find_option(correct_answer_id, options)
+        if correct is None and isinstance(correct_answer, str):
+            correct = _find_option(correct_answer, options)
+        chosen = _find_option(answer, options)
+        if chosen is None:
+            # True/false items may still be answered with "yes"/"t" etc.
+            chosen_bool = _parse_bool(answer)
+            if chosen_bool is not None:
+                matches = [opt for opt in options if _parse_bool(opt.text) is chosen_bool]
+                chosen = matches[0] if len(matches) == 1 else None
+        if correct is None or chosen is None:
+            return None
+        if chosen.id == correct.id:
+            return EvaluationResult(
+                score=1.0, is_correct=True, feedback="Correct!", explanation=explanation
+            )
+        feedback = f"Not quite. The correct answer is {_format_option(correct)}."
+        correction = (misconceptions or {}).get(chosen.id)
+        if correction:
+            feedback += f" {correction}"
+        return EvaluationResult(
+            score=0.0, is_correct=False, feedback=feedback, explanation=explanation
+        )
+
+    # True/false without options: the key is the literal value
+    if not isinstance(correct_answer, str):
+        return None
+    expected, given = _parse_bool(correct_answer), _parse_bool(answer)
+    if expected is None or given is None:
+        return None
+    if expected == given:
+        return EvaluationResult(
+            score=1.0, is_correct=True, feedback="Correct!", explanation=explanation
+        )
+    return EvaluationResult(
+        score=0.0,
+        is_correct=False,
+        feedback=f"Not quite. The statement is {'true' if expected else 'false'}.",
+        explanation=explanation,
+    )
+
+
+def _split_order(value: Union[str, List[str]]) -> List[str]:
+    """Splits an ordering submission or key into its elements."""
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    parts = _ORDER_SEPARATORS.split(str(value).strip())
+    # Also accept numbered lines ("1. first\n2. second")
+    return [re.sub(r"^\d+[.)]\s+", "", p) for p in parts if p.strip()]
+
+
+def _resolve_order(elements: List[str], items: List[str]) -> Optional[List[int]]:
+    """Maps elements to distinct item indices by text, 1-based number or letter."""
+    normalized_items = [_normalize(item) for item in items]
+    indices: List[int] = []
+    for element in elements:
+        core = _normalize(element)
+        index: Optional[int] = None
+        if core in normalized_items and normalized_items.count(core) == 1:
+            index = normalized_items.index(core)
+        elif core.isdigit() and 1 <= int(core) <= len(items):
+            index = int(core) - 1
+        elif re.fullmatch(r"[a-z]", core) and ord(core) - ord("a") < len(items):
+            index = ord(core) - ord("a")
+        if index is None or index in indices:
+            return None
+        indices.append(index)
+    return indices if len(indices) == len(items) else None
+
+
+def _concordant_pair_fraction(given: List[int], expected: List[int]) -> float:
+    """Fraction of item pairs whose relative order matches the expected order."""
+    position = {item: rank for rank, item in enumerate(given)}
+    total = concordant = 0
+    for i, first in enumerate(expected):
+        for second in expected[i + 1:]:
+            total += 1
+            if position[first] < position[second]:
+                concordant += 1
+    return concordant / total if total else 1.0
+
+
+def _grade_ordering(
+    answer: str,
+    items: Optional[List[str]],
+    correct_answer: Optional[Union[str, List[str]]],
+    explanation: Optional[str],
+) -> Optional[EvaluationResult]:
+    """Grades an ordering submission with pairwise partial credit."""
+    if not correct_answer:
+        return None
+    key_elements = _split_order(correct_answer)
+    vocabulary = list(items) if items else key_elements
+    expected = _resolve_order(key_elements, vocabulary)
+    given = _resolve_order(_split_order(answer), vocabulary)
+    if expected is None or given is None:
+        return None
+
+    score = _concordant_pair_fraction(given, expected)
+    correct_order = " → ".join(vocabulary[i] for i in expected)
+    if score == 1.0:
+        return EvaluationResult(
+            score=1.0, is_correct=True, feedback="Correct! That's the right order.",
+            explanation=explanation,
+        )
+    in_place = sum(1 for g, e in zip(given, expected) if g == e)
+    if score >= 0.5:
+        feedback = (
+            f"Partly right: {in_place} of {len(expected)} items are in the correct position."
+        )
+    else:
+        feedback = "Not quite."
+    feedback += f" The correct order is: {correct_order}."
+    return EvaluationResult(
+        score=round(score, 3), is_correct=False, feedback=feedback, explanation=explanation
+    )
+
+
+def grade_answer(
+    answer: str,
+    exercise: Optional[Exercise] = None,
+    assessment: Optional[AssessmentQuestion] = None,
+) -> Optional[EvaluationResult]:
+    """
+    Grades an objective exercise or assessment question locally.
+
+    Args:
+        answer: The user's submitted answer.
+        exercise: The active exercise, if any.
+        assessment: The active assessment question (used if no exercise).
+
+    Returns:
+        An EvaluationResult, or None if the item needs LLM evaluation.
+    """
+    if not answer or not answer.strip():
+        return None
+    if exercise is not None:
+        item_type = (exercise.type or "").lower()
+        if item_type in CHOICE_TYPES:
+            return _grade_choice(
+                answer, exercise.options, exercise.correct_answer_id,
+                exercise.correct_answer, exercise.explanation,
+                exercise.misconception_corrections,
+            )
+        if item_type in ORDERING_TYPES:
+            return _grade_ordering(
+                answer, exercise.items, exercise.correct_answer, exercise.explanation
+            )
+        return None
+    if assessment is not None and (assessment.type or "").lower() in CHOICE_TYPES:
+        return _grade_choice(
+            answer, assessment.options, assessment.correct_answer_id,
+            assessment.correct_answer, assessment.explanation, None,
+        )
+    return None
+
+
+def format_feedback(result: EvaluationResult) -> str:
+    """Renders a grading result as the assistant's chat message."""
+    content = result.feedback
+    if result.explanation:
+        content += f"\n\n*Explanation:* {result.explanation}"
+    return content
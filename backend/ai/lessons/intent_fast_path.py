@@ -0,0 +1,305 @@
+"""
+Local fast-path intent classifier for lesson chat messages.
+
+Runs in front of the LLM intent classification. Keyword/regex rules catch the
+common explicit phrasings ("give me an exercise", "quiz me", a bare "B" while a
+task is active); a small multinomial naive Bayes model over character n-grams,
+trained at import on the phrasing corpus below, covers paraphrases of chat
+messages. A result is returned only when its confidence reaches the threshold;
+otherwise the caller defers to the LLM.
+
+Only the rules start a task. The model cannot tell "give me an exercise" from
+"I don't want an exercise" or "stop the quiz", so its exercise/assessment
+requests are deferred to the LLM.
+
+Intents use the LLM classifier's vocabulary so results feed straight into
+`nodes._map_intent_to_mode`.
+
+While a task is active only the rules are used: a free-text answer to a
+short-answer exercise can look like any other chat message, so that decision
+is left to the LLM.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple
+
+from backend.logger import logger
+from backend.metrics import metrics
+
+INTENT_FAST_PATH_ENABLED = os.environ.get("INTENT_FAST_PATH", "true").lower() != "false"
+INTENT_FAST_PATH_THRESHOLD = float(os.environ.get("INTENT_FAST_PATH_THRESHOLD", "0.85"))
+
+REQUEST_EXERCISE = "request_exercise"
+REQUEST_ASSESSMENT = "request_assessment"
+SUBMIT_ANSWER = "submit_answer"
+ASK_QUESTION = "ask_question"
+OTHER_CHAT = "other_chat"
+
+_TASK_REQUESTS = (REQUEST_EXERCISE, REQUEST_ASSESSMENT)
+
+
+@dataclass(frozen=True)
+class FastPathResult:
+    """A confident local classification."""
+
+    intent: str
+    confidence: float
+    source: str  # "rule" or "model"
+
+
+# --- Rules ---
+
+# Task nouns; bare "test"/"problem"/"task" are too common in questions about the material
+_EXERCISE_WORDS = r"(exercises?|practice( problems?| questions?| exercises?)?|challenges?)"
+_QUIZ_WORDS = r"(quiz(zes)?|assessments?)"
+# After a request form ("can i take the test") "test" is unambiguous
+_REQUESTED_QUIZ_WORDS = r"(quiz(zes)?|assessments?|tests?)"
+# Requests are anchored at the start of the message: imperatives and polite request forms
+_POLITE = r"^(ok(ay)?,? |so,? |now,? )?(please )?"
+_ARTICLE = r"((a|an|another|the|one more|some|more|a new|the next) )?(\S+ )?"
+_REQUEST_FORMS = (
+    r"((give|send|set) me"
+    r"|(can|could|may) (i|we) (have|get|do|try|take|start)"
+    r"|(can|could|would) you (give|send|set) me"
+    r"|(i'?d|i would) like( to (do|try|take|start))?"
+    r"|let'?s (do|try|take|start)"
+    r"|i'?m ready for"
+    r"|(start|begin|take)) "
+)
+# The task noun ends the request ("give me the exercise answer" is not one)
+_REQUEST_END = r"( please| now| (on|about|for) \S.*)?[.!]*$"
+
+# (intent, pattern, confidence, requires_active_task)
+_RULES: List[Tuple[str, Pattern[str], float, bool]] = [
+    # Bare option letters / true-false answers while a task is active
+    (SUBMIT_ANSWER, re.compile(r"^(option |answer )?\(?[a-f]\)?[.)]?$"), 0.97, True),
+    (SUBMIT_ANSWER, re.compile(r"^(true|false)[.!]?$"), 0.97, True),
+    (SUBMIT_ANSWER, re.compile(r"^(my answer is|the answer is|answer:) \S"), 0.9, True),
+    (
+        SUBMIT_ANSWER,
+        re.compile(r"^(i think )?(it'?s|it is) \(?([a-f]|true|false)\)?[.!]?$"),
+        0.95,
+        True,
+    ),
+    # Explicit requests
+    (
+        REQUEST_ASSESSMENT,
+        re.compile(rf"{_POLITE}((can|could) you )?(quiz|test|assess|examine) me\b"),
+        0.95,
+        False,
+    ),
+    (
+        REQUEST_ASSESSMENT,
+        re.compile(rf"{_POLITE}{_REQUEST_FORMS}{_ARTICLE}{_REQUESTED_QUIZ_WORDS}{_REQUEST_END}"),
+        0.9,
+        False,
+    ),
+    (REQUEST_ASSESSMENT, re.compile(r"^i'?m ready to be (tested|quizzed|assessed)[.!]*$"), 0.9, False),
+    (REQUEST_ASSESSMENT, re.compile(rf"^(a |another |the |next )?{_QUIZ_WORDS}( please)?[.!]?$"), 0.9, False),
+    (REQUEST_EXERCISE, re.compile(rf"{_POLITE}{_REQUEST_FORMS}{_ARTICLE}{_EXERCISE_WORDS}{_REQUEST_END}"), 0.9, False),
+    (
+        REQUEST_EXERCISE,
+        re.compile(rf"^(an |another |a |next |new |one more )?{_EXERCISE_WORDS}( please)?[.!]?$"),
+        0.9,
+        False,
+    ),
+    # Acknowledgements and greetings
+    (
+        OTHER_CHAT,
+        re.compile(
+            r"^(ok(ay)?|thanks?( you)?|thank you( so much)?|cool|great|nice|got it|"
+            r"makes sense|hi|hello|hey|awesome|perfect|understood)[.! ]*$"
+        ),
+        0.95,
+        False,
+    ),
+]
+
+# Questions about the material that mention quizzes/exercises are not requests
+_QUESTION_START = re.compile(r"^(what|why|how|when|where|who|which|is|are|does|do|can you explain)\b")
+
+
+def _normalize(message: str) -> str:
+    """Lowercases and collapses whitespace."""
+    return re.sub(r"\s+", " ", message.strip().lower())
+
+
+def _match_rules(text: str, has_active_task: bool) -> Optional[FastPathResult]:
+    """Returns the first matching rule's intent, if any."""
+    is_question = text.endswith("?") and _QUESTION_START.match(text) is not None
+    for intent, pattern, confidence, requires_task in _RULES:
+        if requires_task and not has_active_task:
+            continue
+        if is_question and intent in (REQUEST_EXERCISE, REQUEST_ASSESSMENT):
+            continue
+        if pattern.search(text):
+            return FastPathResult(intent, confidence, "rule")
+    return None
+
+
+# --- Character n-gram naive Bayes ---
+
+# Phrasings the model is trained on (lowercase, representative of real traffic)
+TRAINING_PHRASES: Dict[str, Sequence[str]] = {
+    REQUEST_EXERCISE: (
+        "give me an exercise", "can i have an exercise", "i want to practice",
+        "let me practice this", "another exercise please", "i'd like to try a problem",
+        "give me something to practice", "can you give me a practice problem",
+        "i'm ready for an exercise", "let's do an exercise", "next exercise",
+        "i want a challenge", "can we do some practice", "set me a task",
+        "i would like an exercise on this", "practice time", "give me a problem to solve",
+        "can i try one", "let me try a question on this", "i want to do an exercise now",
+    ),
+    REQUEST_ASSESSMENT: (
+        "quiz me", "test me", "i'm ready for the quiz", "start the assessment",
+        "can i take the quiz", "let's do the quiz", "give me a quiz",
+        "i want to be tested", "test my knowledge", "assess me",
+        "i'd like to take the test", "check my understanding with a quiz",
+        "begin the assessment", "quiz time", "am i ready for the test, quiz me",
+        "can you test me on this", "start the quiz please", "time for the assessment",
+    ),
+    ASK_QUESTION: (
+        "what does this mean", "can you explain that again", "why is that",
+        "how does this work", "what is the difference between them",
+        "i don't understand", "could you clarify the second part",
+        "what's an example of this", "why does it work that way",
+        "how is this used in practice", "can you explain it more simply",
+        "what happens if", "i'm confused about this part", "explain recursion",
+        "what is a variable", "how do i use it", "when would i use this",
+        "can you give an example", "tell me more about this", "what does that term mean",
+    ),
+    OTHER_CHAT: (
+        "thanks", "thank you", "ok", "okay", "cool", "great", "that makes sense",
+        "got it", "hello", "hi there", "nice", "awesome, thanks", "i see",
+        "interesting", "good to know", "that's helpful", "sounds good",
+        "alright", "perfect", "understood, thanks",
+    ),
+}
+
+NGRAM_SIZES = (2, 3, 4)
+# Scales the length-normalized log-likelihood before the softmax; naive Bayes
+# is badly overconfident on raw sums, and this keeps posteriors usable as a
+# confidence score.
+SHARPNESS = 6.0
+# Below this fraction of known n-grams the message is out of distribution
+MIN_NGRAM_COVERAGE = 0.6
+
+
+def char_ngrams(text: str, sizes: Sequence[int] = NGRAM_SIZES) -> List[str]:
+    """Character n-grams of the padded text."""
+    padded = f" {text} "
+    return [padded[i:i + n] for n in sizes for i in range(len(padded) - n + 1)]
+
+
+class NgramNaiveBayes:
+    """Multinomial naive Bayes over character n-grams with Laplace smoothing."""
+
+    def __init__(self, alpha: float = 0.5) -> None:
+        """Initializes an untrained model."""
+        self.alpha = alpha
+        self.log_priors: Dict[str, float] = {}
+        self.log_likelihoods: Dict[str, Dict[str, float]] = {}
+        self.log_unseen: Dict[str, float] = {}
+        self.vocabulary: frozenset = frozenset()
+
+    def fit(self, examples: Dict[str, Sequence[str]]) -> "NgramNaiveBayes":
+        """Trains on {label: [phrases]}."""
+        counts = {label: Counter() for label in examples}
+        for label, phrases in examples.items():
+            for phrase in phrases:
+                counts[label].update(char_ngrams(_normalize(phrase)))
+        self.vocabulary = frozenset(g for c in counts.values() for g in c)
+        total_examples = sum(len(p) for p in examples.values())
+        vocab_size = len(self.vocabulary)
+        for label, counter in counts.items():
+            self.log_priors[label] = math.log(len(examples[label]) / total_examples)
+            denominator = sum(counter.values()) + self.alpha * vocab_size
+            self.log_likelihoods[label] = {
+                gram: math.log((count + self.alpha) / denominator)
+                for gram, count in counter.items()
+            }
+            self.log_unseen[label] = math.log(self.alpha / denominator)
+        return self
+
+    def predict(self, text: str) -> Tuple[Optional[str], float, float]:
+        """Returns (label, probability, n-gram coverage) for a normalized message."""
+        grams = char_ngrams(text)
+        if not grams or not self.log_priors:
+            return None, 0.0, 0.0
+        coverage = sum(1 for g in grams if g in self.vocabulary) / len(grams)
+        scores = {}
+        for label, likelihoods in self.log_likelihoods.items():
+            unseen = self.log_unseen[label]
+            mean_log_likelihood = sum(likelihoods.get(g, unseen) for g in grams) / len(grams)
+            scores[label] = self.log_priors[label] + SHARPNESS * mean_log_likelihood
+        best = max(scores, key=scores.__getitem__)
+        top = scores[best]
+        total = sum(math.exp(score - top) for score in scores.values())
+        return best, 1.0 / total, coverage
+
+
+_model = NgramNaiveBayes().fit(TRAINING_PHRASES)
+
+
+def classify_intent_fast(
+    message: str,
+    has_active_task: bool = False,
+    threshold: Optional[float] = None,
+) -> Optional[FastPathResult]:
+    """
+    Classifies a chat message locally when confident.
+
+    Args:
+        message: The user's latest message.
+        has_active_task: Whether an exercise or assessment question is active.
+        threshold: Minimum confidence (defaults to INTENT_FAST_PATH_THRESHOLD).
+
+    Returns:
+        A FastPathResult, or None to defer to the LLM. Every decision is
+        counted in the `intent_fast_path_total` metric.
+    """
+    threshold = INTENT_FAST_PATH_THRESHOLD if threshold is None else threshold
+    text = _normalize(message)
+    result = _match_rules(text, has_active_task) if text else None
+
+    if result is None and text and not has_active_task:
+        label, probability, coverage = _model.predict(text)
+        # Task requests need a rule: the model scores refusals like requests
+        if label and label not in _TASK_REQUESTS and coverage >= MIN_NGRAM_COVERAGE:
+            result = FastPathResult(label, probability, "model")
+
+    if result is None or result.confidence < threshold:
+        metrics.increment("intent_fast_path_total", {"outcome": "miss"})
+        return None
+
+    metrics.increment(
+        "intent_fast_path_total",
+        {"outcome": "hit", "source": result.source, "intent": result.intent},
+    )
+    logger.debug(
+        f"Fast-path intent '{result.intent}' ({result.source}, {result.confidence:.2f})"
+    )
+    return result
+
+
+def get_fast_path_stats() -> Dict[str, Any]:
+    """Returns fast-path hits, misses and hit rate from the metrics registry."""
+    snapshot = metrics.snapshot()["counters"].get("intent_fast_path_total", [])
+    hits = sum(s["value"] for s in snapshot if s["labels"].get("outcome") == "hit")
+    misses = sum(s["value"] for s in snapshot if s["labels"].get("outcome") == "miss")
+    total = hits + misses
+    by_source: Dict[str, float] = {}
+    for series in snapshot:
+        if series["labels"].get("outcome") == "hit":
+            source = series["labels"].get("source", "unknown")
+            by_source[source] = by_source.get(source, 0.0) + series["value"]
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+        "hits_by_source": by_source,
+    }
@@ -2,7 +2,10 @@
 
 # pylint: disable=broad-exception-caught,singleton-comparison
 
-from typing import Any, Dict, List, cast
+import functools
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, cast
 
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, END # Added END import
@@ -14,11 +17,14 @@ from backend.logger import logger  # Ensure logger is available
 from backend.models import    LessonState
 
 # Import node functions
-from backend.ai.lessons import nodes
+from backend.ai.lessons import nodes, speculation
 
 # Load environment variables
 load_dotenv()
 
+# Classify intent and generate chat replies in one LLM call (see LessonAI)
+LESSON_FUSED_INTENT = os.environ.get("LESSON_FUSED_INTENT", "false").lower() == "true"
+
 
 # Helper function for routing based on state
 def _route_message_logic(state: LessonState) -> str:
@@ -34,14 +40,74 @@ def _route_message_logic(state: LessonState) -> str:
     return "generate_chat_response"
 
 
+def _route_fused_logic(state: LessonState) -> str:
+    """Routes after the fused node: finish if it already produced the reply."""
+    if (
+        state.get("current_interaction_mode", "chatting") == "chatting"
+        and state.get("new_assistant_message")
+    ):
+        return END
+    return _route_message_logic(state)
+
+
+def _as_graph_node(node_function: Callable[..., Any]) -> Callable[..., Dict[str, Any]]:
+    """
+    Adapts a node that returns a tuple (state, ..., message) for use in the graph.
+
+    The generation and evaluation nodes return extra values for direct callers
+    (the on-demand generation endpoints); inside the graph a node must return
+    a dict, so the trailing message is placed in 'new_assistant_message'.
+    """
+
+    @functools.wraps(node_function)
+    def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        result = node_function(state)
+        if not isinstance(result, tuple):
+            return result
+        state_changes = dict(result[0])
+        state_changes["new_assistant_message"] = result[-1]
+        return state_changes
+
+    return wrapper
+
+
 class LessonAI:
     """Encapsulates the Tech Tree lesson langgraph app."""
 
     chat_workflow: StateGraph  # Add type hint for instance variable
     chat_graph: Any  # Compiled graph type might be complex, use Any for now
+    fused: bool
+    speculative: bool
 
-    def __init__(self) -> None:
-        """Initialize the LessonAI."""
+    def __init__(
+        self, fused: Optional[bool] = None, speculative: Optional[bool] = None
+    ) -> None:
+        """
+        Initialize the LessonAI.
+
+        Args:
+            fused: If True, a single LLM call classifies the intent and writes
+                the chat reply; a second call is made only for exercise or
+                assessment generation and answer evaluation. Defaults to the
+                LESSON_FUSED_INTENT environment variable.
+            speculative: If True, the chat reply is generated concurrently with
+                intent classification and discarded if the intent is not
+                chatting (see backend.ai.lessons.speculation). Ignored in fused
+                mode. Defaults to the LESSON_SPECULATIVE_CHAT environment variable.
+        """
+        self.fused = LESSON_FUSED_INTENT if fused is None else fused
+        self.speculative = (
+            speculation.LESSON_SPECULATIVE_CHAT if speculative is None else speculative
+        )
+        if self.fused and self.speculative:
+            logger.warning("Speculative chat is not used in fused mode; disabling it.")
+            self.speculative = False
+        self._dispatch_nodes: Dict[str, Callable[..., Dict[str, Any]]] = {
+            "generate_chat_response": nodes.generate_chat_response,
+            "generate_new_exercise": _as_graph_node(nodes.generate_new_exercise),
+            "generate_new_assessment": _as_graph_node(nodes.generate_new_assessment),
+            "evaluate_answer": _as_graph_node(nodes.evaluate_answer),
+        }
         # Compile the chat turn workflow
         self.chat_workflow = self._create_chat_workflow()
         self.chat_graph = self.chat_workflow.compile()
@@ -54,26 +120,37 @@ class LessonAI:
         workflow = StateGraph(LessonState)
 
         # Add nodes for the chat turn using functions from nodes.py
-        workflow.add_node("classify_intent", nodes.classify_intent)
+        entry_node = "classify_and_respond" if self.fused else "classify_intent"
+        if self.fused:
+            workflow.add_node(entry_node, nodes.classify_and_respond)
+        else:
+            workflow.add_node(entry_node, nodes.classify_intent)
         workflow.add_node("generate_chat_response", nodes.generate_chat_response)
-        workflow.add_node("generate_new_exercise", nodes.generate_new_exercise)
-        workflow.add_node("generate_new_assessment", nodes.generate_new_assessment)
-        workflow.add_node("evaluate_answer", nodes.evaluate_answer)
+        workflow.add_node(
+            "generate_new_exercise", _as_graph_node(nodes.generate_new_exercise)
+        )
+        workflow.add_node(
+            "generate_new_assessment", _as_graph_node(nodes.generate_new_assessment)
+        )
+        workflow.add_node("evaluate_answer", _as_graph_node(nodes.evaluate_answer))
 
         # Entry point for a chat turn
-        workflow.set_entry_point("classify_intent")
+        workflow.set_entry_point(entry_node)
 
         # Conditional routing after classifying intent
-        workflow.add_conditional_edges(
-            "classify_intent",
-            _route_message_logic,
-            {
-                "generate_chat_response": "generate_chat_response",
-                "generate_new_exercise": "generate_new_exercise",
-                "generate_new_assessment": "generate_new_assessment",
-                "evaluate_answer": "evaluate_answer",
-            },
-        )
+        route_map = {
+            "generate_chat_response": "generate_chat_response",
+            "generate_new_exercise": "generate_new_exercise",
+            "generate_new_assessment": "generate_new_assessment",
+            "evaluate_answer": "evaluate_answer",
+        }
+        if self.fused:
+            # The fused node may already have written the chat reply
+            workflow.add_conditional_edges(
+                entry_node, _route_fused_logic, {**route_map, END: END}
+            )
+        else:
+            workflow.add_conditional_edges(entry_node, _route_message_logic, route_map)
 
         # Edges leading back to the end after processing
         workflow.add_edge("generate_chat_response", END) # Use END constant
@@ -108,7 +185,11 @@ class LessonAI:
 
         # Invoke the chat graph
         # The graph will internally call nodes which now expect 'history_context' in the state dict
-        output_state_changes: Any = self.chat_graph.invoke(input_state_dict)
+        output_state_changes: Any
+        if self.speculative:
+            output_state_changes = self._run_speculative_turn(input_state_dict)
+        else:
+            output_state_changes = self.chat_graph.invoke(input_state_dict)
 
         # The output_state_changes dictionary contains the updates from the invoked node,
         # including 'new_assistant_message' if generated by generate_chat_response.
@@ -126,6 +207,56 @@ class LessonAI:
         # Return the final state dictionary (which includes the new message if generated)
         return final_state
 
+    def _dispatch(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs the node the classified intent routes to and merges its changes."""
+        node_function = self._dispatch_nodes[_route_message_logic(cast(LessonState, state))]
+        return {**state, **node_function(state)}
+
+    def _run_speculative_turn(self, input_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Runs a chat turn with the chat reply generated alongside classification.
+
+        Mirrors the graph (classify, then route), but starts generate_chat_response
+        before the LLM classification. Messages the local fast path classifies,
+        and turns where the quota budget or circuit breaker forbid optional work,
+        run without speculation.
+        """
+        history: List[Dict[str, Any]] = input_state.get("history_context") or []
+        if not history or history[-1].get("role") != "user":
+            return self.chat_graph.invoke(input_state)
+        last_user_message = history[-1].get("content", "")
+        state = dict(input_state)
+
+        fast_intent = nodes.fast_path_intent(last_user_message, state)
+        if fast_intent:
+            nodes.apply_intent(state, fast_intent, last_user_message)
+            return self._dispatch(state)
+
+        blocker = speculation.speculation_blocker()
+        if blocker:
+            speculation.record_outcome(f"skipped_{blocker}")
+            return self._dispatch(nodes.classify_intent(state, use_fast_path=False))
+
+        speculative_chat = speculation.SpeculativeChat(nodes.generate_chat_response, state)
+        classify_start = time.monotonic()
+        classified = nodes.classify_intent(state, use_fast_path=False)
+        classify_seconds = time.monotonic() - classify_start
+
+        if _route_message_logic(cast(LessonState, classified)) != "generate_chat_response":
+            speculation.record_outcome(speculative_chat.discard())
+            return self._dispatch(classified)
+
+        try:
+            chat_changes, chat_seconds = speculative_chat.result()
+        except Exception as e:
+            logger.error(f"Speculative chat response failed: {e}", exc_info=True)
+            speculation.record_outcome("failed")
+            return self._dispatch(classified)
+
+        elapsed = time.monotonic() - classify_start
+        speculation.record_outcome("hit", max(0.0, classify_seconds + chat_seconds - elapsed))
+        return {**classified, **chat_changes}
+
     # --- Method to Start Chat (using imported node function) ---
     def start_chat(self, initial_state: LessonState) -> LessonState:
         """
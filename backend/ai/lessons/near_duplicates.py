@@ -0,0 +1,180 @@
+# backend/ai/lessons/near_duplicates.py
+"""
+Near-duplicate detection for generated exercises and assessment questions.
+
+LLM-chosen item IDs say nothing about content: a new question may reuse an
+old ID, and a rephrased old question may arrive under a new one. Generated
+items are therefore compared by text. Each item's text is normalized, cut
+into overlapping character shingles and reduced to a MinHash signature,
+whose agreement with another signature estimates the Jaccard similarity of
+the two shingle sets. An item at or above the threshold is a near-duplicate.
+
+Signatures are cached by text, and `NearDuplicateIndexCache` keeps each
+learner's index between requests, extending it as items are added, so
+checking a new item against the tens of items a learner (or a lesson's shared
+pool) has seen costs one signature and a few dozen integer comparisons.
+"""
+
+import hashlib
+import os
+import random
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from backend.models import AssessmentQuestion, Exercise
+
+GeneratedItem = Union[Exercise, AssessmentQuestion]
+
+# Estimated Jaccard similarity from which two items count as the same item
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.7"))
+# Extra LLM calls made when a generated item nearly repeats an earlier one
+NEAR_DUPLICATE_RETRIES = int(os.environ.get("NEAR_DUPLICATE_RETRIES", "2"))
+NUM_PERMUTATIONS = 64
+SHINGLE_CHARS = 5
+# Most recent items described to the model, and the length of each description
+MAX_PROMPT_ITEMS = 20
+DESCRIPTION_MAX_CHARS = 100
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures must not change between processes
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)
+]
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+Signature = Tuple[int, ...]
+
+
+def item_text(item: GeneratedItem) -> str:
+    """The text that identifies an item: its question or instructions and its choices."""
+    if isinstance(item, AssessmentQuestion):
+        parts = [item.question_text]
+    else:
+        parts = [item.question or "", item.instructions or ""]
+        parts.extend(item.items or [])
+    parts.extend(option.text for option in item.options or [])
+    return " ".join(part for part in parts if part)
+
+
+def describe_item(item: GeneratedItem) -> str:
+    """A one-line description of an item for generation prompts."""
+    text = " ".join(item_text(item).split())
+    if len(text) > DESCRIPTION_MAX_CHARS:
+        text = text[: DESCRIPTION_MAX_CHARS - 3].rstrip() + "..."
+    return f"{item.type}: {text}"
+
+
+def existing_item_descriptions(
+    items: Sequence[GeneratedItem], item_ids: Iterable[str] = ()
+) -> List[str]:
+    """
+    Describes the items a new one must differ from, most recent last.
+
+    IDs without a stored item (states saved before items were kept) are
+    listed as-is.
+    """
+    known_ids = {item.id for item in items}
+    descriptions = [item_id for item_id in item_ids if item_id not in known_ids]
+    descriptions.extend(describe_item(item) for item in items)
+    return descriptions[-MAX_PROMPT_ITEMS:]
+
+
+@lru_cache(maxsize=4096)
+def minhash_signature(text: str) -> Signature:
+    """MinHash signature of the text's character shingles; () for blank text."""
+    normalized = _NON_WORD.sub(" ", text.lower()).strip()
+    if not normalized:
+        return ()
+    shingles = {
+        normalized[i : i + SHINGLE_CHARS]
+        for i in range(max(1, len(normalized) - SHINGLE_CHARS + 1))
+    }
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in shingles
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimated_similarity(first: Signature, second: Signature) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    if not first or not second:
+        return 0.0
+    return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+class NearDuplicateIndex:
+    """The signatures of the items a new item must not repeat."""
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._signatures: List[Tuple[str, Signature]] = []
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    @classmethod
+    def from_items(
+        cls, items: Iterable[GeneratedItem], threshold: float = NEAR_DUPLICATE_THRESHOLD
+    ) -> "NearDuplicateIndex":
+        """Builds an index over already generated items."""
+        index = cls(threshold)
+        for item in items:
+            index.add(item.id, item_text(item))
+        return index
+
+    def keys(self) -> List[str]:
+        """The keys of the indexed items, in the order they were added."""
+        return [key for key, _ in self._signatures]
+
+    def add(self, key: str, text: str) -> None:
+        """Adds the text of the item `key`."""
+        self._signatures.append((key, minhash_signature(text)))
+
+    def find(self, text: str) -> Optional[Tuple[str, float]]:
+        """Returns (key, similarity) of the most similar indexed item at or above the threshold."""
+        signature = minhash_signature(text)
+        best: Optional[Tuple[str, float]] = None
+        for key, other in self._signatures:
+            similarity = estimated_similarity(signature, other)
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+class NearDuplicateIndexCache:
+    """NearDuplicateIndex objects kept between requests, one per learner and lesson."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max(1, max_entries)
+        self._indexes: "OrderedDict[Hashable, NearDuplicateIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def index_for(self, key: Hashable, items: Sequence[GeneratedItem]) -> NearDuplicateIndex:
+        """
+        Returns the index over `items`, the items stored under `key` so far.
+
+        Items appended since the last call are added to the cached index; if
+        the cached index covers other items (the state was reset or belongs
+        to another version of the lesson), it is rebuilt.
+        """
+        item_ids = [item.id for item in items]
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None or index.keys() != item_ids[: len(index)]:
+                index = NearDuplicateIndex.from_items(items)
+            else:
+                for item in items[len(index):]:
+                    index.add(item.id, item_text(item))
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+            return index
@@ -7,40 +7,205 @@ import logging
 import uuid
 
 # Ensure Union is imported from typing
-from typing import Any, Dict, List, Optional, Tuple, Union
-
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from backend.ai.lessons import grading, intent_fast_path
+from backend.ai.lessons.context_builder import build_lesson_context
+from backend.ai.lessons.near_duplicates import (
+    NEAR_DUPLICATE_RETRIES,
+    NearDuplicateIndex,
+    NearDuplicateIndexCache,
+    existing_item_descriptions,
+    item_text,
+)
+from backend.ai.llm_telemetry import llm_node
 from backend.ai.llm_utils import call_llm_with_json_parsing, call_llm_plain_text
 from backend.ai.prompt_loader import load_prompt
+from backend.metrics import metrics
 from backend.models import (
     AssessmentQuestion,
     Exercise,
     GeneratedLessonContent,
+    IntentAndResponseResult,
     IntentClassificationResult,
 )
 from backend.ai.prompt_formatting import LATEX_FORMATTING_INSTRUCTIONS
+from backend.services.lesson_state_utils import unwrap_model
 
 
 logger = logging.getLogger(__name__)
 
-# --- Constants ---
-MAX_HISTORY_TURNS = 10  # Limit conversation history length for prompts
+# Optional shared pool of pre-generated items (backend/services/lesson_item_pool.py),
+# installed at startup; None means items are always generated on demand.
+_item_pool: Optional[Any] = None
+
+
+def set_item_pool(pool: Optional[Any]) -> None:
+    """Installs (or removes, with None) the shared exercise/assessment pool."""
+    global _item_pool  # pylint: disable=global-statement
+    _item_pool = pool
+
+
+def _take_pooled_item(
+    state: Dict[str, Any],
+    item_type: str,
+    existing_ids: List[str],
+    seen: NearDuplicateIndex,
+) -> Optional[Union[Exercise, AssessmentQuestion]]:
+    """
+    Returns a pooled item for the lesson that the learner has not seen and
+    that does not rephrase one of their items; tops up the pool if low.
+    """
+    lesson_id = state.get("lesson_db_id")
+    if _item_pool is None or not lesson_id:
+        return None
+    try:
+        item = _item_pool.take(lesson_id, item_type, existing_ids, seen=seen)
+        _item_pool.request_refill(lesson_id, item_type, state)
+        return item
+    except Exception as e:
+        logger.error(f"Item pool lookup failed for lesson {lesson_id}: {e}", exc_info=True)
+        return None
+
+
+def _share_generated_item(
+    state: Dict[str, Any], item_type: str, item: Union[Exercise, AssessmentQuestion]
+) -> None:
+    """Adds an item generated on demand to the lesson's pool for other learners."""
+    lesson_id = state.get("lesson_db_id")
+    if _item_pool is None or not lesson_id:
+        return
+    try:
+        _item_pool.add(lesson_id, item_type, item, reassign_duplicate_id=False)
+    except Exception as e:
+        logger.error(f"Failed to add {item_type} to pool for lesson {lesson_id}: {e}")
+
+
+# Optional retriever of relevant exposition chunks (backend/services/exposition_retriever.py),
+# installed at startup; None means chat prompts get the beginning of the exposition.
+_exposition_retriever: Optional[Any] = None
+
+
+def set_exposition_retriever(retriever: Optional[Any]) -> None:
+    """Installs (or removes, with None) the exposition chunk retriever."""
+    global _exposition_retriever  # pylint: disable=global-statement
+    _exposition_retriever = retriever
+
+
+def _relevant_exposition(state: Dict[str, Any], user_message: str) -> List[str]:
+    """Returns the exposition chunks relevant to the message, best first (may be empty)."""
+    lesson_id = state.get("lesson_db_id")
+    generated_content: Optional[GeneratedLessonContent] = state.get("generated_content")
+    if _exposition_retriever is None or not lesson_id or not generated_content:
+        return []
+    try:
+        return _exposition_retriever.retrieve(
+            lesson_id, str(generated_content.exposition_content or ""), user_message
+        )
+    except Exception as e:
+        logger.error(f"Exposition retrieval failed for lesson {lesson_id}: {e}", exc_info=True)
+        return []
+
+
+def _generated_items(
+    state: Dict[str, Any], key: str
+) -> List[Union[Exercise, AssessmentQuestion]]:
+    """The exercises or assessment questions already given to the learner."""
+    # Lazily loaded states hold LazyModel stand-ins; validate them here
+    items = [unwrap_model(item) for item in state.get(key) or []]
+    return [item for item in items if isinstance(item, (Exercise, AssessmentQuestion))]
 
 
-# --- Helper Functions ---
-def _truncate_history(history: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    """Truncates conversation history to the last MAX_HISTORY_TURNS."""
-    return history[-MAX_HISTORY_TURNS:]
+# Signatures of each learner's exercises/questions, extended as items are added
+_near_duplicate_indexes = NearDuplicateIndexCache()
 
 
-def _format_history_for_prompt(history: List[Dict[str, str]]) -> str:
-    """Formats conversation history into a simple string for prompts."""
-    formatted = []
-    for msg in history:
-        role = msg.get("role", "unknown")
-        content = msg.get("content", "")
-        formatted.append(f"{role.capitalize()}: {content}")
-    return "\n".join(formatted)
+def _seen_items_index(
+    state: Dict[str, Any],
+    items_key: str,
+    items: List[Union[Exercise, AssessmentQuestion]],
+    use_pool: bool,
+) -> NearDuplicateIndex:
+    """The signatures of the learner's earlier items, cached per learner and lesson."""
+    # Pool refills (use_pool=False) check against the pooled items, not a learner's
+    owner = state.get("user_id") if use_pool else "lesson_item_pool"
+    lesson = state.get("lesson_db_id") or state.get("lesson_uid")
+    return _near_duplicate_indexes.index_for((owner, lesson, items_key), items)
+
+
+def _near_duplicate_of(
+    item: Union[Exercise, AssessmentQuestion],
+    seen: NearDuplicateIndex,
+    existing_ids: List[str],
+    id_prefix: str,
+) -> Optional[str]:
+    """
+    Checks a generated item against the items generated before it.
 
+    An item whose ID is already taken is kept under a fresh ID. Returns the ID
+    of the earlier item it nearly repeats, or None if the item is new.
+    """
+    if item.id in existing_ids:
+        fresh_id = f"{id_prefix}_{uuid.uuid4().hex[:6]}"
+        logger.warning(f"Generated item reused ID {item.id}; assigned {fresh_id}.")
+        item.id = fresh_id
+    match = seen.find(item_text(item))
+    if match is None:
+        return None
+    metrics.increment("generated_item_near_duplicates_total", {"type": item.type})
+    logger.warning(
+        f"Generated item {item.id} nearly repeats {match[0]} (similarity {match[1]:.2f})."
+    )
+    return match[0]
+
+
+def _generate_distinct_item(
+    prompt_name: str,
+    prompt_kwargs: Dict[str, Any],
+    descriptions_kwarg: str,
+    model_cls: Type[Union[Exercise, AssessmentQuestion]],
+    id_prefix: str,
+    existing_items: List[Union[Exercise, AssessmentQuestion]],
+    existing_ids: List[str],
+    seen: NearDuplicateIndex,
+) -> Tuple[Optional[Union[Exercise, AssessmentQuestion]], bool]:
+    """
+    Asks the LLM for an item unlike the learner's earlier ones.
+
+    A near-duplicate is discarded and the LLM asked again, with the discarded
+    item added to the descriptions it must avoid, up to NEAR_DUPLICATE_RETRIES
+    times.
+
+    Returns:
+        (item, False) on success, (None, True) if every attempt nearly
+        repeated an earlier item and (None, False) if generation failed.
+    """
+    rejected: List[Union[Exercise, AssessmentQuestion]] = []
+    for _ in range(1 + max(0, NEAR_DUPLICATE_RETRIES)):
+        descriptions_json = json.dumps(
+            existing_item_descriptions(existing_items + rejected, existing_ids)
+        )
+        try:
+            prompt = load_prompt(
+                prompt_name, **prompt_kwargs, **{descriptions_kwarg: descriptions_json}
+            )
+            result = call_llm_with_json_parsing(
+                prompt, validation_model=model_cls, max_retries=2
+            )
+        except Exception as e:
+            logger.error(f"LLM call/parsing failed for {prompt_name}: {e}", exc_info=True)
+            return None, False
+        if not isinstance(result, model_cls):
+            if result is not None:
+                logger.error(f"{prompt_name} returned unexpected type: {type(result)}")
+            return None, False
+        if not result.id:
+            result.id = f"{id_prefix}_{uuid.uuid4().hex[:6]}"
+            logger.warning(f"Generated item lacked ID, assigned fallback: {result.id}")
+        if not _near_duplicate_of(result, seen, existing_ids, id_prefix):
+            return result, False
+        rejected.append(result)
+    return None, True
 
 # --- Node Functions ---
 
@@ -67,10 +232,35 @@ def _map_intent_to_mode(intent_str: str, state: Dict[str, Any]) -> str:
     return "chatting"
 
 
-def classify_intent(state: Dict[str, Any]) -> Dict[str, Any]:
+def fast_path_intent(message: str, state: Dict[str, Any]) -> Optional[str]:
+    """Returns a locally classified intent for obvious messages, or None for the LLM."""
+    if not intent_fast_path.INTENT_FAST_PATH_ENABLED:
+        return None
+    has_active_task = bool(state.get("active_exercise") or state.get("active_assessment"))
+    result = intent_fast_path.classify_intent_fast(message, has_active_task=has_active_task)
+    return result.intent if result else None
+
+
+def apply_intent(
+    state: Dict[str, Any], intent: str, last_user_message: str
+) -> str:
+    """Sets the interaction mode (and potential answer) for a classified intent."""
+    interaction_mode = _map_intent_to_mode(intent, state)
+    state["current_interaction_mode"] = interaction_mode
+    state["potential_answer"] = (
+        last_user_message if interaction_mode == "submit_answer" else None
+    )
+    return interaction_mode
+
+
+@llm_node
+def classify_intent(state: Dict[str, Any], use_fast_path: bool = True) -> Dict[str, Any]:
     """
     Classifies the user's intent based on the latest message and conversation history.
 
+    Obvious messages are classified locally (see intent_fast_path) unless
+    `use_fast_path` is False, e.g. when the caller has already tried it.
+
     Updates the state with the classified intent ('chatting', 'request_exercise',
     'request_assessment', 'submit_answer', 'unknown').
     """
@@ -89,34 +279,26 @@ def classify_intent(state: Dict[str, Any]) -> Dict[str, Any]:
         return state
 
     last_user_message = history[-1].get("content", "")
-    truncated_history = _truncate_history(history[:-1])  # History *before* last message
-    formatted_history = _format_history_for_prompt(truncated_history)
+
+    # Obvious phrasings are classified locally without an LLM round trip
+    fast_intent = fast_path_intent(last_user_message, state) if use_fast_path else None
+    if fast_intent:
+        logger.info(f"Fast-path intent for user {user_id}: {fast_intent}")
+        apply_intent(state, fast_intent, last_user_message)
+        return state
 
     # --- Context Extraction (Similar to generate_chat_response) ---
     topic: str = state.get("topic", "Unknown Topic")
     lesson_title: str = state.get("lesson_title", "Unknown Lesson")
     user_level: str = state.get("knowledge_level", "beginner")
-    generated_content: Optional[GeneratedLessonContent] = state.get("generated_content")
-    active_exercise: Optional[Exercise] = state.get("active_exercise")
-    active_assessment: Optional[AssessmentQuestion] = state.get("active_assessment")
 
-    exposition_summary = ""
-    if generated_content and generated_content.exposition_content:
-        exposition_summary = str(generated_content.exposition_content)[
-            :500
-        ]  # Limit length
-
-    active_task_context = "None"
-    if active_exercise:
-        active_task_context = (
-            f"Active Exercise: {active_exercise.type} - "
-            f"{active_exercise.instructions or active_exercise.question}"
-        )
-    elif active_assessment:
-        active_task_context = (
-            f"Active Assessment Question: {active_assessment.type} - "
-            f"{active_assessment.question_text}"
-        )
+    # Fit the history before the last message to the prompt budget
+    context = build_lesson_context(
+        "intent_classification",
+        state,
+        history=history[:-1],
+        fixed_text=(last_user_message,),
+    )
 
     # --- Call LLM for Intent Classification ---
     intent_classification_result: Optional[
@@ -127,12 +309,10 @@ def classify_intent(state: Dict[str, Any]) -> Dict[str, Any]:
         prompt = load_prompt(
             "intent_classification",
             user_input=last_user_message,  # Correct key for the prompt template
-            history_json=formatted_history,  # Correct key for the prompt template
+            history_json=context.formatted_history,  # Correct key for the prompt template
             topic=topic,
             lesson_title=lesson_title,
             user_level=user_level,
-            exposition_summary=exposition_summary,
-            active_task_context=active_task_context,
         )
 
         # Use call_llm_with_json_parsing to get a validated IntentClassificationResult object
@@ -161,17 +341,7 @@ def classify_intent(state: Dict[str, Any]) -> Dict[str, Any]:
     if intent_classification and intent_classification.intent:
         classified_intent = intent_classification.intent.lower()
         logger.info(f"Classified intent for user {user_id}: {classified_intent}")
-
-        # Use helper function to map intent to mode
-        interaction_mode = _map_intent_to_mode(classified_intent, state)
-        state["current_interaction_mode"] = interaction_mode
-
-        # Store potential answer if intent is submit_answer
-        if interaction_mode == "submit_answer":
-            state["potential_answer"] = last_user_message
-        else:
-            # Clear potential answer if not submitting
-            state["potential_answer"] = None
+        apply_intent(state, classified_intent, last_user_message)
 
     else:
         # If classification failed or returned no intent, default to chatting
@@ -183,6 +353,7 @@ def classify_intent(state: Dict[str, Any]) -> Dict[str, Any]:
 
 
 # Changed to synchronous
+@llm_node
 def generate_chat_response(
     state: Dict[str, Any],
 ) -> Dict[str, Any]: # Return only state changes dictionary
@@ -210,33 +381,20 @@ def generate_chat_response(
 
     # Use the 'history' variable defined above
     last_user_message = history[-1].get("content", "")
-    # Use the history from state for truncation and formatting
-    truncated_history = _truncate_history(history[:-1])
-    formatted_history = _format_history_for_prompt(truncated_history)
 
     # --- Extract Context ---
     topic: str = state.get("topic", "Unknown Topic")
     lesson_title: str = state.get("lesson_title", "Unknown Lesson")
     user_level: str = state.get("knowledge_level", "beginner")
-    generated_content: Optional[GeneratedLessonContent] = state.get("generated_content")
-    active_exercise: Optional[Exercise] = state.get("active_exercise")
-    active_assessment: Optional[AssessmentQuestion] = state.get("active_assessment")
 
-    exposition_summary = ""
-    if generated_content and generated_content.exposition_content:
-        exposition_summary = str(generated_content.exposition_content)[:1000]
-
-    active_task_context = "None"
-    if active_exercise:
-        active_task_context = (
-            f"Active Exercise: {active_exercise.type} - "
-            f"{active_exercise.instructions or active_exercise.question}"
-        )
-    elif active_assessment:
-        active_task_context = (
-            f"Active Assessment Question: {active_assessment.type} - "
-            f"{active_assessment.question_text}"
-        )
+    # Fit history (before the last message), exposition and task to the prompt budget
+    context = build_lesson_context(
+        "chat_response",
+        state,
+        history=history[:-1],
+        fixed_text=(last_user_message, LATEX_FORMATTING_INSTRUCTIONS),
+        exposition_chunks=_relevant_exposition(state, last_user_message),
+    )
 
     # --- Call LLM for Chat Response ---
     ai_response_content = None  # Initialize as None
@@ -244,12 +402,12 @@ def generate_chat_response(
         prompt = load_prompt(
             "chat_response",
             user_message=last_user_message,
-            history_json=formatted_history,
+            history_json=context.formatted_history,
             topic=topic,
             lesson_title=lesson_title,
             user_level=user_level,
-            exposition=exposition_summary,
-            active_task_context=active_task_context,
+            exposition=context.exposition,
+            active_task_context=context.active_task,
             latex_formatting_instructions=LATEX_FORMATTING_INSTRUCTIONS,
         )
         ai_response_content = call_llm_plain_text(prompt, max_retries=3)
@@ -283,6 +441,95 @@ def generate_chat_response(
     return state_changes
 
 
+@llm_node
+def classify_and_respond(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Classifies the user's intent and, when chatting, generates the reply in one call.
+
+    Used by the fused lesson graph in place of classify_intent followed by
+    generate_chat_response. Sets 'new_assistant_message' only when the model
+    returned a reply for a chatting intent; otherwise the graph routes on
+    'current_interaction_mode' as usual (falling back to generate_chat_response
+    if a chatting reply is missing).
+    """
+    logger.info("Classifying user intent and generating reply (fused).")
+    history: List[Dict[str, Any]] = state.get("history_context", [])
+    user_id: str = state.get("user_id", "unknown_user")
+    state["new_assistant_message"] = None
+
+    if not history or history[-1].get("role") != "user":
+        logger.warning(
+            f"Cannot classify intent: No user message found in history_context for user {user_id}."
+        )
+        state["current_interaction_mode"] = "chatting"
+        return state
+
+    last_user_message = history[-1].get("content", "")
+    lesson_title: str = state.get("lesson_title", "Unknown Lesson")
+
+    # A fast-path hit for a task intent skips the fused call entirely; chatting
+    # intents still need the call for the reply.
+    fast_intent = fast_path_intent(last_user_message, state)
+    if fast_intent and _map_intent_to_mode(fast_intent, state) != "chatting":
+        logger.info(f"Fast-path intent for user {user_id}: {fast_intent}")
+        apply_intent(state, fast_intent, last_user_message)
+        return state
+
+    context = build_lesson_context(
+        "classify_and_respond",
+        state,
+        history=history[:-1],
+        fixed_text=(last_user_message, LATEX_FORMATTING_INSTRUCTIONS),
+        exposition_chunks=_relevant_exposition(state, last_user_message),
+    )
+
+    result: Optional[IntentAndResponseResult] = None
+    try:
+        prompt = load_prompt(
+            "classify_and_respond",
+            user_message=last_user_message,
+            history_json=context.formatted_history,
+            lesson_title=lesson_title,
+            exposition=context.exposition,
+            active_task_context=context.active_task,
+            latex_formatting_instructions=LATEX_FORMATTING_INSTRUCTIONS,
+        )
+        parsed = call_llm_with_json_parsing(
+            prompt, validation_model=IntentAndResponseResult, max_retries=3
+        )
+        if isinstance(parsed, IntentAndResponseResult):
+            result = parsed
+    except Exception as e:
+        logger.error(
+            f"LLM call/parsing failed during fused intent classification: {e}", exc_info=True
+        )
+
+    if not result or not result.intent:
+        logger.warning(f"Fused classification failed for user {user_id}. Defaulting to chatting.")
+        state["current_interaction_mode"] = "chatting"
+        state["potential_answer"] = None
+        return state
+
+    classified_intent = result.intent.lower()
+    logger.info(f"Classified intent for user {user_id}: {classified_intent} (fused)")
+    interaction_mode = apply_intent(state, classified_intent, last_user_message)
+
+    if interaction_mode == "chatting" and result.response:
+        state["new_assistant_message"] = {"role": "assistant", "content": result.response}
+        state["error_message"] = None
+
+    return state
+
+
+def _clear_active_task(state: Dict[str, Any]) -> None:
+    """Resets the task fields after an answer has been evaluated."""
+    state["active_exercise"] = None
+    state["active_assessment"] = None
+    state["potential_answer"] = None
+    state["current_interaction_mode"] = "chatting"
+    state["error_message"] = None  # Clear any previous error
+
+
 # Changed to synchronous
 def _prepare_evaluation_context(
     active_exercise: Optional[Exercise],
@@ -332,6 +579,7 @@ def _prepare_evaluation_context(
     return context
 
 
+@llm_node
 def evaluate_answer(
     state: Dict[str, Any],
 ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
@@ -374,6 +622,22 @@ def evaluate_answer(
         # Return state and the error message
         return state, feedback_message
 
+    # --- Grade objective items locally ---
+    local_result = grading.grade_answer(user_answer, active_exercise, active_assessment)
+    if local_result is not None:
+        item_type = (active_exercise or active_assessment).type
+        metrics.increment("answer_grading_total", {"method": "local", "type": item_type})
+        logger.info(
+            f"Graded {item_type} answer locally for user {user_id}: score {local_result.score}."
+        )
+        feedback_message = {
+            "role": "assistant",
+            "content": grading.format_feedback(local_result),
+        }
+        _clear_active_task(state)
+        state["last_evaluation"] = local_result.model_dump()
+        return state, feedback_message
+
     # --- Prepare Context using Helper ---
     eval_context = _prepare_evaluation_context(active_exercise, active_assessment)
     task_type = eval_context["task_type"]
@@ -381,6 +645,10 @@ def evaluate_answer(
     correct_answer_details = eval_context["correct_answer_details"]
 
     # --- Call LLM for Evaluation ---
+    metrics.increment(
+        "answer_grading_total",
+        {"method": "llm", "type": (active_exercise or active_assessment).type},
+    )
     evaluation_feedback_content = None  # Initialize as None
     try:
         prompt = load_prompt(
@@ -406,11 +674,8 @@ def evaluate_answer(
     feedback_message = {"role": "assistant", "content": evaluation_feedback_content}
 
     # Clear the active task and potential answer
-    state["active_exercise"] = None
-    state["active_assessment"] = None
-    state["potential_answer"] = None
-    state["current_interaction_mode"] = "chatting"
-    state["error_message"] = None  # Clear any previous error
+    _clear_active_task(state)
+    state["last_evaluation"] = None  # Free-text feedback carries no structured score
 
     logger.info(f"Generated evaluation feedback for user {user_id}.")
     # Return the updated state and the feedback message dictionary
@@ -431,8 +696,29 @@ GenerateNodeReturnType = Tuple[
 
 # Changed to synchronous
 # Updated return type hint
+def _activate_exercise(
+    state: Dict[str, Any], exercise: Exercise, existing_exercise_ids: List[str]
+) -> Tuple[Dict[str, Any], Exercise, Dict[str, Any]]:
+    """Makes `exercise` the active task; returns (state, exercise, message)."""
+    state["active_exercise"] = exercise
+    state["active_assessment"] = None
+    state["generated_exercise_ids"] = existing_exercise_ids + [exercise.id]
+    state["generated_exercises"] = _generated_items(state, "generated_exercises") + [exercise]
+    assistant_message = {
+        "role": "assistant",
+        "content": (
+            f"Okay, I've generated a new {exercise.type.replace('_', ' ')} "
+            "exercise for you. Please see below and provide your answer in the chat."),
+    }
+    state["current_interaction_mode"] = "awaiting_answer"
+    state["error_message"] = None
+    return state, exercise, assistant_message
+
+
+@llm_node
 def generate_new_exercise(
     state: Dict[str, Any],
+    use_pool: bool = True,
 ) -> Tuple[
     Dict[str, Any], Optional[Union[Exercise, Dict[str, Any]]], Optional[Dict[str, Any]]
 ]:  # Keep message return
@@ -443,6 +729,9 @@ def generate_new_exercise(
     its ID to 'generated_exercise_ids'. Appends a confirmation message
     to the conversation history.
 
+    Unseen exercises from the lesson's shared pool are served without an LLM
+    call unless `use_pool` is False (as when the pool refills itself).
+
     Returns:
         Tuple[Dict[str, Any], Optional[Union[Exercise, Dict[str, Any]]]]:
             The updated state and the generated Exercise object (or dict/None).
@@ -470,113 +759,124 @@ def generate_new_exercise(
         # Return original state, None exercise, and the error message
         return state, None, assistant_message
 
-    # Create exposition summary
-    exposition_summary = str(generated_content.exposition_content)[:1000]
+    existing_exercises = _generated_items(state, "generated_exercises")
+    seen = _seen_items_index(state, "generated_exercises", existing_exercises, use_pool)
+    pooled_exercise = (
+        _take_pooled_item(state, "exercise", existing_exercise_ids, seen) if use_pool else None
+    )
+    if isinstance(pooled_exercise, Exercise):
+        logger.info(f"Serving pooled exercise {pooled_exercise.id} to user {user_id}.")
+        return _activate_exercise(state, pooled_exercise, existing_exercise_ids)
 
     # Create syllabus context
     syllabus_context = (
         f"Module: {state.get('module_title', 'N/A')}, Lesson: {lesson_title}"
     )
+    # Describe the earlier exercises so the model avoids repeating them
+    existing_exercise_ids_json = json.dumps(
+        existing_item_descriptions(existing_exercises, existing_exercise_ids)
+    )
+
+    # Fit the exposition to the prompt budget
+    context = build_lesson_context(
+        "generate_exercises",
+        state,
+        fixed_text=(
+            syllabus_context,
+            existing_exercise_ids_json,
+            LATEX_FORMATTING_INSTRUCTIONS,
+        ),
+    )
 
     # --- 2. Call LLM ---
-    new_exercise_result: Optional[Union[Exercise, Dict[str, Any]]] = None
-    try:
-        prompt = load_prompt(
-            "generate_exercises",
-            topic=topic,
-            lesson_title=lesson_title,
-            user_level=user_level,
-            exposition_summary=exposition_summary,
-            syllabus_context=syllabus_context,
-            existing_exercise_descriptions_json=json.dumps(existing_exercise_ids),
-            latex_formatting_instructions=LATEX_FORMATTING_INSTRUCTIONS,
-        )
-        new_exercise_result = call_llm_with_json_parsing(
-            prompt, validation_model=Exercise, max_retries=2
-        )
-    except Exception as e:
-        logger.error(
-            f"LLM call/parsing failed during exercise generation: {e}", exc_info=True
-        )
+    # Near-duplicates of earlier exercises are discarded and regenerated
+    new_exercise, near_duplicate = _generate_distinct_item(
+        "generate_exercises",
+        {
+            "topic": topic,
+            "lesson_title": lesson_title,
+            "user_level": user_level,
+            "exposition_summary": context.exposition,
+            "syllabus_context": syllabus_context,
+            "latex_formatting_instructions": LATEX_FORMATTING_INSTRUCTIONS,
+        },
+        "existing_exercise_descriptions_json",
+        Exercise,
+        "ex",
+        existing_exercises,
+        existing_exercise_ids,
+        seen,
+    )
 
     # --- 3. Process Result & Update State ---
-    validated_exercise: Optional[Exercise] = None
-    if isinstance(new_exercise_result, Exercise):
-        validated_exercise = new_exercise_result
-        if not validated_exercise.id:
-            validated_exercise.id = f"ex_{uuid.uuid4().hex[:6]}"
-            logger.warning(
-                f"Generated exercise lacked ID, assigned fallback: {validated_exercise.id}"
-            )
-
-        # Check for duplicate ID
-        if validated_exercise.id in existing_exercise_ids:
-            logger.warning(
-                f"""LLM generated an exercise with a duplicate ID
-                    ({validated_exercise.id}). Discarding."""
-            )
-            assistant_message = {
-                "role": "assistant",
-                "content": """
-                    Sorry, I couldn't come up with a new exercise right now.
-                    Would you like to try again or ask something else?""",
-            }
-            state["current_interaction_mode"] = "chatting"
-            state["error_message"] = "Duplicate exercise ID generated."
-            return (
-                state,
-                None,
-                assistant_message,
-            )  # Return state, None exercise, failure message
-        else:
-            # Successfully generated new exercise
-            logger.info(
-                f"Successfully generated new exercise with ID: {validated_exercise.id}"
-            )
-            state["active_exercise"] = validated_exercise
-            state["active_assessment"] = None
-            state["generated_exercise_ids"] = existing_exercise_ids + [
-                validated_exercise.id
-            ]
-            assistant_message = {
-                "role": "assistant",
-                "content": (
-                    f"Okay, I've generated a new {validated_exercise.type.replace('_', ' ')} "
-                    "exercise for you. Please see below and provide your answer in the chat."),
-            }
-            state["current_interaction_mode"] = "awaiting_answer"
-            state["error_message"] = None
-            return (
-                state,
-                validated_exercise,
-                assistant_message,
-            )  # Return state, exercise, success message
-
-    else:  # Handle generation failure or unexpected return type
-        if new_exercise_result is not None:
-            logger.error(
-                f"Exercise generation returned unexpected type: {type(new_exercise_result)}"
-            )
-        logger.error(f"Failed to generate a valid new exercise for user {user_id}.")
+    if isinstance(new_exercise, Exercise):
+        # Successfully generated new exercise
+        logger.info(f"Successfully generated new exercise with ID: {new_exercise.id}")
+        if use_pool:
+            _share_generated_item(state, "exercise", new_exercise)
+        # Return state, exercise, success message
+        return _activate_exercise(state, new_exercise, existing_exercise_ids)
+
+    if near_duplicate:
         assistant_message = {
             "role": "assistant",
             "content": """
-                Sorry, I wasn't able to generate an exercise for you right now.
-                Please try again later or ask me something else.""",
+                Sorry, I couldn't come up with a new exercise right now.
+                Would you like to try again or ask something else?""",
         }
         state["current_interaction_mode"] = "chatting"
-        state["error_message"] = "Exercise generation failed."
+        state["error_message"] = "Near-duplicate exercise generated."
         return (
             state,
             None,
             assistant_message,
         )  # Return state, None exercise, failure message
 
+    # Handle generation failure or unexpected return type
+    logger.error(f"Failed to generate a valid new exercise for user {user_id}.")
+    assistant_message = {
+        "role": "assistant",
+        "content": """
+            Sorry, I wasn't able to generate an exercise for you right now.
+            Please try again later or ask me something else.""",
+    }
+    state["current_interaction_mode"] = "chatting"
+    state["error_message"] = "Exercise generation failed."
+    return (
+        state,
+        None,
+        assistant_message,
+    )  # Return state, None exercise, failure message
+
 
 # Changed to synchronous
 # Updated return type hint
+def _activate_assessment(
+    state: Dict[str, Any], question: AssessmentQuestion, existing_assessment_ids: List[str]
+) -> Tuple[Dict[str, Any], AssessmentQuestion, Dict[str, Any]]:
+    """Makes `question` the active task; returns (state, question, message)."""
+    state["active_assessment"] = question
+    state["active_exercise"] = None
+    state["generated_assessment_question_ids"] = existing_assessment_ids + [question.id]
+    state["generated_assessment_questions"] = _generated_items(
+        state, "generated_assessment_questions"
+    ) + [question]
+    assistant_message = {
+        "role": "assistant",
+        "content": f"""
+            Okay, here's an assessment question for you
+            ({question.type.replace('_', ' ')}).
+            Please see below and provide your answer in the chat.""",
+    }
+    state["current_interaction_mode"] = "awaiting_answer"
+    state["error_message"] = None
+    return state, question, assistant_message
+
+
+@llm_node
 def generate_new_assessment(
     state: Dict[str, Any],
+    use_pool: bool = True,
 ) -> Tuple[
     Dict[str, Any],
     Optional[Union[AssessmentQuestion, Dict[str, Any]]],
@@ -589,6 +889,9 @@ def generate_new_assessment(
     its ID to 'generated_assessment_ids'. Appends a confirmation message
     to the conversation history.
 
+    Unseen questions from the lesson's shared pool are served without an LLM
+    call unless `use_pool` is False (as when the pool refills itself).
+
     Returns:
         Tuple[Dict[str, Any], Optional[Union[AssessmentQuestion, Dict[str, Any]]]]:
              The updated state and the generated AssessmentQuestion object (or dict/None).
@@ -619,99 +922,94 @@ def generate_new_assessment(
         # Return original state, None question, and the error message
         return state, None, assistant_message
 
-    exposition_summary = str(generated_content.exposition_content)[:1000]
+    existing_questions = _generated_items(state, "generated_assessment_questions")
+    seen = _seen_items_index(state, "generated_assessment_questions", existing_questions, use_pool)
+    pooled_question = (
+        _take_pooled_item(state, "assessment", existing_assessment_ids, seen) if use_pool else None
+    )
+    if isinstance(pooled_question, AssessmentQuestion):
+        logger.info(f"Serving pooled assessment question {pooled_question.id} to user {user_id}.")
+        return _activate_assessment(state, pooled_question, existing_assessment_ids)
+
+    # Create syllabus context
+    syllabus_context = (
+        f"Module: {state.get('module_title', 'N/A')}, Lesson: {lesson_title}"
+    )
+    # Describe the earlier questions so the model avoids repeating them
+    existing_assessment_ids_json = json.dumps(
+        existing_item_descriptions(existing_questions, existing_assessment_ids)
+    )
+
+    # Fit the exposition to the prompt budget
+    context = build_lesson_context(
+        "generate_assessment",
+        state,
+        fixed_text=(
+            syllabus_context,
+            existing_assessment_ids_json,
+            LATEX_FORMATTING_INSTRUCTIONS,
+        ),
+    )
 
     # --- 2. Call LLM ---
-    new_assessment_result: Optional[Union[AssessmentQuestion, Dict[str, Any]]] = None
-    try:
-        prompt = load_prompt(
-            "generate_assessment",
-            topic=topic,
-            lesson_title=lesson_title,
-            user_level=user_level,
-            exposition_summary=exposition_summary,
-            existing_question_descriptions_json=json.dumps(existing_assessment_ids),
-            latex_formatting_instructions=LATEX_FORMATTING_INSTRUCTIONS,
-        )
-        new_assessment_result = call_llm_with_json_parsing(
-            prompt, validation_model=AssessmentQuestion, max_retries=2
-        )
-    except Exception as e:
-        logger.error(
-            f"LLM call/parsing failed during assessment generation: {e}", exc_info=True
-        )
+    # Near-duplicates of earlier questions are discarded and regenerated
+    new_question, near_duplicate = _generate_distinct_item(
+        "generate_assessment",
+        {
+            "topic": topic,
+            "lesson_title": lesson_title,
+            "user_level": user_level,
+            "exposition_summary": context.exposition,
+            "syllabus_context": syllabus_context,
+            "latex_formatting_instructions": LATEX_FORMATTING_INSTRUCTIONS,
+        },
+        "existing_question_descriptions_json",
+        AssessmentQuestion,
+        "as",
+        existing_questions,
+        existing_assessment_ids,
+        seen,
+    )
 
     # --- 3. Process Result & Update State ---
-    validated_question: Optional[AssessmentQuestion] = None
-    if isinstance(new_assessment_result, AssessmentQuestion):
-        validated_question = new_assessment_result
-        if not validated_question.id:
-            validated_question.id = f"as_{uuid.uuid4().hex[:6]}"
-            logger.warning(
-                f"Generated assessment lacked ID, assigned fallback: {validated_question.id}"
-            )
-
-        # Check for duplicates
-        if validated_question.id in existing_assessment_ids:
-            logger.warning(
-                "LLM generated an assessment with a duplicate ID "
-                f"({validated_question.id}). Discarding."
-            )
-            assistant_message = {
-                "role": "assistant",
-                "content": """
-                    Sorry, I couldn't come up with a new assessment question right now.
-                    Would you like to try again or ask something else?""",
-            }
-            state["current_interaction_mode"] = "chatting"
-            state["error_message"] = "Duplicate assessment ID generated."
-            return (
-                state,
-                None,
-                assistant_message,
-            )  # Return state, None question, failure message
-        else:
-            # Successfully generated new assessment question
-            logger.info(
-                f"Successfully generated new assessment question with ID: {validated_question.id}"
-            )
-            state["active_assessment"] = validated_question
-            state["active_exercise"] = None
-            state["generated_assessment_question_ids"] = existing_assessment_ids + [
-                validated_question.id
-            ]
-            assistant_message = {
-                "role": "assistant",
-                "content": f"""
-                    Okay, here's an assessment question for you
-                    ({validated_question.type.replace('_', ' ')}).
-                    Please see below and provide your answer in the chat.""",
-            }
-            state["current_interaction_mode"] = "awaiting_answer"
-            state["error_message"] = None
-            return (
-                state,
-                validated_question,
-                assistant_message,
-            )  # Return state, question, success message
-
-    else:  # Handle generation failure or unexpected return type
-        if new_assessment_result is not None:
-            logger.error(
-                f"Assessment generation returned unexpected type: {type(new_assessment_result)}"
-            )
-        logger.error(
-            f"Failed to generate a valid new assessment question for user {user_id}."
+    if isinstance(new_question, AssessmentQuestion):
+        # Successfully generated new assessment question
+        logger.info(
+            f"Successfully generated new assessment question with ID: {new_question.id}"
         )
+        if use_pool:
+            _share_generated_item(state, "assessment", new_question)
+        # Return state, question, success message
+        return _activate_assessment(state, new_question, existing_assessment_ids)
+
+    if near_duplicate:
         assistant_message = {
             "role": "assistant",
-            "content": ("Sorry, I wasn't able to generate an assessment question for you "
-                        "right now. Please try again later or ask me something else."),
+            "content": """
+                Sorry, I couldn't come up with a new assessment question right now.
+                Would you like to try again or ask something else?""",
         }
         state["current_interaction_mode"] = "chatting"
-        state["error_message"] = "Assessment generation failed."
+        state["error_message"] = "Near-duplicate assessment question generated."
         return (
             state,
             None,
             assistant_message,
         )  # Return state, None question, failure message
+
+    # Handle generation failure or unexpected return type
+    logger.error(
+        f"Failed to generate a valid new assessment question for user {user_id}."
+    )
+    assistant_message = {
+        "role": "assistant",
+        "content": ("Sorry, I wasn't able to generate an assessment question for you "
+                    "right now. Please try again later or ask me something else."),
+    }
+    state["current_interaction_mode"] = "chatting"
+    state["error_message"] = "Assessment generation failed."
+    return (
+        state,
+        None,
+        assistant_message,
+    )  # Return state, None question, failure message
@@ -0,0 +1,130 @@
+"""
+Speculative chat-response generation for lesson chat turns.
+
+Chatting is the most common intent, so in speculative mode the chat reply is
+generated in a worker thread while the intent is being classified. If the
+intent turns out to be chatting the reply is already (partly) done; otherwise
+the speculative call is cancelled if it has not started, or its result is
+discarded.
+
+Speculation is optional work: it is skipped when the LLM quota budget lacks
+low-priority headroom or the primary model's circuit breaker is not closed.
+Saved and wasted latency are reported through the metrics registry.
+"""
+
+import copy
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from backend.ai import llm_utils
+from backend.ai.circuit_breaker import CircuitState, get_breaker
+from backend.ai.lessons.context_builder import PROMPT_BUDGETS
+from backend.ai.llm_quota import LOW_PRIORITY, quota_budget
+from backend.logger import logger
+from backend.metrics import metrics
+
+LESSON_SPECULATIVE_CHAT = os.environ.get("LESSON_SPECULATIVE_CHAT", "false").lower() == "true"
+SPECULATIVE_WORKERS = int(os.environ.get("LESSON_SPECULATIVE_WORKERS", "4"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Returns the shared worker pool, creating it on first use."""
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=SPECULATIVE_WORKERS, thread_name_prefix="speculative-chat"
+            )
+        return _executor
+
+
+def speculation_blocker() -> Optional[str]:
+    """Returns why speculation is not allowed right now, or None if it is."""
+    if llm_utils.MODEL_NAME and get_breaker(llm_utils.MODEL_NAME).state != CircuitState.CLOSED:
+        return "breaker_open"
+    estimated_tokens = PROMPT_BUDGETS["chat_response"].total_tokens
+    if not quota_budget.has_headroom(LOW_PRIORITY, estimated_tokens=estimated_tokens):
+        return "quota"
+    return None
+
+
+class SpeculativeChat:
+    """A chat reply being generated ahead of the intent decision."""
+
+    def __init__(
+        self, chat_node: Callable[[Dict[str, Any]], Dict[str, Any]], state: Dict[str, Any]
+    ) -> None:
+        """Starts `chat_node` on a copy of the state in the worker pool."""
+        self.duration_seconds: Optional[float] = None
+        # The node mutates its input, so it works on its own copy
+        state_copy = copy.copy(state)
+        self._future: Future = _get_executor().submit(self._run, chat_node, state_copy)
+
+    def _run(
+        self, chat_node: Callable[[Dict[str, Any]], Dict[str, Any]], state: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Runs the chat node and times it."""
+        start_time = time.monotonic()
+        try:
+            return chat_node(state)
+        finally:
+            self.duration_seconds = time.monotonic() - start_time
+
+    def result(self) -> Tuple[Dict[str, Any], float]:
+        """Waits for the reply; returns (state changes, LLM seconds spent)."""
+        changes = self._future.result()
+        return changes, self.duration_seconds or 0.0
+
+    def discard(self) -> str:
+        """
+        Abandons the speculative reply.
+
+        Returns:
+            "cancelled" if the call never started, otherwise "discarded"; the
+            time a discarded call spends is recorded as wasted once it finishes.
+        """
+        if self._future.cancel():
+            return "cancelled"
+
+        def _record_waste(future: Future) -> None:
+            try:
+                future.result()
+            except (CancelledError, Exception):  # pylint: disable=broad-exception-caught
+                pass
+            wasted = self.duration_seconds or 0.0
+            metrics.increment("speculative_chat_wasted_seconds_total", amount=wasted)
+            metrics.observe("speculative_chat_wasted_seconds", wasted)
+
+        self._future.add_done_callback(_record_waste)
+        return "discarded"
+
+
+def record_outcome(outcome: str, saved_seconds: float = 0.0) -> None:
+    """Counts a speculation outcome and, for hits, the latency saved."""
+    metrics.increment("speculative_chat_total", {"outcome": outcome})
+    if outcome == "hit":
+        metrics.increment("speculative_chat_saved_seconds_total", amount=saved_seconds)
+        metrics.observe("speculative_chat_saved_seconds", saved_seconds)
+    logger.debug(f"Speculative chat outcome: {outcome} (saved {saved_seconds:.3f}s)")
+
+
+def get_speculation_stats() -> Dict[str, Any]:
+    """Returns speculation outcomes and total saved versus wasted seconds."""
+    counters = metrics.snapshot()["counters"]
+    outcomes = {
+        series["labels"].get("outcome", "unknown"): series["value"]
+        for series in counters.get("speculative_chat_total", [])
+    }
+    saved = sum(s["value"] for s in counters.get("speculative_chat_saved_seconds_total", []))
+    wasted = sum(s["value"] for s in counters.get("speculative_chat_wasted_seconds_total", []))
+    return {
+        "outcomes": outcomes,
+        "saved_seconds_total": saved,
+        "wasted_seconds_total": wasted,
+    }
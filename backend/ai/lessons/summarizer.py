@@ -0,0 +1,52 @@
+# backend/ai/lessons/summarizer.py
+"""
+Rolling summary of a lesson conversation.
+
+Prompts carry the conversation summary plus only the turns after it, so their
+size stays flat however long a lesson runs. The summary is extended every few
+turns from the previous summary and the messages it does not yet cover; see
+LessonInteractionService for when it is refreshed.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from backend.ai.lessons.context_builder import format_history
+from backend.ai.llm_telemetry import llm_node
+from backend.ai.llm_utils import call_llm_plain_text
+from backend.ai.prompt_loader import load_prompt
+from backend.ai.token_budget import truncate_to_tokens
+
+# Refresh the summary once this many user turns are not covered by it (0 disables)
+CONVERSATION_SUMMARY_EVERY_TURNS = int(os.environ.get("CONVERSATION_SUMMARY_EVERY_TURNS", "6"))
+# Latest messages always sent verbatim and never folded into the summary
+CONVERSATION_SUMMARY_KEEP_RECENT = int(os.environ.get("CONVERSATION_SUMMARY_KEEP_RECENT", "6"))
+# Cap on the stored summary; prompts may trim it further to their budget
+SUMMARY_MAX_TOKENS = 300
+
+
+@llm_node
+def summarize_conversation(
+    previous_summary: Optional[str],
+    messages: List[Dict[str, Any]],
+    topic: str,
+    lesson_title: str,
+) -> Optional[str]:
+    """
+    Folds `messages` into the previous summary.
+
+    Returns:
+        The updated summary, or None if the LLM returned nothing.
+    """
+    prompt = load_prompt(
+        "summarize_conversation",
+        topic=topic,
+        lesson_title=lesson_title,
+        previous_summary=previous_summary or "None yet.",
+        history_json=format_history(messages),
+        max_words=SUMMARY_MAX_TOKENS * 3 // 4,
+    )
+    summary = call_llm_plain_text(prompt, max_retries=2)
+    if not summary or not summary.strip():
+        return None
+    return truncate_to_tokens(summary.strip(), SUMMARY_MAX_TOKENS)
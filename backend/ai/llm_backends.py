@@ -0,0 +1,450 @@
+"""
+Pluggable LLM backends.
+
+The backend is selected with the LLM_BACKEND environment variable:
+
+- ``gemini`` (default): Google Gemini via ``google.generativeai``.
+- ``fake``: a local, deterministic stand-in that returns canned, schema-valid
+  responses for every prompt the application sends (lesson, syllabus and
+  onboarding prompts). It needs no API key and can inject latency, generic
+  errors and ``ResourceExhausted`` so the full FastAPI stack can be
+  load-tested offline.
+
+Fake backend settings (all optional):
+
+- LLM_FAKE_LATENCY_MS: mean latency per call (default 0).
+- LLM_FAKE_LATENCY_JITTER_MS: spread of the latency distribution (default 0).
+- LLM_FAKE_LATENCY_DISTRIBUTION: fixed | uniform | normal | lognormal.
+- LLM_FAKE_LATENCY_PER_TOKEN_MS: extra latency per response token (default 0).
+- LLM_FAKE_ERROR_RATE: probability of a ServiceUnavailable error (default 0).
+- LLM_FAKE_RESOURCE_EXHAUSTED_RATE: probability of ResourceExhausted (default 0).
+- LLM_FAKE_SEED: seed for latency and error injection (default 0).
+
+Response content depends only on the prompt, so identical prompts always get
+identical responses.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+
+from backend.ai.token_budget import estimate_tokens
+from backend.logger import logger
+
+GEMINI_BACKEND = "gemini"
+FAKE_BACKEND = "fake"
+FAKE_MODEL_NAME = "fake-llm"
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+def get_backend_name() -> str:
+    """Returns the configured backend name (LLM_BACKEND, default 'gemini')."""
+    return os.environ.get("LLM_BACKEND", GEMINI_BACKEND).strip().lower()
+
+
+def is_fake_backend() -> bool:
+    """True when the fake backend is selected."""
+    return get_backend_name() == FAKE_BACKEND
+
+
+def configure_backend(api_key: Optional[str]) -> None:
+    """Performs backend-wide configuration (the API key for Gemini)."""
+    if is_fake_backend():
+        return
+    genai.configure(api_key=api_key)  # type: ignore[attr-defined]
+
+
+def create_generative_model(model_name: str) -> Any:
+    """
+    Creates a model object exposing `generate_content` for the active backend.
+
+    Raises:
+        ValueError: If LLM_BACKEND names an unknown backend.
+    """
+    backend = get_backend_name()
+    if backend == FAKE_BACKEND:
+        return FakeGenerativeModel(model_name)
+    if backend == GEMINI_BACKEND:
+        return genai.GenerativeModel(model_name)  # type: ignore[attr-defined]
+    raise ValueError(f"Unknown LLM_BACKEND '{backend}'")
+
+
+# --- Fake backend ---
+
+
+def _env_float(name: str, default: float) -> float:
+    """Reads a float environment variable, falling back to the default."""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        logger.warning(f"Invalid value for {name}; using {default}.")
+        return default
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class FakeLLMConfig:
+    """Latency and failure injection settings for the fake backend."""
+
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    latency_distribution: str = "fixed"
+    latency_per_token_ms: float = 0.0
+    error_rate: float = 0.0
+    resource_exhausted_rate: float = 0.0
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMConfig":
+        """Builds the configuration from LLM_FAKE_* environment variables."""
+        distribution = os.environ.get("LLM_FAKE_LATENCY_DISTRIBUTION", "fixed").lower()
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            logger.warning(
+                f"Unknown LLM_FAKE_LATENCY_DISTRIBUTION '{distribution}'; using 'fixed'."
+            )
+            distribution = "fixed"
+        return cls(
+            latency_ms=_env_float("LLM_FAKE_LATENCY_MS", 0.0),
+            latency_jitter_ms=_env_float("LLM_FAKE_LATENCY_JITTER_MS", 0.0),
+            latency_distribution=distribution,
+            latency_per_token_ms=_env_float("LLM_FAKE_LATENCY_PER_TOKEN_MS", 0.0),
+            error_rate=_env_float("LLM_FAKE_ERROR_RATE", 0.0),
+            resource_exhausted_rate=_env_float("LLM_FAKE_RESOURCE_EXHAUSTED_RATE", 0.0),
+            seed=int(_env_float("LLM_FAKE_SEED", 0)),
+        )
+
+
+class FakeUsageMetadata:
+    """Token counts in the shape of Gemini's usage_metadata."""
+
+    def __init__(self, prompt_token_count: int, candidates_token_count: int) -> None:
+        """Stores the token counts."""
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    """Minimal stand-in for a Gemini GenerateContentResponse."""
+
+    def __init__(self, text: str, prompt_tokens: int) -> None:
+        """Stores the response text and usage."""
+        self.text = text
+        self.usage_metadata = FakeUsageMetadata(prompt_tokens, estimate_tokens(text))
+
+
+def _digest(text: str) -> int:
+    """Stable integer hash of `text` (independent of PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def _pick(prompt: str, choices: List[Any]) -> Any:
+    """Deterministically picks one of `choices` for a prompt."""
+    return choices[_digest(prompt) % len(choices)]
+
+
+def _find(pattern: str, prompt: str, default: str) -> str:
+    """Returns the first group of `pattern` in the prompt, or `default`."""
+    match = re.search(pattern, prompt)
+    return match.group(1).strip() if match and match.group(1).strip() else default
+
+
+def _short_id(prefix: str, prompt: str) -> str:
+    """Builds an id unique to the prompt (existing ids are part of the prompt)."""
+    return f"{prefix}_{_digest(prompt) % 16**8:08x}"
+
+
+def _keyword_intent(message: str) -> str:
+    """Guesses the intent of a user message from keywords."""
+    message = message.lower()
+    if any(word in message for word in ("quiz", "assessment", "test me")):
+        return "request_quiz"
+    if any(word in message for word in ("exercise", "practice", "task")):
+        return "request_exercise"
+    if "?" in message or message.startswith(("what", "how", "why", "explain")):
+        return "ask_question"
+    return "other_chat"
+
+
+def _intent_response(prompt: str) -> str:
+    """Keyword-based intent for the intent classification prompt."""
+    message = _find(r'User\'s latest message: "(.*)"', prompt, "")
+    return json.dumps({"intent": _keyword_intent(message)})
+
+
+def _chat_response(prompt: str) -> str:
+    """Plain-text tutor reply for the chat prompt."""
+    title = _find(r"explaining '(.*?)'", prompt, "this lesson")
+    return (
+        f"Good question. In {title}, the key idea is to build intuition first and then "
+        "connect it to concrete examples. Let me know which part you would like to "
+        "explore further."
+    )
+
+
+def _summary_response(prompt: str) -> str:
+    """Fixed-size running summary for the conversation summary prompt."""
+    title = _find(r"conversation about '(.*?)'", prompt, "the lesson")
+    return (
+        f"The user is working through {title}. They asked several questions about the "
+        "core ideas, received explanations with examples, and attempted an exercise."
+    )
+
+
+def _classify_and_respond_response(prompt: str) -> str:
+    """Intent plus (for chatting intents) a reply for the fused prompt."""
+    message = _find(r"\*\*User's Latest Message:\*\* (.*)", prompt, "")
+    intent = _keyword_intent(message)
+    if intent == "request_quiz":
+        return json.dumps({"intent": "request_assessment", "response": None})
+    if intent == "request_exercise":
+        return json.dumps({"intent": intent, "response": None})
+    title = _find(r"tutor for the lesson '(.*?)'", prompt, "this lesson")
+    return json.dumps({"intent": intent, "response": _chat_response(f"explaining '{title}'")})
+
+
+def _evaluation_response(prompt: str) -> str:
+    """Evaluation JSON for the lesson evaluate_answer prompt."""
+    score = _pick(prompt, [1.0, 1.0, 0.5, 0.0])
+    return json.dumps(
+        {
+            "score": score,
+            "is_correct": score >= 0.8,
+            "feedback": "Correct, well done!" if score >= 0.8 else "Not quite; revisit the key idea.",
+            "explanation": "The expected answer follows directly from the lesson content.",
+        }
+    )
+
+
+def _exercise_response(prompt: str) -> str:
+    """Exercise JSON for the generate_exercises prompt."""
+    title = _find(r"- lesson_title: (.*)", prompt, "the lesson")
+    exercise_id = _short_id("ex", prompt)
+    if _digest(prompt) % 2:
+        return json.dumps(
+            {
+                "id": exercise_id,
+                "type": "multiple_choice",
+                "instructions": f"Which statement best summarises {title}?",
+                "options": [
+                    {"id": "A", "text": "It is unrelated to the topic."},
+                    {"id": "B", "text": "It captures the central idea of the lesson."},
+                    {"id": "C", "text": "It only applies to advanced cases."},
+                ],
+                "correct_answer_id": "B",
+                "explanation": "Option B restates the central idea covered in the lesson.",
+                "misconception_corrections": {
+                    "A": "The lesson shows the idea is central to the topic.",
+                    "C": "The idea applies from the simplest cases upwards.",
+                },
+            }
+        )
+    return json.dumps(
+        {
+            "id": exercise_id,
+            "type": "short_answer",
+            "instructions": f"In one sentence, explain the main idea of {title}.",
+            "expected_solution_format": "A single concise sentence.",
+            "correct_answer": f"The main idea of {title} as described in the lesson.",
+            "explanation": "A good answer names the central concept and why it matters.",
+        }
+    )
+
+
+def _assessment_response(prompt: str) -> str:
+    """Assessment question JSON for the generate_assessment prompt."""
+    title = _find(r"- lesson_title: (.*)", prompt, "the lesson")
+    return json.dumps(
+        {
+            "id": _short_id("quiz", prompt),
+            "type": "true_false",
+            "question_text": f"{title} builds on ideas introduced earlier in the course.",
+            "options": [{"id": "True", "text": "True"}, {"id": "False", "text": "False"}],
+            "correct_answer_id": "True",
+            "explanation": "Each lesson builds on the preceding material in the syllabus.",
+            "confidence_check": False,
+        }
+    )
+
+
+def _lesson_content_response(prompt: str) -> str:
+    """Markdown exposition for the generate_lesson_content prompt."""
+    lesson = _find(r"- lesson_name: (.*)", prompt, "This Lesson")
+    paragraph = (
+        f"{lesson} is easiest to understand by starting with a simple example and "
+        "then generalising. Think about how the idea shows up in everyday situations, "
+        "and what would change if it did not hold."
+    )
+    return "\n\n".join(
+        [f"# {lesson}", "## Introduction", paragraph, "## Key Ideas", paragraph,
+         "## Why It Matters", paragraph]
+    )
+
+
+def _syllabus_response(prompt: str) -> str:
+    """Syllabus JSON for the syllabus generation prompt."""
+    topic = _find(r"syllabus for the topic: (.*?)\.\s*\n", prompt, "General Topic")
+    level = _find(r"knowledge level is: (.*)", prompt, "beginner")
+    return json.dumps(
+        {
+            "topic": topic,
+            "level": level,
+            "duration": "4 weeks",
+            "learning_objectives": [
+                f"Explain the core concepts of {topic}.",
+                f"Apply {topic} to simple problems.",
+                f"Analyse common pitfalls in {topic}.",
+            ],
+            "modules": [
+                {
+                    "week": week,
+                    "title": f"{title} of {topic}",
+                    "lessons": [{"title": f"{title}: Part {part}"} for part in range(1, 4)],
+                }
+                for week, title in enumerate(["Foundations", "Core Techniques", "Applications"], 1)
+            ],
+        }
+    )
+
+
+def _syllabus_update_response(prompt: str) -> str:
+    """Returns the current syllabus unchanged for the syllabus update prompt."""
+    match = re.search(
+        r"Here is the current syllabus:\s*(\{.*\})\s*The user has provided", prompt, re.DOTALL
+    )
+    if match:
+        try:
+            return json.dumps(json.loads(match.group(1)))
+        except json.JSONDecodeError:
+            pass
+    return _syllabus_response(prompt)
+
+
+def _onboarding_question_response(prompt: str) -> str:
+    """Question text for the onboarding question prompt."""
+    topic = _find(r"questions on the topic of (.*?) so", prompt, "the topic")
+    difficulty = _find(r"difficulty level \((\d+)\)", prompt, "2")
+    question = _pick(
+        prompt,
+        [
+            f"What is one key term used in {topic}?",
+            f"Name a common application of {topic}.",
+            f"Which basic principle underlies {topic}?",
+        ],
+    )
+    return f"Difficulty: {difficulty}\nQuestion: {question}"
+
+
+def _onboarding_evaluation_response(prompt: str) -> str:
+    """Classification and feedback for the onboarding evaluation prompt."""
+    return _pick(
+        prompt,
+        [
+            "1:Correct, that is a good answer.",
+            "0.5:Partially correct; the answer misses an important detail.",
+            "0:That is not correct; review the basics of the topic.",
+        ],
+    )
+
+
+def _generic_response(prompt: str) -> str:
+    """Fallback for prompts with no canned responder."""
+    return "This is a canned response from the fake LLM backend."
+
+
+# (prompt_name, marker, responder): the RenderedPrompt name is used when present,
+# otherwise the first responder whose marker appears in the prompt text.
+_RESPONDERS: List[Tuple[str, str, Callable[[str], str]]] = [
+    ("intent_classification", "to determine their intent", _intent_response),
+    ("classify_and_respond", "First decide what the user wants", _classify_and_respond_response),
+    ("chat_response", "helpful and encouraging tutor", _chat_response),
+    ("summarize_conversation", "running notes on a tutoring conversation", _summary_response),
+    ("evaluate_answer", "You are evaluating a user's answer", _evaluation_response),
+    ("generate_exercises", "exercise generation engine", _exercise_response),
+    ("generate_assessment", "assessment question generation engine", _assessment_response),
+    ("generate_lesson_content", "content generation engine", _lesson_content_response),
+    ("syllabus_generation", "creating a\ncomprehensive syllabus", _syllabus_response),
+    ("syllabus_update", "updating a syllabus for the topic", _syllabus_update_response),
+    ("onboarding_question", "creating questions on the topic", _onboarding_question_response),
+    ("onboarding_evaluation", "Here is a question that was asked", _onboarding_evaluation_response),
+]
+
+
+def register_fake_responder(
+    prompt_name: str, marker: str, responder: Callable[[str], str]
+) -> None:
+    """Adds (or replaces) the canned responder for a prompt."""
+    _RESPONDERS[:] = [entry for entry in _RESPONDERS if entry[0] != prompt_name]
+    _RESPONDERS.insert(0, (prompt_name, marker, responder))
+
+
+def fake_response_text(prompt: str) -> str:
+    """Returns the canned response text for a prompt."""
+    prompt_name = getattr(prompt, "prompt_name", None)
+    for name, marker, responder in _RESPONDERS:
+        if prompt_name == name or (prompt_name is None and marker in prompt):
+            return responder(str(prompt))
+    return _generic_response(str(prompt))
+
+
+class FakeGenerativeModel:
+    """Offline replacement for `genai.GenerativeModel` with fault injection."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, model_name: str, config: Optional[FakeLLMConfig] = None) -> None:
+        """Initializes the fake model (config defaults to the environment)."""
+        self.model_name = model_name
+        self.config = config or FakeLLMConfig.from_env()
+        self._rng = random.Random(self.config.seed)
+        self.calls = 0
+
+    def _sample_latency(self, response_tokens: int) -> float:
+        """Draws a latency (seconds) from the configured distribution."""
+        mean = self.config.latency_ms
+        spread = self.config.latency_jitter_ms
+        distribution = self.config.latency_distribution
+        with self._lock:
+            if distribution == "uniform":
+                latency = self._rng.uniform(mean - spread, mean + spread)
+            elif distribution == "normal":
+                latency = self._rng.gauss(mean, spread)
+            elif distribution == "lognormal" and mean > 0:
+                sigma = math.sqrt(math.log(1 + (spread / mean) ** 2)) if spread else 0.0
+                latency = self._rng.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+            else:
+                latency = mean
+        latency += self.config.latency_per_token_ms * response_tokens
+        return max(0.0, latency) / 1000.0
+
+    def _maybe_fail(self) -> None:
+        """Raises an injected error according to the configured rates."""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.config.resource_exhausted_rate:
+            raise ResourceExhausted("Fake backend: quota exhausted (injected)")
+        if roll < self.config.resource_exhausted_rate + self.config.error_rate:
+            raise ServiceUnavailable("Fake backend: service unavailable (injected)")
+
+    def generate_content(self, contents: Any, **_: Any) -> FakeResponse:
+        """Returns a canned response after the injected latency (or an injected error)."""
+        prompt = contents if isinstance(contents, str) else str(contents)
+        text = fake_response_text(prompt)
+        with self._lock:
+            self.calls += 1
+        delay = self._sample_latency(estimate_tokens(text))
+        if delay:
+            time.sleep(delay)
+        self._maybe_fail()
+        return FakeResponse(text, estimate_tokens(prompt))
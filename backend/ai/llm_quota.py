@@ -0,0 +1,137 @@
+"""
+Sliding-window LLM quota budget.
+
+Every model attempt made through `llm_utils` is recorded here (one request
+plus its estimated prompt tokens). Optional work (speculative generation,
+prefetching) asks for headroom at low priority before issuing a call, so it
+backs off well before user-facing calls would hit the provider's per-minute
+limits. Limits come from LLM_QUOTA_RPM and LLM_QUOTA_TPM; when unset the
+budget only tracks usage and always has headroom.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from backend.logger import logger
+from backend.metrics import metrics
+
+NORMAL_PRIORITY = "normal"
+LOW_PRIORITY = "low"
+
+
+def _env_optional_int(name: str) -> Optional[int]:
+    """Reads a positive int from the environment, or None if unset/invalid."""
+    value = os.environ.get(name)
+    if not value:
+        return None
+    try:
+        parsed = int(value)
+    except ValueError:
+        logger.warning(f"Invalid value for {name}; quota limit disabled.")
+        return None
+    return parsed if parsed > 0 else None
+
+
+class QuotaBudget:
+    """Tracks requests and tokens over a sliding window against optional limits."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        low_priority_share: float = 0.7,
+        window_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes the budget.
+
+        Args:
+            requests_per_minute: Request limit per window (None for unlimited).
+            tokens_per_minute: Token limit per window (None for unlimited).
+            low_priority_share: Fraction of each limit low-priority work may use.
+            window_seconds: Length of the sliding window.
+            clock: Monotonic clock (injectable for tests).
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.low_priority_share = low_priority_share
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "QuotaBudget":
+        """Builds the budget from LLM_QUOTA_* environment variables."""
+        try:
+            share = float(os.environ.get("LLM_QUOTA_LOW_PRIORITY_SHARE", "0.7"))
+        except ValueError:
+            share = 0.7
+        return cls(
+            requests_per_minute=_env_optional_int("LLM_QUOTA_RPM"),
+            tokens_per_minute=_env_optional_int("LLM_QUOTA_TPM"),
+            low_priority_share=share,
+        )
+
+    def _expire(self, now: float) -> None:
+        """Drops events older than the window (caller holds the lock)."""
+        cutoff = now - self.window_seconds
+        while self._events and self._events[0][0] <= cutoff:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    def record(self, tokens: int) -> None:
+        """Records one model request using roughly `tokens` tokens."""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            self._events.append((now, tokens))
+            self._tokens_in_window += tokens
+
+    def usage(self) -> Tuple[int, int]:
+        """Returns (requests, tokens) in the current window."""
+        with self._lock:
+            self._expire(self._clock())
+            return len(self._events), self._tokens_in_window
+
+    def has_headroom(self, priority: str = NORMAL_PRIORITY, estimated_tokens: int = 0) -> bool:
+        """
+        True if a call of `estimated_tokens` fits the budget at this priority.
+
+        Normal-priority calls may use the full limits; low-priority calls only
+        `low_priority_share` of them.
+        """
+        share = self.low_priority_share if priority == LOW_PRIORITY else 1.0
+        requests, tokens = self.usage()
+        if self.requests_per_minute is not None and requests + 1 > self.requests_per_minute * share:
+            allowed = False
+        elif (
+            self.tokens_per_minute is not None
+            and tokens + estimated_tokens > self.tokens_per_minute * share
+        ):
+            allowed = False
+        else:
+            allowed = True
+        if not allowed:
+            metrics.increment("llm_quota_denied_total", {"priority": priority})
+        return allowed
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns current usage and limits."""
+        requests, tokens = self.usage()
+        return {
+            "requests_in_window": requests,
+            "tokens_in_window": tokens,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "low_priority_share": self.low_priority_share,
+        }
+
+
+# Shared budget for all LLM calls in this process
+quota_budget = QuotaBudget.from_env()
@@ -0,0 +1,191 @@
+"""
+Per-prompt telemetry for LLM calls.
+
+Every call made through `llm_utils` is tagged with the prompt template that
+produced it (carried on the RenderedPrompt returned by `load_prompt`) and the
+graph node that issued it (set by the `llm_node` decorator). The record holds
+token counts, wall time, retries and the parse outcome. Records are aggregated
+into histograms in the shared metrics registry, summarised per prompt for
+capacity planning, and optionally appended to an NDJSON file
+(LLM_TELEMETRY_NDJSON_PATH).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from backend.ai.token_budget import estimate_tokens
+from backend.logger import logger
+from backend.metrics import metrics
+
+UNKNOWN = "unknown"
+
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+# Name of the graph node currently issuing LLM calls
+_current_node: ContextVar[Optional[str]] = ContextVar("llm_current_node", default=None)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def llm_node(func: F) -> F:
+    """Decorator tagging LLM calls made inside `func` with the function's name."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = _current_node.set(func.__name__)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_node.reset(token)
+
+    return wrapper  # type: ignore[return-value]
+
+
+@dataclass
+class LLMCallRecord:
+    """Telemetry for a single logical LLM call (including its retries)."""
+
+    prompt_name: str = UNKNOWN
+    node: str = UNKNOWN
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    wall_time_seconds: float = 0.0
+    retries: int = 0
+    outcome: str = "ok"  # ok | error | parse_failed | fallback_parser
+    timestamp: float = field(default_factory=time.time)
+
+    def record_retry(self, *_: Any) -> None:
+        """Callback for call_with_retry: counts one retry."""
+        self.retries += 1
+
+    def set_response(self, response: Any) -> None:
+        """Extracts token counts from a model response (estimating if absent)."""
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None) if usage else None
+        response_tokens = getattr(usage, "candidates_token_count", None) if usage else None
+        if isinstance(prompt_tokens, int):
+            self.prompt_tokens = prompt_tokens
+        if isinstance(response_tokens, int):
+            self.response_tokens = response_tokens
+        else:
+            text = getattr(response, "text", "")
+            self.response_tokens = estimate_tokens(text if isinstance(text, str) else "")
+
+
+class _PromptSummary:
+    """Running per-prompt aggregates used for the capacity-planning view."""
+
+    def __init__(self) -> None:
+        """Initializes empty aggregates."""
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.wall_time_seconds = 0.0
+        self.nodes: Dict[str, int] = {}
+
+    def add(self, record: LLMCallRecord) -> None:
+        """Folds one call record into the aggregates."""
+        self.calls += 1
+        self.failures += 1 if record.outcome in ("error", "parse_failed") else 0
+        self.retries += record.retries
+        self.prompt_tokens += record.prompt_tokens
+        self.response_tokens += record.response_tokens
+        self.wall_time_seconds += record.wall_time_seconds
+        self.nodes[record.node] = self.nodes.get(record.node, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns a JSON-serializable summary."""
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "total_wall_time_seconds": self.wall_time_seconds,
+            "avg_wall_time_seconds": self.wall_time_seconds / self.calls if self.calls else 0.0,
+            "nodes": dict(self.nodes),
+        }
+
+
+_summaries: Dict[str, _PromptSummary] = {}
+_summaries_lock = threading.Lock()
+_ndjson_lock = threading.Lock()
+
+
+def _append_ndjson(record: LLMCallRecord) -> None:
+    """Appends the record to the configured NDJSON file, if any."""
+    path = os.environ.get("LLM_TELEMETRY_NDJSON_PATH")
+    if not path:
+        return
+    try:
+        line = json.dumps(asdict(record))
+        with _ndjson_lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        logger.warning(f"Failed to write LLM telemetry to {path}: {e}")
+
+
+def record_llm_call(record: LLMCallRecord) -> None:
+    """Aggregates a finished call into metrics, the per-prompt summary and NDJSON."""
+    labels = {"prompt": record.prompt_name, "node": record.node}
+    metrics.increment("llm_calls_total", {**labels, "outcome": record.outcome})
+    if record.retries:
+        metrics.increment("llm_retries_total", labels, amount=record.retries)
+    metrics.observe("llm_call_seconds", record.wall_time_seconds, labels)
+    metrics.observe("llm_prompt_tokens", record.prompt_tokens, labels, buckets=TOKEN_BUCKETS)
+    metrics.observe("llm_response_tokens", record.response_tokens, labels, buckets=TOKEN_BUCKETS)
+
+    with _summaries_lock:
+        _summaries.setdefault(record.prompt_name, _PromptSummary()).add(record)
+
+    _append_ndjson(record)
+
+
+@contextmanager
+def track_llm_call(prompt: Any, node: Optional[str] = None) -> Iterator[LLMCallRecord]:
+    """
+    Context manager timing one logical LLM call and recording its telemetry.
+
+    The prompt name is taken from the RenderedPrompt, the node from the
+    enclosing `llm_node` (or the explicit `node` argument). The prompt token
+    count starts as an estimate and is replaced by the API's figure when the
+    caller passes the response to `set_response`. An exception escaping the
+    block marks the call as an error.
+    """
+    record = LLMCallRecord(
+        prompt_name=getattr(prompt, "prompt_name", None) or UNKNOWN,
+        node=node or _current_node.get() or UNKNOWN,
+        prompt_tokens=estimate_tokens(prompt) if isinstance(prompt, str) else 0,
+    )
+    start_time = time.monotonic()
+    try:
+        yield record
+    except Exception:
+        record.outcome = "error"
+        raise
+    finally:
+        record.wall_time_seconds = time.monotonic() - start_time
+        record_llm_call(record)
+
+
+def get_prompt_summaries() -> Dict[str, Dict[str, Any]]:
+    """Returns per-prompt aggregates (calls, failures, retries, tokens, wall time)."""
+    with _summaries_lock:
+        return {name: summary.to_dict() for name, summary in _summaries.items()}
+
+
+def reset_prompt_summaries() -> None:
+    """Clears the per-prompt aggregates (primarily for tests)."""
+    with _summaries_lock:
+        _summaries.clear()
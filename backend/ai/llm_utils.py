@@ -7,28 +7,50 @@ import os
 import random
 import re
 import time
-from typing import Any, Callable, Dict, Optional, Type, TypeVar
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
 
 import google.generativeai as genai
 from dotenv import load_dotenv
-from google.api_core.exceptions import ResourceExhausted
+from google.api_core.exceptions import (FailedPrecondition, InvalidArgument,
+                                        ResourceExhausted)
 from pydantic import BaseModel
 
+from backend.ai.circuit_breaker import CircuitOpenError, get_breaker
+from backend.ai.llm_backends import (FAKE_MODEL_NAME, configure_backend,
+                                       create_generative_model, is_fake_backend)
+from backend.ai.llm_quota import quota_budget
+from backend.ai.llm_telemetry import LLMCallRecord, track_llm_call
+from backend.ai.response_schema import (build_response_schema,
+                                        restore_map_fields)
+from backend.ai.token_budget import estimate_tokens
 from backend.exceptions import log_and_raise_new, validate_internal_model
 from backend.logger import logger
+from backend.metrics import metrics
 
 # Load environment variables
 load_dotenv()
 
 # Define MODEL type hint before assignment
 MODEL: Optional[genai.GenerativeModel] = None  # type: ignore[name-defined]
+MODEL_NAME: Optional[str] = None
+# Optional secondary model used when the primary model's circuit is open or failing
+FALLBACK_MODEL: Optional[genai.GenerativeModel] = None  # type: ignore[name-defined]
+FALLBACK_MODEL_NAME: Optional[str] = os.environ.get("GEMINI_FALLBACK_MODEL") or None
+
+# Ask the model for schema-constrained JSON in call_llm_with_json_parsing
+STRUCTURED_OUTPUT_ENABLED = os.environ.get("LLM_STRUCTURED_OUTPUT", "true").lower() != "false"
+
+# Errors caused by the request itself rather than the health of the model
+_CLIENT_ERRORS = (InvalidArgument, FailedPrecondition)
 
 # Configure Gemini API (Consider moving this configuration elsewhere if used broadly)
 # For now, keep it here as this module is the primary LLM interface
 try:
     gemini_api_key = os.environ.get("GEMINI_API_KEY")
-    gemini_model_name = os.environ.get("GEMINI_MODEL")
-    if not gemini_api_key:
+    gemini_model_name = os.environ.get("GEMINI_MODEL") or (
+        FAKE_MODEL_NAME if is_fake_backend() else None
+    )
+    if not gemini_api_key and not is_fake_backend():
         log_and_raise_new(
             exception_type=KeyError,
             exception_message="GEMINI_API_KEY",
@@ -41,10 +63,15 @@ try:
             exc_info=False # Original log didn't include stack trace
         )
 
-    genai.configure(api_key=gemini_api_key)  # type: ignore[attr-defined]
-    MODEL = genai.GenerativeModel(gemini_model_name)  # type: ignore[attr-defined]
+    configure_backend(gemini_api_key)
+    MODEL = create_generative_model(gemini_model_name)
+    MODEL_NAME = gemini_model_name
     logger.info(f"Gemini model '{gemini_model_name}' configured successfully.")
 
+    if FALLBACK_MODEL_NAME and FALLBACK_MODEL_NAME != gemini_model_name:
+        FALLBACK_MODEL = create_generative_model(FALLBACK_MODEL_NAME)
+        logger.info(f"Gemini fallback model '{FALLBACK_MODEL_NAME}' configured.")
+
 except KeyError as e:
     logger.error(
         f"Gemini configuration failed due to missing environment variable: {e}"
@@ -67,6 +94,7 @@ def call_with_retry(
     *args: Any,
     max_retries: int = 5,
     initial_delay: float = 1.0,
+    on_retry: Optional[Callable[[int], None]] = None,
     **kwargs: Any,
 ) -> Any:
     """
@@ -78,6 +106,7 @@ def call_with_retry(
         *args: Positional arguments for the function.
         max_retries: Maximum number of retries.
         initial_delay: Initial delay in seconds before the first retry.
+        on_retry: Optional callback invoked with the attempt number before each retry.
         **kwargs: Keyword arguments for the function.
 
     Returns:
@@ -103,6 +132,8 @@ def call_with_retry(
 
             # Calculate delay with exponential backoff and jitter
             current_delay = delay * (2 ** (retries - 1)) + random.uniform(0, 0.5)
+            if on_retry is not None:
+                on_retry(retries)
             logger.warning(
                 f"ResourceExhausted error calling {func.__name__}."
                 f" Retrying in {current_delay:.2f} seconds... (Attempt {retries}/{max_retries})"
@@ -115,6 +146,115 @@ def call_with_retry(
             raise other_e  # Use renamed variable
 
 
+def _call_model_with_breaker(
+    model: Any,
+    model_name: str,
+    prompt: Any,
+    max_retries: int,
+    initial_delay: float,
+    call_record: Optional[LLMCallRecord] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Calls `model.generate_content` with retries, guarded by the model's circuit breaker.
+
+    Every attempt (including retried ones) is recorded on the breaker, so a burst
+    of quota errors can open the circuit mid-retry, at which point the remaining
+    attempts are abandoned with CircuitOpenError instead of sleeping.
+    """
+    breaker = get_breaker(model_name)
+    if call_record is not None:
+        call_record.model = model_name
+
+    def generate_with_breaker(*call_args: Any, **call_kwargs: Any) -> Any:
+        if not breaker.allow_request():
+            raise CircuitOpenError(model_name)
+        quota_budget.record(estimate_tokens(str(call_args[0])) if call_args else 0)
+        start_time = time.monotonic()
+        try:
+            result = model.generate_content(*call_args, **call_kwargs)
+        except _CLIENT_ERRORS:
+            # The model answered; the request was bad. Not a health signal.
+            breaker.record_success(time.monotonic() - start_time)
+            raise
+        except Exception:
+            breaker.record_failure(time.monotonic() - start_time)
+            raise
+        breaker.record_success(time.monotonic() - start_time)
+        return result
+
+    return call_with_retry(
+        generate_with_breaker,
+        prompt,
+        max_retries=max_retries,
+        initial_delay=initial_delay,
+        on_retry=call_record.record_retry if call_record is not None else None,
+        **kwargs,
+    )
+
+
+def generate_content(
+    prompt: Any,
+    max_retries: int = 5,
+    initial_delay: float = 1.0,
+    call_record: Optional[LLMCallRecord] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Sends a prompt to the configured LLM, routing around an unhealthy primary model.
+
+    The primary model is called through its circuit breaker. If its circuit is
+    open, or the call still fails after retries, and a fallback model is
+    configured (GEMINI_FALLBACK_MODEL), the request is routed to the fallback.
+
+    Args:
+        prompt: The prompt to send.
+        max_retries: Maximum retries per model for quota errors.
+        initial_delay: Initial delay for retries.
+        call_record: Optional telemetry record updated with the model used and retries.
+        **kwargs: Extra keyword arguments for `generate_content` (e.g. generation_config).
+
+    Returns:
+        The raw model response.
+
+    Raises:
+        RuntimeError: If no model is configured.
+        CircuitOpenError: If the circuit is open and no fallback is available.
+        Exception: The last error raised by the model call.
+    """
+    if MODEL is None or MODEL_NAME is None:
+        raise RuntimeError("LLM MODEL not configured. Cannot make API call.")
+
+    try:
+        return _call_model_with_breaker(
+            MODEL, MODEL_NAME, prompt, max_retries, initial_delay, call_record, **kwargs
+        )
+    except Exception as primary_e:
+        if (
+            FALLBACK_MODEL is None
+            or FALLBACK_MODEL_NAME is None
+            or isinstance(primary_e, _CLIENT_ERRORS)
+        ):
+            raise
+        logger.warning(
+            f"Primary LLM model '{MODEL_NAME}' unavailable ({type(primary_e).__name__});"
+            f" routing request to fallback model '{FALLBACK_MODEL_NAME}'."
+        )
+        metrics.increment(
+            "llm_fallback_routed_total",
+            {"from_model": MODEL_NAME, "to_model": FALLBACK_MODEL_NAME},
+        )
+        return _call_model_with_breaker(
+            FALLBACK_MODEL,
+            FALLBACK_MODEL_NAME,
+            prompt,
+            max_retries,
+            initial_delay,
+            call_record,
+            **kwargs,
+        )
+
+
 def _extract_json_from_text(response_text: str) -> Optional[Dict[str, Any]]:
     """Attempts to extract a JSON object from text, trying common patterns."""
     json_patterns = [
@@ -154,21 +294,79 @@ def _extract_json_from_text(response_text: str) -> Optional[Dict[str, Any]]:
     return parsed_json
 
 
+def _build_json_generation_config(
+    validation_model: Optional[Type[BaseModel]],
+) -> Dict[str, Any]:
+    """Builds the generation config requesting JSON output, schema-constrained if possible."""
+    generation_config: Dict[str, Any] = {"response_mime_type": "application/json"}
+    if validation_model is not None:
+        try:
+            generation_config["response_schema"] = build_response_schema(validation_model)
+        except ValueError as schema_e:
+            logger.warning(
+                f"Could not build response schema for {validation_model.__name__}: {schema_e}."
+                " Requesting unconstrained JSON."
+            )
+    return generation_config
+
+
+def _parse_json_response(
+    response_text: str, structured: bool
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Parses the JSON object from an LLM response.
+
+    Structured responses are expected to be a bare JSON document, so they are
+    decoded directly; the regex-based extractor is only used as a fallback.
+
+    Returns:
+        The parsed dictionary (or None) and the parse outcome
+        ("ok", "fallback_parser" or "parse_failed").
+    """
+    mode = "structured" if structured else "free_text"
+    if structured:
+        try:
+            loaded_data = json.loads(response_text)
+            if isinstance(loaded_data, dict):
+                metrics.increment("llm_json_parse_total", {"mode": mode, "outcome": "ok"})
+                return loaded_data, "ok"
+            logger.warning(
+                f"Structured LLM response is not a JSON object: {type(loaded_data)}"
+            )
+        except json.JSONDecodeError as json_e:
+            logger.warning(f"Structured LLM response is not valid JSON: {json_e}")
+
+    parsed_json = _extract_json_from_text(response_text)
+    if parsed_json is None:
+        outcome = "parse_failed"
+    else:
+        outcome = "fallback_parser" if structured else "ok"
+    metrics.increment("llm_json_parse_total", {"mode": mode, "outcome": outcome})
+    return parsed_json, outcome
+
+
 def call_llm_with_json_parsing(
     prompt: str,
     validation_model: Optional[Type[T]] = None,
     max_retries: int = 5,
     initial_delay: float = 1.0,
+    structured_output: Optional[bool] = None,
 ) -> Optional[T | Dict[str, Any]]:
     """
     Calls the configured LLM, attempts to parse a JSON object from the response,
     and optionally validates it against a Pydantic model.
 
+    In structured-output mode (the default, see LLM_STRUCTURED_OUTPUT) the request
+    carries a JSON response MIME type and, when a validation model is given, a
+    response schema derived from it. If the model rejects the schema the call is
+    repeated once in free-text mode.
+
     Args:
         prompt: The prompt string to send to the LLM.
         validation_model: Optional Pydantic model class to validate the JSON against.
         max_retries: Maximum retries for the LLM call (for quota errors).
         initial_delay: Initial delay for retries.
+        structured_output: Overrides STRUCTURED_OUTPUT_ENABLED for this call.
 
     Returns:
         - If validation_model is provided: An instance of the Pydantic model if
@@ -181,31 +379,61 @@ def call_llm_with_json_parsing(
         logger.error("LLM MODEL not configured. Cannot make API call.")
         return None
 
-    try:
-        # Use call_with_retry for the actual API call
-        response = call_with_retry(
-            MODEL.generate_content,
-            prompt,
-            max_retries=max_retries,
-            initial_delay=initial_delay,
-        )
-        response_text = response.text
+    structured = STRUCTURED_OUTPUT_ENABLED if structured_output is None else structured_output
 
-    except ResourceExhausted:
-        logger.error(
-            "LLM call failed after multiple retries due to resource exhaustion."
-        )
-        # Let execution continue, will return None later if parsing fails
-    except Exception as llm_e:  # Renamed 'e' to 'llm_e'
-        logger.error(f"LLM call failed with unexpected error: {llm_e}", exc_info=True)
-        # Let execution continue, will return None later if parsing fails
+    parsed_json: Optional[Dict[str, Any]] = None
+    with track_llm_call(prompt) as call_record:
+        response_text = ""
+        try:
+            # Breaker-aware call with retries and fallback routing
+            if structured:
+                try:
+                    response = generate_content(
+                        prompt,
+                        max_retries=max_retries,
+                        initial_delay=initial_delay,
+                        call_record=call_record,
+                        generation_config=_build_json_generation_config(validation_model),
+                    )
+                except _CLIENT_ERRORS as schema_e:
+                    logger.warning(
+                        f"Structured output request rejected ({schema_e}); retrying in free-text mode."
+                    )
+                    metrics.increment("llm_structured_output_rejected_total")
+                    structured = False
+            if not structured:
+                response = generate_content(
+                    prompt,
+                    max_retries=max_retries,
+                    initial_delay=initial_delay,
+                    call_record=call_record,
+                )
+            call_record.set_response(response)
+            response_text = response.text
 
-    # Attempt to extract JSON using the helper function
-    parsed_json = _extract_json_from_text(response_text)
+        except ResourceExhausted:
+            logger.error(
+                "LLM call failed after multiple retries due to resource exhaustion."
+            )
+            # Let execution continue, will return None later if parsing fails
+        except CircuitOpenError as circuit_e:
+            logger.error(f"LLM call rejected: {circuit_e}")
+        except Exception as llm_e:  # Renamed 'e' to 'llm_e'
+            logger.error(f"LLM call failed with unexpected error: {llm_e}", exc_info=True)
+            # Let execution continue, will return None later if parsing fails
+
+        # Decode the JSON (direct decode for structured output, regex extraction otherwise)
+        if response_text:
+            parsed_json, call_record.outcome = _parse_json_response(response_text, structured)
+        else:
+            call_record.outcome = "error"
 
     # Optional Pydantic validation
     # If parsed_json is None here, validation will fail and return None below
     if validation_model:
+        if parsed_json is not None:
+            # String maps come back as key/value arrays in structured mode
+            parsed_json = restore_map_fields(validation_model, parsed_json)
         # Use helper to validate and raise specific internal error
         validated_data = validate_internal_model(
             validation_model,
@@ -237,26 +465,34 @@ def call_llm_plain_text(
         logger.error("LLM MODEL not configured. Cannot make API call.")
         return None
 
-    try:
-        # Use call_with_retry for the actual API call
-        response = call_with_retry(
-            MODEL.generate_content,
-            prompt,
-            max_retries=max_retries,
-            initial_delay=initial_delay,
-        )
-        response_text = response.text
-        # Ensure response_text is actually a string before returning
-        return response_text if isinstance(response_text, str) else None
+    with track_llm_call(prompt) as call_record:
+        try:
+            # Breaker-aware call with retries and fallback routing
+            response = generate_content(
+                prompt,
+                max_retries=max_retries,
+                initial_delay=initial_delay,
+                call_record=call_record,
+            )
+            call_record.set_response(response)
+            response_text = response.text
+            # Ensure response_text is actually a string before returning
+            return response_text if isinstance(response_text, str) else None
 
-    except ResourceExhausted:
-        logger.error(
-            "LLM call failed after multiple retries due to resource exhaustion."
-        )
-        return None
-    except Exception as llm_e:  # Renamed 'e' to 'llm_e'
-        logger.error(f"LLM call failed with unexpected error: {llm_e}", exc_info=True)
-        return None
+        except ResourceExhausted:
+            logger.error(
+                "LLM call failed after multiple retries due to resource exhaustion."
+            )
+            call_record.outcome = "error"
+            return None
+        except CircuitOpenError as circuit_e:
+            logger.error(f"LLM call rejected: {circuit_e}")
+            call_record.outcome = "error"
+            return None
+        except Exception as llm_e:  # Renamed 'e' to 'llm_e'
+            logger.error(f"LLM call failed with unexpected error: {llm_e}", exc_info=True)
+            call_record.outcome = "error"
+            return None
 
 
 # Example Usage / Simple Test Block
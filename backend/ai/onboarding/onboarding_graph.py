@@ -16,6 +16,9 @@ from google.api_core.exceptions import ResourceExhausted
 from langgraph.graph import END, StateGraph
 from tavily import TavilyClient  # type: ignore
 
+from backend.ai.llm_backends import (FAKE_MODEL_NAME, configure_backend,
+                                       create_generative_model, is_fake_backend)
+from backend.ai.search_fanout import SEARCH_TIMEOUT_SECONDS, fan_out
 from backend.exceptions import log_and_raise_new
 
 from .prompts import EVALUATE_ANSWER_PROMPT, GENERATE_QUESTION_PROMPT
@@ -27,15 +30,17 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # Configure Tavily and Gemini API timeouts
-TAVILY_TIMEOUT = 5  # seconds
+TAVILY_TIMEOUT = SEARCH_TIMEOUT_SECONDS  # seconds per search query
 
 # Configure Gemini API
 # Define type hint before assignment
 MODEL: Optional[genai.GenerativeModel] = None  # type: ignore[name-defined]
 try:
     gemini_api_key = os.environ.get("GEMINI_API_KEY")
-    gemini_model_name = os.environ.get("GEMINI_MODEL")
-    if not gemini_api_key:
+    gemini_model_name = os.environ.get("GEMINI_MODEL") or (
+        FAKE_MODEL_NAME if is_fake_backend() else None
+    )
+    if not gemini_api_key and not is_fake_backend():
         log_and_raise_new(
             exception_type=KeyError,
             exception_message="GEMINI_API_KEY",
@@ -49,8 +54,8 @@ try:
         )
 
     # Configuration within the try block (8 spaces indent)
-    genai.configure(api_key=gemini_api_key)  # type: ignore[attr-defined]
-    MODEL = genai.GenerativeModel(gemini_model_name)  # type: ignore[attr-defined]
+    configure_backend(gemini_api_key)
+    MODEL = create_generative_model(gemini_model_name)
     logger.info(f"Onboarding Config: Gemini model '{gemini_model_name}' configured.")
 
 # Except block aligned with try (0 spaces indent)
@@ -250,51 +255,66 @@ class TechTreeAI:
                 "search_completed": True,
             }
 
-        try:
-            # Search Wikipedia
-            self.search_status = "Searching Wikipedia..."
-
-            wiki_search = call_with_retry(
-                TAVILY.search,
-                query=f"{topic} wikipedia",
-                search_depth="advanced",
-                include_domains=["en.wikipedia.org"],
-                max_results=1,
-            )
-            wikipedia_content = (
-                wiki_search.get("results", [{}])[0].get("content", "")
-                if wiki_search.get("results")
-                else ""
-            )
-
-            # Search Google (excluding Wikipedia)
-            self.search_status = "Searching Google..."
-            google_search = call_with_retry(
-                TAVILY.search,
-                query=topic,
-                search_depth="advanced",
-                exclude_domains=["wikipedia.org"],
-                max_results=4,
-            )
-            google_results = [
-                result.get("content", "") for result in google_search.get("results", [])
-            ]
+        # Wikipedia and the general web are searched concurrently
+        self.search_status = "Searching Wikipedia and the web..."
+        outcomes = fan_out(
+            {
+                "wikipedia": lambda: call_with_retry(
+                    TAVILY.search,
+                    query=f"{topic} wikipedia",
+                    search_depth="advanced",
+                    include_domains=["en.wikipedia.org"],
+                    max_results=1,
+                ),
+                "google": lambda: call_with_retry(
+                    TAVILY.search,
+                    query=topic,
+                    search_depth="advanced",
+                    exclude_domains=["wikipedia.org"],
+                    max_results=4,
+                ),
+            },
+            timeout=TAVILY_TIMEOUT,
+            graph="onboarding",
+        )
+        wiki_search, google_search = outcomes["wikipedia"], outcomes["google"]
 
-            self.search_status = "Search completed successfully."
-            return {
-                "wikipedia_content": wikipedia_content,
-                "google_results": google_results,
-                "search_completed": True,
-            }
-        except Exception as ex:  # pylint: disable=broad-except
-            self.search_status = f"Error during internet search: {ex}"
-            logger.error(self.search_status, exc_info=True)
+        if isinstance(wiki_search, Exception) and isinstance(google_search, Exception):
+            self.search_status = f"Error during internet search: {wiki_search}"
+            logger.error(self.search_status, exc_info=wiki_search)
             return {
-                "wikipedia_content": f"Error searching for {topic}: {str(ex)}",
+                "wikipedia_content": f"Error searching for {topic}: {str(wiki_search)}",
                 "google_results": [],
                 "search_completed": True,
             }
 
+        # Either search may have failed; questions can be generated from the other
+        wikipedia_content = ""
+        if isinstance(wiki_search, Exception):
+            logger.warning(f"Wikipedia search failed, using web results only: {wiki_search}")
+        elif wiki_search.get("results"):
+            wikipedia_content = wiki_search["results"][0].get("content", "")
+
+        google_results: List[str] = []
+        if isinstance(google_search, Exception):
+            logger.warning(f"Web search failed, using Wikipedia only: {google_search}")
+        else:
+            google_results = [
+                result.get("content", "") for result in google_search.get("results", [])
+            ]
+
+        partial = isinstance(wiki_search, Exception) or isinstance(google_search, Exception)
+        self.search_status = (
+            "Search completed with partial results."
+            if partial
+            else "Search completed successfully."
+        )
+        return {
+            "wikipedia_content": wikipedia_content,
+            "google_results": google_results,
+            "search_completed": True,
+        }
+
     def _generate_question(self, state: AgentState) -> Dict[str, Any]:
         """Generates a question using the Gemini API and search results."""
         if MODEL is None:
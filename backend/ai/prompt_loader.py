@@ -1,54 +1,216 @@
 """Utility for loading and formatting prompts from files."""
 
+import glob
 import os
+import threading
+import time
+from dataclasses import dataclass
 from string import Template
-from typing import Any
+from typing import Any, Dict, FrozenSet
+
+from backend.logger import logger
 
 # Define the base directory for prompts relative to this file's location
 # This assumes prompt_loader.py is in backend/ai/
 PROMPT_DIR = os.path.join(os.path.dirname(__file__), "lessons", "prompts")
 
+# How often (seconds) a template's file mtime is re-checked; negative disables hot reload
+PROMPT_RELOAD_INTERVAL_SECONDS = float(
+    os.environ.get("PROMPT_RELOAD_INTERVAL_SECONDS", "2.0")
+)
+
 class PromptTemplate(Template):
     """Custom Template subclass to allow partial formatting."""
     # Keep the default delimiter and idpattern
     # Override pattern if needed for more complex scenarios
 
+
+class RenderedPrompt(str):
+    """A formatted prompt string that remembers which template produced it."""
+
+    prompt_name: str
+
+    def __new__(cls, text: str, prompt_name: str) -> "RenderedPrompt":
+        instance = super().__new__(cls, text)
+        instance.prompt_name = prompt_name
+        return instance
+
+
+@dataclass
+class CompiledPrompt:
+    """A parsed prompt template together with its source metadata."""
+
+    name: str
+    path: str
+    template: PromptTemplate
+    placeholders: FrozenSet[str]
+    mtime: float
+    checked_at: float
+
+
+class PromptRegistry:
+    """
+    In-memory registry of compiled prompt templates.
+
+    All `.prompt` files in the prompt directory are read and compiled once
+    (normally at startup) and formatting is then served from memory. A file's
+    mtime is re-checked at most every `reload_interval` seconds and the
+    template is recompiled when it changes, so edits are picked up without a
+    restart and without reading files on every call.
+    """
+
+    def __init__(
+        self,
+        prompt_dir: str = PROMPT_DIR,
+        reload_interval: float = PROMPT_RELOAD_INTERVAL_SECONDS,
+    ) -> None:
+        """
+        Initializes an empty registry.
+
+        Args:
+            prompt_dir: Directory containing the `.prompt` files.
+            reload_interval: Minimum seconds between mtime checks per template;
+                a negative value disables hot reload.
+        """
+        self.prompt_dir = prompt_dir
+        self.reload_interval = reload_interval
+        self._prompts: Dict[str, CompiledPrompt] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _compile(self, name: str, path: str) -> CompiledPrompt:
+        """Reads and compiles one template file, validating its placeholders."""
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, "r", encoding="utf-8") as f:
+                template_content = f.read()
+        except FileNotFoundError as ex:
+            raise FileNotFoundError(f"Prompt file not found: {path}") from ex
+
+        template = PromptTemplate(template_content)
+        if not template.is_valid():
+            raise ValueError(
+                f"Prompt '{name}' contains malformed placeholders ({path})."
+            )
+        return CompiledPrompt(
+            name=name,
+            path=path,
+            template=template,
+            placeholders=frozenset(template.get_identifiers()),
+            mtime=mtime,
+            checked_at=time.monotonic(),
+        )
+
+    def load_all(self) -> int:
+        """
+        Compiles every template in the prompt directory.
+
+        Returns:
+            The number of templates loaded.
+
+        Raises:
+            ValueError: If any template has malformed placeholders.
+        """
+        compiled: Dict[str, CompiledPrompt] = {}
+        for path in sorted(glob.glob(os.path.join(self.prompt_dir, "*.prompt"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            compiled[name] = self._compile(name, path)
+        with self._lock:
+            self._prompts = compiled
+            self._loaded = True
+        logger.info(f"Loaded {len(compiled)} prompt templates from {self.prompt_dir}")
+        return len(compiled)
+
+    def get(self, prompt_name: str) -> CompiledPrompt:
+        """
+        Returns the compiled template, recompiling it if its file has changed.
+
+        Raises:
+            FileNotFoundError: If no such prompt exists.
+            ValueError: If the template has malformed placeholders.
+        """
+        if not self._loaded:
+            self.load_all()
+
+        with self._lock:
+            entry = self._prompts.get(prompt_name)
+        if entry is None:
+            # A template added after startup
+            path = os.path.join(self.prompt_dir, f"{prompt_name}.prompt")
+            entry = self._compile(prompt_name, path)
+            with self._lock:
+                self._prompts[prompt_name] = entry
+            return entry
+
+        now = time.monotonic()
+        if self.reload_interval < 0 or now - entry.checked_at < self.reload_interval:
+            return entry
+
+        entry.checked_at = now
+        try:
+            mtime = os.path.getmtime(entry.path)
+        except OSError:
+            logger.warning(
+                f"Prompt file for '{prompt_name}' is no longer readable; serving cached template."
+            )
+            return entry
+        if mtime != entry.mtime:
+            logger.info(f"Prompt '{prompt_name}' changed on disk; reloading.")
+            entry = self._compile(prompt_name, entry.path)
+            with self._lock:
+                self._prompts[prompt_name] = entry
+        return entry
+
+    def placeholders(self, prompt_name: str) -> FrozenSet[str]:
+        """Returns the placeholder names used by a template."""
+        return self.get(prompt_name).placeholders
+
+    def render(self, prompt_name: str, **kwargs: Any) -> RenderedPrompt:
+        """
+        Formats a template with the given placeholder values.
+
+        Raises:
+            FileNotFoundError: If the prompt does not exist.
+            KeyError: If a placeholder in the template is not provided in kwargs.
+            ValueError: On any other formatting error.
+        """
+        entry = self.get(prompt_name)
+        missing = entry.placeholders.difference(kwargs)
+        if missing:
+            raise KeyError(
+                f"Missing placeholder value for '{sorted(missing)[0]}' in prompt '{prompt_name}'"
+            )
+        try:
+            return RenderedPrompt(entry.template.substitute(**kwargs), prompt_name)
+        except Exception as ex:
+            # Catch other potential formatting errors
+            raise ValueError(f"Error formatting prompt '{prompt_name}': {ex}") from ex
+
+
+# Shared registry used by load_prompt
+prompt_registry = PromptRegistry()
+
+
 def load_prompt(prompt_name: str, **kwargs: Any) -> str:
     """
-    Loads a prompt template from a file and substitutes placeholders.
+    Formats a prompt template from the shared registry.
+
+    Templates are compiled once and re-read only when their file changes.
 
     Args:
         prompt_name: The name of the prompt file (without extension).
         **kwargs: Keyword arguments representing placeholders and their values.
 
     Returns:
-        The formatted prompt string.
+        The formatted prompt string (a RenderedPrompt carrying the prompt name).
 
     Raises:
         FileNotFoundError: If the prompt file does not exist.
         KeyError: If a placeholder in the template is not provided in kwargs.
+        ValueError: If the template is malformed or cannot be formatted.
     """
-    file_path = os.path.join(PROMPT_DIR, f"{prompt_name}.prompt")
+    return prompt_registry.render(prompt_name, **kwargs)
 
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            template_content = f.read()
-    except FileNotFoundError as ex:
-        raise FileNotFoundError(f"Prompt file not found: {file_path}") from ex
-
-    template = PromptTemplate(template_content)
-
-    # Using safe_substitute to avoid errors if not all placeholders are needed
-    # for a specific call, though ideally all required ones should be passed.
-    # If strict checking is needed, use substitute() which raises KeyError.
-    try:
-        formatted_prompt = template.substitute(**kwargs)
-        return formatted_prompt
-    except KeyError as ex:
-        raise KeyError(f"Missing placeholder value for '{ex}' in prompt '{prompt_name}'") from ex
-    except Exception as ex:
-        # Catch other potential formatting errors
-        raise ValueError(f"Error formatting prompt '{prompt_name}': {ex}") from ex
 
 # Example Usage (can be removed or kept for testing):
 if __name__ == "__main__":
@@ -70,21 +232,26 @@ if __name__ == "__main__":
             "chat_response",
             lesson_title="Python Basics",
             exposition="Python is a versatile language...",
-            history_json=json.dumps(history_example[-1:], indent=2) # Only last message
+            history_json=json.dumps(history_example[-1:], indent=2), # Only last message
+            active_task_context="",
+            user_message="What is a decorator?",
+            latex_formatting_instructions="",
         )
         print("--- Chat Response Example ---")
         print(formatted_chat)
         print("\n" + "="*20 + "\n")
 
         # Example for evaluation
-        context_example_str = "Question: What is 2+2?\nExpected Answer: 4\nUser Answer: 4" # pylint: disable=invalid-name
         formatted_eval = load_prompt(
             "evaluate_answer",
-            question_type="math question",
-            prompt_context=context_example_str
+            task_type="Exercise",
+            task_details="Type: short_answer\nInstructions/Question: What is 2+2?",
+            correct_answer_details="Correct Answer/Criteria: 4",
+            user_answer="4",
+            latex_formatting_instructions="",
         )
         print("--- Evaluation Example ---")
         print(formatted_eval)
 
     except (FileNotFoundError, KeyError, ValueError) as e:
-        print(f"Error loading/formatting prompt: {e}")
\ No newline at end of file
+        print(f"Error loading/formatting prompt: {e}")
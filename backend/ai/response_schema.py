@@ -0,0 +1,217 @@
+"""
+Builds Gemini response schemas from Pydantic models for structured output.
+
+Gemini's `response_schema` accepts a restricted OpenAPI subset: no `$ref`,
+no `anyOf`, no titles/defaults and no free-form maps. Pydantic's JSON schema is
+rewritten into that subset here so JSON-producing calls can ask the model to
+emit output that already matches the target model.
+
+String maps (`Dict[str, str]`) are requested as arrays of key/value objects
+and turned back into dictionaries by `restore_map_fields` before validation.
+Other free-form maps cannot be expressed and are left out of the schema.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from backend.logger import logger
+
+# Keys understood by Gemini's Schema proto; everything else is dropped
+_SUPPORTED_KEYS = {
+    "type",
+    "description",
+    "enum",
+    "properties",
+    "required",
+    "items",
+    "nullable",
+}
+
+# Entry field names of string maps sent as arrays: property name -> (key, value)
+_MAP_ENTRY_NAMES: Dict[str, Tuple[str, str]] = {
+    "misconception_corrections": ("option_id", "correction"),
+}
+_DEFAULT_MAP_ENTRY_NAMES = ("key", "value")
+
+
+def _resolve_ref(node: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    """Replaces a `$ref` node with the referenced definition."""
+    ref = node.get("$ref")
+    if not ref:
+        return node
+    name = ref.split("/")[-1]
+    resolved = defs.get(name)
+    if resolved is None:
+        raise ValueError(f"Unresolvable schema reference: {ref}")
+    return resolved
+
+
+def _is_string_map(node: Dict[str, Any]) -> bool:
+    """True for the schema of a Dict[str, str]."""
+    values = node.get("additionalProperties")
+    return (
+        node.get("type") == "object"
+        and not node.get("properties")
+        and isinstance(values, dict)
+        and values.get("type") == "string"
+    )
+
+
+def _map_entry_schema(name: Optional[str]) -> Dict[str, Any]:
+    """Schema of the key/value array that stands in for a string map."""
+    key_name, value_name = _MAP_ENTRY_NAMES.get(name or "", _DEFAULT_MAP_ENTRY_NAMES)
+    return {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {key_name: {"type": "string"}, value_name: {"type": "string"}},
+            "required": [key_name, value_name],
+        },
+    }
+
+
+def _convert_node(
+    node: Dict[str, Any], defs: Dict[str, Any], name: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Converts one JSON-schema node into Gemini's subset.
+
+    Returns None for nodes that cannot be represented (e.g. free-form maps other
+    than string maps), so the caller can drop the corresponding property.
+    """
+    node = _resolve_ref(node, defs)
+
+    nullable = False
+    any_of = node.get("anyOf")
+    if any_of:
+        variants = [v for v in any_of if v.get("type") != "null"]
+        nullable = len(variants) < len(any_of)
+        if not variants:
+            return None
+        # Unions of several concrete types are not supported; use the first
+        # variant (e.g. Union[str, List[str]] becomes a string).
+        converted = _convert_node(variants[0], defs, name)
+        if converted is None:
+            return None
+        if nullable:
+            converted["nullable"] = True
+        if "description" in node and "description" not in converted:
+            converted["description"] = node["description"]
+        return converted
+
+    node_type = node.get("type")
+    if node_type is None:
+        return None
+    if _is_string_map(node):
+        return _map_entry_schema(name)
+
+    result: Dict[str, Any] = {
+        key: value
+        for key, value in node.items()
+        if key in _SUPPORTED_KEYS and key not in ("properties", "items", "required")
+    }
+
+    if node_type == "object":
+        properties: Dict[str, Any] = {}
+        for prop_name, prop_schema in node.get("properties", {}).items():
+            converted_prop = _convert_node(prop_schema, defs, prop_name)
+            if converted_prop is not None:
+                properties[prop_name] = converted_prop
+        if not properties:
+            # Free-form objects (Dict[str, ...]) have no Gemini equivalent
+            return None
+        result["properties"] = properties
+        # Object descriptions come from model docstrings, which are not prompt text
+        result.pop("description", None)
+        required = [name for name in node.get("required", []) if name in properties]
+        if required:
+            result["required"] = required
+    elif node_type == "array":
+        items = _convert_node(node.get("items", {}), defs)
+        if items is None:
+            return None
+        result["items"] = items
+
+    return result
+
+
+@lru_cache(maxsize=None)
+def _json_schema(model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """Pydantic's JSON schema of a model (read-only)."""
+    return model_cls.model_json_schema()
+
+
+@lru_cache(maxsize=None)
+def build_response_schema(model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Returns a Gemini-compatible response schema for a Pydantic model.
+
+    Args:
+        model_cls: The Pydantic model the LLM output will be validated against.
+
+    Returns:
+        A schema dictionary suitable for `generation_config["response_schema"]`.
+
+    Raises:
+        ValueError: If the model cannot be represented at all.
+    """
+    json_schema = _json_schema(model_cls)
+    defs = json_schema.get("$defs", {})
+    schema = _convert_node(json_schema, defs)
+    if schema is None:
+        raise ValueError(
+            f"Model {model_cls.__name__} cannot be expressed as a response schema."
+        )
+    logger.debug(f"Built response schema for {model_cls.__name__}: {schema}")
+    return schema
+
+
+def _restore_node(
+    value: Any, node: Dict[str, Any], defs: Dict[str, Any], name: Optional[str] = None
+) -> Any:
+    """Turns the key/value arrays under one schema node back into dictionaries."""
+    node = _resolve_ref(node, defs)
+    any_of = node.get("anyOf")
+    if any_of:
+        variants = [v for v in any_of if v.get("type") != "null"]
+        # Mirrors _convert_node, which requested the first variant
+        return _restore_node(value, variants[0], defs, name) if variants else value
+
+    if _is_string_map(node):
+        if not isinstance(value, list):
+            return value
+        key_name, value_name = _MAP_ENTRY_NAMES.get(name or "", _DEFAULT_MAP_ENTRY_NAMES)
+        return {
+            str(entry[key_name]): entry[value_name]
+            for entry in value
+            if isinstance(entry, dict) and key_name in entry and value_name in entry
+        }
+    if node.get("type") == "object" and isinstance(value, dict):
+        properties = node.get("properties", {})
+        return {
+            key: _restore_node(item, properties[key], defs, key) if key in properties else item
+            for key, item in value.items()
+        }
+    if node.get("type") == "array" and isinstance(value, list):
+        items = node.get("items", {})
+        return [_restore_node(item, items, defs) for item in value]
+    return value
+
+
+def restore_map_fields(model_cls: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts string maps returned as key/value arrays back into dictionaries.
+
+    Data that already holds dictionaries (free-text mode) is returned unchanged.
+
+    Args:
+        model_cls: The Pydantic model the response schema was built from.
+        data: The JSON object returned by the model.
+
+    Returns:
+        The data with the shape `model_cls` expects.
+    """
+    json_schema = _json_schema(model_cls)
+    return _restore_node(data, json_schema, json_schema.get("$defs", {}))
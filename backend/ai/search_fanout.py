@@ -0,0 +1,91 @@
+"""
+Concurrent fan-out of internet searches.
+
+The syllabus and onboarding graphs each start with several independent
+Tavily queries, and an advanced search takes seconds. `fan_out` starts all
+queries of a step at once, each on a worker thread of its own, and waits for
+them together, so the step takes as long as its slowest query instead of the
+sum.
+
+Every query gets the same deadline. Because no query waits behind another
+for a worker, the deadline only covers the query's own run; the delay before
+it started is recorded separately. A query that misses the deadline is
+reported as a `TimeoutError` and the step continues with the queries that
+finished; the late query is left to complete in the background (it cannot be
+interrupted) and its result is discarded.
+"""
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict
+
+from backend.logger import logger
+from backend.metrics import metrics
+
+SEARCH_TIMEOUT_SECONDS = float(os.environ.get("INTERNET_SEARCH_TIMEOUT", "10"))
+
+# Histogram buckets (seconds) for the delay between submitting and starting a search
+QUEUE_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+
+def _run_search(search: Callable[[], Any], submitted: float, graph: str) -> Any:
+    """Runs one search, recording how long it waited for its thread."""
+    metrics.observe(
+        "internet_search_queue_wait_seconds",
+        time.monotonic() - submitted,
+        {"graph": graph},
+        buckets=QUEUE_WAIT_BUCKETS,
+    )
+    return search()
+
+
+def fan_out(
+    searches: Dict[str, Callable[[], Any]],
+    timeout: float = SEARCH_TIMEOUT_SECONDS,
+    graph: str = "unknown",
+) -> Dict[str, Any]:
+    """
+    Runs the searches concurrently and waits at most `timeout` seconds.
+
+    Args:
+        searches: Zero-argument callables keyed by a name for the search.
+        timeout: Seconds each search may take.
+        graph: The calling graph, used as a metrics label.
+
+    Returns:
+        The same keys mapped to each search's result, or to the exception it
+        raised (`TimeoutError` if it did not finish in time).
+    """
+    if not searches:
+        return {}
+    started = time.monotonic()
+    # One thread per search: a shared pool would let searches queued behind
+    # late ones from other steps time out before they ever ran
+    executor = ThreadPoolExecutor(max_workers=len(searches), thread_name_prefix="internet-search")
+    try:
+        futures: Dict[str, Future] = {
+            name: executor.submit(_run_search, fn, started, graph) for name, fn in searches.items()
+        }
+        wait(futures.values(), timeout=timeout)
+    finally:
+        # Late searches keep their threads until they return
+        executor.shutdown(wait=False)
+
+    outcomes: Dict[str, Any] = {}
+    for name, future in futures.items():
+        if not future.done():
+            logger.warning(f"Internet search '{name}' timed out after {timeout:.1f}s")
+            outcomes[name] = TimeoutError(f"Search '{name}' timed out after {timeout:.1f}s")
+            outcome = "timeout"
+        elif future.exception() is not None:
+            outcomes[name] = future.exception()
+            outcome = "error"
+        else:
+            outcomes[name] = future.result()
+            outcome = "ok"
+        metrics.increment("internet_searches_total", {"graph": graph, "outcome": outcome})
+    metrics.observe(
+        "internet_search_fan_out_seconds", time.monotonic() - started, {"graph": graph}
+    )
+    return outcomes
@@ -9,6 +9,8 @@ import google.generativeai as genai
 from dotenv import load_dotenv
 from tavily import TavilyClient  # type: ignore
 
+from backend.ai.llm_backends import (FAKE_MODEL_NAME, configure_backend,
+                                       create_generative_model, is_fake_backend)
 from backend.exceptions import log_and_raise_new
 from backend.logger import logger  # Import logger
 
@@ -22,8 +24,10 @@ TAVILY: Optional[TavilyClient] = None
 # Configure Gemini API
 try:
     gemini_api_key = os.environ.get("GEMINI_API_KEY")
-    gemini_model_name = os.environ.get("GEMINI_MODEL")
-    if not gemini_api_key:
+    gemini_model_name = os.environ.get("GEMINI_MODEL") or (
+        FAKE_MODEL_NAME if is_fake_backend() else None
+    )
+    if not gemini_api_key and not is_fake_backend():
         log_and_raise_new(
             exception_type=KeyError,
             exception_message="GEMINI_API_KEY",
@@ -36,8 +40,8 @@ try:
             exc_info=False # Original log didn't include stack trace
         )
 
-    genai.configure(api_key=gemini_api_key)  # type: ignore[attr-defined]
-    MODEL = genai.GenerativeModel(gemini_model_name)  # type: ignore[attr-defined]
+    configure_backend(gemini_api_key)
+    MODEL = create_generative_model(gemini_model_name)
     logger.info(f"Syllabus Config: Gemini model '{gemini_model_name}' configured.")
 except KeyError as e:
     logger.error(
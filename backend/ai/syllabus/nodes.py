@@ -7,12 +7,13 @@ import re
 import traceback
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional  # Added List, Any, cast
+from typing import Any, Callable, Dict, List, Optional  # Added List, Any, cast
 
 import google.generativeai as genai
 from requests import RequestException
 from tavily import TavilyClient  # type: ignore
 
+from backend.ai.search_fanout import fan_out
 from backend.logger import logger  # Import logger
 # Project specific imports
 from backend.services.sqlite_db import SQLiteDatabaseService
@@ -106,7 +107,6 @@ def search_internet(
     knowledge_level = state["user_knowledge_level"]
     logger.info(f"Internet Search: Topic='{topic}', Level='{knowledge_level}'")
 
-    search_results: List[str] = []
     queries = [
         (
             f"{topic} syllabus curriculum outline learning objectives",
@@ -118,28 +118,41 @@ def search_internet(
         ),
     ]
 
-    for query, params in queries:
-        try:
+    def _search(query: str, params: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+        def run() -> Dict[str, Any]:
             logger.info(f"Tavily Query: {query} (Params: {params})")
-            search = tavily_client.search(
-                query=query, search_depth="advanced", **params
+            return tavily_client.search(query=query, search_depth="advanced", **params)
+
+        return run
+
+    # The queries are independent: run them concurrently and keep what finishes in time
+    outcomes = fan_out(
+        {query: _search(query, params) for query, params in queries}, graph="syllabus"
+    )
+
+    search_results: List[str] = []
+    for query, _ in queries:
+        outcome = outcomes[query]
+        if isinstance(outcome, TimeoutError):
+            logger.warning(f"Tavily query '{query}' timed out; continuing without it.")
+            search_results.append(f"Web search timed out: {str(outcome)}")
+        elif isinstance(outcome, RequestException):
+            logger.warning(f"Tavily request error for query '{query}': {outcome}")
+            search_results.append(f"Error during web search: {str(outcome)}")
+        elif isinstance(outcome, BaseException):
+            logger.error(
+                f"Unexpected error during Tavily search for query '{query}': {outcome}",
+                exc_info=outcome,
             )
+            search_results.append(f"Unexpected error during web search: {str(outcome)}")
+        else:
             content = [
                 r.get("content", "")
-                for r in search.get("results", [])
+                for r in outcome.get("results", [])
                 if r.get("content")
             ]
             search_results.extend(content)
             logger.info(f"Found {len(content)} results.")
-        except RequestException as e:
-            logger.warning(f"Tavily request error for query '{query}': {e}")
-            search_results.append(f"Error during web search: {str(e)}")
-        except Exception as e:
-            logger.error(
-                f"Unexpected error during Tavily search for query '{query}': {e}",
-                exc_info=True,
-            )
-            search_results.append(f"Unexpected error during web search: {str(e)}")
 
     logger.info(f"Total search results gathered: {len(search_results)}")
     return {"search_results": search_results}
@@ -1,4 +1,13 @@
-"""Defines and manages the LangGraph workflow for syllabus generation."""
+"""
+Defines and manages the LangGraph workflow for syllabus generation.
+
+The compiled graph is built once per SyllabusAI and never modified; each run
+gets its own state. `generate` (used by SyllabusService) keeps that state
+local to the call, so any number of generations can run in parallel threads.
+The `initialize` / `get_or_create_syllabus` / ... methods keep a run's state on
+the instance for single-caller use such as scripts and must not be shared
+between concurrent requests.
+"""
 
 # pylint: disable=broad-exception-caught,singleton-comparison
 
@@ -31,7 +40,7 @@ class SyllabusAI:
     """Orchestrates syllabus generation using a LangGraph workflow."""
 
     def __init__(self, db_service: SQLiteDatabaseService):
-        """Initializes the SyllabusAI graph and stores dependencies."""
+        """Compiles the shared SyllabusAI graph and stores dependencies."""
         self.state: Optional[SyllabusState] = None
         self.db_service = db_service
         # Store configured clients (or handle None if config failed)
@@ -84,21 +93,73 @@ class SyllabusAI:
             print("Conditional Edge: No existing syllabus, searching internet.")
             return "search_internet"
 
-    # --- Public Methods for Service Interaction ---
+    # --- Per-Run Methods (safe to call concurrently) ---
+
+    def create_state(
+        self, topic: str, knowledge_level: str, user_id: Optional[str] = None
+    ) -> SyllabusState:
+        """Returns the initial state of a new run."""
+        return cast(
+            SyllabusState,
+            nodes.initialize_state(
+                None, topic=topic, knowledge_level=knowledge_level, user_id=user_id
+            ),
+        )
+
+    def run(self, state: SyllabusState) -> SyllabusState:
+        """
+        Runs the graph from its entry point and returns the final state.
+
+        `state` itself is not modified, so callers may run the graph on
+        several states at the same time.
+
+        Raises:
+            RuntimeError: If a graph node fails.
+        """
+        final_state = cast(SyllabusState, dict(state))
+        try:
+            for step in self.graph.stream(state, config={"recursion_limit": 10}):
+                node_name = list(step.keys())[0]
+                logger.debug(f"Syllabus graph step: {node_name}")
+                update_value = step[node_name]
+                if not isinstance(update_value, dict):
+                    logger.warning(f"Ignoring non-dict update from node '{node_name}': {update_value}")
+                    continue
+                for key, value in update_value.items():
+                    if key in SyllabusState.__annotations__:
+                        final_state[key] = value  # type: ignore
+                    else:
+                        logger.warning(f"Ignoring unexpected key '{key}' from graph execution update.")
+        except Exception as e:
+            logger.error(f"Error during syllabus graph execution: {e}", exc_info=True)
+            raise RuntimeError("Syllabus graph execution failed.") from e
+        return final_state
+
+    def generate(
+        self, topic: str, knowledge_level: str, user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Finds or generates the syllabus for a topic and level.
+
+        Thread-safe: the run's state lives only in this call.
+
+        Raises:
+            RuntimeError: If the graph fails or produces no syllabus.
+        """
+        final_state = self.run(self.create_state(topic, knowledge_level, user_id))
+        syllabus = final_state.get("generated_syllabus") or final_state.get("existing_syllabus")
+        if not syllabus:
+            raise RuntimeError("Failed to get or create a valid syllabus.")
+        logger.info(f"Syllabus get/create finished. Result UID: {syllabus.get('uid', 'N/A')}")
+        return syllabus
+
+    # --- Stateful Methods (one run per instance) ---
 
     def initialize(
         self, topic: str, knowledge_level: str, user_id: Optional[str] = None
     ) -> Dict[str, Optional[str]]: # Revert: Returns a status dict, not the full state
         """Initializes the internal state for a new run."""
-        # Use the node function directly to create the initial state dict
-        # Cast the result to SyllabusState
-        initial_state_dict = nodes.initialize_state(
-            None,  # Pass None for state as it's initialization
-            topic=topic,
-            knowledge_level=knowledge_level,
-            user_id=user_id,
-        )
-        self.state = cast(SyllabusState, initial_state_dict)
+        self.state = self.create_state(topic, knowledge_level, user_id)
         print(
             f"SyllabusAI initialized: Topic='{topic}', Level='{knowledge_level}', User={user_id}"
         )
@@ -118,34 +179,7 @@ class SyllabusAI:
         print("Starting get_or_create_syllabus graph execution...")
 
         # Run the graph from the entry point ('search_database')
-        final_state_updates = {}
-        try:
-            # Stream the execution, starting with the current state
-            for step in self.graph.stream(self.state, config={"recursion_limit": 10}):
-                node_name = list(step.keys())[0]
-                print(f"Graph Step: {node_name}")
-                # Accumulate all updates from the steps
-                # Ensure the update value is a dictionary
-                update_value = step[node_name]
-                if isinstance(update_value, dict):
-                    final_state_updates.update(update_value)
-                else:
-                    logger.warning(f"Ignoring non-dict update from node '{node_name}': {update_value}")
-
-
-            # Apply accumulated updates to the internal state carefully
-            if final_state_updates and self.state:
-                for key, value in final_state_updates.items():
-                    if key in SyllabusState.__annotations__:
-                        # Mypy might still complain about direct assignment, but it's safer than .update()
-                        self.state[key] = value # type: ignore
-                    else:
-                        logger.warning(f"Ignoring unexpected key '{key}' from graph execution update.")
-
-        except Exception as e:
-            print(f"Error during graph execution in get_or_create_syllabus: {e}")
-            traceback.print_exc()
-            raise RuntimeError("Syllabus graph execution failed.") from e
+        self.state = self.run(self.state)
 
         # The result is the syllabus found or generated, now stored in the updated state
         syllabus = self.state.get("generated_syllabus") or self.state.get(
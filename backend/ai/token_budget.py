@@ -0,0 +1,130 @@
+"""
+Fast local token estimation and budget allocation for prompt context.
+
+The estimator is a heuristic (no tokenizer dependency): it takes the larger of
+a characters-per-token and a words-per-token estimate, which tracks Gemini's
+tokenizer closely enough for budgeting English prose, markdown and code.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# Average characters per token for English text
+CHARS_PER_TOKEN = 4.0
+# Average tokens per whitespace-separated word
+TOKENS_PER_WORD = 1.3
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of tokens in `text`."""
+    if not text:
+        return 0
+    by_chars = len(text) / CHARS_PER_TOKEN
+    by_words = text.count(" ") * TOKENS_PER_WORD
+    return max(1, int(max(by_chars, by_words)))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """
+    Truncates `text` to roughly `max_tokens` tokens on a word boundary.
+
+    Args:
+        text: The text to truncate.
+        max_tokens: Token allowance.
+        keep: "head" keeps the beginning of the text, "tail" keeps the end.
+
+    Returns:
+        The text unchanged if it fits, otherwise a shortened version marked
+        with an ellipsis where content was removed.
+    """
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    max_chars = int(max_tokens * CHARS_PER_TOKEN)
+    # Shrink until the estimate fits (word-heavy text needs fewer chars)
+    while max_chars > 0:
+        if keep == "tail":
+            candidate = text[-max_chars:]
+            space = _WHITESPACE.search(candidate)
+            if space and space.end() < len(candidate):
+                candidate = candidate[space.end():]
+        else:
+            candidate = text[:max_chars]
+            cut = candidate.rfind(" ")
+            if cut > 0:
+                candidate = candidate[:cut]
+        if estimate_tokens(candidate) < max_tokens:
+            return f"...{candidate}" if keep == "tail" else f"{candidate}..."
+        max_chars = int(max_chars * 0.9)
+    return ""
+
+
+class ContextBudget:
+    """
+    Allocates a fixed token budget across prompt sections in priority order.
+
+    Callers take sections from highest to lowest priority; each take is capped
+    by an optional per-section limit and by whatever budget remains, so
+    high-priority sections are never starved by large low-priority ones.
+    """
+
+    def __init__(self, total_tokens: int) -> None:
+        """Initializes the budget with the number of tokens available."""
+        self.total_tokens = max(0, total_tokens)
+        self.remaining = self.total_tokens
+        self.allocations: Dict[str, int] = {}
+
+    def reserve(self, name: str, text: str) -> None:
+        """Charges fixed prompt text (template, user message) against the budget."""
+        used = estimate_tokens(text)
+        self.remaining = max(0, self.remaining - used)
+        self.allocations[name] = self.allocations.get(name, 0) + used
+
+    def _allowance(self, max_tokens: Optional[int]) -> int:
+        if max_tokens is None:
+            return self.remaining
+        return max(0, min(self.remaining, max_tokens))
+
+    def take_text(
+        self,
+        name: str,
+        text: str,
+        max_tokens: Optional[int] = None,
+        keep: str = "head",
+    ) -> str:
+        """Takes as much of `text` as the allowance permits."""
+        fitted = truncate_to_tokens(text, self._allowance(max_tokens), keep=keep)
+        used = estimate_tokens(fitted)
+        self.remaining = max(0, self.remaining - used)
+        self.allocations[name] = used
+        return fitted
+
+    def take_messages(
+        self,
+        name: str,
+        messages: List[Dict[str, Any]],
+        formatter: Callable[[Dict[str, Any]], str],
+        max_tokens: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Takes the most recent whole messages that fit the allowance.
+
+        Messages are never cut mid-way; older messages are dropped first.
+        """
+        allowance = self._allowance(max_tokens)
+        selected: List[Dict[str, Any]] = []
+        used = 0
+        for message in reversed(messages):
+            cost = estimate_tokens(formatter(message)) + 1  # +1 for the separator
+            if used + cost > allowance:
+                break
+            selected.append(message)
+            used += cost
+        selected.reverse()
+        self.remaining = max(0, self.remaining - used)
+        self.allocations[name] = used
+        return selected
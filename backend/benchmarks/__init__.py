@@ -0,0 +1 @@
+"""Offline benchmarks run against the fake LLM backend."""
@@ -0,0 +1,123 @@
+"""
+Benchmark: chat turn latency with fused vs. two-call intent classification.
+
+Runs the real lesson graph against the fake LLM backend with injected latency
+and reports per-turn latency and LLM calls per turn for both modes.
+
+Usage:
+    python -m backend.benchmarks.fused_intent --turns 40 --latency-ms 800 --jitter-ms 200
+"""
+
+import argparse
+import statistics
+import time
+from typing import Any, Dict, List
+
+from backend.ai import llm_utils
+from backend.ai.lessons.lessons_graph import LessonAI
+from backend.ai.llm_backends import FakeGenerativeModel, FakeLLMConfig
+from backend.models import GeneratedLessonContent
+
+# A typical mix of turns: mostly questions and chat, some task requests
+USER_MESSAGES = [
+    "What is the difference between a list and a tuple?",
+    "Thanks, that makes sense.",
+    "How does slicing work?",
+    "Can I have an exercise?",
+    "Why are tuples faster?",
+    "Cool!",
+    "Explain list comprehensions?",
+    "Test me with a quiz",
+]
+
+
+def _base_state() -> Dict[str, Any]:
+    """Builds a lesson state representative of a real lesson."""
+    return {
+        "topic": "Python",
+        "knowledge_level": "beginner",
+        "lesson_title": "Lists and Tuples",
+        "module_title": "Data Structures",
+        "generated_content": GeneratedLessonContent(
+            exposition_content="Lists are mutable sequences. Tuples are immutable. " * 200
+        ),
+        "user_id": "bench_user",
+        "current_interaction_mode": "chatting",
+        "generated_exercises": [],
+        "generated_assessment_questions": [],
+        "generated_exercise_ids": [],
+        "generated_assessment_question_ids": [],
+        "active_exercise": None,
+        "active_assessment": None,
+        "potential_answer": None,
+    }
+
+
+def run_mode(fused: bool, turns: int, config: FakeLLMConfig) -> Dict[str, float]:
+    """Runs `turns` chat turns and returns latency and call statistics."""
+    model = FakeGenerativeModel("fake-bench", config)
+    llm_utils.MODEL = model
+    llm_utils.MODEL_NAME = f"fake-bench-{'fused' if fused else 'two-call'}"
+    llm_utils.FALLBACK_MODEL = None
+    lesson_ai = LessonAI(fused=fused)
+
+    latencies: List[float] = []
+    history: List[Dict[str, Any]] = [{"role": "assistant", "content": "Welcome!"}]
+    state = _base_state()
+    for turn in range(turns):
+        message = USER_MESSAGES[turn % len(USER_MESSAGES)]
+        history.append({"role": "user", "content": message})
+        start = time.perf_counter()
+        state = lesson_ai.process_chat_turn(state, message, list(history))
+        latencies.append(time.perf_counter() - start)
+        reply = state.pop("new_assistant_message", None)
+        if reply:
+            history.append(reply)
+        # Keep the benchmark focused on chat turns rather than task state
+        state["active_exercise"] = None
+        state["active_assessment"] = None
+
+    latencies.sort()
+    return {
+        "mean_s": statistics.mean(latencies),
+        "p50_s": latencies[len(latencies) // 2],
+        "p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "llm_calls_per_turn": model.calls / turns,
+    }
+
+
+def main() -> None:
+    """Parses arguments, runs both modes and prints a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument(
+        "--distribution", default="lognormal", choices=["fixed", "uniform", "normal", "lognormal"]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        latency_distribution=args.distribution,
+        seed=args.seed,
+    )
+    results = {
+        "two-call": run_mode(False, args.turns, config),
+        "fused": run_mode(True, args.turns, config),
+    }
+
+    print(f"{'mode':<10} {'mean (s)':>10} {'p50 (s)':>10} {'p95 (s)':>10} {'calls/turn':>11}")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<10} {stats['mean_s']:>10.3f} {stats['p50_s']:>10.3f} "
+            f"{stats['p95_s']:>10.3f} {stats['llm_calls_per_turn']:>11.2f}"
+        )
+    speedup = results["two-call"]["mean_s"] / max(results["fused"]["mean_s"], 1e-9)
+    print(f"\nFused mode mean turn latency: {speedup:.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark: validated vs. trusted vs. lazy deserialization of a stored lesson state.
+
+Serializes a lesson state with large exercise and assessment lists the way it
+is stored in `user_progress.lesson_state_json`, then times loading it with
+full Pydantic validation, with the trusted, schema-stamped fast path and with
+lazy hydration. A second table times a typical chat turn's round trip: load,
+read the exposition and the active exercise, serialize.
+
+Usage:
+    python -m backend.benchmarks.state_deserialization --exercises 200 --repeat 50
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from backend.models import (AssessmentQuestion, Exercise, ExpositionContent,
+                            ExpositionContentItem, GeneratedLessonContent,
+                            Metadata, Option)
+from backend.services.lesson_state_utils import (deserialize_state_data,
+                                                 serialize_state_data)
+
+MODES: Dict[str, Dict[str, bool]] = {
+    "validated": {},
+    "trusted": {"trusted": True},
+    "lazy": {"trusted": True, "lazy": True},
+}
+
+
+def _exercise(i: int) -> Exercise:
+    """Builds a multiple-choice exercise with realistic text sizes."""
+    return Exercise(
+        id=f"ex{i}",
+        type="multiple_choice",
+        question=f"Which statement about lists is true? (variant {i})",
+        instructions="Pick the single best answer.",
+        options=[Option(id=letter, text=f"Option {letter} for exercise {i}") for letter in "ABCD"],
+        correct_answer_id="B",
+        hints=["Think about mutability.", "Compare with tuples."],
+        explanation="Lists are mutable sequences; tuples are not. " * 4,
+        misconception_corrections={"A": "Tuples are immutable.", "C": "Lists keep order."},
+    )
+
+
+def _question(i: int) -> AssessmentQuestion:
+    """Builds a true/false assessment question."""
+    return AssessmentQuestion(
+        id=f"as{i}",
+        type="true_false",
+        question_text=f"Lists can be modified after creation. (variant {i})",
+        options=[Option(id="A", text="True"), Option(id="B", text="False")],
+        correct_answer_id="A",
+        explanation="Lists are mutable.",
+    )
+
+
+def build_state(exercises: int, questions: int) -> Dict[str, Any]:
+    """Builds a stored state dict (as loaded from the database)."""
+    items = [
+        ExpositionContentItem(type="paragraph", text="Lists are mutable sequences. " * 20)
+        for _ in range(30)
+    ]
+    generated = [_exercise(i) for i in range(exercises)]
+    state = {
+        "topic": "Python",
+        "knowledge_level": "beginner",
+        "lesson_title": "Lists and Tuples",
+        "generated_content": GeneratedLessonContent(
+            topic="Python",
+            level="beginner",
+            exposition_content=ExpositionContent(content=items),
+            metadata=Metadata(title="Lists and Tuples", tags=["python", "lists"]),
+        ),
+        "current_interaction_mode": "chatting",
+        "generated_exercises": generated,
+        "generated_assessment_questions": [_question(i) for i in range(questions)],
+        "generated_exercise_ids": [exercise.id for exercise in generated],
+        "active_exercise": generated[-1] if generated else None,
+        "active_assessment": None,
+    }
+    return json.loads(serialize_state_data(state))  # type: ignore[arg-type]
+
+
+def time_loads(load: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Times `repeat` calls of `load` and returns mean/p50/p95 in milliseconds."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": statistics.mean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def chat_turn_round_trip(stored: Dict[str, Any], options: Dict[str, bool]) -> str:
+    """Loads a state, uses what a chat turn uses, and serializes it again."""
+    state = deserialize_state_data(stored, **options)
+    _ = state["generated_content"].exposition_content  # type: ignore[union-attr]
+    _ = state["active_exercise"].type  # type: ignore[union-attr]
+    return serialize_state_data(state)
+
+
+def _print_table(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    """Prints one timing table with the speedup of each mode over validation."""
+    print(f"\n{title}")
+    print(f"{'mode':<10} {'mean (ms)':>10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'speedup':>8}")
+    baseline = results["validated"]["mean_ms"]
+    for mode, stats in results.items():
+        print(
+            f"{mode:<10} {stats['mean_ms']:>10.2f} {stats['p50_ms']:>10.2f} "
+            f"{stats['p95_ms']:>10.2f} {baseline / max(stats['mean_ms'], 1e-9):>7.2f}x"
+        )
+
+
+def main() -> None:
+    """Parses arguments, times all modes and prints a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--exercises", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    stored = build_state(args.exercises, args.questions)
+    # All modes must produce the same models
+    expected = deserialize_state_data(stored)
+    assert all(deserialize_state_data(stored, **o) == expected for o in MODES.values())
+
+    loads = {
+        mode: time_loads(lambda o=options: deserialize_state_data(stored, **o), args.repeat)
+        for mode, options in MODES.items()
+    }
+    turns = {
+        mode: time_loads(lambda o=options: chat_turn_round_trip(stored, o), args.repeat)
+        for mode, options in MODES.items()
+    }
+    print(
+        f"State with {args.exercises} exercises, {args.questions} assessment questions "
+        f"({len(json.dumps(stored)) // 1024} KiB)"
+    )
+    _print_table("Load only", loads)
+    _print_table("Chat turn round trip (load, use exposition and exercise, save)", turns)
+
+
+if __name__ == "__main__":
+    main()
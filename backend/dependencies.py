@@ -15,15 +15,26 @@ from jose import JWTError, jwt
 # Import services and models
 # Corrected import: OnboardingAI -> TechTreeAI
 from backend.ai.app import LessonAI, SyllabusAI, TechTreeAI
+from backend.ai.lessons import nodes as lesson_nodes
 from backend.exceptions import validate_internal_model
 from backend.models import User
 from backend.services.auth_service import AuthService
+from backend.services.exposition_prefetcher import ExpositionPrefetcher
+from backend.services.exposition_retriever import (
+    EXPOSITION_RETRIEVAL_ENABLED,
+    ExpositionRetriever,
+)
+from backend.services.idempotency import IdempotencyStore
+from backend.services.job_queue import JobQueue
 from backend.services.lesson_exposition_service import LessonExpositionService
 from backend.services.lesson_interaction_service import \
     LessonInteractionService
+from backend.services.lesson_item_pool import ITEM_POOL_ENABLED, LessonItemPool
+from backend.services.lesson_state_cache import LessonStateCache
 from backend.services.onboarding_service import OnboardingService
 from backend.services.sqlite_db import SQLiteDatabaseService
 from backend.services.syllabus_service import SyllabusService
+from backend.services.syllabus_warmup import SyllabusWarmupService
 
 # --- Environment Variables ---
 SECRET_KEY = os.environ.get("SECRET_KEY", "a_very_secret_key")
@@ -50,13 +61,33 @@ onboarding_service = OnboardingService(db_service=db_service)
 # Syllabus AI and Service
 # Corrected SyllabusAI instantiation (needs db_service)
 syllabus_ai = SyllabusAI(db_service=db_service)
-syllabus_service = SyllabusService(db_service=db_service)
+syllabus_service = SyllabusService(db_service=db_service, syllabus_ai=syllabus_ai)
 
 # Lesson Exposition Service
 exposition_service = LessonExpositionService(
     db_service=db_service, syllabus_service=syllabus_service
 )
 
+# Background pre-generation of upcoming lesson expositions
+exposition_prefetcher = ExpositionPrefetcher(
+    exposition_service=exposition_service, syllabus_service=syllabus_service
+)
+
+# Whole-syllabus exposition warm-up
+warmup_service = SyllabusWarmupService(
+    exposition_service=exposition_service, syllabus_service=syllabus_service
+)
+
+# Shared exercise/assessment pools used by the lesson generation nodes
+item_pool = LessonItemPool(db_service=db_service)
+if ITEM_POOL_ENABLED:
+    lesson_nodes.set_item_pool(item_pool)
+
+# Exposition chunks relevant to the user's message, for chat prompts
+exposition_retriever = ExpositionRetriever(db_service=db_service)
+if EXPOSITION_RETRIEVAL_ENABLED:
+    lesson_nodes.set_exposition_retriever(exposition_retriever)
+
 # Lesson AI Component
 lesson_ai = LessonAI()
 
@@ -66,7 +97,21 @@ interaction_service = LessonInteractionService(  # Needs DB, Exposition, AI
     # syllabus_service=syllabus_service, # Removed unexpected argument
     exposition_service=exposition_service,
     lesson_ai=lesson_ai,
+    exposition_prefetcher=exposition_prefetcher,
+    state_cache=LessonStateCache(),
+)
+
+# Replays of chat/generation requests sent with an Idempotency-Key header
+idempotency_store = IdempotencyStore()
+
+# Background generation jobs (`?background=true` on the generation endpoints);
+# workers are started and stopped by the app lifespan
+job_queue = JobQueue(db_service=db_service)
+job_queue.register("exercise", lambda payload: interaction_service.generate_exercise(**payload))
+job_queue.register(
+    "assessment", lambda payload: interaction_service.generate_assessment_question(**payload)
 )
+job_queue.register("syllabus", lambda payload: syllabus_service.get_or_generate_syllabus(**payload))
 
 logger = logging.getLogger(__name__)
 
@@ -151,6 +196,21 @@ def get_exposition_service() -> LessonExpositionService:
     return exposition_service
 
 
+def get_warmup_service() -> SyllabusWarmupService:
+    """Dependency function to get the syllabus warm-up service instance."""
+    return warmup_service
+
+
 def get_interaction_service() -> LessonInteractionService:
     """Dependency function to get the lesson interaction service instance."""
     return interaction_service
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Dependency function to get the idempotency store instance."""
+    return idempotency_store
+
+
+def get_job_queue() -> JobQueue:
+    """Dependency function to get the background job queue instance."""
+    return job_queue
@@ -21,7 +21,8 @@ from pydantic import ValidationError
 from backend.exceptions import InternalDataValidationError
 # Remove direct import of SQLiteDatabaseService
 # Import the shared db_service instance from dependencies
-from backend.dependencies import db_service
+from backend.dependencies import db_service, job_queue
+from backend.ai.prompt_loader import prompt_registry
 from backend.logger import logger
 
 # Define the lifespan context manager
@@ -30,11 +31,15 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     """
     Manages application startup and shutdown events.
     """
-    # Startup logic would go here (if any)
     logger.info("Application startup...")
+    # Compile and validate all prompt templates up front
+    prompt_registry.load_all()
+    # Resume background generation jobs left over from a previous run
+    await job_queue.start()
     yield
     # Shutdown logic
     logger.info("Application shutdown...")
+    await job_queue.stop()
     # Use the imported shared db_service instance
     db_service.close()
     print("Database connection closed.") # Keep print for visibility if desired
@@ -103,6 +108,10 @@ from backend.routers import lesson_router
 app.include_router(lesson_router.router, prefix="/lesson", tags=["Lesson"])
 from backend.routers import progress_router
 app.include_router(progress_router.router, prefix="/progress", tags=["User Progress"])
+from backend.routers import metrics_router
+app.include_router(metrics_router.router, prefix="/metrics", tags=["Metrics"])
+from backend.routers import jobs_router
+app.include_router(jobs_router.router, prefix="/jobs", tags=["Jobs"])
 
 if __name__ == "__main__":
     import uvicorn
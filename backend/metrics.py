@@ -0,0 +1,175 @@
+"""
+Lightweight in-process metrics registry for the TechTree backend.
+
+Counters, gauges and histograms are keyed by a metric name plus an optional
+set of labels and can be read back at runtime (e.g. via the /metrics router).
+This is intentionally dependency-free; values live only for the lifetime of the
+process.
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Default histogram bucket upper bounds (seconds)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0,
+)
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    """Builds a stable, hashable key from a labels dictionary."""
+    if not labels:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """Fixed-bucket histogram with count, sum and approximate quantiles."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        """Initializes empty buckets with the given upper bounds."""
+        self.bounds: List[float] = sorted(buckets)
+        self.bucket_counts: List[int] = [0] * (len(self.bounds) + 1)  # last is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max_value = 0.0
+
+    def observe(self, value: float) -> None:
+        """Records one observation."""
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max_value = max(self.max_value, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns the upper bound of the bucket containing quantile q."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return self.bounds[index] if index < len(self.bounds) else self.max_value
+        return self.max_value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns a JSON-serializable summary."""
+        buckets = {str(bound): count for bound, count in zip(self.bounds, self.bucket_counts)}
+        buckets["+Inf"] = self.bucket_counts[-1]
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max_value,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": buckets,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe store of named counters, gauges and histograms."""
+
+    def __init__(self) -> None:
+        """Initializes an empty registry."""
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+
+    def increment(
+        self, name: str, labels: Optional[Dict[str, Any]] = None, amount: float = 1.0
+    ) -> None:
+        """Increments a counter by the given amount."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set_gauge(
+        self, name: str, value: float, labels: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Sets a gauge to the given value."""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[Dict[str, Any]] = None,
+        buckets: Optional[Sequence[float]] = None,
+    ) -> None:
+        """
+        Records an observation in a histogram.
+
+        The bucket bounds are fixed by the first observation of each series.
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = Histogram(buckets or DEFAULT_BUCKETS)
+                series[key] = histogram
+            histogram.observe(value)
+
+    def get_histogram(
+        self, name: str, labels: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the summary of a histogram series, or None if never observed."""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_label_key(labels))
+            return histogram.to_dict() if histogram else None
+
+    def get_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> float:
+        """Returns the current value of a counter (0.0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def get_gauge(
+        self, name: str, labels: Optional[Dict[str, Any]] = None
+    ) -> Optional[float]:
+        """Returns the current value of a gauge, or None if never set."""
+        with self._lock:
+            return self._gauges.get(name, {}).get(_label_key(labels))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a JSON-serializable copy of all metric series."""
+
+        def _series(store: Dict[str, Dict[LabelKey, float]]) -> Dict[str, Any]:
+            return {
+                name: [
+                    {"labels": dict(key), "value": value}
+                    for key, value in series.items()
+                ]
+                for name, series in store.items()
+            }
+
+        with self._lock:
+            return {
+                "counters": _series(self._counters),
+                "gauges": _series(self._gauges),
+                "histograms": {
+                    name: [
+                        {"labels": dict(key), **histogram.to_dict()}
+                        for key, histogram in series.items()
+                    ]
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """Clears all metrics (primarily for tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Shared registry used across the application
+metrics = MetricsRegistry()
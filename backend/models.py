@@ -128,6 +128,14 @@ class IntentClassificationResult(BaseModel):
     intent: str
 
 
+# pylint: disable=too-few-public-methods
+class IntentAndResponseResult(BaseModel):
+    """Pydantic model for the fused intent classification and chat reply."""
+
+    intent: str
+    response: Optional[str] = None  # Only present when the intent is chatting
+
+
 # pylint: disable=too-few-public-methods
 class EvaluationResult(BaseModel):
     """Pydantic model for the result of answer evaluation."""
@@ -181,8 +189,13 @@ class LessonState(TypedDict, total=False): # Allow partial states
     active_exercise: Optional[Exercise]
     active_assessment: Optional[AssessmentQuestion]
     potential_answer: Optional[str]
+    # Structured result (EvaluationResult dump) of the last locally graded answer
+    last_evaluation: Optional[Dict[str, Any]]
     # Added field to store the lesson's DB primary key
     lesson_db_id: Optional[int]
+    # Rolling summary of the oldest conversation messages, and how many it covers
+    conversation_summary: Optional[str]
+    summary_message_count: int
     # Temporary key to pass history context during graph invocation
     history_context: Optional[List[Dict[str, Any]]]
     # Temporary key to hold message generated by chat node before service saves it
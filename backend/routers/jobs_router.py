@@ -0,0 +1,93 @@
+# backend/routers/jobs_router.py
+"""fastApi router for polling and streaming background generation jobs"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from backend.dependencies import get_current_user, get_job_queue
+from backend.models import User
+from backend.services.job_queue import JobQueue
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+# pylint: disable=too-few-public-methods
+class JobResponse(BaseModel):
+    """Status of a background generation job and, once done, its result."""
+    job_id: str
+    job_type: str
+    status: str  # queued | running | succeeded | failed
+    attempts: int
+    max_attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+
+def job_accepted_response(job: Dict[str, Any]) -> JSONResponse:
+    """Builds the 202 response of an endpoint that queued a job."""
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=JobResponse(**job).model_dump(),
+        headers={"Location": f"/jobs/{job['job_id']}"},
+    )
+
+
+def _get_own_job(job_queue: JobQueue, job_id: str, user: Optional[User]) -> Dict[str, Any]:
+    """Returns the job if it belongs to the user; other users get a 404."""
+    if not user or user.user_id == "no-auth":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required to read jobs.",
+        )
+    job = job_queue.get_job(job_id)
+    if job is None or job["user_id"] != user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' not found."
+        )
+    return job
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    job_queue: JobQueue = Depends(get_job_queue),
+) -> JobResponse:
+    """
+    Returns the status of a background job; poll until it is succeeded or failed.
+    """
+    return JobResponse(**_get_own_job(job_queue, job_id, current_user))
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    job_queue: JobQueue = Depends(get_job_queue),
+) -> StreamingResponse:
+    """
+    Streams the job as server-sent events, one per status change.
+
+    Each event is named after the job's status and carries the JobResponse as
+    JSON; the stream ends after the succeeded or failed event.
+    """
+    _get_own_job(job_queue, job_id, current_user)
+
+    async def events() -> AsyncIterator[str]:
+        async for job in job_queue.watch(job_id):
+            data = json.dumps(JobResponse(**job).model_dump())
+            yield f"event: {job['status']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,10 +1,11 @@
 """fastApi router for lessons"""
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 # Import necessary dependencies
-from fastapi import Depends
+from fastapi import Depends, Header, Query
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 # Import new dependency functions and User model
@@ -12,6 +13,8 @@ from backend.dependencies import (
     get_current_user,
     get_interaction_service,  # New
     get_exposition_service,  # New
+    get_idempotency_store,
+    get_job_queue,
 )
 from backend.logger import logger
 # Import ChatMessage from models now
@@ -20,6 +23,10 @@ from backend.models import User, GeneratedLessonContent, Exercise, AssessmentQue
 # Import the new service types for type hinting
 from backend.services.lesson_interaction_service import LessonInteractionService
 from backend.services.lesson_exposition_service import LessonExpositionService
+from backend.services.idempotency import (IdempotencyKeyError, IdempotencyStore,
+                                          request_fingerprint)
+from backend.services.job_queue import JobQueue
+from backend.routers.jobs_router import JobResponse, job_accepted_response
 
 router = APIRouter()
 
@@ -179,6 +186,8 @@ async def handle_chat_message(
     request_body: ChatMessageRequest,
     current_user: User = Depends(get_current_user),
     interaction_service: LessonInteractionService = Depends(get_interaction_service),
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store),
 ) -> ChatTurnResponse:
     """
     Processes one turn of a user's chat conversation within a specific lesson.
@@ -194,6 +203,9 @@ async def handle_chat_message(
         request_body: Contains the user's chat message.
         current_user: The authenticated user.
         interaction_service: Dependency-injected LessonInteractionService instance.
+        idempotency_key: Optional client key; a retry with the same key gets the
+            original response instead of a second AI turn.
+        idempotency_store: Dependency-injected store of idempotent results.
 
     Returns:
         ChatTurnResponse containing a list of AI response messages or an error message.
@@ -201,6 +213,7 @@ async def handle_chat_message(
     Raises:
         HTTPException (401): If the user is not authenticated.
         HTTPException (404): If the lesson state cannot be found.
+        HTTPException (422): If the Idempotency-Key is invalid or was used for another request.
         HTTPException (500): If an internal server error occurs.
     """
     if not current_user or current_user.user_id == "no-auth":
@@ -214,12 +227,19 @@ async def handle_chat_message(
         f"lesson: {lesson_index}, user: {current_user.user_id}"
     )
     try:
-        result = await interaction_service.handle_chat_turn(
-            user_id=current_user.user_id,
-            syllabus_id=syllabus_id,
-            module_index=module_index,
-            lesson_index=lesson_index,
-            user_message=request_body.message,
+        result = await idempotency_store.run(
+            current_user.user_id,
+            idempotency_key,
+            request_fingerprint(
+                "chat", syllabus_id, module_index, lesson_index, request_body.message
+            ),
+            lambda: interaction_service.handle_chat_turn(
+                user_id=current_user.user_id,
+                syllabus_id=syllabus_id,
+                module_index=module_index,
+                lesson_index=lesson_index,
+                user_message=request_body.message,
+            ),
         )
         if "error" in result:
             return ChatTurnResponse(responses=[], error=result["error"])
@@ -230,6 +250,8 @@ async def handle_chat_message(
             responses_list = result.get("responses", [])
             # Validate/convert if necessary, though Pydantic handles it if types match
             return ChatTurnResponse(responses=responses_list)
+    except IdempotencyKeyError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
     except ValueError as e:
         logger.error(f"Value error in handle_chat_message: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
@@ -244,6 +266,7 @@ async def handle_chat_message(
 @router.post(
     "/exercise/{syllabus_id}/{module_index}/{lesson_index}",
     response_model=ExerciseResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobResponse, "description": "Job queued"}},
 )
 async def generate_exercise(
     syllabus_id: str,
@@ -251,7 +274,11 @@ async def generate_exercise(
     lesson_index: int,
     current_user: User = Depends(get_current_user),
     interaction_service: LessonInteractionService = Depends(get_interaction_service),
-) -> ExerciseResponse:
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store),
+    background: bool = Query(False, description="Queue a job and return 202 with its ID"),
+    job_queue: JobQueue = Depends(get_job_queue),
+) -> Union[ExerciseResponse, JSONResponse]:
     """
     Generates a new, unique exercise for the specified lesson on demand.
 
@@ -264,6 +291,12 @@ async def generate_exercise(
         lesson_index: The index of the lesson.
         current_user: The authenticated user.
         interaction_service: Dependency-injected LessonInteractionService instance.
+        idempotency_key: Optional client key; a retry with the same key gets the
+            original exercise instead of generating another.
+        idempotency_store: Dependency-injected store of idempotent results.
+        background: If true, queue the generation and return 202 with the job;
+            poll GET /jobs/{job_id} or stream /jobs/{job_id}/events for the result.
+        job_queue: Dependency-injected background job queue.
 
     Returns:
         ExerciseResponse containing the generated Exercise object or an error message.
@@ -271,6 +304,7 @@ async def generate_exercise(
     Raises:
         HTTPException (401): If the user is not authenticated.
         HTTPException (404): If the lesson state cannot be found.
+        HTTPException (422): If the Idempotency-Key is invalid or was used for another request.
         HTTPException (500): If exercise generation fails or an internal error occurs.
     """
     if not current_user or current_user.user_id == "no-auth":
@@ -284,12 +318,34 @@ async def generate_exercise(
         f"lesson: {lesson_index}, user: {current_user.user_id}"
     )
     try:
+        if background:
+            job = await idempotency_store.run(
+                current_user.user_id,
+                idempotency_key,
+                request_fingerprint("exercise-job", syllabus_id, module_index, lesson_index),
+                lambda: job_queue.enqueue(
+                    current_user.user_id,
+                    "exercise",
+                    {
+                        "user_id": current_user.user_id,
+                        "syllabus_id": syllabus_id,
+                        "module_index": module_index,
+                        "lesson_index": lesson_index,
+                    },
+                ),
+            )
+            return job_accepted_response(job)
         # Service returns a dictionary: {"exercise": Optional[ExerciseDict], "message": Optional[str]}
-        result_dict = await interaction_service.generate_exercise(
-            user_id=current_user.user_id,
-            syllabus_id=syllabus_id,
-            module_index=module_index,
-            lesson_index=lesson_index,
+        result_dict = await idempotency_store.run(
+            current_user.user_id,
+            idempotency_key,
+            request_fingerprint("exercise", syllabus_id, module_index, lesson_index),
+            lambda: interaction_service.generate_exercise(
+                user_id=current_user.user_id,
+                syllabus_id=syllabus_id,
+                module_index=module_index,
+                lesson_index=lesson_index,
+            ),
         )
         # Extract values from the dictionary
         exercise_data = result_dict.get("exercise") # This is a dict or None
@@ -298,6 +354,8 @@ async def generate_exercise(
             exercise=exercise_data, # Pass the dict/None directly for Pydantic validation
             message=message
         )
+    except IdempotencyKeyError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
     except ValueError as e:
         logger.error(f"Value error in generate_exercise: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
@@ -317,6 +375,7 @@ async def generate_exercise(
 @router.post(
     "/assessment/{syllabus_id}/{module_index}/{lesson_index}",
     response_model=AssessmentQuestionResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobResponse, "description": "Job queued"}},
 )
 async def generate_assessment_question(
     syllabus_id: str,
@@ -324,7 +383,11 @@ async def generate_assessment_question(
     lesson_index: int,
     current_user: User = Depends(get_current_user),
     interaction_service: LessonInteractionService = Depends(get_interaction_service),
-) -> AssessmentQuestionResponse:
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store),
+    background: bool = Query(False, description="Queue a job and return 202 with its ID"),
+    job_queue: JobQueue = Depends(get_job_queue),
+) -> Union[AssessmentQuestionResponse, JSONResponse]:
     """
     Generates a new, unique assessment question for the specified lesson on demand.
 
@@ -337,6 +400,12 @@ async def generate_assessment_question(
         lesson_index: The index of the lesson.
         current_user: The authenticated user.
         interaction_service: Dependency-injected LessonInteractionService instance.
+        idempotency_key: Optional client key; a retry with the same key gets the
+            original question instead of generating another.
+        idempotency_store: Dependency-injected store of idempotent results.
+        background: If true, queue the generation and return 202 with the job;
+            poll GET /jobs/{job_id} or stream /jobs/{job_id}/events for the result.
+        job_queue: Dependency-injected background job queue.
 
     Returns:
         AssessmentQuestionResponse containing the generated question or an error.
@@ -344,6 +413,7 @@ async def generate_assessment_question(
     Raises:
         HTTPException (401): If the user is not authenticated.
         HTTPException (404): If the lesson state cannot be found.
+        HTTPException (422): If the Idempotency-Key is invalid or was used for another request.
         HTTPException (500): If question generation fails or an internal error occurs.
     """
     if not current_user or current_user.user_id == "no-auth":
@@ -357,18 +427,41 @@ async def generate_assessment_question(
         f"lesson: {lesson_index}, user: {current_user.user_id}"
     )
     try:
-        # Service now returns a tuple: (Optional[AssessmentQuestion], Optional[str])
-        question_obj, message = await interaction_service.generate_assessment_question(
-            user_id=current_user.user_id,
-            syllabus_id=syllabus_id,
-            module_index=module_index,
-            lesson_index=lesson_index,
+        if background:
+            job = await idempotency_store.run(
+                current_user.user_id,
+                idempotency_key,
+                request_fingerprint("assessment-job", syllabus_id, module_index, lesson_index),
+                lambda: job_queue.enqueue(
+                    current_user.user_id,
+                    "assessment",
+                    {
+                        "user_id": current_user.user_id,
+                        "syllabus_id": syllabus_id,
+                        "module_index": module_index,
+                        "lesson_index": lesson_index,
+                    },
+                ),
+            )
+            return job_accepted_response(job)
+        # Service returns a dictionary: {"assessment": Optional[QuestionDict], "message": Optional[str]}
+        result_dict = await idempotency_store.run(
+            current_user.user_id,
+            idempotency_key,
+            request_fingerprint("assessment", syllabus_id, module_index, lesson_index),
+            lambda: interaction_service.generate_assessment_question(
+                user_id=current_user.user_id,
+                syllabus_id=syllabus_id,
+                module_index=module_index,
+                lesson_index=lesson_index,
+            ),
         )
-        # The service already returns the validated AssessmentQuestion object or None
         return AssessmentQuestionResponse(
-            question=question_obj, # type: ignore[arg-type]
-            message=message
+            question=result_dict.get("assessment"),  # type: ignore[arg-type]
+            message=result_dict.get("message"),
         )
+    except IdempotencyKeyError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
     except ValueError as e:
         logger.error(f"Value error in generate_assessment_question: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
@@ -0,0 +1,57 @@
+# backend/routers/metrics_router.py
+"""fastApi router exposing in-process runtime metrics"""
+
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from backend.ai.circuit_breaker import get_breaker_snapshots
+from backend.ai.lessons.intent_fast_path import get_fast_path_stats
+from backend.ai.lessons.speculation import get_speculation_stats
+from backend.ai.llm_quota import quota_budget
+from backend.ai.llm_telemetry import get_prompt_summaries
+from backend.metrics import metrics
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("")
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Returns a snapshot of the in-process metrics registry along with the
+    current state of each LLM circuit breaker and the LLM quota budget.
+    """
+    return {
+        **metrics.snapshot(),
+        "circuit_breakers": get_breaker_snapshots(),
+        "llm_quota": quota_budget.snapshot(),
+    }
+
+
+@router.get("/llm")
+async def get_llm_prompt_metrics() -> Dict[str, Any]:
+    """
+    Returns per-prompt LLM usage aggregates (calls, failures, retries, tokens
+    and wall time) for capacity planning against the model quota.
+    """
+    return {"prompts": get_prompt_summaries()}
+
+
+@router.get("/intent-fast-path")
+async def get_intent_fast_path_metrics() -> Dict[str, Any]:
+    """
+    Returns how often the local intent classifier answered without an LLM call
+    (hits, misses, hit rate and hits by rule/model source).
+    """
+    return get_fast_path_stats()
+
+
+@router.get("/speculation")
+async def get_speculation_metrics() -> Dict[str, Any]:
+    """
+    Returns speculative chat outcomes (hits, cancelled/discarded misses and
+    skips) with the total latency saved versus LLM time wasted.
+    """
+    return get_speculation_stats()
@@ -1,17 +1,22 @@
 """API routes for syllabus generation and retrieval."""
 # Improved code for backend/routers/syllabus_router.py
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status # Use status constants
+from fastapi import APIRouter, Depends, HTTPException, Query, status # Use status constants
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field # Field can be used for better validation/docs
 
 # Assuming get_db_service is NOT directly needed here if SyllabusService handles it
-from backend.dependencies import get_current_user, get_syllabus_service
+from backend.dependencies import (get_current_user, get_job_queue,
+                                  get_syllabus_service, get_warmup_service)
 # Removed unused get_db_service import
 from backend.models import User
 # Removed unused SQLiteDatabaseService import
+from backend.routers.jobs_router import JobResponse, job_accepted_response
+from backend.services.job_queue import JobQueue
 from backend.services.syllabus_service import SyllabusService
+from backend.services.syllabus_warmup import SyllabusWarmupService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -67,15 +72,20 @@ class SyllabusListResponse(BaseModel):
     status_code=status.HTTP_201_CREATED, # Use 201 for resource creation
     summary="Generate a new syllabus", # Add summary for docs
     description="Generates a new syllabus based on topic and level, optionally personalized.", # Add description
+    responses={status.HTTP_202_ACCEPTED: {"model": JobResponse, "description": "Job queued"}},
 )
 async def generate_syllabus( # Added return type hint
     request_body: SyllabusRequest,
     syllabus_service: SyllabusService = Depends(get_syllabus_service),
-    current_user: User = Depends(get_current_user)
-) -> SyllabusResponse:
+    current_user: User = Depends(get_current_user),
+    background: bool = Query(False, description="Queue a job and return 202 with its ID"),
+    job_queue: JobQueue = Depends(get_job_queue),
+) -> Union[SyllabusResponse, JSONResponse]:
     """
     Generates a new syllabus based on the topic and level.
     Optionally personalizes based on user ID if provided.
+    With `background=true` the generation is queued and a 202 with the job is
+    returned instead; the job's result is the syllabus.
     """
     logger.info(
         "Generating syllabus request received",
@@ -85,7 +95,24 @@ async def generate_syllabus( # Added return type hint
             "user_id": current_user.user_id,
         },
     )
+    if background and current_user.user_id == "no-auth":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required to queue syllabus generation.",
+        )
     try:
+        if background:
+            job = await job_queue.enqueue(
+                current_user.user_id,
+                "syllabus",
+                {
+                    "topic": request_body.topic,
+                    "level": request_body.level,
+                    "user_id": current_user.user_id,
+                },
+            )
+            return job_accepted_response(job)
+
         syllabus_data = await syllabus_service.get_or_generate_syllabus(
             topic=request_body.topic,
             level=request_body.level,
@@ -160,6 +187,61 @@ async def get_syllabus_by_id( # Added return type hint
             detail="An internal server error occurred while retrieving the syllabus.",
         ) from e
 
+@router.post(
+    "/{syllabus_id}/warmup",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Warm up a syllabus",
+    description=(
+        "Starts generating every lesson exposition of the syllabus in the background. "
+        "Lessons with existing content are skipped, so the call is safe to repeat "
+        "to resume an interrupted warm-up."
+    ),
+    responses={
+        status.HTTP_404_NOT_FOUND: {"description": "Syllabus not found"},
+    }
+)
+async def start_syllabus_warmup(
+    syllabus_id: str,
+    syllabus_service: SyllabusService = Depends(get_syllabus_service),
+    warmup_service: SyllabusWarmupService = Depends(get_warmup_service),
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Starts (or reports the running) warm-up of a syllabus.
+    """
+    logger.info(f"Warm-up requested for syllabus {syllabus_id} by user: {current_user.user_id}")
+    if await syllabus_service.get_syllabus_by_id(syllabus_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Syllabus with ID '{syllabus_id}' not found.",
+        )
+    return warmup_service.start(syllabus_id).to_dict()
+
+
+@router.get(
+    "/{syllabus_id}/warmup",
+    summary="Get syllabus warm-up progress",
+    description="Returns the progress of the latest warm-up of the syllabus.",
+    responses={
+        status.HTTP_404_NOT_FOUND: {"description": "No warm-up has been started"},
+    }
+)
+async def get_syllabus_warmup(
+    syllabus_id: str,
+    warmup_service: SyllabusWarmupService = Depends(get_warmup_service),
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Returns warm-up progress for a syllabus.
+    """
+    progress = warmup_service.get_progress(syllabus_id)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No warm-up has been started for syllabus '{syllabus_id}'.",
+        )
+    return progress.to_dict()
+
 # --- NEW ROUTE ---
 @router.get(
     "/topic/{topic}/level/{level}",
@@ -0,0 +1,156 @@
+# backend/services/exposition_prefetcher.py
+"""
+Background pre-generation of upcoming lesson expositions.
+
+When a learner opens lesson (m, l), the expositions of the next N lessons of
+the syllabus are generated in the background so that those lessons open
+instantly. Lessons that already have `lesson_content` (or are being generated)
+are skipped. Prefetching is optional work: it runs one lesson at a time and
+stops as soon as the LLM quota budget lacks low-priority headroom.
+"""
+
+# pylint: disable=broad-exception-caught
+
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.ai.llm_quota import LOW_PRIORITY, quota_budget
+from backend.ai.token_budget import estimate_tokens
+from backend.logger import logger
+from backend.metrics import metrics
+from backend.services.lesson_exposition_service import LessonExpositionService
+from backend.services.syllabus_service import SyllabusService
+
+EXPOSITION_PREFETCH_LOOKAHEAD = int(os.environ.get("EXPOSITION_PREFETCH_LOOKAHEAD", "2"))
+# Rough size of a generated exposition, added to the prompt estimate
+EXPOSITION_RESPONSE_TOKENS = 1500
+
+
+def syllabus_lessons(syllabus: Dict[str, Any]) -> List[Tuple[int, int, str]]:
+    """Lists all lessons of a syllabus as (module_index, lesson_index, title), in order."""
+    ordered: List[Tuple[int, int, str]] = []
+    for m_pos, module in enumerate(syllabus.get("modules", [])):
+        m_index = module.get("module_index", m_pos)
+        lessons = module.get("lessons")
+        if lessons is None:
+            lessons = module.get("content", {}).get("lessons", [])
+        for l_pos, lesson in enumerate(lessons):
+            ordered.append(
+                (m_index, lesson.get("lesson_index", l_pos), lesson.get("title", "Unknown Lesson"))
+            )
+    ordered.sort(key=lambda entry: (entry[0], entry[1]))
+    return ordered
+
+
+def upcoming_lessons(
+    syllabus: Dict[str, Any], module_index: int, lesson_index: int, count: int
+) -> List[Tuple[int, int, str]]:
+    """
+    Lists the lessons following (module_index, lesson_index) in syllabus order.
+
+    Returns:
+        Up to `count` tuples of (module_index, lesson_index, lesson_title),
+        continuing into the next modules when a module ends.
+    """
+    following = [
+        entry for entry in syllabus_lessons(syllabus)
+        if (entry[0], entry[1]) > (module_index, lesson_index)
+    ]
+    return following[:count]
+
+
+class ExpositionPrefetcher:
+    """Schedules low-priority exposition generation for upcoming lessons."""
+
+    def __init__(
+        self,
+        exposition_service: LessonExpositionService,
+        syllabus_service: SyllabusService,
+        lookahead: Optional[int] = None,
+    ) -> None:
+        """
+        Initializes the prefetcher.
+
+        Args:
+            exposition_service: Service that generates and saves expositions.
+            syllabus_service: Service for retrieving the syllabus structure.
+            lookahead: Number of following lessons to prefetch (0 disables);
+                defaults to EXPOSITION_PREFETCH_LOOKAHEAD.
+        """
+        self.exposition_service = exposition_service
+        self.syllabus_service = syllabus_service
+        self.lookahead = EXPOSITION_PREFETCH_LOOKAHEAD if lookahead is None else lookahead
+        # Syllabi with a prefetch run in progress; a second open just returns
+        self._running: Set[str] = set()
+        # Strong references so scheduled tasks are not garbage collected
+        self._tasks: Set["asyncio.Task[Dict[str, int]]"] = set()
+
+    def schedule(
+        self, syllabus_id: str, module_index: int, lesson_index: int
+    ) -> Optional["asyncio.Task[Dict[str, int]]"]:
+        """
+        Starts prefetching after the given lesson without waiting for it.
+
+        Must be called from a running event loop. Returns the task, or None if
+        prefetching is disabled or already running for this syllabus.
+        """
+        if self.lookahead <= 0 or syllabus_id in self._running:
+            return None
+        task = asyncio.get_running_loop().create_task(
+            self.prefetch_after(syllabus_id, module_index, lesson_index)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def prefetch_after(
+        self, syllabus_id: str, module_index: int, lesson_index: int
+    ) -> Dict[str, int]:
+        """
+        Generates missing expositions for the next `lookahead` lessons, in order.
+
+        Returns:
+            Counts per outcome: generated, skipped_existing, skipped_quota, failed.
+        """
+        outcomes = {"generated": 0, "skipped_existing": 0, "skipped_quota": 0, "failed": 0}
+        if syllabus_id in self._running:
+            return outcomes
+        self._running.add(syllabus_id)
+        try:
+            syllabus = await self.syllabus_service.get_syllabus_by_id(syllabus_id)
+            if not syllabus:
+                logger.warning(f"Prefetch skipped: syllabus {syllabus_id} not found.")
+                return outcomes
+
+            estimated_tokens = (
+                estimate_tokens(json.dumps({"modules": syllabus.get("modules", [])}, default=str))
+                + EXPOSITION_RESPONSE_TOKENS
+            )
+            upcoming = upcoming_lessons(syllabus, module_index, lesson_index, self.lookahead)
+            for position, (m_index, l_index, title) in enumerate(upcoming):
+                if not quota_budget.has_headroom(LOW_PRIORITY, estimated_tokens=estimated_tokens):
+                    outcomes["skipped_quota"] += len(upcoming) - position
+                    logger.info(
+                        f"Prefetch for {syllabus_id} stopped: no low-priority LLM quota headroom."
+                    )
+                    break
+                try:
+                    generated = await self.exposition_service.pregenerate_exposition(
+                        syllabus, m_index, l_index, title
+                    )
+                    outcomes["generated" if generated else "skipped_existing"] += 1
+                except Exception as e:
+                    outcomes["failed"] += 1
+                    logger.warning(
+                        f"Prefetch of {syllabus_id}/{m_index}/{l_index} failed: {e}"
+                    )
+        finally:
+            self._running.discard(syllabus_id)
+
+        for outcome, count in outcomes.items():
+            if count:
+                metrics.increment("exposition_prefetch_total", {"outcome": outcome}, amount=count)
+        logger.info(f"Exposition prefetch after {syllabus_id}/{module_index}/{lesson_index}: {outcomes}")
+        return outcomes
@@ -0,0 +1,118 @@
+# backend/services/exposition_retriever.py
+"""
+Retrieval of the exposition chunks relevant to a chat message.
+
+The exposition service builds a hashing TF-IDF index of each lesson's
+exposition (see backend/ai/lessons/exposition_index.py) and saves it with the
+lesson content in the `lesson_exposition_index` table.
+The chat nodes ask this retriever for the top-k chunks for the user's message
+and put those in the prompt instead of the beginning of the lesson. Loaded
+indexes are kept in a small LRU cache, so a turn costs one vector product.
+
+Lessons saved before the index existed are indexed on first use. The cached
+index is checked against the state's exposition, so a regenerated lesson is
+never answered from its old chunks.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from backend.ai.lessons.exposition_index import ExpositionIndex, content_hash, index_record
+from backend.logger import logger
+from backend.metrics import metrics
+from backend.services.sqlite_db import SQLiteDatabaseService
+
+EXPOSITION_RETRIEVAL_ENABLED = os.environ.get("EXPOSITION_RETRIEVAL", "true").lower() != "false"
+EXPOSITION_RETRIEVAL_TOP_K = int(os.environ.get("EXPOSITION_RETRIEVAL_TOP_K", "4"))
+EXPOSITION_INDEX_CACHE_SIZE = int(os.environ.get("EXPOSITION_INDEX_CACHE_SIZE", "256"))
+
+# Histogram buckets (seconds) for one index search
+SEARCH_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01)
+
+
+class ExpositionRetriever:
+    """Finds the exposition chunks of a lesson most relevant to a message."""
+
+    def __init__(
+        self,
+        db_service: SQLiteDatabaseService,
+        top_k: int = EXPOSITION_RETRIEVAL_TOP_K,
+        max_cached: int = EXPOSITION_INDEX_CACHE_SIZE,
+    ) -> None:
+        """
+        Initializes the retriever with an empty cache.
+
+        Args:
+            db_service: Database holding the lesson_exposition_index table.
+            top_k: Chunks returned per message at most.
+            max_cached: Lesson indexes kept in memory.
+        """
+        self.db_service = db_service
+        self.top_k = top_k
+        self.max_cached = max(1, max_cached)
+        # lesson_id -> (content hash, index or None if the lesson has no chunks)
+        self._cache: "OrderedDict[int, Tuple[str, Optional[ExpositionIndex]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def retrieve(self, lesson_id: int, exposition: str, query: str) -> List[str]:
+        """
+        Returns the chunks most relevant to `query`, best first.
+
+        Args:
+            lesson_id: The lesson's primary key.
+            exposition: The exposition the learner is reading (from the lesson state).
+            query: The user's message.
+
+        Returns:
+            Up to `top_k` chunk texts; empty if no chunk matches the message.
+        """
+        index = self._get_index(lesson_id, exposition)
+        if index is None:
+            return []
+        started = time.perf_counter()
+        hits = index.search(query, self.top_k)
+        metrics.observe(
+            "exposition_retrieval_seconds", time.perf_counter() - started, buckets=SEARCH_BUCKETS
+        )
+        metrics.increment(
+            "exposition_retrievals_total", {"outcome": "matched" if hits else "no_match"}
+        )
+        return [index.chunks[i] for i, _ in hits]
+
+    def _get_index(self, lesson_id: int, exposition: str) -> Optional[ExpositionIndex]:
+        """Returns the lesson's index from the cache, the database or a fresh build."""
+        digest = content_hash(exposition)
+        with self._lock:
+            cached = self._cache.get(lesson_id)
+            if cached is not None and cached[0] == digest:
+                self._cache.move_to_end(lesson_id)
+                return cached[1]
+
+        index = self._load(lesson_id, digest, exposition)
+        with self._lock:
+            self._cache[lesson_id] = (digest, index)
+            self._cache.move_to_end(lesson_id)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return index
+
+    def _load(self, lesson_id: int, digest: str, exposition: str) -> Optional[ExpositionIndex]:
+        """Loads the stored index, indexing the lesson first if it has none."""
+        row = self.db_service.get_exposition_index(lesson_id)
+        if row is not None and row["content_hash"] == digest:
+            index = ExpositionIndex.from_bytes(row["chunks"], row["vectors"])
+            if index is not None:
+                return index
+        if row is not None and row["content_hash"] != digest:
+            # The state holds another version of the exposition than the database
+            return ExpositionIndex.build(exposition) if exposition.strip() else None
+
+        logger.info(f"Indexing exposition of lesson {lesson_id} for retrieval")
+        record = index_record(exposition)
+        if record is None:
+            return None
+        self.db_service.save_exposition_index(lesson_id, record)
+        return ExpositionIndex.from_bytes(record["chunks"], record["vectors"])
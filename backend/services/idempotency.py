@@ -0,0 +1,157 @@
+# backend/services/idempotency.py
+"""
+Short-lived store of request results keyed by the client's Idempotency-Key.
+
+Frontend retries and double clicks on the chat and generation endpoints would
+otherwise each cost an LLM call and add a duplicate history entry. A request
+carrying an `Idempotency-Key` header runs once: a concurrent duplicate waits
+for the first one and gets its result, and a later replay within the TTL gets
+the stored result without touching the service. Failed requests are not
+remembered, so a retry after an error runs again.
+
+Keys are scoped to the user. Reusing a key for a different request (another
+endpoint, lesson or message) is rejected with IdempotencyKeyError.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from backend.logger import logger
+from backend.metrics import metrics
+
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+# Longer keys are rejected rather than stored
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+class IdempotencyKeyError(Exception):
+    """The idempotency key is invalid or was already used for a different request."""
+
+
+@dataclass
+class _Entry:
+    """A request seen under one key: in flight until `done` is set."""
+
+    fingerprint: str
+    created_at: float
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    result: Any = None
+    succeeded: bool = False
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Hashes the parts that identify a request (endpoint, path params, body)."""
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class IdempotencyStore:
+    """In-memory store of in-flight and completed idempotent requests."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes the store.
+
+        Args:
+            ttl_seconds: How long a completed result can be replayed.
+            max_entries: Completed results kept at most (oldest dropped first).
+            clock: Monotonic time source, injectable for tests.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _purge(self, now: float) -> None:
+        """
+        Drops expired results and, beyond `max_entries`, the oldest ones.
+
+        Entries are in creation order, so the scan stops at the first fresh
+        entry once the store is within `max_entries`. In-flight requests are
+        skipped, never dropped.
+        """
+        for key in list(self._entries):
+            entry = self._entries[key]
+            expired = now - entry.created_at > self.ttl_seconds
+            if not expired and len(self._entries) <= self.max_entries:
+                break
+            if entry.done.is_set():
+                del self._entries[key]
+
+    async def run(
+        self,
+        user_id: str,
+        key: Optional[str],
+        fingerprint: str,
+        func: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Runs `func` at most once per (user, key) and returns its result.
+
+        Args:
+            user_id: The requesting user; keys are scoped to the user.
+            key: The Idempotency-Key header value; None runs `func` directly.
+            fingerprint: request_fingerprint() of the request.
+            func: Performs the request.
+
+        Raises:
+            IdempotencyKeyError: If the key is empty, too long or belongs to
+                another request.
+            Exception: Whatever `func` raised (the key is then forgotten).
+        """
+        if key is None:
+            return await func()
+        if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            raise IdempotencyKeyError(
+                f"Idempotency-Key must be 1-{MAX_IDEMPOTENCY_KEY_LENGTH} characters."
+            )
+
+        now = self._clock()
+        self._purge(now)
+        store_key = (user_id, key)
+        entry = self._entries.get(store_key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                metrics.increment("idempotency_requests_total", {"outcome": "conflict"})
+                raise IdempotencyKeyError(
+                    "Idempotency-Key was already used for a different request."
+                )
+            if entry.done.is_set():
+                metrics.increment("idempotency_requests_total", {"outcome": "replayed"})
+            else:
+                metrics.increment("idempotency_requests_total", {"outcome": "joined"})
+                await entry.done.wait()
+            if entry.succeeded:
+                logger.info(f"Returning stored result for idempotency key {key} of user {user_id}.")
+                return entry.result
+            # The original attempt failed and was forgotten; run this one anew
+            return await self.run(user_id, key, fingerprint, func)
+
+        entry = _Entry(fingerprint=fingerprint, created_at=now)
+        self._entries[store_key] = entry
+        metrics.increment("idempotency_requests_total", {"outcome": "new"})
+        try:
+            entry.result = await func()
+            entry.succeeded = True
+            return entry.result
+        except BaseException:
+            if self._entries.get(store_key) is entry:
+                del self._entries[store_key]
+            raise
+        finally:
+            entry.done.set()
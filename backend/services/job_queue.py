@@ -0,0 +1,214 @@
+# backend/services/job_queue.py
+"""
+Persistent background queue for long-running generation requests.
+
+Generating an exercise, an assessment question or a syllabus can take longer
+than a proxy's request timeout and pins a server worker for the whole LLM
+call. With `?background=true` the generation endpoints instead enqueue a job
+and answer 202 with its ID; clients poll GET /jobs/{job_id} or subscribe to
+GET /jobs/{job_id}/events (server-sent events) for the result.
+
+Jobs live in the `generation_jobs` table, so queued jobs survive a restart and
+jobs interrupted while running are queued again when the queue starts. A pool
+of asyncio workers runs the registered handler for each job type. Failed
+attempts are retried with exponential backoff up to `max_attempts`; errors
+that a retry cannot fix (unknown lesson, invalid input) fail the job at once.
+"""
+
+# pylint: disable=broad-exception-caught
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from backend.logger import logger
+from backend.metrics import metrics
+from backend.services.sqlite_db import SQLiteDatabaseService
+
+JOB_QUEUE_WORKERS = int(os.environ.get("JOB_QUEUE_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+# Delay before the first retry; doubled for every further attempt
+JOB_RETRY_BASE_SECONDS = float(os.environ.get("JOB_RETRY_BASE_SECONDS", "5"))
+# How often idle workers and event streams re-check the table
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", "1"))
+
+TERMINAL_JOB_STATUSES = ("succeeded", "failed")
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Returns False for errors a retry cannot fix (missing lesson, bad input)."""
+    if isinstance(error, HTTPException):
+        return error.status_code >= 500
+    return not isinstance(error, (ValueError, TypeError, KeyError))
+
+
+class UnknownJobTypeError(ValueError):
+    """No handler is registered for the requested job type."""
+
+
+class JobQueue:
+    """SQLite-backed job queue with a pool of asyncio workers."""
+
+    def __init__(
+        self,
+        db_service: SQLiteDatabaseService,
+        workers: int = JOB_QUEUE_WORKERS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_base_seconds: float = JOB_RETRY_BASE_SECONDS,
+        poll_seconds: float = JOB_POLL_SECONDS,
+    ) -> None:
+        """
+        Initializes the queue; workers start with `start()`.
+
+        Args:
+            db_service: Database holding the `generation_jobs` table.
+            workers: Jobs run at the same time.
+            max_attempts: Attempts per job before it is marked failed.
+            retry_base_seconds: Backoff before the first retry.
+            poll_seconds: Idle workers re-check the table this often.
+        """
+        self.db_service = db_service
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self.poll_seconds = poll_seconds
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._wake: Optional[asyncio.Event] = None
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        """Registers the coroutine function that runs jobs of `job_type`."""
+        self._handlers[job_type] = handler
+
+    async def enqueue(self, user_id: str, job_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Persists a new job and wakes an idle worker.
+
+        Returns:
+            The queued job (see SQLiteDatabaseService.get_job).
+
+        Raises:
+            UnknownJobTypeError: If no handler is registered for `job_type`.
+        """
+        if job_type not in self._handlers:
+            raise UnknownJobTypeError(f"Unknown job type: {job_type}")
+        job_id = self.db_service.create_job(user_id, job_type, payload, self.max_attempts)
+        metrics.increment("job_queue_jobs_total", {"job_type": job_type, "outcome": "enqueued"})
+        logger.info(f"Queued {job_type} job {job_id} for user {user_id}")
+        if self._wake is not None:
+            self._wake.set()
+        return self.db_service.get_job(job_id)  # type: ignore[return-value]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the current state of a job, or None if it does not exist."""
+        return self.db_service.get_job(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields the job whenever its status or attempt count changes.
+
+        Ends after yielding a finished job, or at once if the job does not exist.
+        """
+        last_seen = None
+        while True:
+            job = self.get_job(job_id)
+            if job is None:
+                return
+            seen = (job["status"], job["attempts"])
+            if seen != last_seen:
+                last_seen = seen
+                yield job
+            if job["status"] in TERMINAL_JOB_STATUSES:
+                return
+            await asyncio.sleep(self.poll_seconds)
+
+    async def start(self) -> None:
+        """Requeues jobs interrupted by a restart and starts the workers."""
+        if self._tasks:
+            return
+        requeued = self.db_service.requeue_running_jobs()
+        if requeued:
+            logger.info(f"Requeued {requeued} generation job(s) interrupted by a restart")
+        self._wake = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancels the workers; a job they were running is requeued on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wake = None
+
+    async def run_pending(self) -> int:
+        """Runs due jobs until none is left and returns how many ran."""
+        ran = 0
+        while await self._run_next():
+            ran += 1
+        return ran
+
+    async def _worker(self) -> None:
+        """Runs jobs as they become due; sleeps while the queue is empty."""
+        while True:
+            try:
+                if await self._run_next():
+                    continue
+            except Exception as e:
+                logger.error(f"Job worker error: {e}", exc_info=True)
+            assert self._wake is not None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_next(self) -> bool:
+        """Claims and runs one due job. Returns False if none was due."""
+        job = self.db_service.claim_next_job()
+        if job is None:
+            return False
+        job_id, job_type = job["job_id"], job["job_type"]
+        handler = self._handlers.get(job_type)
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise UnknownJobTypeError(f"Unknown job type: {job_type}")
+            result = await handler(job["payload"])
+        except Exception as e:
+            self._record_failure(job, e)
+        else:
+            self.db_service.finish_job(job_id, "succeeded", result=result)
+            metrics.increment("job_queue_jobs_total", {"job_type": job_type, "outcome": "succeeded"})
+            logger.info(f"Job {job_id} ({job_type}) succeeded")
+        finally:
+            metrics.observe(
+                "job_queue_run_seconds", time.perf_counter() - started, {"job_type": job_type}
+            )
+        return True
+
+    def _record_failure(self, job: Dict[str, Any], error: Exception) -> None:
+        """Schedules a retry with backoff, or marks the job failed."""
+        job_id, job_type = job["job_id"], job["job_type"]
+        message = str(error.detail) if isinstance(error, HTTPException) else str(error)
+        if _is_retryable(error) and job["attempts"] < job["max_attempts"]:
+            delay = self.retry_base_seconds * 2 ** (job["attempts"] - 1)
+            run_after = (datetime.now() + timedelta(seconds=delay)).isoformat()
+            self.db_service.finish_job(job_id, "queued", error=message, run_after=run_after)
+            metrics.increment("job_queue_jobs_total", {"job_type": job_type, "outcome": "retried"})
+            logger.warning(
+                f"Job {job_id} ({job_type}) attempt {job['attempts']} failed: {message}; "
+                f"retrying in {delay:.0f}s"
+            )
+            return
+        self.db_service.finish_job(job_id, "failed", error=message)
+        metrics.increment("job_queue_jobs_total", {"job_type": job_type, "outcome": "failed"})
+        logger.error(f"Job {job_id} ({job_type}) failed: {message}", exc_info=error)
@@ -4,13 +4,16 @@ Service responsible for generating and retrieving static lesson exposition conte
 
 # pylint: disable=broad-exception-caught
 
+import asyncio
 import json
 from typing import Any, Dict, Optional, Tuple
 
 from google.api_core.exceptions import ResourceExhausted
 
+from backend.ai.lessons.exposition_index import index_record
 from backend.ai.llm_utils import MODEL as llm_model
-from backend.ai.llm_utils import call_with_retry
+from backend.ai.llm_telemetry import track_llm_call
+from backend.ai.llm_utils import generate_content
 from backend.ai.prompt_loader import load_prompt
 from backend.exceptions import (log_and_propagate, log_and_raise_new,
                                 validate_internal_model)
@@ -44,8 +47,64 @@ class LessonExpositionService:
         """
         self.db_service = db_service
         self.syllabus_service = syllabus_service
+        # Generations in progress, keyed by (syllabus_id, module_index, lesson_index),
+        # so a lesson opened while it is being prefetched waits instead of regenerating
+        self._inflight: Dict[
+            Tuple[str, int, int], "asyncio.Future[Tuple[GeneratedLessonContent, int]]"
+        ] = {}
 
     async def _generate_and_save_exposition(
+        self,
+        syllabus: Dict[str, Any],
+        lesson_title: str,
+        knowledge_level: str,
+        syllabus_id: str,
+        module_index: int,
+        lesson_index: int,
+    ) -> Tuple[GeneratedLessonContent, int]:
+        """
+        Generates and saves a lesson exposition without blocking the event loop.
+
+        The blocking LLM call and DB write run in a worker thread. Concurrent
+        requests for the same lesson share a single generation.
+
+        Returns:
+            A tuple containing the generated content object and the lesson's database ID.
+
+        Raises:
+            RuntimeError: If content generation or saving fails.
+        """
+        key = (syllabus_id, module_index, lesson_index)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            logger.info(f"Waiting for in-flight exposition generation for {key}")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.ensure_future(
+            asyncio.to_thread(
+                self._generate_and_save_exposition_blocking,
+                syllabus,
+                lesson_title,
+                knowledge_level,
+                syllabus_id,
+                module_index,
+                lesson_index,
+            )
+        )
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._inflight.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+    def is_generating(self, syllabus_id: str, module_index: int, lesson_index: int) -> bool:
+        """True if an exposition for this lesson is currently being generated."""
+        return (syllabus_id, module_index, lesson_index) in self._inflight
+
+    def _generate_and_save_exposition_blocking(
         self,
         syllabus: Dict[str, Any],  # Added type parameters
         lesson_title: str,
@@ -97,7 +156,9 @@ class LessonExpositionService:
                 raise RuntimeError(
                     "LLM model not configured for exposition generation."
                 )
-            response = call_with_retry(llm_model.generate_content, prompt)
+            with track_llm_call(prompt, node="generate_exposition") as call_record:
+                response = generate_content(prompt, call_record=call_record)
+                call_record.set_response(response)
             response_text = response.text
         except ResourceExhausted:
             log_and_raise_new(
@@ -136,6 +197,7 @@ class LessonExpositionService:
                 module_index=module_index,
                 lesson_index=lesson_index,
                 content=generated_content_object.model_dump(mode="json"),
+                exposition_index=index_record(response_text.strip()),
             )
             if not lesson_db_id_int:
                 # Use log_and_raise_new as there's no specific prior exception to chain
@@ -263,6 +325,46 @@ class LessonExpositionService:
             )
             return None, None
 
+    async def pregenerate_exposition(
+        self,
+        syllabus: Dict[str, Any],
+        module_index: int,
+        lesson_index: int,
+        lesson_title: str,
+    ) -> bool:
+        """
+        Generates and saves a lesson's exposition ahead of time, if missing.
+
+        Args:
+            syllabus: The syllabus dictionary (matching SyllabusResponse).
+            module_index: The index of the module.
+            lesson_index: The index of the lesson.
+            lesson_title: The title of the lesson.
+
+        Returns:
+            True if new content was generated, False if it already existed or
+            was already being generated (in which case this waits for it).
+
+        Raises:
+            RuntimeError: If content generation or saving fails.
+        """
+        syllabus_id = syllabus["syllabus_id"]
+        inflight = self._inflight.get((syllabus_id, module_index, lesson_index))
+        if inflight is not None:
+            await asyncio.shield(inflight)
+            return False
+        if self.db_service.get_lesson_content(syllabus_id, module_index, lesson_index):
+            return False
+        await self._generate_and_save_exposition(
+            syllabus=syllabus,
+            lesson_title=lesson_title,
+            knowledge_level=syllabus.get("level", "beginner"),
+            syllabus_id=syllabus_id,
+            module_index=module_index,
+            lesson_index=lesson_index,
+        )
+        return True
+
     async def get_exposition_by_id(
         self, lesson_id: int
     ) -> Optional[GeneratedLessonContent]:
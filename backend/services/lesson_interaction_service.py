@@ -6,6 +6,7 @@ AI graph, and potentially other services.
 
 # backend/services/lesson_interaction_service.py
 
+import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar, Union, cast
@@ -16,6 +17,9 @@ from pydantic import BaseModel
 from backend.exceptions import log_and_propagate
 from backend.ai.app import LessonAI
 from backend.ai.lessons import nodes
+from backend.ai.lessons.summarizer import (CONVERSATION_SUMMARY_EVERY_TURNS,
+                                           CONVERSATION_SUMMARY_KEEP_RECENT,
+                                           summarize_conversation)
 from backend.models import (
     AssessmentQuestion,
     Exercise,
@@ -23,11 +27,15 @@ from backend.models import (
     LessonState,
 )
 from backend.exceptions import validate_internal_model
+from backend.services.exposition_prefetcher import ExpositionPrefetcher
 from backend.services.lesson_exposition_service import LessonExpositionService
+from backend.services.lesson_state_cache import CacheKey, LessonStateCache
+from backend.services.session_lock import KeyedAsyncLock
 from backend.services.sqlite_db import SQLiteDatabaseService
 
 # Import helpers from utility file
 from .lesson_state_utils import (
+    LAZY_STATE_HYDRATION,
     deserialize_state_data,
     format_assessment_question_for_chat_history,
     format_exercise_for_chat_history,
@@ -51,6 +59,11 @@ class LessonInteractionService:
         db_service: SQLiteDatabaseService,
         exposition_service: LessonExpositionService,
         lesson_ai: LessonAI,
+        exposition_prefetcher: Optional[ExpositionPrefetcher] = None,
+        state_cache: Optional[LessonStateCache] = None,
+        session_lock: Optional[KeyedAsyncLock] = None,
+        summary_every_turns: int = CONVERSATION_SUMMARY_EVERY_TURNS,
+        summary_keep_recent: int = CONVERSATION_SUMMARY_KEEP_RECENT,
     ):
         """
         Initializes the LessonInteractionService.
@@ -59,12 +72,93 @@ class LessonInteractionService:
             db_service: Instance of the database service.
             exposition_service: Instance of the exposition service.
             lesson_ai: Instance of the LessonAI graph application.
+            exposition_prefetcher: Optional prefetcher that pre-generates the
+                expositions of the lessons following an opened lesson.
+            state_cache: Optional cache of live lesson states; without it every
+                request loads and deserializes the state from the database.
+            session_lock: Lock serializing the state-changing requests of one
+                lesson session; a private one is created if not given.
+            summary_every_turns: Refresh the rolling conversation summary once
+                this many user turns are not covered by it (0 disables).
+            summary_keep_recent: Latest messages kept out of the summary and
+                always sent verbatim.
         """
         self.db_service = db_service
         self.exposition_service = exposition_service
         self.lesson_ai = lesson_ai
+        self.exposition_prefetcher = exposition_prefetcher
+        self.state_cache = state_cache
+        self.session_lock = session_lock or KeyedAsyncLock()
+        self.summary_every_turns = summary_every_turns
+        self.summary_keep_recent = max(0, summary_keep_recent)
+        self._summary_tasks: Dict[CacheKey, "asyncio.Task[None]"] = {}
         logger.info("LessonInteractionService initialized.")
 
+    def _cache_state_saved(self, key: CacheKey, state: LessonState) -> None:
+        """Writes a just-persisted state through to the state cache, if any."""
+        if self.state_cache is not None:
+            self.state_cache.update_state(key, state)
+
+    def _invalidate_cached_state(self, key: CacheKey) -> None:
+        """Drops a cached state whose persisted copy may differ from it."""
+        if self.state_cache is not None:
+            self.state_cache.invalidate(key)
+
+    def _schedule_summary_refresh(
+        self, key: CacheKey, progress_id: str, unsummarized_messages: int
+    ) -> None:
+        """
+        Starts a background refresh of the conversation summary once enough
+        messages after it have accumulated; the turn does not wait for it.
+        """
+        if self.summary_every_turns <= 0 or key in self._summary_tasks:
+            return
+        # A turn is a user message plus the reply
+        if unsummarized_messages < self.summary_keep_recent + 2 * self.summary_every_turns:
+            return
+        task = asyncio.get_running_loop().create_task(self._refresh_summary(key, progress_id))
+        self._summary_tasks[key] = task
+        task.add_done_callback(lambda _: self._summary_tasks.pop(key, None))
+
+    async def _refresh_summary(self, key: CacheKey, progress_id: str) -> None:
+        """Folds all but the latest messages into the conversation summary."""
+        try:
+            state, _, _ = await self._load_or_initialize_state(*key)
+            if not state:
+                return
+            covered = state.get("summary_message_count") or 0
+            messages = self.db_service.get_conversation_history(progress_id, offset=covered)
+            to_summarize = messages[: len(messages) - self.summary_keep_recent]
+            if not to_summarize:
+                return
+            # The LLM call runs off the event loop and outside the session lock
+            summary = await asyncio.to_thread(
+                summarize_conversation,
+                state.get("conversation_summary"),
+                to_summarize,
+                state.get("topic", "Unknown Topic"),
+                state.get("lesson_title") or "Unknown Lesson",
+            )
+            if not summary:
+                return
+
+            async with self.session_lock.acquire(key):
+                state, _, _ = await self._load_or_initialize_state(*key)
+                if not state or (state.get("summary_message_count") or 0) != covered:
+                    return  # Refreshed elsewhere in the meantime
+                state["conversation_summary"] = summary
+                state["summary_message_count"] = covered + len(to_summarize)
+                self.db_service.update_lesson_state(progress_id, serialize_state_data(state))
+                self._cache_state_saved(key, state)
+            logger.info(
+                f"Summarized {len(to_summarize)} messages of progress {progress_id}; "
+                f"summary covers {covered + len(to_summarize)}."
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # The next turn retries; prompts keep using the previous summary
+            logger.error(f"Conversation summary refresh failed: {e}", exc_info=True)
+            self._invalidate_cached_state(key)
+
     async def _load_or_initialize_state(
         self,
         user_id: str,
@@ -75,6 +169,7 @@ class LessonInteractionService:
         """
         Loads existing lesson state or initializes a new one if not found.
         Also fetches the static lesson content and the progress record ID.
+        A state held in the state cache is returned without touching the database.
 
         Returns:
             A tuple containing:
@@ -91,6 +186,12 @@ class LessonInteractionService:
             f"{syllabus_id}/{module_index}/{lesson_index}"
         )
 
+        cache_key: CacheKey = (user_id, syllabus_id, module_index, lesson_index)
+        if self.state_cache is not None:
+            cached = self.state_cache.get(cache_key)
+            if cached is not None:
+                return cached.state, cached.lesson_content, cached.progress_id
+
         # 1. Fetch static lesson content (exposition, metadata)
         lesson_content: Optional[GeneratedLessonContent] = None
         lesson_db_id: Optional[int] = None
@@ -133,7 +234,12 @@ class LessonInteractionService:
             state_from_db = progress_record["lesson_state"]
             if isinstance(state_from_db, dict):
                 # Deserialization handles internal errors and logs them
-                lesson_state = deserialize_state_data(state_from_db)
+                # The blob was written by serialize_state_data, so it can skip
+                # re-validation when its schema stamp is current; nested models
+                # are then hydrated only when the turn uses them
+                lesson_state = deserialize_state_data(
+                    state_from_db, trusted=True, lazy=LAZY_STATE_HYDRATION
+                )
                 if lesson_state:  # Check if deserialization was successful
                     logger.info(f"Loaded and deserialized state for user {user_id}.")
                     # Ensure lesson_db_id is consistent
@@ -236,6 +342,12 @@ class LessonInteractionService:
                 )
                 raise RuntimeError("Failed to save initial lesson state.") from db_err
 
+            # Cache the state in the shape a database load would produce
+            lesson_state["generated_content"] = lesson_content  # type: ignore[typeddict-item]
+
+        if self.state_cache is not None and progress_id:
+            self.state_cache.put(cache_key, lesson_state, lesson_content, progress_id)
+
         # Return the final state, content, and the progress_id
         return lesson_state, lesson_content, progress_id
 
@@ -370,9 +482,13 @@ class LessonInteractionService:
                 ),
                 "lesson_state": serializable_state_for_response,  # Will be None
             }
+
+        # Pre-generate the next lessons in the background so they open instantly
+        if self.exposition_prefetcher and lesson_content:
+            self.exposition_prefetcher.schedule(syllabus_id, module_index, lesson_index)
+
         return response_data  # This return needs to be at the function level
 
-    # pylint: disable=too-many-nested-blocks, too-many-branches, too-many-statements
     async def handle_chat_turn(
         self,
         user_id: str,
@@ -384,8 +500,33 @@ class LessonInteractionService:
         """
         Processes a single turn of the chat conversation.
 
+        Turns and generation requests of the same lesson session run one at a
+        time, so none of them overwrites the state saved by another.
+
+        Delegates to _process_chat_turn.
+
+        Raises:
+            HTTPException: If the state cannot be loaded or processing fails.
+        """
+        async with self.session_lock.acquire(
+            (user_id, syllabus_id, module_index, lesson_index)
+        ):
+            return await self._process_chat_turn(
+                user_id, syllabus_id, module_index, lesson_index, user_message
+            )
+
+    # pylint: disable=too-many-nested-blocks, too-many-branches, too-many-statements
+    async def _process_chat_turn(
+        self,
+        user_id: str,
+        syllabus_id: str,
+        module_index: int,
+        lesson_index: int,
+        user_message: str,
+    ) -> Dict[str, Any]:
+        """
         Loads state, invokes the LessonAI graph, saves the updated state,
-        and returns the AI responses.
+        and returns the AI responses. The caller holds the session lock.
 
         Raises:
             RuntimeError: If state/progress_id cannot be loaded/found.
@@ -416,32 +557,38 @@ class LessonInteractionService:
                     "Failed to retrieve progress ID. Cannot process chat turn."
                 )
 
-            # 2. Save incoming user message
-            try:
-                self.db_service.save_conversation_message(
-                    progress_id=progress_id,
-                    role="user",
-                    message_type="CHAT_USER",
-                    content=user_message,
-                )
-            except Exception as save_err:
-                logger.error(
-                    f"Failed to save user message to history: {save_err}", exc_info=True
-                )
-                # Logged error, proceed with turn
+            # All writes of the turn are committed together at the end, so a
+            # failure part-way through leaves neither history nor state half-written
+            unit_of_work = self.db_service.unit_of_work()
+            cache_key: CacheKey = (user_id, syllabus_id, module_index, lesson_index)
 
-            # 3. Get current history for AI context
-            history = self.db_service.get_conversation_history(progress_id)
+            # 2. Record incoming user message
+            user_history_message = unit_of_work.save_conversation_message(
+                progress_id=progress_id,
+                role="user",
+                message_type="CHAT_USER",
+                content=user_message,
+            )
+
+            # 3. Get the history not covered by the conversation summary for AI
+            # context (plus the uncommitted user message)
+            history = self.db_service.get_conversation_history(
+                progress_id, offset=current_state.get("summary_message_count") or 0
+            )
+            history.append(user_history_message)
 
             # 4. Invoke the LessonAI graph - it now returns only the updated state dict
-            updated_state = self.lesson_ai.process_chat_turn(
+            # The graph makes blocking LLM calls (and may generate a task), so it
+            # runs off the event loop and other sessions' turns proceed meanwhile
+            updated_state = await asyncio.to_thread(
+                self.lesson_ai.process_chat_turn,
                 current_state=current_state,
                 user_message=user_message, # Pass original message directly
                 history=history,
             )
             # Cast removed - process_chat_turn should return LessonState directly
 
-            # 5. Extract the new assistant message from the state and save it
+            # 5. Extract the new assistant message from the state and record it
             saved_assistant_messages_for_response = []
             new_assistant_message = updated_state.get(
                 "new_assistant_message"
@@ -459,30 +606,16 @@ class LessonInteractionService:
                 metadata_to_save = new_assistant_message.get(
                     "metadata"
                 )  # Get metadata if present
-                try:
-                    self.db_service.save_conversation_message(
-                        progress_id=progress_id,
-                        role="assistant",
-                        message_type="CHAT_ASSISTANT",  # Use appropriate type
-                        content=content_to_save,
-                        metadata=metadata_to_save,  # Pass metadata
-                    )
-                    # Add the successfully saved message to the list for the response payload
-                    saved_assistant_messages_for_response.append(
-                        {"role": "assistant", "content": content_to_save}
-                    )
-                except Exception as save_err:
-                    logger.error(
-                        f"Failed to save assistant message to history: {save_err}",
-                        exc_info=True,
-                    )
-                    # Optionally add an error indicator to the response if save fails
-                    saved_assistant_messages_for_response.append(
-                        {
-                            "role": "assistant",
-                            "content": f"[Save Error] {content_to_save}",
-                        }
-                    )
+                unit_of_work.save_conversation_message(
+                    progress_id=progress_id,
+                    role="assistant",
+                    message_type="CHAT_ASSISTANT",  # Use appropriate type
+                    content=content_to_save,
+                    metadata=metadata_to_save,  # Pass metadata
+                )
+                saved_assistant_messages_for_response.append(
+                    {"role": "assistant", "content": content_to_save}
+                )
             elif new_assistant_message:
                 # Log if the structure is unexpected but exists
                 logger.warning(
@@ -490,33 +623,22 @@ class LessonInteractionService:
                 )
             # If new_assistant_message is None, nothing is saved or added to response list
 
-            # (The rest of the function continues from here, saving the updated_state without the message)
-
-            # 6. Save the updated state back to the database (state no longer contains the message)
-            try:
-                state_json = serialize_state_data(updated_state)
-                lesson_db_id = updated_state.get(
-                    "lesson_db_id"
-                )  # Already validated or None
-                status = "in_progress"  # TODO: Determine status based on state logic if needed # pylint: disable=fixme
-
-                self.db_service.save_user_progress(
-                    user_id=user_id,
-                    syllabus_id=syllabus_id,
-                    module_index=module_index,
-                    lesson_index=lesson_index,
-                    status=status,
-                    lesson_id=lesson_db_id,
-                    lesson_state_json=state_json,
-                    # score=updated_state.get("score") # Add score if relevant
-                )
-                logger.info(f"Saved updated state for user {user_id} after chat turn.")
-            except Exception as e:
-                logger.error(
-                    f"Failed to save updated lesson state after chat turn: {e}",
-                    exc_info=True,
-                )
-                # Logged error, but proceed to return messages
+            # 6. Record the updated state (state no longer contains the message)
+            state_json = serialize_state_data(updated_state)
+            lesson_db_id = updated_state.get(
+                "lesson_db_id"
+            )  # Already validated or None
+            status = "in_progress"  # TODO: Determine status based on state logic if needed # pylint: disable=fixme
+            unit_of_work.save_user_progress(
+                user_id=user_id,
+                syllabus_id=syllabus_id,
+                module_index=module_index,
+                lesson_index=lesson_index,
+                status=status,
+                lesson_id=lesson_db_id,
+                lesson_state_json=state_json,
+                # score=updated_state.get("score") # Add score if relevant
+            )
 
             # 7. Prepare response for the router
             error_message_from_state = updated_state.get("error_message")
@@ -525,19 +647,28 @@ class LessonInteractionService:
             }
             if error_message_from_state:
                 response_payload["error"] = error_message_from_state
-                # Optionally, save this error message to history as well
-                try:
-                    self.db_service.save_conversation_message(
-                        progress_id=progress_id,
-                        role="system",  # Use 'system' for state-level errors
-                        message_type="SYSTEM_ERROR",  # Added message_type
-                        content=error_message_from_state,
-                    )
-                except Exception as save_err:
-                    logger.error(
-                        f"Failed to save error message from state to history: {save_err}",
-                        exc_info=True,
-                    )
+                # Save this error message to history as well
+                unit_of_work.save_conversation_message(
+                    progress_id=progress_id,
+                    role="system",  # Use 'system' for state-level errors
+                    message_type="SYSTEM_ERROR",  # Added message_type
+                    content=error_message_from_state,
+                )
+
+            # 8. Commit the whole turn in one transaction
+            try:
+                unit_of_work.commit()
+                logger.info(f"Saved chat turn for user {user_id}.")
+                self._cache_state_saved(cache_key, updated_state)
+                self._schedule_summary_refresh(
+                    cache_key, progress_id, len(history) + len(saved_assistant_messages_for_response)
+                )
+            except Exception as e:
+                logger.error(f"Failed to save chat turn: {e}", exc_info=True)
+                self._invalidate_cached_state(cache_key)
+                # Nothing was saved; still return the replies, marked as unsaved
+                for message in saved_assistant_messages_for_response:
+                    message["content"] = f"[Save Error] {message['content']}"
 
             return response_payload
 
@@ -612,8 +743,9 @@ class LessonInteractionService:
 
             # 2. Call the specific generation node function
             # Node function now returns state_changes, generated_item, assistant_message_dict
-            state_changes, new_item_obj, assistant_message_dict = node_function(
-                cast(Dict[str, Any], current_state)
+            # The node makes a blocking LLM call, so it runs off the event loop
+            state_changes, new_item_obj, assistant_message_dict = await asyncio.to_thread(
+                node_function, cast(Dict[str, Any], current_state)
             )
             # Merge state changes into the current state
             # Be careful with potential overwrites if keys overlap unexpectedly
@@ -675,29 +807,24 @@ class LessonInteractionService:
             else:
                 message_type = "GENERATION_FAILURE"
 
-            # 5. Save the assistant message (item prompt or failure) to history
+            # 5. Record the assistant message (item prompt or failure) and the
+            # updated state, then commit both in one transaction
+            unit_of_work = self.db_service.unit_of_work()
             if assistant_message_content:  # Check if there's content to save
-                try:
-                    metadata = None
-                    if validated_item:
-                        # Assuming validated_item has an 'id' attribute
-                        item_id = getattr(validated_item, "id", None)
-                        if item_id:
-                            metadata = {metadata_key: item_id}
-
-                    self.db_service.save_conversation_message(
-                        progress_id=progress_id,
-                        role="assistant",
-                        message_type=message_type,  # Pass the determined message type
-                        content=assistant_message_content,
-                        metadata=metadata,
-                    )
-                except Exception as save_err:
-                    logger.error(
-                        f"Failed to save {item_type_name}/failure message to history: {save_err}",
-                        exc_info=True,
-                    )
-                    # Continue, but the history record is missing
+                metadata = None
+                if validated_item:
+                    # Assuming validated_item has an 'id' attribute
+                    item_id = getattr(validated_item, "id", None)
+                    if item_id:
+                        metadata = {metadata_key: item_id}
+
+                unit_of_work.save_conversation_message(
+                    progress_id=progress_id,
+                    role="assistant",
+                    message_type=message_type,  # Pass the determined message type
+                    content=assistant_message_content,
+                    metadata=metadata,
+                )
 
             # 6. Save the updated state
             try:
@@ -705,7 +832,7 @@ class LessonInteractionService:
                 state_json = serialize_state_data(cast(LessonState, updated_state))
                 lesson_db_id = updated_state.get("lesson_db_id")
 
-                self.db_service.save_user_progress(
+                unit_of_work.save_user_progress(
                     user_id=user_id,
                     syllabus_id=syllabus_id,
                     module_index=module_index,
@@ -714,14 +841,22 @@ class LessonInteractionService:
                     lesson_id=lesson_db_id,
                     lesson_state_json=state_json,
                 )
+                unit_of_work.commit()
                 logger.info(
                     f"Saved updated state after {item_type_name} generation attempt for user {user_id}."
                 )
+                self._cache_state_saved(
+                    (user_id, syllabus_id, module_index, lesson_index),
+                    cast(LessonState, updated_state),
+                )
             except Exception as e:
                 logger.error(
                     f"Failed to save state after {item_type_name} generation: {e}",
                     exc_info=True,
                 )
+                self._invalidate_cached_state(
+                    (user_id, syllabus_id, module_index, lesson_index)
+                )
                 raise RuntimeError(
                     f"Failed to save state after {item_type_name} generation."
                 ) from e
@@ -761,19 +896,22 @@ class LessonInteractionService:
         """
         Handles the request to generate a new exercise on demand.
 
-        Delegates to _handle_generation_request.
+        Delegates to _handle_generation_request under the session lock.
         """
-        return await self._handle_generation_request(
-            user_id=user_id,
-            syllabus_id=syllabus_id,
-            module_index=module_index,
-            lesson_index=lesson_index,
-            node_function=nodes.generate_new_exercise,
-            model_cls=Exercise,
-            format_function=format_exercise_for_chat_history,
-            item_type_name="exercise",
-            metadata_key="exercise_id",
-        )
+        async with self.session_lock.acquire(
+            (user_id, syllabus_id, module_index, lesson_index)
+        ):
+            return await self._handle_generation_request(
+                user_id=user_id,
+                syllabus_id=syllabus_id,
+                module_index=module_index,
+                lesson_index=lesson_index,
+                node_function=nodes.generate_new_exercise,
+                model_cls=Exercise,
+                format_function=format_exercise_for_chat_history,
+                item_type_name="exercise",
+                metadata_key="exercise_id",
+            )
 
     # --- Start of generate_assessment_question ---
     async def generate_assessment_question(
@@ -786,19 +924,22 @@ class LessonInteractionService:
         """
         Handles the request to generate a new assessment question on demand.
 
-        Delegates to _handle_generation_request.
+        Delegates to _handle_generation_request under the session lock.
         """
-        return await self._handle_generation_request(
-            user_id=user_id,
-            syllabus_id=syllabus_id,
-            module_index=module_index,
-            lesson_index=lesson_index,
-            node_function=nodes.generate_new_assessment,
-            model_cls=AssessmentQuestion,
-            format_function=format_assessment_question_for_chat_history,
-            item_type_name="assessment question",
-            metadata_key="question_id",
-        )
+        async with self.session_lock.acquire(
+            (user_id, syllabus_id, module_index, lesson_index)
+        ):
+            return await self._handle_generation_request(
+                user_id=user_id,
+                syllabus_id=syllabus_id,
+                module_index=module_index,
+                lesson_index=lesson_index,
+                node_function=nodes.generate_new_assessment,
+                model_cls=AssessmentQuestion,
+                format_function=format_assessment_question_for_chat_history,
+                item_type_name="assessment question",
+                metadata_key="question_id",
+            )
 
     # --- Start of update_lesson_progress ---
     async def update_lesson_progress(
@@ -836,44 +977,51 @@ class LessonInteractionService:
                 f"Invalid status: {status}. Must be one of {allowed_statuses}"
             )
 
-        # Use save_user_progress which handles upsert logic
-        try:
-            # We need the lesson_id (primary key) to save progress correctly.
-            # Fetch it first.
-            lesson_db_id = self.db_service.get_lesson_id(
-                syllabus_id, module_index, lesson_index
-            )
-            if lesson_db_id is None:
-                raise ValueError(
-                    f"Lesson not found for {syllabus_id}/{module_index}/{lesson_index}"
+        # Wait for a running turn, which would otherwise overwrite the status
+        async with self.session_lock.acquire(
+            (user_id, syllabus_id, module_index, lesson_index)
+        ):
+            # The progress row is rewritten below, so the cached state is stale
+            self._invalidate_cached_state((user_id, syllabus_id, module_index, lesson_index))
+
+            # Use save_user_progress which handles upsert logic
+            try:
+                # We need the lesson_id (primary key) to save progress correctly.
+                # Fetch it first.
+                lesson_db_id = self.db_service.get_lesson_id(
+                    syllabus_id, module_index, lesson_index
                 )
+                if lesson_db_id is None:
+                    raise ValueError(
+                        f"Lesson not found for {syllabus_id}/{module_index}/{lesson_index}"
+                    )
 
-            # Save the progress (this will update if exists)
-            progress_id = self.db_service.save_user_progress(
-                user_id=user_id,
-                syllabus_id=syllabus_id,
-                module_index=module_index,
-                lesson_index=lesson_index,
-                status=status,
-                lesson_id=lesson_db_id,
-                # We don't update lesson_state here, only status
-            )
+                # Save the progress (this will update if exists)
+                progress_id = self.db_service.save_user_progress(
+                    user_id=user_id,
+                    syllabus_id=syllabus_id,
+                    module_index=module_index,
+                    lesson_index=lesson_index,
+                    status=status,
+                    lesson_id=lesson_db_id,
+                    # We don't update lesson_state here, only status
+                )
 
-            # Return the updated progress details
-            # Fetch the updated record to be sure? Or construct from input?
-            # Constructing is simpler if save_user_progress doesn't return full record.
-            return {
-                "progress_id": progress_id,  # Assuming save_user_progress returns the ID
-                "user_id": user_id,
-                "syllabus_id": syllabus_id,
-                "module_index": module_index,
-                "lesson_index": lesson_index,
-                "status": status,
-            }
-        except Exception as e:
-            logger.error(f"Error updating progress: {e}", exc_info=True)
-            # Re-raise potentially as a different error type if needed
-            raise RuntimeError("Failed to update lesson progress in database.") from e
+                # Return the updated progress details
+                # Fetch the updated record to be sure? Or construct from input?
+                # Constructing is simpler if save_user_progress doesn't return full record.
+                return {
+                    "progress_id": progress_id,  # Assuming save_user_progress returns the ID
+                    "user_id": user_id,
+                    "syllabus_id": syllabus_id,
+                    "module_index": module_index,
+                    "lesson_index": lesson_index,
+                    "status": status,
+                }
+            except Exception as e:
+                logger.error(f"Error updating progress: {e}", exc_info=True)
+                # Re-raise potentially as a different error type if needed
+                raise RuntimeError("Failed to update lesson progress in database.") from e
 
     async def handle_rerun_message(
         self,
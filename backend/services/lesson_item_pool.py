@@ -0,0 +1,269 @@
+# backend/services/lesson_item_pool.py
+"""
+Shared per-lesson pools of pre-generated exercises and assessment questions.
+
+All learners of a lesson can be given the same validated items, so generated
+items are stored in the `lesson_item_pool` table keyed by the lesson's
+primary key. `nodes.generate_new_exercise` / `generate_new_assessment` take
+the oldest pooled item the learner has not seen yet (by ID or as a rephrasing
+of one of their items) and only call the LLM when none is left. Whenever a
+lesson's pool is below the low-water mark, a background worker refills it up
+to the target size at low LLM priority. An item that nearly repeats a pooled
+one is never added.
+"""
+
+# pylint: disable=broad-exception-caught
+
+import copy
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+from backend.ai.lessons import nodes
+from backend.ai.lessons.context_builder import PROMPT_BUDGETS
+from backend.ai.lessons.near_duplicates import NearDuplicateIndex, item_text
+from backend.ai.llm_quota import LOW_PRIORITY, quota_budget
+from backend.logger import logger
+from backend.metrics import metrics
+from backend.models import AssessmentQuestion, Exercise
+from backend.services.sqlite_db import SQLiteDatabaseService
+
+ITEM_POOL_ENABLED = os.environ.get("LESSON_ITEM_POOL", "true").lower() != "false"
+ITEM_POOL_LOW_WATER_MARK = int(os.environ.get("LESSON_ITEM_POOL_LOW_WATER_MARK", "3"))
+ITEM_POOL_TARGET_SIZE = int(os.environ.get("LESSON_ITEM_POOL_TARGET_SIZE", "6"))
+
+# Lessons whose pooled-item signatures are kept in memory
+_MAX_CACHED_INDEXES = 256
+
+EXERCISE = "exercise"
+ASSESSMENT = "assessment"
+
+PoolItem = Union[Exercise, AssessmentQuestion]
+
+# item_type -> (model, ID prefix, state keys of the learner's seen IDs and items, prompt name)
+_ITEM_TYPES: Dict[str, Tuple[Type[BaseModel], str, str, str, str]] = {
+    EXERCISE: (
+        Exercise, "ex", "generated_exercise_ids", "generated_exercises", "generate_exercises"
+    ),
+    ASSESSMENT: (
+        AssessmentQuestion,
+        "as",
+        "generated_assessment_question_ids",
+        "generated_assessment_questions",
+        "generate_assessment",
+    ),
+}
+
+
+class LessonItemPool:
+    """Serves exercises/assessment questions from a shared per-lesson pool."""
+
+    def __init__(
+        self,
+        db_service: SQLiteDatabaseService,
+        low_water_mark: int = ITEM_POOL_LOW_WATER_MARK,
+        target_size: int = ITEM_POOL_TARGET_SIZE,
+        max_workers: int = 2,
+    ) -> None:
+        """
+        Initializes the pool.
+
+        Args:
+            db_service: Database service holding the lesson_item_pool table.
+            low_water_mark: A refill starts when fewer items than this are pooled.
+            target_size: A refill generates items until this many are pooled.
+            max_workers: Background refill threads.
+        """
+        self.db_service = db_service
+        self.low_water_mark = low_water_mark
+        self.target_size = max(target_size, low_water_mark)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="item-pool-refill"
+        )
+        self._refilling: Set[Tuple[int, str]] = set()
+        self._lock = threading.Lock()
+        # (lesson_id, item_type) -> signatures of the pooled items
+        self._indexes: "OrderedDict[Tuple[int, str], NearDuplicateIndex]" = OrderedDict()
+        self._index_lock = threading.Lock()
+
+    def _load(self, lesson_id: int, item_type: str) -> List[PoolItem]:
+        """Loads and validates a lesson's pooled items, oldest first."""
+        model_cls = _ITEM_TYPES[item_type][0]
+        items: List[PoolItem] = []
+        for row in self.db_service.get_pool_items(lesson_id, item_type):
+            try:
+                items.append(model_cls.model_validate(row["item"]))  # type: ignore[arg-type]
+            except ValidationError as e:
+                logger.warning(f"Skipping invalid pooled {item_type} {row['item_id']}: {e}")
+        return items
+
+    def _pooled_index(self, lesson_id: int, item_type: str) -> NearDuplicateIndex:
+        """Returns the signatures of a lesson's pooled items; call with `_index_lock` held."""
+        key = (lesson_id, item_type)
+        index = self._indexes.get(key)
+        if index is None:
+            index = NearDuplicateIndex.from_items(self._load(lesson_id, item_type))
+            self._indexes[key] = index
+            while len(self._indexes) > _MAX_CACHED_INDEXES:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(key)
+        return index
+
+    def size(self, lesson_id: int, item_type: str) -> int:
+        """Number of items pooled for a lesson."""
+        return self.db_service.count_pool_items(lesson_id, item_type)
+
+    def take(
+        self,
+        lesson_id: int,
+        item_type: str,
+        exclude_ids: Iterable[str] = (),
+        seen: Optional[NearDuplicateIndex] = None,
+    ) -> Optional[PoolItem]:
+        """
+        Returns the oldest pooled item whose ID is not in `exclude_ids`.
+
+        With `seen`, the signatures of the learner's items, pooled items that
+        nearly repeat one of them are passed over as well. Items stay in the
+        pool for other learners. Returns None on a miss.
+        """
+        model_cls = _ITEM_TYPES[item_type][0]
+        excluded = set(exclude_ids)
+        while True:
+            rows = self.db_service.get_pool_items(lesson_id, item_type, excluded, limit=1)
+            if not rows:
+                metrics.increment("lesson_item_pool_total", {"type": item_type, "outcome": "miss"})
+                return None
+            row = rows[0]
+            try:
+                item = model_cls.model_validate(row["item"])
+            except ValidationError as e:
+                logger.warning(f"Skipping invalid pooled {item_type} {row['item_id']}: {e}")
+                excluded.add(row["item_id"])
+                continue
+            if seen is not None and seen.find(item_text(item)) is not None:  # type: ignore[arg-type]
+                metrics.increment(
+                    "lesson_item_pool_near_duplicates_total", {"type": item_type, "stage": "take"}
+                )
+                excluded.add(row["item_id"])
+                continue
+            metrics.increment("lesson_item_pool_total", {"type": item_type, "outcome": "hit"})
+            return item  # type: ignore[return-value]
+
+    def add(
+        self, lesson_id: int, item_type: str, item: PoolItem, reassign_duplicate_id: bool = True
+    ) -> Optional[str]:
+        """
+        Adds a validated item to the lesson's pool.
+
+        LLM-chosen IDs are often generic ("ex1"), so with `reassign_duplicate_id`
+        an item whose ID is already pooled is stored under a fresh unique ID.
+        An item that nearly repeats a pooled one is not added.
+
+        Returns:
+            The pooled item's ID, or None if it was not added.
+        """
+        prefix = _ITEM_TYPES[item_type][1]
+        text = item_text(item)
+        with self._index_lock:
+            pooled = self._pooled_index(lesson_id, item_type)
+            match = pooled.find(text)
+            if match is not None:
+                metrics.increment(
+                    "lesson_item_pool_near_duplicates_total", {"type": item_type, "stage": "add"}
+                )
+                logger.info(
+                    f"Not pooling {item_type} {item.id} for lesson {lesson_id}: "
+                    f"it nearly repeats {match[0]}."
+                )
+                return None
+            item_id = item.id or f"{prefix}_{uuid.uuid4().hex[:8]}"
+            for _ in range(3):
+                candidate = item.model_copy(update={"id": item_id})
+                if self.db_service.add_pool_item(
+                    lesson_id, item_type, item_id, candidate.model_dump(mode="json")
+                ):
+                    pooled.add(item_id, text)
+                    return item_id
+                if not reassign_duplicate_id:
+                    return None
+                item_id = f"{prefix}_{uuid.uuid4().hex[:8]}"
+        return None
+
+    def request_refill(self, lesson_id: int, item_type: str, state: Dict[str, Any]) -> bool:
+        """
+        Starts a background refill if the pool is below the low-water mark.
+
+        Args:
+            lesson_id: The lesson's primary key.
+            item_type: 'exercise' or 'assessment'.
+            state: A lesson state with the lesson context used for generation.
+
+        Returns:
+            True if a refill was started.
+        """
+        key = (lesson_id, item_type)
+        with self._lock:
+            if key in self._refilling:
+                return False
+            if self.size(lesson_id, item_type) >= self.low_water_mark:
+                return False
+            self._refilling.add(key)
+        # The worker must not see later changes to the learner's state
+        state_copy = copy.copy(state)
+        self._executor.submit(self._refill, lesson_id, item_type, state_copy)
+        return True
+
+    def _refill(self, lesson_id: int, item_type: str, state: Dict[str, Any]) -> int:
+        """Generates items until the target size; stops on quota or a failure."""
+        _, _, ids_key, items_key, prompt_name = _ITEM_TYPES[item_type]
+        generate = (
+            nodes.generate_new_exercise if item_type == EXERCISE else nodes.generate_new_assessment
+        )
+        estimated_tokens = PROMPT_BUDGETS[prompt_name].total_tokens
+        added = 0
+        try:
+            pooled_items = self._load(lesson_id, item_type)
+            while len(pooled_items) < self.target_size:
+                if not quota_budget.has_headroom(LOW_PRIORITY, estimated_tokens=estimated_tokens):
+                    logger.info(f"Pool refill for lesson {lesson_id} paused: no quota headroom.")
+                    break
+                # Ask for an item unlike everything already pooled; near-duplicates
+                # of pooled items are rejected by the node
+                refill_state = {
+                    **state,
+                    ids_key: [item.id for item in pooled_items],
+                    items_key: list(pooled_items),
+                    "active_exercise": None,
+                    "active_assessment": None,
+                }
+                _, new_item, _ = generate(refill_state, use_pool=False)
+                if new_item is None:
+                    logger.warning(f"Pool refill for lesson {lesson_id} ({item_type}) failed.")
+                    break
+                pooled_id = self.add(lesson_id, item_type, new_item)
+                if not pooled_id:
+                    logger.warning(f"Pool refill for lesson {lesson_id} ({item_type}) rejected.")
+                    break
+                pooled_items.append(new_item.model_copy(update={"id": pooled_id}))
+                added += 1
+        except Exception as e:
+            logger.error(f"Pool refill for lesson {lesson_id} failed: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._refilling.discard((lesson_id, item_type))
+        if added:
+            metrics.increment(
+                "lesson_item_pool_refilled_total", {"type": item_type}, amount=added
+            )
+        logger.info(f"Refilled {item_type} pool for lesson {lesson_id} with {added} item(s).")
+        return added
+
+    def shutdown(self) -> None:
+        """Waits for running refills and stops the worker threads."""
+        self._executor.shutdown(wait=True)
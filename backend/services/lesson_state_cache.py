@@ -0,0 +1,198 @@
+# backend/services/lesson_state_cache.py
+"""
+Bounded in-memory cache of live lesson states.
+
+Every chat turn and generation request needs the learner's `LessonState`.
+Loading it from the database means a progress lookup, a JSON parse and a
+Pydantic validation of every nested model, only for the same state to be
+serialized again at the end of the turn. The cache keeps the deserialized
+state, the lesson content and the IDs per (user, syllabus, module, lesson) so
+a steady-state turn costs only the LLM call and one write.
+
+The cache is write-through: callers `put` a state only after it has been
+saved, so the database stays the source of truth and an evicted entry is
+simply reloaded. Entries are evicted least-recently-used beyond
+`max_entries` and after `idle_seconds` without access. It is per process;
+deployments with several workers should route a learner to one worker or set
+LESSON_STATE_CACHE_SIZE=0.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from backend.metrics import metrics
+from backend.models import GeneratedLessonContent, LessonState
+
+LESSON_STATE_CACHE_SIZE = int(os.environ.get("LESSON_STATE_CACHE_SIZE", "1000"))
+LESSON_STATE_CACHE_IDLE_SECONDS = float(
+    os.environ.get("LESSON_STATE_CACHE_IDLE_SECONDS", "1800")
+)
+
+# (user_id, syllabus_id, module_index, lesson_index)
+CacheKey = Tuple[str, str, int, int]
+
+
+@dataclass
+class CachedLessonState:
+    """A learner's live lesson state with the data needed to persist it."""
+
+    state: LessonState
+    lesson_content: GeneratedLessonContent
+    progress_id: str
+    lesson_db_id: Optional[int]
+    last_access: float = 0.0
+
+
+class LessonStateCache:
+    """Thread-safe LRU cache of lesson states with idle expiry."""
+
+    def __init__(
+        self,
+        max_entries: int = LESSON_STATE_CACHE_SIZE,
+        idle_seconds: float = LESSON_STATE_CACHE_IDLE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes the cache.
+
+        Args:
+            max_entries: Maximum number of cached states (0 disables caching).
+            idle_seconds: Entries not accessed for this long are dropped.
+            clock: Monotonic time source, injectable for tests.
+        """
+        self.max_entries = max(0, max_entries)
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, CachedLessonState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[CachedLessonState]:
+        """
+        Returns the cached entry for a lesson, or None on a miss.
+
+        The returned entry holds a shallow copy of the state, so a caller that
+        fails half-way through a turn leaves the cached state untouched.
+        """
+        if not self.enabled:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.last_access > self.idle_seconds:
+                del self._entries[key]
+                metrics.increment("lesson_state_cache_evictions_total", {"reason": "idle"})
+                entry = None
+            if entry is None:
+                metrics.increment("lesson_state_cache_total", {"outcome": "miss"})
+                return None
+            entry.last_access = now
+            self._entries.move_to_end(key)
+        metrics.increment("lesson_state_cache_total", {"outcome": "hit"})
+        return CachedLessonState(
+            state=dict(entry.state),  # type: ignore[arg-type]
+            lesson_content=entry.lesson_content,
+            progress_id=entry.progress_id,
+            lesson_db_id=entry.lesson_db_id,
+            last_access=entry.last_access,
+        )
+
+    def put(
+        self,
+        key: CacheKey,
+        state: LessonState,
+        lesson_content: GeneratedLessonContent,
+        progress_id: str,
+    ) -> None:
+        """Caches a state that has just been persisted."""
+        if not self.enabled:
+            return
+        entry = CachedLessonState(
+            state=dict(state),  # type: ignore[arg-type]
+            lesson_content=lesson_content,
+            progress_id=progress_id,
+            lesson_db_id=state.get("lesson_db_id"),
+            last_access=self._clock(),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict_locked(entry.last_access)
+
+    def update_state(self, key: CacheKey, state: LessonState) -> bool:
+        """
+        Replaces the state of an existing entry after it has been persisted.
+
+        Returns:
+            False if the lesson is not cached (nothing to update).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry.state = dict(state)  # type: ignore[assignment]
+            entry.lesson_db_id = state.get("lesson_db_id")
+            entry.last_access = self._clock()
+            self._entries.move_to_end(key)
+        return True
+
+    def invalidate(self, key: CacheKey) -> None:
+        """Drops a lesson's entry so the next load reads the database."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def evict_idle(self) -> int:
+        """Drops all entries idle for longer than `idle_seconds`; returns the count."""
+        with self._lock:
+            return self._evict_locked(self._clock())
+
+    def _evict_locked(self, now: float) -> int:
+        """
+        Drops idle entries and entries beyond `max_entries`. Caller holds the lock.
+
+        Entries are kept in access order, so both kinds are at the front.
+        """
+        evicted = {"idle": 0, "size": 0}
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if now - oldest.last_access > self.idle_seconds:
+                reason = "idle"
+            elif len(self._entries) > self.max_entries:
+                reason = "size"
+            else:
+                break
+            self._entries.popitem(last=False)
+            evicted[reason] += 1
+        for reason, count in evicted.items():
+            if count:
+                metrics.increment(
+                    "lesson_state_cache_evictions_total", {"reason": reason}, amount=count
+                )
+        return sum(evicted.values())
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Current size and configuration."""
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "idle_seconds": self.idle_seconds,
+        }
@@ -1,14 +1,18 @@
 # backend/services/lesson_state_utils.py
 """Utility functions for serializing, deserializing, and formatting lesson state data."""
 
+import copy
+import hashlib
 import json
 import logging
+import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Type, TypeVar, cast
+from typing import Any, Dict, List, Optional, Type, TypedDict, TypeVar, cast
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from backend.exceptions import validate_internal_model
+from backend.metrics import metrics
 # Assuming models are defined in backend.models
 from backend.models import (AssessmentQuestion, Exercise,
                             GeneratedLessonContent, LessonState)
@@ -17,15 +21,125 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
 
+# Key of the schema stamp written into every serialized state blob
+STATE_SCHEMA_VERSION_KEY = "state_schema_version"
+
+
+def _compute_state_schema_version() -> str:
+    """Fingerprints the JSON schemas of the models nested in a lesson state."""
+    schemas = {
+        model_cls.__name__: model_cls.model_json_schema()
+        for model_cls in (GeneratedLessonContent, Exercise, AssessmentQuestion)
+    }
+    digest = hashlib.sha256(json.dumps(schemas, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+# Changes whenever a nested model changes, so blobs written by an older model
+# definition are never trusted
+STATE_SCHEMA_VERSION = _compute_state_schema_version()
+
+# Hydrate nested models of trusted states loaded from the database on first
+# access instead of on load. When turned off, trusted states take the
+# single-pass TypeAdapter path.
+LAZY_STATE_HYDRATION = os.environ.get("LESSON_STATE_LAZY_HYDRATION", "true").lower() != "false"
+
+
+# --- Lazy Models ---
+
+
+class LazyModel:
+    """
+    Stand-in for a nested model of a stored lesson state.
+
+    Keeps the model's stored JSON and validates it only when an attribute is
+    first used, then forwards attribute access to the real model. It is not an
+    instance of the model class: code that needs the real model (`isinstance`
+    checks, Pydantic fields) calls `unwrap_model`. Serializing a stand-in that
+    was never used returns the stored JSON unchanged.
+    """
+
+    __slots__ = ("_model_cls", "_raw", "_model")
+
+    def __init__(self, model_cls: Type[BaseModel], raw: Dict[str, Any]) -> None:
+        object.__setattr__(self, "_model_cls", model_cls)
+        object.__setattr__(self, "_raw", raw)
+        object.__setattr__(self, "_model", None)
+
+    @property
+    def is_hydrated(self) -> bool:
+        """Whether the model has been validated (and may have been changed)."""
+        return self._model is not None
+
+    def hydrate(self) -> BaseModel:
+        """Validates the stored JSON once and returns the real model."""
+        if self._model is None:
+            model = validate_internal_model(
+                self._model_cls,
+                self._raw,
+                context_message=f"Lazy validation failed for {self._model_cls.__name__}",
+            )
+            object.__setattr__(self, "_model", model)
+            metrics.increment(
+                "lesson_state_lazy_hydrations_total", {"model": self._model_cls.__name__}
+            )
+        return self._model
+
+    def to_json_data(self) -> Dict[str, Any]:
+        """The stored JSON if never used, else the current model's dump."""
+        if self._model is None:
+            return self._raw
+        return self._model.model_dump(mode="json")
+
+    def __getattr__(self, name: str) -> Any:
+        if name in LazyModel.__slots__:
+            raise AttributeError(name)
+        return getattr(self.hydrate(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.hydrate(), name, value)
+
+    def __eq__(self, other: Any) -> bool:
+        return self.hydrate() == unwrap_model(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __copy__(self) -> BaseModel:
+        return copy.copy(self.hydrate())
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> BaseModel:
+        return copy.deepcopy(self.hydrate(), memo)
+
+    def __repr__(self) -> str:
+        if self._model is None:
+            return f"LazyModel({self._model_cls.__name__}, not hydrated)"
+        return repr(self._model)
+
+
+def unwrap_model(value: Any) -> Any:
+    """Returns the real model behind a LazyModel; other values unchanged."""
+    return value.hydrate() if isinstance(value, LazyModel) else value
+
+
 # --- Serialization Helpers ---
 
 
+def _dump_model(value: Any) -> Any:
+    """JSON data of a model, reusing the stored JSON of unused lazy models."""
+    if isinstance(value, LazyModel):
+        return value.to_json_data()
+    return value.model_dump(mode="json")
+
+
 def _serialize_value(value: Any) -> Any:
     """Serialize a single value, handling Pydantic models and datetimes."""
-    if isinstance(value, BaseModel):
-        return value.model_dump(mode="json")
-    if isinstance(value, list) and value and isinstance(value[0], BaseModel):
-        return [item.model_dump(mode="json") for item in value]
+    if isinstance(value, (BaseModel, LazyModel)):
+        return _dump_model(value)
+    if isinstance(value, list) and value and isinstance(value[0], (BaseModel, LazyModel)):
+        return [_dump_model(item) for item in value]
     if isinstance(value, datetime):
         return value.isoformat()
     return value
@@ -43,6 +157,7 @@ def serialize_state_data(state: LessonState) -> str:
         A JSON string representation of the state.
     """
     serializable_dict = {key: _serialize_value(value) for key, value in state.items()}
+    serializable_dict[STATE_SCHEMA_VERSION_KEY] = STATE_SCHEMA_VERSION
     return json.dumps(serializable_dict)
 
 
@@ -115,37 +230,116 @@ def _deserialize_model_list(
     return validated_items
 
 
-def deserialize_state_data(state_dict: Dict[str, Any]) -> LessonState:
+# --- Trusted Deserialization ---
+
+
+class _NestedStateModels(TypedDict, total=False):
+    """The LessonState fields that hold Pydantic models."""
+
+    generated_content: Optional[GeneratedLessonContent]
+    active_exercise: Optional[Exercise]
+    active_assessment: Optional[AssessmentQuestion]
+    generated_exercises: Optional[List[Exercise]]
+    generated_assessment_questions: Optional[List[AssessmentQuestion]]
+
+
+# One compiled validator for all nested models. With pydantic-core, building
+# models this way is faster than `model_construct`, which runs in Python.
+_NESTED_MODELS_ADAPTER = TypeAdapter(_NestedStateModels)
+
+
+def _load_trusted_models(state_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Builds all nested models of a serializer-written blob in a single pass.
+
+    Returns:
+        The nested fields as models, or None if the blob does not validate
+        (the caller then runs the per-field path for detailed errors).
+    """
+    nested = {key: state_dict.get(key) for key in _NestedStateModels.__annotations__}
+    try:
+        models = _NESTED_MODELS_ADAPTER.validate_python(nested)
+    except ValidationError:
+        return None
+    models["generated_exercises"] = models["generated_exercises"] or []
+    models["generated_assessment_questions"] = models["generated_assessment_questions"] or []
+    return models
+
+
+def _lazy_models(state_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Wraps the nested models of a serializer-written blob in LazyModels."""
+    def _lazy(data: Any, model_cls: Type[BaseModel]) -> Optional[LazyModel]:
+        return LazyModel(model_cls, data) if isinstance(data, dict) else None
+
+    def _lazy_list(data: Any, model_cls: Type[BaseModel]) -> List[LazyModel]:
+        if not isinstance(data, list):
+            return []
+        return [LazyModel(model_cls, item) for item in data if isinstance(item, dict)]
+
+    return {
+        "generated_content": _lazy(state_dict.get("generated_content"), GeneratedLessonContent),
+        "active_exercise": _lazy(state_dict.get("active_exercise"), Exercise),
+        "active_assessment": _lazy(state_dict.get("active_assessment"), AssessmentQuestion),
+        "generated_exercises": _lazy_list(state_dict.get("generated_exercises"), Exercise),
+        "generated_assessment_questions": _lazy_list(
+            state_dict.get("generated_assessment_questions"), AssessmentQuestion
+        ),
+    }
+
+
+def deserialize_state_data(
+    state_dict: Dict[str, Any], trusted: bool = False, lazy: bool = False
+) -> LessonState:
     """
     Converts a dictionary (from DB) back into a LessonState structure
     with Pydantic models, handling potential validation errors gracefully.
 
     Args:
         state_dict: The dictionary loaded from the database.
+        trusted: The dictionary was written by `serialize_state_data`. If its
+            schema stamp matches the current models, all nested models are
+            built in one compiled pass instead of field by field and item by
+            item; otherwise (old blob, changed models) the per-field path runs.
+        lazy: With a trusted, current blob, wrap nested models in LazyModels
+            that are validated on first access, so a turn only pays for the
+            models it uses. Serializing reuses the stored JSON of unused ones.
+            The interaction service passes LESSON_STATE_LAZY_HYDRATION (on by
+            default) for database loads.
 
     Returns:
         A LessonState TypedDict with nested models validated.
     """
     deserialized_state = state_dict.copy()  # Start with a copy
-
-    # Deserialize complex fields using helpers
-    deserialized_state["generated_content"] = _deserialize_model(
-        state_dict.get("generated_content"), GeneratedLessonContent, "generated_content"
-    )
-    deserialized_state["active_exercise"] = _deserialize_model(
-        state_dict.get("active_exercise"), Exercise, "active_exercise"
-    )
-    deserialized_state["active_assessment"] = _deserialize_model(
-        state_dict.get("active_assessment"), AssessmentQuestion, "active_assessment"
-    )
-    deserialized_state["generated_exercises"] = _deserialize_model_list(
-        state_dict.get("generated_exercises"), Exercise, "generated_exercises"
-    )
-    deserialized_state["generated_assessment_questions"] = _deserialize_model_list(
-        state_dict.get("generated_assessment_questions"),
-        AssessmentQuestion,
-        "generated_assessment_questions",
-    )
+    schema_version = deserialized_state.pop(STATE_SCHEMA_VERSION_KEY, None)
+
+    is_current = trusted and schema_version == STATE_SCHEMA_VERSION
+    trusted_models = _load_trusted_models(state_dict) if is_current and not lazy else None
+    if is_current and lazy:
+        metrics.increment("lesson_state_deserialize_total", {"mode": "lazy"})
+        deserialized_state.update(_lazy_models(state_dict))
+    elif trusted_models is not None:
+        metrics.increment("lesson_state_deserialize_total", {"mode": "trusted"})
+        deserialized_state.update(trusted_models)
+    else:
+        metrics.increment("lesson_state_deserialize_total", {"mode": "validated"})
+        # Deserialize complex fields using helpers
+        deserialized_state["generated_content"] = _deserialize_model(
+            state_dict.get("generated_content"), GeneratedLessonContent, "generated_content"
+        )
+        deserialized_state["active_exercise"] = _deserialize_model(
+            state_dict.get("active_exercise"), Exercise, "active_exercise"
+        )
+        deserialized_state["active_assessment"] = _deserialize_model(
+            state_dict.get("active_assessment"), AssessmentQuestion, "active_assessment"
+        )
+        deserialized_state["generated_exercises"] = _deserialize_model_list(
+            state_dict.get("generated_exercises"), Exercise, "generated_exercises"
+        )
+        deserialized_state["generated_assessment_questions"] = _deserialize_model_list(
+            state_dict.get("generated_assessment_questions"),
+            AssessmentQuestion,
+            "generated_assessment_questions",
+        )
 
     # Ensure other fields expected by LessonState are present or defaulted if needed
     # (Example: ensure user_responses is a list)
@@ -119,3 +119,44 @@ CREATE TABLE IF NOT EXISTS conversation_history (
 );
 CREATE INDEX IF NOT EXISTS idx_history_progress_id ON conversation_history(progress_id);
 CREATE INDEX IF NOT EXISTS idx_history_timestamp ON conversation_history(timestamp);
+
+-- Shared pool of pre-generated exercises/assessment questions per lesson
+CREATE TABLE IF NOT EXISTS lesson_item_pool (
+    pool_item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lesson_id INTEGER NOT NULL,
+    item_type TEXT NOT NULL,             -- 'exercise' or 'assessment'
+    item_id TEXT NOT NULL,               -- Exercise.id / AssessmentQuestion.id
+    item_json TEXT NOT NULL,             -- Validated item as JSON
+    created_at TEXT NOT NULL,
+    FOREIGN KEY (lesson_id) REFERENCES lessons(lesson_id) ON DELETE CASCADE,
+    UNIQUE(lesson_id, item_type, item_id)
+);
+CREATE INDEX IF NOT EXISTS idx_item_pool_lesson ON lesson_item_pool(lesson_id, item_type);
+
+-- Chunked exposition and its hashing TF-IDF vectors, for chat retrieval
+CREATE TABLE IF NOT EXISTS lesson_exposition_index (
+    lesson_id INTEGER PRIMARY KEY,       -- FK to lessons; one index per lesson
+    content_hash TEXT NOT NULL,          -- SHA-256 of the indexed exposition
+    chunks_json TEXT NOT NULL,           -- JSON list of chunk texts, in document order
+    vectors BLOB NOT NULL,               -- float16 .npy matrix, one row per chunk
+    created_at TEXT NOT NULL,
+    FOREIGN KEY (lesson_id) REFERENCES lessons(lesson_id) ON DELETE CASCADE
+);
+
+-- Background generation jobs (exercises, assessment questions, syllabi)
+CREATE TABLE IF NOT EXISTS generation_jobs (
+    job_id TEXT PRIMARY KEY,             -- UUID
+    user_id TEXT NOT NULL,               -- Owner; only they can read the job
+    job_type TEXT NOT NULL,              -- 'exercise', 'assessment', 'syllabus'
+    payload_json TEXT NOT NULL,          -- Arguments for the job handler
+    status TEXT NOT NULL,                -- 'queued', 'running', 'succeeded', 'failed'
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after TEXT NOT NULL,             -- ISO 8601; a retried job waits until then
+    result_json TEXT,                    -- Handler result once succeeded
+    error TEXT,                          -- Last error message
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON generation_jobs(status, run_after);
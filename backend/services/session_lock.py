@@ -0,0 +1,87 @@
+# backend/services/session_lock.py
+"""
+Keyed asyncio lock that serializes work per lesson session.
+
+A chat turn and an exercise request for the same (user, lesson) both load the
+lesson state, await an LLM call and write the state back; run concurrently,
+the second write silently drops the first one's changes. Holding the session's
+lock for the whole load-generate-save cycle makes such requests run one after
+the other, while requests for different sessions never wait on each other.
+
+Locks exist only while held or awaited, so the registry stays as small as the
+number of sessions with a request in flight. The lock is per process; it does
+not coordinate several worker processes writing the same progress row.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Hashable
+
+from backend.metrics import metrics
+
+# Histogram buckets (seconds) for the time a request waited for its session
+LOCK_WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclass
+class _KeyLock:
+    """The lock of one key and how many tasks hold or await it."""
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+class KeyedAsyncLock:
+    """Mutual exclusion per key, with full parallelism across keys."""
+
+    def __init__(self, name: str = "lesson_session") -> None:
+        """
+        Initializes an empty registry.
+
+        Args:
+            name: Prefix of the metrics this lock reports.
+        """
+        self.name = name
+        self._locks: Dict[Hashable, _KeyLock] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def locked(self, key: Hashable) -> bool:
+        """Returns True if some task currently holds the lock of `key`."""
+        entry = self._locks.get(key)
+        return entry is not None and entry.lock.locked()
+
+    @asynccontextmanager
+    async def acquire(self, key: Hashable) -> AsyncIterator[None]:
+        """
+        Holds the lock of `key` for the duration of the `async with` block.
+
+        Records whether the lock was contended and, if so, how long the
+        caller waited for it.
+        """
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = _KeyLock()
+        entry.users += 1
+        contended = entry.lock.locked()
+        metrics.increment(
+            f"{self.name}_lock_acquisitions_total",
+            {"outcome": "contended" if contended else "uncontended"},
+        )
+        started = time.perf_counter()
+        try:
+            async with entry.lock:
+                if contended:
+                    metrics.observe(
+                        f"{self.name}_lock_wait_seconds",
+                        time.perf_counter() - started,
+                        buckets=LOCK_WAIT_BUCKETS,
+                    )
+                yield
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                del self._locks[key]
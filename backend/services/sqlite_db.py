@@ -6,6 +6,7 @@ import os
 import uuid
 import json
 import sqlite3
+import threading
 from datetime import datetime, timezone # Added timezone
 from pathlib import Path
 from typing import (
@@ -14,6 +15,7 @@ from typing import (
     Dict,
     Any,
     Callable,
+    Iterable,
     Tuple,
     Union,
 )
@@ -22,6 +24,31 @@ from typing import (
 from backend.logger import logger
 
 
+def build_conversation_message(
+    progress_id: str,
+    role: str,
+    message_type: str,
+    content: str,
+    timestamp: Optional[datetime] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Builds a conversation_history message in the shape get_conversation_history returns.
+
+    The ID and timestamp are fixed here, so a message recorded now and written
+    later still sorts where it happened.
+    """
+    return {
+        "message_id": str(uuid.uuid4()),
+        "progress_id": progress_id,
+        "timestamp": (timestamp or datetime.now(timezone.utc)).isoformat(),
+        "role": role,
+        "message_type": message_type,
+        "content": content,
+        "metadata": metadata or None,
+    }
+
+
 class SQLiteDatabaseService:
     """
     Service class for interacting with the SQLite database.
@@ -32,6 +59,9 @@ class SQLiteDatabaseService:
         Initializes SQLiteDatabaseService, connecting to the SQLite database and creating tables.
         """
         self.conn: sqlite3.Connection
+        # The connection is shared by all threads; writes hold this lock so a
+        # commit from one request never lands inside another's transaction
+        self._write_lock = threading.RLock()
         try:
             # Always use the root directory for the database
             root_dir = os.path.dirname(
@@ -69,9 +99,10 @@ class SQLiteDatabaseService:
 
             logger.info(f"SQLite database initialized at: {abs_path}")
 
-            # Create tables if they don't exist
+            # Create tables if they don't exist; the schema is idempotent, so this
+            # also adds tables introduced after an existing database was created
+            self._create_tables()
             if not db_exists:
-                self._create_tables()
                 logger.info("Database tables created")
 
         except Exception as e:
@@ -123,20 +154,21 @@ class SQLiteDatabaseService:
             The query results (single row, list of rows, or None).
         """
         try:
-            cursor = self.conn.cursor()
+            with self._write_lock:
+                cursor = self.conn.cursor()
 
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
 
-            if commit:
-                self.conn.commit()
+                if commit:
+                    self.conn.commit()
 
-            if fetch_one:
-                return cursor.fetchone()  # Returns a Row or None
-            else:
-                return cursor.fetchall()  # Returns a list of Rows
+                if fetch_one:
+                    return cursor.fetchone()  # Returns a Row or None
+                else:
+                    return cursor.fetchall()  # Returns a list of Rows
 
         except sqlite3.Error as e:
             logger.error(f"Database error: {str(e)}", exc_info=True)
@@ -177,12 +209,24 @@ class SQLiteDatabaseService:
             The result of the function
         """
         try:
-            with self.conn:
+            with self._write_lock, self.conn:
                 return func(*args, **kwargs)
         except Exception as e:
             logger.error(f"Transaction error: {str(e)}", exc_info=True)
             raise
 
+    def unit_of_work(self) -> "UnitOfWork":
+        """
+        Starts collecting writes to commit atomically in one transaction.
+
+        Usage:
+            with db_service.unit_of_work() as uow:
+                uow.save_conversation_message(...)
+                uow.save_user_progress(...)
+            # committed here; nothing is written if the block raises
+        """
+        return UnitOfWork(self)
+
     # Type hint for return value
     def get_all_table_data(self) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -688,6 +732,7 @@ class SQLiteDatabaseService:
         module_index: int,
         lesson_index: int,
         content: Dict[str, Any],
+        exposition_index: Optional[Dict[str, Any]] = None,
     ) -> int:
         """
         Saves the generated content for a specific lesson.
@@ -697,6 +742,8 @@ class SQLiteDatabaseService:
             module_index (int): The index of the module.
             lesson_index (int): The index of the lesson.
             content (dict): The generated lesson content (e.g., exposition).
+            exposition_index (dict, optional): The exposition's retrieval index
+                (see save_exposition_index); without one a stored index is removed.
 
         Returns:
             int: The primary key (lesson_id) of the lesson this content is associated with.
@@ -757,6 +804,9 @@ class SQLiteDatabaseService:
                     raise RuntimeError("Failed to get content_id after insert.")
                 content_id = content_id_result[0]
 
+            # 3. Replace the exposition's index for chat retrieval
+            self._save_exposition_index(lesson_pk, exposition_index)
+
             return lesson_pk  # Return the lesson's primary key
 
         try:
@@ -947,6 +997,23 @@ class SQLiteDatabaseService:
         Returns:
             str: The ID of the progress entry (UUID)
         """
+        return self._upsert_user_progress(
+            user_id, syllabus_id, module_index, lesson_index, status,
+            lesson_id=lesson_id, lesson_state_json=lesson_state_json, commit=True,
+        )
+
+    def _upsert_user_progress(
+        self,
+        user_id: str,
+        syllabus_id: str,
+        module_index: int,
+        lesson_index: int,
+        status: str,
+        lesson_id: Optional[int] = None,
+        lesson_state_json: Optional[str] = None,
+        commit: bool = True,
+    ) -> str:
+        """Inserts or updates a progress row; see save_user_progress."""
         now = datetime.now().isoformat()
 
         # Ensure we have the lesson_id PK if not provided
@@ -975,7 +1042,7 @@ class SQLiteDatabaseService:
                 WHERE progress_id = ?
             """
             update_params = (status, now, lesson_state_json, progress_id)
-            self.execute_query(update_query, update_params, commit=True)
+            self.execute_query(update_query, update_params, commit=commit)
         else:
             progress_id = str(uuid.uuid4())
             insert_query = """
@@ -995,7 +1062,7 @@ class SQLiteDatabaseService:
                 now,
                 lesson_state_json,
             )
-            self.execute_query(insert_query, insert_params, commit=True)
+            self.execute_query(insert_query, insert_params, commit=commit)
 
         return progress_id
 
@@ -1083,6 +1150,22 @@ class SQLiteDatabaseService:
         return result
 
     # Type hints for args and return
+    def update_lesson_state(self, progress_id: str, lesson_state_json: str) -> None:
+        """
+        Replaces the stored lesson state of a progress entry, leaving its status as is.
+
+        Args:
+            progress_id (str): The ID of the user progress entry.
+            lesson_state_json (str): The serialized lesson state.
+        """
+        query = """
+            UPDATE user_progress SET lesson_state_json = ?, updated_at = ?
+            WHERE progress_id = ?
+        """
+        self.execute_query(
+            query, (lesson_state_json, datetime.now().isoformat(), progress_id), commit=True
+        )
+
     def _calculate_total_lessons(self, syllabus: Dict[str, Any] | None, syllabus_id: str) -> int:
         """Helper to calculate total lessons, preferring passed syllabus dict."""
         if syllabus and "content" in syllabus and "modules" in syllabus["content"]:
@@ -1188,20 +1271,11 @@ class SQLiteDatabaseService:
             timestamp (datetime, optional): When the message occurred. Defaults to now.
             metadata (dict, optional): Additional structured data related to the message.
         """
-        message_id = str(uuid.uuid4())
-        ts = timestamp or datetime.now(timezone.utc)
-        ts_iso = ts.isoformat()
-        metadata_json = json.dumps(metadata) if metadata else None
-
-        query = """
-            INSERT INTO conversation_history
-            (message_id, progress_id, role, message_type, content, timestamp, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        params = (message_id, progress_id, role, message_type, content, ts_iso, metadata_json)
-
+        message = build_conversation_message(
+            progress_id, role, message_type, content, timestamp, metadata
+        )
         try:
-            self.execute_query(query, params, commit=True)
+            self._insert_conversation_message(message, commit=True)
         except Exception as e:
             logger.error(
                 f"Error saving conversation message for progress {progress_id}: {e}",
@@ -1209,14 +1283,35 @@ class SQLiteDatabaseService:
             )
             # Decide if we should raise here or just log
 
+    def _insert_conversation_message(self, message: Dict[str, Any], commit: bool = True) -> None:
+        """Inserts a message built by build_conversation_message; raises on failure."""
+        query = """
+            INSERT INTO conversation_history
+            (message_id, progress_id, role, message_type, content, timestamp, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        metadata = message.get("metadata")
+        params = (
+            message["message_id"],
+            message["progress_id"],
+            message["role"],
+            message["message_type"],
+            message["content"],
+            message["timestamp"],
+            json.dumps(metadata) if metadata else None,
+        )
+        self.execute_query(query, params, commit=commit)
+
     # Type hints for args and return
-    def get_conversation_history(self, progress_id: str) -> List[Dict[str, Any]]:
+    def get_conversation_history(self, progress_id: str, offset: int = 0) -> List[Dict[str, Any]]:
         """
         Retrieves the conversation history for a specific user progress entry,
         ordered by timestamp.
 
         Args:
             progress_id (str): The ID of the user progress entry.
+            offset (int): Number of oldest messages to skip (e.g. those already
+                covered by the conversation summary).
 
         Returns:
             list: A list of message dictionaries, ordered chronologically.
@@ -1225,9 +1320,10 @@ class SQLiteDatabaseService:
         query = """
             SELECT * FROM conversation_history
             WHERE progress_id = ?
-            ORDER BY timestamp ASC
+            ORDER BY timestamp ASC, rowid ASC
+            LIMIT -1 OFFSET ?
         """
-        params = (progress_id,)
+        params = (progress_id, max(0, offset))
         history: List[Dict[str, Any]] = []
 
         try:
@@ -1259,3 +1355,376 @@ class SQLiteDatabaseService:
                 exc_info=True,
             )
             return []  # Return empty list on error
+
+    # Lesson item pool methods
+    def add_pool_item(
+        self, lesson_id: int, item_type: str, item_id: str, item: Dict[str, Any]
+    ) -> bool:
+        """
+        Adds a validated exercise or assessment question to a lesson's shared pool.
+
+        Args:
+            lesson_id (int): The lesson's primary key.
+            item_type (str): 'exercise' or 'assessment'.
+            item_id (str): The item's ID (unique within the lesson and type).
+            item (dict): The item as a JSON-serializable dictionary.
+
+        Returns:
+            bool: True if added, False if an item with this ID is already pooled.
+        """
+        query = """
+            INSERT OR IGNORE INTO lesson_item_pool
+            (lesson_id, item_type, item_id, item_json, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        params = (lesson_id, item_type, item_id, json.dumps(item), datetime.now().isoformat())
+        with self._write_lock:
+            cursor = self.conn.execute(query, params)
+            self.conn.commit()
+        return cursor.rowcount > 0
+
+    def get_pool_items(
+        self,
+        lesson_id: int,
+        item_type: str,
+        exclude_ids: Iterable[str] = (),
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves a lesson's pooled items of one type, oldest first.
+
+        Args:
+            lesson_id (int): The lesson's primary key.
+            item_type (str): 'exercise' or 'assessment'.
+            exclude_ids (Iterable[str]): Item IDs to leave out.
+            limit (Optional[int]): Maximum number of rows to return.
+
+        Returns:
+            list: Dictionaries with 'item_id' and the parsed 'item'. Rows with
+                  invalid JSON are skipped.
+        """
+        excluded = list(dict.fromkeys(exclude_ids))
+        query = """
+            SELECT item_id, item_json FROM lesson_item_pool
+            WHERE lesson_id = ? AND item_type = ?
+        """
+        params: List[Any] = [lesson_id, item_type]
+        if excluded:
+            query += f" AND item_id NOT IN ({', '.join('?' * len(excluded))})"
+            params.extend(excluded)
+        query += " ORDER BY pool_item_id ASC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        items: List[Dict[str, Any]] = []
+        for row in self.execute_read_query(query, tuple(params)):
+            try:
+                items.append({"item_id": row["item_id"], "item": json.loads(row["item_json"])})
+            except json.JSONDecodeError:
+                logger.warning(f"Invalid pooled {item_type} JSON for item {row['item_id']}")
+        return items
+
+    def count_pool_items(self, lesson_id: int, item_type: str) -> int:
+        """
+        Counts a lesson's pooled items of one type.
+
+        Args:
+            lesson_id (int): The lesson's primary key.
+            item_type (str): 'exercise' or 'assessment'.
+
+        Returns:
+            int: The number of pooled items.
+        """
+        query = """
+            SELECT COUNT(*) AS item_count FROM lesson_item_pool
+            WHERE lesson_id = ? AND item_type = ?
+        """
+        rows = self.execute_read_query(query, (lesson_id, item_type))
+        return int(rows[0]["item_count"]) if rows else 0
+
+    # Exposition retrieval index methods
+    def _save_exposition_index(self, lesson_id: int, index: Optional[Dict[str, Any]]) -> bool:
+        """Stores or, given None, removes the lesson's exposition index; call inside a transaction."""
+        if index is None:
+            self.execute_query(
+                "DELETE FROM lesson_exposition_index WHERE lesson_id = ?", (lesson_id,)
+            )
+            return False
+        query = """
+            INSERT OR REPLACE INTO lesson_exposition_index
+            (lesson_id, content_hash, chunks_json, vectors, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        params = (
+            lesson_id,
+            index["content_hash"],
+            json.dumps(index["chunks"]),
+            index["vectors"],
+            datetime.now().isoformat(),
+        )
+        self.execute_query(query, params)
+        return True
+
+    def save_exposition_index(self, lesson_id: int, index: Optional[Dict[str, Any]]) -> bool:
+        """
+        Stores a lesson's exposition index for chat retrieval.
+
+        save_lesson_content already does this; this indexes lessons saved
+        before the index existed. The index is built by
+        backend/ai/lessons/exposition_index.py (`index_record`).
+
+        Args:
+            lesson_id (int): The lesson's primary key.
+            index (dict): 'content_hash', the 'chunks' list and the 'vectors'
+                          blob, or None to remove the lesson's index.
+
+        Returns:
+            bool: True if an index was stored, False if it was removed.
+        """
+        return self._transaction(self._save_exposition_index, lesson_id, index)
+
+    def get_exposition_index(self, lesson_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Retrieves a lesson's stored exposition index.
+
+        Args:
+            lesson_id (int): The lesson's primary key.
+
+        Returns:
+            dict: 'content_hash', the 'chunks' list and the 'vectors' blob, or
+                  None if the lesson has no index.
+        """
+        query = """
+            SELECT content_hash, chunks_json, vectors FROM lesson_exposition_index
+            WHERE lesson_id = ?
+        """
+        rows = self.execute_read_query(query, (lesson_id,))
+        if not rows:
+            return None
+        try:
+            chunks = json.loads(rows[0]["chunks_json"])
+        except json.JSONDecodeError:
+            logger.warning(f"Invalid exposition index chunks for lesson {lesson_id}")
+            return None
+        return {
+            "content_hash": rows[0]["content_hash"],
+            "chunks": chunks,
+            "vectors": rows[0]["vectors"],
+        }
+
+    # Generation job methods
+    def create_job(
+        self, user_id: str, job_type: str, payload: Dict[str, Any], max_attempts: int
+    ) -> str:
+        """
+        Queues a background generation job.
+
+        Args:
+            user_id (str): The user who owns the job.
+            job_type (str): The handler to run, e.g. 'exercise'.
+            payload (dict): JSON-serializable handler arguments.
+            max_attempts (int): Attempts before the job is marked failed.
+
+        Returns:
+            str: The new job's ID.
+        """
+        job_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        query = """
+            INSERT INTO generation_jobs
+            (job_id, user_id, job_type, payload_json, status, attempts, max_attempts,
+             run_after, created_at, updated_at)
+            VALUES (?, ?, ?, ?, 'queued', 0, ?, ?, ?, ?)
+        """
+        params = (job_id, user_id, job_type, json.dumps(payload), max_attempts, now, now, now)
+        self.execute_query(query, params, commit=True)
+        return job_id
+
+    def claim_next_job(self) -> Optional[Dict[str, Any]]:
+        """
+        Marks the oldest due queued job as running and returns it.
+
+        Returns:
+            dict: The claimed job (see get_job), or None if no job is due.
+        """
+        now = datetime.now().isoformat()
+        with self._write_lock, self.conn:
+            row = self.conn.execute(
+                """
+                SELECT job_id FROM generation_jobs
+                WHERE status = 'queued' AND run_after <= ?
+                ORDER BY created_at ASC LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                """
+                UPDATE generation_jobs
+                SET status = 'running', attempts = attempts + 1, updated_at = ?
+                WHERE job_id = ?
+                """,
+                (now, row["job_id"]),
+            )
+        return self.get_job(row["job_id"])
+
+    def finish_job(
+        self,
+        job_id: str,
+        status: str,
+        result: Any = None,
+        error: Optional[str] = None,
+        run_after: Optional[str] = None,
+    ) -> None:
+        """
+        Records the outcome of a job attempt.
+
+        Args:
+            job_id (str): The job's ID.
+            status (str): 'succeeded', 'failed', or 'queued' to retry.
+            result: JSON-serializable handler result (on success).
+            error (str, optional): The attempt's error message.
+            run_after (str, optional): ISO 8601 time before which a retried
+                job is not claimed again.
+        """
+        now = datetime.now().isoformat()
+        query = """
+            UPDATE generation_jobs
+            SET status = ?, result_json = ?, error = ?, run_after = ?, updated_at = ?
+            WHERE job_id = ?
+        """
+        result_json = json.dumps(result, default=str) if result is not None else None
+        self.execute_query(
+            query, (status, result_json, error, run_after or now, now, job_id), commit=True
+        )
+
+    def requeue_running_jobs(self) -> int:
+        """
+        Queues again the jobs left running by a stopped process.
+
+        Returns:
+            int: The number of jobs requeued.
+        """
+        now = datetime.now().isoformat()
+        with self._write_lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE generation_jobs SET status = 'queued', updated_at = ? "
+                "WHERE status = 'running'",
+                (now,),
+            )
+        return cursor.rowcount
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieves a generation job.
+
+        Args:
+            job_id (str): The job's ID.
+
+        Returns:
+            dict: The job with parsed 'payload' and 'result', or None if not found.
+        """
+        row = self.execute_query(
+            "SELECT * FROM generation_jobs WHERE job_id = ?", (job_id,), fetch_one=True
+        )
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job.pop("payload_json"))
+        result_json = job.pop("result_json")
+        job["result"] = json.loads(result_json) if result_json is not None else None
+        return job
+
+
+class UnitOfWork:
+    """
+    Collects the writes of one request and commits them in a single transaction.
+
+    Writes are recorded, not executed, until `commit`, so a request that fails
+    half-way leaves nothing behind and a whole chat turn costs one commit.
+    Reads made before the commit do not see the recorded writes.
+    """
+
+    def __init__(self, db_service: SQLiteDatabaseService) -> None:
+        self.db_service = db_service
+        self._operations: List[Callable[[], Any]] = []
+
+    @property
+    def pending(self) -> int:
+        """Number of recorded writes not yet committed."""
+        return len(self._operations)
+
+    def save_conversation_message(
+        self,
+        progress_id: str,
+        role: str,
+        message_type: str,
+        content: str,
+        timestamp: Optional[datetime] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Records a conversation message (see SQLiteDatabaseService.save_conversation_message).
+
+        Returns:
+            The message as get_conversation_history will return it, so it can
+            be used (e.g. as LLM context) before it is committed.
+        """
+        message = build_conversation_message(
+            progress_id, role, message_type, content, timestamp, metadata
+        )
+        self._operations.append(
+            lambda: self.db_service._insert_conversation_message(  # pylint: disable=protected-access
+                message, commit=False
+            )
+        )
+        return message
+
+    def save_user_progress(
+        self,
+        user_id: str,
+        syllabus_id: str,
+        module_index: int,
+        lesson_index: int,
+        status: str,
+        lesson_id: Optional[int] = None,
+        lesson_state_json: Optional[str] = None,
+    ) -> None:
+        """Records a progress upsert (see SQLiteDatabaseService.save_user_progress)."""
+        self._operations.append(
+            lambda: self.db_service._upsert_user_progress(  # pylint: disable=protected-access
+                user_id, syllabus_id, module_index, lesson_index, status,
+                lesson_id=lesson_id, lesson_state_json=lesson_state_json, commit=False,
+            )
+        )
+
+    def commit(self) -> None:
+        """
+        Executes all recorded writes in one transaction.
+
+        Raises:
+            Exception: Whatever the failing write raised; no write is kept.
+        """
+        operations, self._operations = self._operations, []
+        if not operations:
+            return
+
+        def _run_all() -> None:
+            for operation in operations:
+                operation()
+
+        self.db_service._transaction(_run_all)  # pylint: disable=protected-access
+
+    def rollback(self) -> None:
+        """Discards all recorded writes."""
+        self._operations = []
+
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
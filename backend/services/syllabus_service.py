@@ -5,6 +5,7 @@ Coordinates between the database service and the Syllabus AI component
 to create, retrieve, and manage syllabus data.
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, Optional, cast  # Added cast
 from backend.exceptions import log_and_raise_new
@@ -24,14 +25,17 @@ class SyllabusService:
     underlying database and AI components related to syllabi.
     """
 
-    def __init__(self, db_service: SQLiteDatabaseService):
+    def __init__(
+        self, db_service: SQLiteDatabaseService, syllabus_ai: Optional[SyllabusAI] = None
+    ):
         """
         Initializes the SyllabusService.
 
         Args:
             db_service: An instance of SQLiteDatabaseService for database access.
+            syllabus_ai: The shared SyllabusAI; a new one is compiled if omitted.
         """
-        self.syllabus_ai = SyllabusAI(db_service=db_service)
+        self.syllabus_ai = syllabus_ai or SyllabusAI(db_service=db_service)
         self.db_service = db_service
 
     async def get_or_generate_syllabus(
@@ -100,9 +104,11 @@ class SyllabusService:
         logger.info(
             f"Creating syllabus for topic='{topic}', level='{knowledge_level}', user_id='{user_id}'"
         )
-        self.syllabus_ai.initialize(topic, knowledge_level, user_id=user_id)
-
-        syllabus_content = self.syllabus_ai.get_or_create_syllabus()
+        # Each generation has its own graph state, so requests run in parallel
+        # threads instead of blocking the event loop one after another
+        syllabus_content = await asyncio.to_thread(
+            self.syllabus_ai.generate, topic, knowledge_level, user_id
+        )
 
         if not syllabus_content or "modules" not in syllabus_content:
             log_and_raise_new(
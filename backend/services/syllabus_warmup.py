@@ -0,0 +1,223 @@
+# backend/services/syllabus_warmup.py
+"""
+Syllabus warm-up: generate every lesson exposition of a syllabus up front.
+
+Used to pre-bake a course before a cohort starts. Lessons are generated with
+bounded concurrency; before each LLM call the run waits until the quota
+budget has low-priority headroom, so a warm-up never crowds out learners.
+Lessons that already have content are skipped, which makes an interrupted run
+resumable by simply starting it again.
+
+Run from the command line:
+
+    python -m backend.services.syllabus_warmup <syllabus_id> [--concurrency N]
+
+or through POST/GET /syllabus/{syllabus_id}/warmup.
+"""
+
+# pylint: disable=broad-exception-caught
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.ai.llm_quota import LOW_PRIORITY, quota_budget
+from backend.ai.token_budget import estimate_tokens
+from backend.logger import logger
+from backend.metrics import metrics
+from backend.services.exposition_prefetcher import (EXPOSITION_RESPONSE_TOKENS,
+                                                    syllabus_lessons)
+from backend.services.lesson_exposition_service import LessonExpositionService
+from backend.services.syllabus_service import SyllabusService
+
+WARMUP_CONCURRENCY = int(os.environ.get("SYLLABUS_WARMUP_CONCURRENCY", "3"))
+# How long to wait before re-checking the quota budget when it is exhausted
+WARMUP_QUOTA_POLL_SECONDS = float(os.environ.get("SYLLABUS_WARMUP_QUOTA_POLL_SECONDS", "5"))
+
+
+@dataclass
+class WarmupProgress:
+    """Progress of one syllabus warm-up run."""
+
+    syllabus_id: str
+    status: str = "pending"  # pending | running | completed | failed
+    total: int = 0
+    generated: int = 0
+    skipped_existing: int = 0
+    failed: int = 0
+    quota_waits: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def done(self) -> int:
+        """Lessons processed so far (generated, skipped or failed)."""
+        return self.generated + self.skipped_existing + self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable view including the processed count."""
+        data = asdict(self)
+        data["done"] = self.done
+        return data
+
+
+class SyllabusWarmupService:
+    """Generates all expositions of a syllabus with bounded concurrency."""
+
+    def __init__(
+        self,
+        exposition_service: LessonExpositionService,
+        syllabus_service: SyllabusService,
+        max_concurrency: int = WARMUP_CONCURRENCY,
+        quota_poll_seconds: float = WARMUP_QUOTA_POLL_SECONDS,
+    ) -> None:
+        """
+        Initializes the service.
+
+        Args:
+            exposition_service: Service that generates and saves expositions.
+            syllabus_service: Service for retrieving the syllabus structure.
+            max_concurrency: Maximum lessons generated at the same time.
+            quota_poll_seconds: Wait between quota checks while throttled.
+        """
+        self.exposition_service = exposition_service
+        self.syllabus_service = syllabus_service
+        self.max_concurrency = max(1, max_concurrency)
+        self.quota_poll_seconds = quota_poll_seconds
+        self._runs: Dict[str, WarmupProgress] = {}
+        self._tasks: Dict[str, "asyncio.Task[WarmupProgress]"] = {}
+
+    def get_progress(self, syllabus_id: str) -> Optional[WarmupProgress]:
+        """Returns the latest run's progress for a syllabus, if any."""
+        return self._runs.get(syllabus_id)
+
+    def start(self, syllabus_id: str) -> WarmupProgress:
+        """
+        Starts a warm-up in the background, unless one is already running.
+
+        Must be called from a running event loop. Returns the run's progress.
+        """
+        task = self._tasks.get(syllabus_id)
+        if task is not None and not task.done():
+            return self._runs[syllabus_id]
+        progress = WarmupProgress(syllabus_id=syllabus_id)
+        self._runs[syllabus_id] = progress
+        task = asyncio.get_running_loop().create_task(self.warm_up(syllabus_id, progress))
+        self._tasks[syllabus_id] = task
+        return progress
+
+    async def _wait_for_quota(self, estimated_tokens: int, progress: WarmupProgress) -> None:
+        """Blocks until the quota budget has low-priority headroom."""
+        while not quota_budget.has_headroom(LOW_PRIORITY, estimated_tokens=estimated_tokens):
+            progress.quota_waits += 1
+            await asyncio.sleep(self.quota_poll_seconds)
+
+    async def warm_up(
+        self,
+        syllabus_id: str,
+        progress: Optional[WarmupProgress] = None,
+        on_progress: Optional[Callable[[WarmupProgress], None]] = None,
+    ) -> WarmupProgress:
+        """
+        Generates the missing expositions of every lesson in the syllabus.
+
+        Args:
+            syllabus_id: The syllabus to warm up.
+            progress: Progress object to update (a new one is created if None).
+            on_progress: Called after each lesson is processed.
+
+        Returns:
+            The final progress. Lessons that failed are counted and listed in
+            `errors`; running the warm-up again retries only those.
+        """
+        progress = progress or WarmupProgress(syllabus_id=syllabus_id)
+        self._runs[syllabus_id] = progress
+        progress.status = "running"
+        progress.started_at = time.time()
+
+        syllabus = await self.syllabus_service.get_syllabus_by_id(syllabus_id)
+        if not syllabus:
+            progress.status = "failed"
+            progress.errors.append(f"Syllabus {syllabus_id} not found.")
+            progress.finished_at = time.time()
+            return progress
+
+        lessons = syllabus_lessons(syllabus)
+        progress.total = len(lessons)
+        estimated_tokens = (
+            estimate_tokens(json.dumps({"modules": syllabus.get("modules", [])}, default=str))
+            + EXPOSITION_RESPONSE_TOKENS
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        logger.info(
+            f"Warming up syllabus {syllabus_id}: {len(lessons)} lessons, "
+            f"concurrency {self.max_concurrency}"
+        )
+
+        async def _warm_lesson(module_index: int, lesson_index: int, title: str) -> None:
+            async with semaphore:
+                try:
+                    await self._wait_for_quota(estimated_tokens, progress)
+                    generated = await self.exposition_service.pregenerate_exposition(
+                        syllabus, module_index, lesson_index, title
+                    )
+                    if generated:
+                        progress.generated += 1
+                    else:
+                        progress.skipped_existing += 1
+                    outcome = "generated" if generated else "skipped_existing"
+                except Exception as e:
+                    progress.failed += 1
+                    progress.errors.append(f"{module_index}/{lesson_index} ({title}): {e}")
+                    outcome = "failed"
+                    logger.warning(
+                        f"Warm-up of {syllabus_id}/{module_index}/{lesson_index} failed: {e}"
+                    )
+            metrics.increment("syllabus_warmup_lessons_total", {"outcome": outcome})
+            if on_progress:
+                on_progress(progress)
+
+        await asyncio.gather(*(_warm_lesson(m, l, title) for m, l, title in lessons))
+
+        progress.status = "completed" if not progress.failed else "failed"
+        progress.finished_at = time.time()
+        logger.info(f"Warm-up of syllabus {syllabus_id} finished: {progress.to_dict()}")
+        return progress
+
+
+def main() -> None:
+    """Warms up a syllabus from the command line, printing progress."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("syllabus_id")
+    parser.add_argument("--concurrency", type=int, default=WARMUP_CONCURRENCY)
+    args = parser.parse_args()
+
+    # Imported here so that importing this module does not open the database
+    from backend.dependencies import (  # pylint: disable=import-outside-toplevel
+        exposition_service, syllabus_service)
+
+    service = SyllabusWarmupService(
+        exposition_service, syllabus_service, max_concurrency=args.concurrency
+    )
+
+    def _print_progress(progress: WarmupProgress) -> None:
+        print(
+            f"[{progress.done}/{progress.total}] generated={progress.generated} "
+            f"skipped={progress.skipped_existing} failed={progress.failed}",
+            flush=True,
+        )
+
+    progress = asyncio.run(service.warm_up(args.syllabus_id, on_progress=_print_progress))
+    for error in progress.errors:
+        print(f"error: {error}")
+    print(f"Warm-up {progress.status}.")
+    raise SystemExit(0 if progress.status == "completed" else 1)
+
+
+if __name__ == "__main__":
+    main()
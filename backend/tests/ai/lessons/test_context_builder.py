@@ -0,0 +1,149 @@
+# backend/tests/ai/lessons/test_context_builder.py
+"""Tests for backend/ai/lessons/context_builder.py and backend/ai/token_budget.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+from typing import Any, Dict
+
+from backend.ai.lessons import context_builder
+from backend.ai.lessons.context_builder import (PromptBudget,
+                                                build_lesson_context)
+from backend.ai.token_budget import (ContextBudget, estimate_tokens,
+                                     truncate_to_tokens)
+from backend.models import Exercise, GeneratedLessonContent
+
+
+class TestTokenBudget:
+    """Tests for the token estimator and allocator."""
+
+    def test_estimate_tokens(self):
+        """The estimate scales with text length and is zero for empty text."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("word") == 1
+        assert 240 <= estimate_tokens("lorem ipsum " * 100) <= 320
+
+    def test_truncate_keeps_head_or_tail(self):
+        """Truncation respects the budget and the requested end."""
+        text = " ".join(f"w{i}" for i in range(500))
+        head = truncate_to_tokens(text, 50)
+        tail = truncate_to_tokens(text, 50, keep="tail")
+        assert estimate_tokens(head) <= 50
+        assert head.startswith("w0 ") and head.endswith("...")
+        assert tail.endswith("w499") and tail.startswith("...")
+        assert truncate_to_tokens("short text", 50) == "short text"
+
+    def test_take_messages_keeps_newest_whole_messages(self):
+        """Older messages are dropped first and none are cut mid-way."""
+        messages = [{"role": "user", "content": f"message number {i} " * 5} for i in range(20)]
+        budget = ContextBudget(100)
+        selected = budget.take_messages("history", messages, lambda m: m["content"])
+        assert selected
+        assert selected[-1] is messages[-1]
+        assert selected == messages[-len(selected):]
+        assert budget.allocations["history"] <= 100
+
+
+class TestBuildLessonContext:
+    """Tests for lesson prompt context assembly."""
+
+    def _state(self, exposition: str, **extra: Any) -> Dict[str, Any]:
+        return {
+            "generated_content": GeneratedLessonContent(exposition_content=exposition),
+            **extra,
+        }
+
+    def test_small_context_passes_through(self):
+        """Short exposition and history fit unchanged."""
+        history = [{"role": "assistant", "content": "Welcome!"}]
+        context = build_lesson_context(
+            "chat_response", self._state("Short lesson."), history=history
+        )
+        assert context.exposition == "Short lesson."
+        assert context.formatted_history == "Assistant: Welcome!"
+        assert context.active_task == "None"
+
+    def test_large_context_fits_budget(self, monkeypatch):
+        """Long exposition and history are cut to the prompt budget by priority."""
+        monkeypatch.setitem(
+            context_builder.PROMPT_BUDGETS,
+            "chat_response",
+            PromptBudget(total_tokens=1500, history_share=0.5),
+        )
+        history = [
+            {"role": "user" if i % 2 else "assistant", "content": f"turn {i} " * 40}
+            for i in range(30)
+        ]
+        exercise = Exercise(id="ex1", type="short_answer", instructions="Explain recursion.")
+        state = self._state("Lesson paragraph. " * 2000, active_exercise=exercise)
+
+        context = build_lesson_context("chat_response", state, history=history)
+
+        assert context.active_task == "Active Exercise: short_answer - Explain recursion."
+        assert context.history and context.history[-1] is history[-1]
+        assert len(context.history) < len(history)
+        assert context.exposition.startswith("Lesson paragraph.")
+        total = sum(context.allocations.values())
+        assert total <= 1500
+
+    def test_generation_prompts_skip_history(self):
+        """Exercise generation gets no history, only exposition."""
+        history = [{"role": "user", "content": "hi"}]
+        context = build_lesson_context(
+            "generate_exercises", self._state("Lesson body."), history=history
+        )
+        assert context.history == []
+        assert context.exposition == "Lesson body."
+
+    def test_intent_classification_gets_only_history(self):
+        """The intent prompt has no exposition or task placeholder; history gets the budget."""
+        history = [
+            {"role": "user" if i % 2 else "assistant", "content": f"turn {i} " * 40}
+            for i in range(30)
+        ]
+        exercise = Exercise(id="ex1", type="short_answer", instructions="Explain recursion.")
+        state = self._state("Lesson paragraph. " * 2000, active_exercise=exercise)
+
+        context = build_lesson_context("intent_classification", state, history=history)
+
+        assert context.exposition == ""
+        assert context.active_task == "None"
+        assert set(context.allocations) <= {"template", "fixed", "history"}
+        assert context.allocations["history"] > 0.7 * (
+            1200 - context.allocations["template"] - context.allocations.get("fixed", 0)
+        )
+
+    def test_summary_leads_history_within_budget(self, monkeypatch):
+        """The conversation summary precedes recent turns and shares the history budget."""
+        monkeypatch.setitem(
+            context_builder.PROMPT_BUDGETS,
+            "chat_response",
+            PromptBudget(total_tokens=1500, history_share=0.5, summary_max_tokens=50),
+        )
+        history = [{"role": "user", "content": f"turn {i} " * 40} for i in range(30)]
+        state = self._state("Lesson body.", conversation_summary="The user asked about loops. " * 50)
+
+        context = build_lesson_context("chat_response", state, history=history)
+
+        assert context.formatted_history.startswith("Summary of earlier conversation: The user")
+        assert context.allocations["summary"] <= 50
+        assert context.history[-1] is history[-1]
+        assert context.allocations["summary"] + context.allocations["history"] <= 750
+
+    def test_retrieved_excerpts_replace_the_head(self):
+        """Retrieved chunks are used best first instead of the start of the lesson."""
+        state = self._state("Intro. " * 50 + "Recursion details.")
+        context = build_lesson_context(
+            "chat_response", state, exposition_chunks=["Recursion details.", "Base cases."]
+        )
+        assert context.exposition == (
+            "Recursion details." + context_builder.EXCERPT_SEPARATOR + "Base cases."
+        )
+
+    def test_excerpts_that_do_not_fit_are_dropped_whole(self, monkeypatch):
+        """Lower-ranked excerpts are left out rather than cut mid-way."""
+        monkeypatch.setitem(
+            context_builder.PROMPT_BUDGETS, "chat_response", PromptBudget(total_tokens=300)
+        )
+        monkeypatch.setattr(context_builder, "_template_text", lambda name: "")
+        chunks = ["relevant " * 100, "other " * 100]
+        context = build_lesson_context("chat_response", self._state("x"), exposition_chunks=chunks)
+        assert context.exposition == chunks[0]
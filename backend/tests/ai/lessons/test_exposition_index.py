@@ -0,0 +1,79 @@
+# backend/tests/ai/lessons/test_exposition_index.py
+"""Tests for backend/ai/lessons/exposition_index.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import pytest
+
+from backend.ai.lessons.exposition_index import (
+    N_FEATURES,
+    ExpositionIndex,
+    chunk_exposition,
+)
+
+EXPOSITION = "\n\n".join(
+    [
+        "# Variables\n\nA variable names a value stored in memory.",
+        "Assignment binds a name to an object with the equals sign.",
+        "# Loops\n\nA for loop iterates over the items of a sequence.",
+        "A while loop repeats until its condition becomes false.",
+        "# Functions\n\nA function groups statements under a name and returns a value.",
+        "Recursion is a function calling itself; every recursion needs a base case.",
+    ]
+)
+
+
+class TestChunkExposition:
+    """Tests for chunk_exposition()"""
+
+    def test_merges_paragraphs_up_to_the_limit(self):
+        """Short paragraphs are merged and no chunk exceeds the limit."""
+        chunks = chunk_exposition(EXPOSITION, max_chars=150)
+        assert 1 < len(chunks) < EXPOSITION.count("\n\n") + 1
+        assert all(len(chunk) <= 150 for chunk in chunks)
+        assert chunks[0].startswith("# Variables\n\nA variable")
+
+    def test_splits_long_paragraphs_on_sentences(self):
+        """A paragraph over the limit is split, keeping all of its text."""
+        paragraph = " ".join(f"Sentence number {i} is here." for i in range(40))
+        chunks = chunk_exposition(paragraph, max_chars=100)
+        assert all(len(chunk) <= 100 for chunk in chunks)
+        assert " ".join(chunks) == paragraph
+
+    def test_empty_text_has_no_chunks(self):
+        assert chunk_exposition("") == []
+        assert chunk_exposition("\n\n  \n") == []
+
+
+class TestExpositionIndex:
+    """Tests for ExpositionIndex"""
+
+    def test_search_ranks_the_matching_section_first(self):
+        """A question about a later section retrieves that section."""
+        index = ExpositionIndex.build(EXPOSITION, max_chars=150)
+
+        hits = index.search("What is the base case of a recursion?", top_k=2)
+
+        assert hits
+        assert "Recursion" in index.chunks[hits[0][0]]
+        assert all(score > 0 for _, score in hits)
+        assert [score for _, score in hits] == sorted((s for _, s in hits), reverse=True)
+
+    def test_query_without_terms_matches_nothing(self):
+        index = ExpositionIndex.build(EXPOSITION, max_chars=150)
+        assert index.search("?!", top_k=3) == []
+        assert index.search("loop", top_k=0) == []
+
+    def test_round_trips_through_bytes(self):
+        """The serialized float16 matrix restores the same ranking."""
+        index = ExpositionIndex.build(EXPOSITION, max_chars=150)
+
+        restored = ExpositionIndex.from_bytes(index.chunks, index.to_bytes())
+
+        assert restored is not None
+        assert restored.vectors.shape == (len(index), N_FEATURES)
+        query = "while loop condition"
+        assert [i for i, _ in restored.search(query, 3)] == [i for i, _ in index.search(query, 3)]
+
+    def test_mismatched_blob_is_rejected(self):
+        index = ExpositionIndex.build(EXPOSITION, max_chars=150)
+        assert ExpositionIndex.from_bytes(index.chunks[:-1], index.to_bytes()) is None
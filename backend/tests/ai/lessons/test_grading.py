@@ -0,0 +1,148 @@
+# backend/tests/ai/lessons/test_grading.py
+"""Tests for backend/ai/lessons/grading.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import pytest
+
+from backend.ai.lessons.grading import format_feedback, grade_answer
+from backend.models import AssessmentQuestion, EvaluationResult, Exercise, Option
+
+OPTIONS = [
+    Option(id="A", text="A loop"),
+    Option(id="B", text="A function calling itself"),
+    Option(id="C", text="A data type"),
+]
+
+
+def _mc_exercise(**overrides) -> Exercise:
+    data = {
+        "id": "ex_mc",
+        "type": "multiple_choice",
+        "instructions": "What is recursion?",
+        "options": OPTIONS,
+        "correct_answer_id": "B",
+        "explanation": "Recursion is self-reference.",
+        "misconception_corrections": {"A": "Loops repeat without calling themselves."},
+    }
+    data.update(overrides)
+    return Exercise(**data)
+
+
+def _ordering_exercise(**overrides) -> Exercise:
+    data = {
+        "id": "ex_order",
+        "type": "ordering",
+        "instructions": "Order the steps.",
+        "items": ["Parse", "Plan", "Execute", "Report"],
+        "correct_answer": ["Parse", "Plan", "Execute", "Report"],
+    }
+    data.update(overrides)
+    return Exercise(**data)
+
+
+class TestChoiceGrading:
+    """Multiple-choice and true/false grading."""
+
+    @pytest.mark.parametrize(
+        "answer",
+        ["B", "b", "b)", "(B)", "Option B", "The answer is b.", "I think it's B",
+         "a function calling itself", "B) A function calling itself"],
+    )
+    def test_correct_answer_forms(self, answer: str):
+        """Letters, wrapped letters and the option text are all normalized."""
+        result = grade_answer(answer, exercise=_mc_exercise())
+        assert result == EvaluationResult(
+            score=1.0, is_correct=True, feedback="Correct!",
+            explanation="Recursion is self-reference.",
+        )
+
+    def test_incorrect_with_misconception(self):
+        """A wrong choice names the right option and its misconception correction."""
+        result = grade_answer("A", exercise=_mc_exercise())
+        assert result is not None and not result.is_correct
+        assert result.score == 0.0
+        assert "B) A function calling itself" in result.feedback
+        assert "Loops repeat" in result.feedback
+
+    def test_key_from_correct_answer_text(self):
+        """Without correct_answer_id the key may be given as option text."""
+        exercise = _mc_exercise(correct_answer_id=None, correct_answer="A data type")
+        assert grade_answer("C", exercise=exercise).is_correct
+
+    @pytest.mark.parametrize("answer", ["D", "maybe the second one", "recursion is neat"])
+    def test_unmappable_defers_to_llm(self, answer: str):
+        """Unknown option references return None."""
+        assert grade_answer(answer, exercise=_mc_exercise()) is None
+
+    def test_missing_key_defers_to_llm(self):
+        """Without an answer key there is nothing to grade against."""
+        assert grade_answer("B", exercise=_mc_exercise(correct_answer_id=None)) is None
+
+    @pytest.mark.parametrize("answer, correct", [("True", True), ("t", True), ("no", False)])
+    def test_true_false_assessment(self, answer: str, correct: bool):
+        """True/false options match by id, text or boolean words."""
+        question = AssessmentQuestion(
+            id="q_tf",
+            type="true_false",
+            question_text="Recursion needs a base case.",
+            options=[Option(id="A", text="True"), Option(id="B", text="False")],
+            correct_answer_id="A",
+        )
+        assert grade_answer(answer, assessment=question).is_correct is correct
+
+    def test_true_false_without_options(self):
+        """A literal true/false key is enough."""
+        exercise = Exercise(id="ex_tf", type="true_false", correct_answer="False")
+        result = grade_answer("false", exercise=exercise)
+        assert result.is_correct and result.score == 1.0
+        assert not grade_answer("yes", exercise=exercise).is_correct
+
+
+class TestOrderingGrading:
+    """Ordering grading with partial credit."""
+
+    @pytest.mark.parametrize(
+        "answer",
+        ["Parse, Plan, Execute, Report", "1, 2, 3, 4", "a > b > c > d",
+         "1. parse\n2. plan\n3. execute\n4. report"],
+    )
+    def test_correct_order_forms(self, answer: str):
+        """Item text, numbers, letters and numbered lines are accepted."""
+        result = grade_answer(answer, exercise=_ordering_exercise())
+        assert result.is_correct and result.score == 1.0
+
+    def test_partial_credit(self):
+        """One adjacent swap keeps 5 of 6 pairs in order."""
+        result = grade_answer("Parse, Execute, Plan, Report", exercise=_ordering_exercise())
+        assert not result.is_correct
+        assert result.score == pytest.approx(5 / 6, abs=1e-3)
+        assert "2 of 4 items" in result.feedback
+        assert "Parse → Plan → Execute → Report" in result.feedback
+
+    def test_reversed_scores_zero(self):
+        """A fully reversed order has no concordant pairs."""
+        result = grade_answer("Report, Execute, Plan, Parse", exercise=_ordering_exercise())
+        assert result.score == 0.0
+
+    def test_key_as_string(self):
+        """A comma-separated string key works like a list."""
+        exercise = _ordering_exercise(correct_answer="Plan, Parse, Execute, Report")
+        assert grade_answer("2, 1, 3, 4", exercise=exercise).is_correct
+
+    @pytest.mark.parametrize("answer", ["Parse, Plan", "Parse, Parse, Plan, Report", "first then last"])
+    def test_incomplete_or_unknown_defers_to_llm(self, answer: str):
+        """Missing, duplicate or unknown items return None."""
+        assert grade_answer(answer, exercise=_ordering_exercise()) is None
+
+
+class TestFreeText:
+    """Free-text items are left to the LLM."""
+
+    def test_short_answer_not_graded(self):
+        exercise = Exercise(id="ex_sa", type="short_answer", correct_answer="4")
+        assert grade_answer("4", exercise=exercise) is None
+
+    def test_format_feedback(self):
+        """The explanation is appended to the feedback line."""
+        result = EvaluationResult(score=1.0, is_correct=True, feedback="Correct!", explanation="Why.")
+        assert format_feedback(result) == "Correct!\n\n*Explanation:* Why."
@@ -0,0 +1,192 @@
+# backend/tests/ai/lessons/test_intent_fast_path.py
+"""Tests for backend/ai/lessons/intent_fast_path.py and its use in the intent nodes"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+from typing import Any, Dict, Optional
+from unittest.mock import patch
+
+import pytest
+
+from backend.ai.lessons import intent_fast_path, nodes
+from backend.ai.lessons.intent_fast_path import (NgramNaiveBayes,
+                                                 classify_intent_fast,
+                                                 get_fast_path_stats)
+from backend.metrics import metrics
+from backend.models import Exercise, GeneratedLessonContent
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    """Isolates fast-path counters per test."""
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestClassifyIntentFast:
+    """Tests for the rules and the n-gram model."""
+
+    @pytest.mark.parametrize(
+        "message, expected",
+        [
+            ("Give me an exercise", "request_exercise"),
+            ("can I have another exercise please", "request_exercise"),
+            ("Quiz me", "request_assessment"),
+            ("I'd like to take the test", "request_assessment"),
+            ("Thanks!", "other_chat"),
+            ("What is recursion?", "ask_question"),
+            ("I'm ready to be tested", "request_assessment"),
+        ],
+    )
+    def test_confident_without_task(self, message: str, expected: str):
+        """Common phrasings are classified locally."""
+        result = classify_intent_fast(message)
+        assert result is not None
+        assert result.intent == expected
+
+    @pytest.mark.parametrize(
+        "message",
+        ["B", "b)", "True", "The answer is C", "I think it's A"],
+    )
+    def test_answers_need_active_task(self, message: str):
+        """Bare answers are submissions only while a task is active."""
+        result = classify_intent_fast(message, has_active_task=True)
+        assert result is not None and result.intent == "submit_answer"
+        assert classify_intent_fast(message, has_active_task=False) is None
+
+    @pytest.mark.parametrize(
+        "message, has_active_task",
+        [
+            ("Gibberish", False),
+            ("What is a quiz?", False),
+            ("I want to know how tests work in pytest", False),
+            ("Recursion is when a function calls itself", True),
+            ("What is recursion?", True),
+        ],
+    )
+    def test_defers_to_llm(self, message: str, has_active_task: bool):
+        """Ambiguous, out-of-distribution and free-text answers go to the LLM."""
+        assert classify_intent_fast(message, has_active_task=has_active_task) is None
+
+    @pytest.mark.parametrize(
+        "message, has_active_task",
+        [
+            (message, active)
+            for message in (
+                "I have a problem with understanding recursion",
+                "how do tasks work in asyncio",
+                "I need more practice with pointers before I move on",
+                "I want to test whether my loop terminates",
+            )
+            for active in (False, True)
+        ]
+        + [("give me the exercise answer", True), ("show me the exercise again", True)],
+    )
+    def test_chat_mentioning_tasks_is_not_a_request(self, message: str, has_active_task: bool):
+        """Only request forms start a task; other mentions of tasks go to the LLM."""
+        result = classify_intent_fast(message, has_active_task=has_active_task)
+        assert result is None or result.intent not in ("request_exercise", "request_assessment")
+
+    @pytest.mark.parametrize(
+        "message, expected",
+        [
+            ("give me a hard exercise.", "request_exercise"),
+            ("can we do a practice problem", "request_exercise"),
+            ("I'd like an exercise about recursion", "request_exercise"),
+            ("could you quiz me on loops", "request_assessment"),
+            ("give me a quiz on loops please", "request_assessment"),
+        ],
+    )
+    def test_request_forms_with_active_task(self, message: str, expected: str):
+        """Explicit requests are recognised by the rules while a task is active."""
+        result = classify_intent_fast(message, has_active_task=True)
+        assert result is not None and result.intent == expected
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "i dont want an exercise",
+            "no quiz please",
+            "stop the quiz",
+            "test",
+            "do you like exercise",
+        ],
+    )
+    def test_refusals_and_non_requests_defer_to_llm(self, message: str):
+        """Only a rule starts a task; the model scores refusals like requests."""
+        assert classify_intent_fast(message) is None
+
+    def test_threshold(self):
+        """A result below the threshold is not returned."""
+        assert classify_intent_fast("Give me an exercise", threshold=0.99) is None
+
+    def test_model_fit_and_predict(self):
+        """The n-gram model learns from the provided phrases."""
+        model = NgramNaiveBayes().fit({"a": ["alpha alpha"], "b": ["beta beta"]})
+        label, probability, coverage = model.predict("alpha")
+        assert label == "a"
+        assert probability > 0.5
+        assert coverage == 1.0
+
+    def test_hit_rate_stats(self):
+        """Hits and misses are counted for the hit-rate view."""
+        classify_intent_fast("Give me an exercise")
+        classify_intent_fast("Quiz me")
+        classify_intent_fast("Gibberish")
+        stats = get_fast_path_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(2 / 3)
+        assert stats["hits_by_source"] == {"rule": 2}
+
+
+def _state(message: str, active_exercise: Optional[Exercise] = None) -> Dict[str, Any]:
+    """Minimal state with the user's message as the last history entry."""
+    return {
+        "lesson_title": "Recursion",
+        "generated_content": GeneratedLessonContent(exposition_content="..."),
+        "history_context": [{"role": "user", "content": message}],
+        "active_exercise": active_exercise,
+        "active_assessment": None,
+        "current_interaction_mode": "chatting",
+    }
+
+
+@patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+@patch("backend.ai.lessons.nodes.load_prompt")
+class TestNodesFastPath:
+    """The intent nodes skip the LLM on a fast-path hit."""
+
+    def test_classify_intent_skips_llm(self, mock_load_prompt, mock_llm):
+        """An obvious request is routed without an LLM call."""
+        result = nodes.classify_intent(_state("Give me an exercise"))
+        mock_llm.assert_not_called()
+        assert result["current_interaction_mode"] == "request_exercise"
+
+    def test_classify_intent_submit_answer(self, mock_load_prompt, mock_llm):
+        """A bare option letter with an active task is a submission."""
+        exercise = Exercise(id="ex1", type="multiple_choice", instructions="Pick one")
+        result = nodes.classify_intent(_state("B", active_exercise=exercise))
+        mock_llm.assert_not_called()
+        assert result["current_interaction_mode"] == "submit_answer"
+        assert result["potential_answer"] == "B"
+
+    def test_disabled(self, mock_load_prompt, mock_llm, monkeypatch):
+        """With the fast path disabled every message goes to the LLM."""
+        monkeypatch.setattr(intent_fast_path, "INTENT_FAST_PATH_ENABLED", False)
+        mock_llm.return_value = None
+        nodes.classify_intent(_state("Give me an exercise"))
+        mock_llm.assert_called_once()
+
+    def test_fused_node_still_calls_llm_for_chat(self, mock_load_prompt, mock_llm):
+        """In fused mode a chatting hit still needs the LLM for the reply."""
+        mock_llm.return_value = None
+        nodes.classify_and_respond(_state("Thanks!"))
+        mock_llm.assert_called_once()
+
+    def test_fused_node_skips_llm_for_tasks(self, mock_load_prompt, mock_llm):
+        """In fused mode a task request skips the fused call."""
+        result = nodes.classify_and_respond(_state("Quiz me"))
+        mock_llm.assert_not_called()
+        assert result["current_interaction_mode"] == "request_assessment"
+        assert result["new_assistant_message"] is None
@@ -25,6 +25,13 @@ DEFAULT_INITIAL_HISTORY = [{"role": "assistant", "content": "Hello"}]
 class TestLessonAIIntentClassification:
     """Tests for the intent classification logic (nodes.classify_intent)."""
 
+    @pytest.fixture(autouse=True)
+    def _llm_classification_only(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """These tests cover the LLM path; the local fast path is tested separately."""
+        monkeypatch.setattr(
+            "backend.ai.lessons.intent_fast_path.INTENT_FAST_PATH_ENABLED", False
+        )
+
     # Basic state setup helper
     def _get_base_state(
         self,
@@ -118,8 +125,6 @@ class TestLessonAIIntentClassification:
             topic="Testing",
             lesson_title="Intent Test",
             user_level="beginner",
-            exposition_summary="Some content.",
-            active_task_context="None",
         )
         mock_call_llm.assert_called_once_with(
             "mocked_intent_prompt",
@@ -164,9 +169,6 @@ class TestLessonAIIntentClassification:
         # Call the classify_intent node function (cast state)
         result_state = nodes.classify_intent(cast(Dict[str, Any], state))
 
-        expected_task_context = (
-            f"Active Exercise: {active_exercise.type} - {active_exercise.question}"
-        )
         mock_load_prompt.assert_called_once_with(
             "intent_classification",
             user_input=user_message,  # Check prompt key used in node
@@ -174,8 +176,6 @@ class TestLessonAIIntentClassification:
             topic="Testing",
             lesson_title="Intent Test",
             user_level="beginner",
-            exposition_summary="Some content.",
-            active_task_context=expected_task_context,
         )
         mock_call_llm.assert_called_once_with(
             "mocked_intent_prompt",
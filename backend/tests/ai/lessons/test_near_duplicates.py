@@ -0,0 +1,101 @@
+# backend/tests/ai/lessons/test_near_duplicates.py
+"""Tests for backend/ai/lessons/near_duplicates.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+from backend.ai.lessons import near_duplicates
+from backend.ai.lessons.near_duplicates import (
+    NearDuplicateIndex,
+    NearDuplicateIndexCache,
+    describe_item,
+    estimated_similarity,
+    existing_item_descriptions,
+    item_text,
+    minhash_signature,
+)
+from backend.models import AssessmentQuestion, Exercise, Option
+
+
+def _exercise(item_id: str, instructions: str) -> Exercise:
+    return Exercise(id=item_id, type="short_answer", instructions=instructions)
+
+
+class TestSignatures:
+    """Tests for item text and MinHash signatures"""
+
+    def test_item_text_includes_choices(self):
+        question = AssessmentQuestion(
+            id="q1",
+            type="multiple_choice",
+            question_text="Which type is immutable?",
+            options=[Option(id="a", text="list"), Option(id="b", text="tuple")],
+        )
+        assert item_text(question) == "Which type is immutable? list tuple"
+
+    def test_similarity_tracks_shared_text(self):
+        """Identical text scores 1, a small edit scores high, unrelated text low."""
+        base = minhash_signature("Explain why a recursive function needs a base case.")
+        assert len(base) == near_duplicates.NUM_PERMUTATIONS
+        assert base == minhash_signature("EXPLAIN why a recursive function needs a base case!")
+        edited = minhash_signature("Explain why every recursive function needs a base case.")
+        unrelated = minhash_signature("What does the len() function return for a list?")
+        assert estimated_similarity(base, edited) >= 0.7
+        assert estimated_similarity(base, unrelated) < 0.3
+
+    def test_blank_text_matches_nothing(self):
+        assert minhash_signature("  ?! ") == ()
+        assert estimated_similarity((), minhash_signature("text")) == 0.0
+
+
+class TestNearDuplicateIndex:
+    """Tests for NearDuplicateIndex and the prompt descriptions"""
+
+    def test_find_returns_the_closest_item_over_the_threshold(self):
+        index = NearDuplicateIndex.from_items(
+            [
+                _exercise("ex1", "Explain why a recursive function needs a base case."),
+                _exercise("ex2", "Write a loop that prints the numbers 1 to 10."),
+            ]
+        )
+        match = index.find("Explain why every recursive function needs a base case.")
+        assert match is not None and match[0] == "ex1"
+        assert index.find("Name two mutable built-in types.") is None
+
+    def test_descriptions_are_short_and_recent(self, monkeypatch):
+        """IDs without stored items are kept; only the most recent entries are listed."""
+        monkeypatch.setattr(near_duplicates, "MAX_PROMPT_ITEMS", 3)
+        items = [_exercise(f"ex{i}", f"Exercise {i} " + "word " * 40) for i in range(3)]
+
+        descriptions = existing_item_descriptions(items, ["ex_legacy", "ex0", "ex1", "ex2"])
+
+        assert descriptions == [describe_item(item) for item in items]
+        assert all(len(d) <= len("short_answer: ") + 100 for d in descriptions)
+        assert descriptions[0].startswith("short_answer: Exercise 0 word")
+        assert descriptions[0].endswith("...")
+        assert existing_item_descriptions([], ["ex_legacy"]) == ["ex_legacy"]
+
+
+class TestNearDuplicateIndexCache:
+    """Tests for NearDuplicateIndexCache"""
+
+    def test_cached_index_is_extended_with_new_items(self):
+        cache = NearDuplicateIndexCache()
+        first = _exercise("ex1", "Explain why a recursive function needs a base case.")
+        second = _exercise("ex2", "Write a loop that prints the numbers 1 to 10.")
+
+        index = cache.index_for("learner", [first])
+        extended = cache.index_for("learner", [first, second])
+
+        assert extended is index
+        assert extended.keys() == ["ex1", "ex2"]
+        assert extended.find("Write a loop that prints the numbers 1 to 10!") is not None
+
+    def test_index_is_rebuilt_when_the_items_change(self):
+        """A reset or replaced item list never reuses signatures of other items."""
+        cache = NearDuplicateIndexCache(max_entries=1)
+        index = cache.index_for("learner", [_exercise("ex1", "Define a variable.")])
+
+        rebuilt = cache.index_for("learner", [_exercise("ex9", "Name two mutable types.")])
+
+        assert rebuilt is not index and rebuilt.keys() == ["ex9"]
+        cache.index_for("other learner", [])
+        assert len(cache) == 1
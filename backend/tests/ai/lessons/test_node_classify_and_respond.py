@@ -0,0 +1,172 @@
+# backend/tests/ai/lessons/test_node_classify_and_respond.py
+"""Tests for the fused classify_and_respond node and the fused lesson graph"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+from typing import Any, Dict, Optional
+from unittest.mock import ANY, MagicMock, patch
+
+from backend.ai.lessons import nodes
+from backend.ai.lessons.lessons_graph import LessonAI
+from backend.models import (Exercise, GeneratedLessonContent,
+                            IntentAndResponseResult)
+
+
+def _get_base_state(
+    user_message: Optional[str] = "What is recursion?", **overrides: Any
+) -> Dict[str, Any]:
+    """Creates a minimal lesson state with the user's message in history_context."""
+    history = [{"role": "assistant", "content": "Welcome!"}]
+    if user_message:
+        history.append({"role": "user", "content": user_message})
+    state: Dict[str, Any] = {
+        "topic": "Programming",
+        "knowledge_level": "beginner",
+        "lesson_title": "Recursion",
+        "module_title": "Functions",
+        "generated_content": GeneratedLessonContent(exposition_content="Recursion is..."),
+        "user_id": "fused_user",
+        "history_context": history,
+        "current_interaction_mode": "chatting",
+        "generated_exercises": [],
+        "generated_assessment_questions": [],
+        "generated_exercise_ids": [],
+        "generated_assessment_question_ids": [],
+        "active_exercise": None,
+        "active_assessment": None,
+        "potential_answer": None,
+        "new_assistant_message": {"role": "assistant", "content": "stale"},
+    }
+    state.update(overrides)
+    return state
+
+
+@patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+@patch("backend.ai.lessons.nodes.load_prompt")
+class TestClassifyAndRespond:
+    """Tests for nodes.classify_and_respond."""
+
+    def test_chatting_intent_sets_reply(self, mock_load_prompt, mock_llm):
+        """A chatting intent with a reply produces the assistant message."""
+        mock_load_prompt.return_value = "fused prompt"
+        mock_llm.return_value = IntentAndResponseResult(
+            intent="ask_question", response="It calls itself."
+        )
+
+        result = nodes.classify_and_respond(_get_base_state())
+
+        mock_load_prompt.assert_called_once_with(
+            "classify_and_respond",
+            user_message="What is recursion?",
+            history_json="Assistant: Welcome!",
+            lesson_title="Recursion",
+            exposition="Recursion is...",
+            active_task_context="None",
+            latex_formatting_instructions=ANY,
+        )
+        mock_llm.assert_called_once_with(
+            "fused prompt", validation_model=IntentAndResponseResult, max_retries=3
+        )
+        assert result["current_interaction_mode"] == "chatting"
+        assert result["new_assistant_message"] == {
+            "role": "assistant",
+            "content": "It calls itself.",
+        }
+
+    def test_exercise_intent_has_no_reply(self, mock_load_prompt, mock_llm):
+        """Non-chat intents only set the mode; stale replies are cleared."""
+        mock_llm.return_value = IntentAndResponseResult(
+            intent="request_exercise", response="ignored"
+        )
+
+        result = nodes.classify_and_respond(_get_base_state("Give me an exercise"))
+
+        assert result["current_interaction_mode"] == "request_exercise"
+        assert result["new_assistant_message"] is None
+
+    def test_submit_answer_with_active_task(self, mock_load_prompt, mock_llm):
+        """Answers to an active task are routed to evaluation."""
+        exercise = Exercise(id="ex1", type="short_answer", instructions="Define recursion.")
+        mock_llm.return_value = IntentAndResponseResult(intent="submit_answer")
+
+        result = nodes.classify_and_respond(
+            _get_base_state("A function calling itself", active_exercise=exercise)
+        )
+
+        assert result["current_interaction_mode"] == "submit_answer"
+        assert result["potential_answer"] == "A function calling itself"
+        assert result["new_assistant_message"] is None
+
+    def test_llm_failure_defaults_to_chatting(self, mock_load_prompt, mock_llm):
+        """A failed call falls back to chatting without a reply."""
+        mock_llm.side_effect = RuntimeError("boom")
+
+        result = nodes.classify_and_respond(_get_base_state())
+
+        assert result["current_interaction_mode"] == "chatting"
+        assert result["new_assistant_message"] is None
+
+    def test_no_user_message(self, mock_load_prompt, mock_llm):
+        """Without a user message no LLM call is made."""
+        result = nodes.classify_and_respond(_get_base_state(user_message=None))
+
+        mock_llm.assert_not_called()
+        assert result["current_interaction_mode"] == "chatting"
+
+
+@patch("backend.ai.lessons.nodes.call_llm_plain_text")
+@patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+@patch("backend.ai.lessons.nodes.load_prompt", MagicMock(return_value="prompt"))
+class TestFusedLessonGraph:
+    """Tests for LessonAI in fused mode (real graph, mocked LLM calls)."""
+
+    def test_fused_chat_turn_makes_one_call(self, mock_json_llm, mock_plain_llm):
+        """A chatting turn ends after the fused node."""
+        mock_json_llm.return_value = IntentAndResponseResult(
+            intent="other_chat", response="Hello again!"
+        )
+        lesson_ai = LessonAI(fused=True)
+        state = _get_base_state("Thanks!")
+        history = state.pop("history_context")
+
+        final_state = lesson_ai.process_chat_turn(state, "Thanks!", history)
+
+        assert mock_json_llm.call_count == 1
+        mock_plain_llm.assert_not_called()
+        assert final_state["new_assistant_message"]["content"] == "Hello again!"
+        assert "history_context" not in final_state
+
+    def test_missing_reply_falls_back_to_chat_node(self, mock_json_llm, mock_plain_llm):
+        """A chatting intent without a reply is answered by generate_chat_response."""
+        mock_json_llm.return_value = IntentAndResponseResult(intent="ask_question")
+        mock_plain_llm.return_value = "Fallback reply"
+        lesson_ai = LessonAI(fused=True)
+        state = _get_base_state()
+        history = state.pop("history_context")
+
+        final_state = lesson_ai.process_chat_turn(state, "What is recursion?", history)
+
+        mock_plain_llm.assert_called_once()
+        assert final_state["new_assistant_message"]["content"] == "Fallback reply"
+
+    def test_exercise_turn_makes_generation_call(self, mock_json_llm, mock_plain_llm):
+        """Task requests go to the generator node, whose message is returned."""
+        mock_json_llm.return_value = IntentAndResponseResult(intent="request_exercise")
+        exercise = Exercise(id="ex1", type="short_answer", instructions="Define it.")
+        message = {"role": "assistant", "content": "Here is an exercise."}
+        with patch.object(
+            nodes,
+            "generate_new_exercise",
+            MagicMock(return_value=({"active_exercise": exercise}, exercise, message)),
+        ) as mock_generate:
+            lesson_ai = LessonAI(fused=True)
+            state = _get_base_state("Give me an exercise")
+            history = state.pop("history_context")
+            final_state = lesson_ai.process_chat_turn(state, "Give me an exercise", history)
+
+        mock_generate.assert_called_once()
+        assert final_state["active_exercise"] == exercise
+        assert final_state["new_assistant_message"] == message
+
+    def test_default_mode_is_two_call(self, mock_json_llm, mock_plain_llm):
+        """LessonAI defaults to the separate classify and respond nodes."""
+        assert LessonAI().fused is False
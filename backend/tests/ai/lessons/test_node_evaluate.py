@@ -133,10 +133,7 @@ class TestEvaluateAnswerNode:
         mock_call_llm: MagicMock,
         mock_load_prompt: MagicMock,
     ) -> None:  # Added return type hint
-        """Test evaluating an incorrect quiz answer with explanation."""
-        mock_load_prompt.return_value = "mocked_eval_prompt"
-        mock_call_llm.return_value = "Not quite. *Explanation:* Python is a language."
-
+        """Test an incorrect multiple-choice quiz answer is graded locally with explanation."""
         question = AssessmentQuestion(
             id="q_eval",
             type="multiple_choice",
@@ -144,6 +141,7 @@ class TestEvaluateAnswerNode:
             options=[Option(id="A", text="Snake"), Option(id="B", text="Language")],
             correct_answer_id="B",
             correct_answer="Language",
+            explanation="Python is a language.",
         )
         initial_history = [
             {
@@ -164,20 +162,15 @@ class TestEvaluateAnswerNode:
             cast(Dict[str, Any], state)
         )
 
-        mock_load_prompt.assert_called_once_with(
-            "evaluate_answer",
-            task_type="Assessment Question",
-            task_details=ANY,
-            correct_answer_details="Correct Answer: Language", # Match actual call
-            user_answer="A",
-            latex_formatting_instructions=LATEX_FORMATTING_INSTRUCTIONS,
-        )
-        mock_call_llm.assert_called_once_with("mocked_eval_prompt", max_retries=2)
+        # Objective items never reach the LLM
+        mock_load_prompt.assert_not_called()
+        mock_call_llm.assert_not_called()
 
         # Check the returned feedback message
         assert isinstance(feedback_message, dict)
         assert feedback_message.get("role") == "assistant"
         assert "Not quite." in feedback_message.get("content", "")
+        assert "B) Language" in feedback_message.get("content", "")
         assert "*Explanation:* Python is a language." in feedback_message.get(
             "content", ""
         )
@@ -187,6 +180,12 @@ class TestEvaluateAnswerNode:
         assert updated_state.get("current_interaction_mode") == "chatting"
         assert updated_state.get("active_assessment") is None
         assert updated_state.get("potential_answer") is None
+        assert updated_state.get("last_evaluation") == {
+            "score": 0.0,
+            "is_correct": False,
+            "feedback": "Not quite. The correct answer is B) Language.",
+            "explanation": "Python is a language.",
+        }
 
     @patch("backend.ai.lessons.nodes.logger", MagicMock())
     def test_evaluate_answer_no_user_answer(self) -> None:  # Added return type hint
@@ -94,6 +94,7 @@ class TestGenerateAssessmentNode:
             lesson_title="Gen Assess Lesson",
             user_level="intermediate",
             exposition_summary="Lesson content here.",
+            syllabus_context="Module: Module Gen, Lesson: Gen Assess Lesson",
             existing_question_descriptions_json="[]",
             latex_formatting_instructions=LATEX_FORMATTING_INSTRUCTIONS,
         )
@@ -149,33 +150,72 @@ class TestGenerateAssessmentNode:
     def test_generate_new_assessment_duplicate_id(
         self, mock_call_llm: MagicMock, mock_load_prompt: MagicMock
     ) -> None:  # Added return type hint
-        """Test discarding assessment question if LLM returns a duplicate ID."""
+        """A new question that reuses an earlier ID is kept under a fresh ID."""
         mock_load_prompt.return_value = "mocked_gen_q_prompt"
-        mock_duplicate_question = AssessmentQuestion(
+        mock_call_llm.return_value = AssessmentQuestion(
             id="q_existing",
             type="true_false",
-            question_text="Duplicate?",
-            correct_answer_id="False",
+            question_text="Tuples are immutable.",
+            correct_answer_id="True",
+        )
+
+        initial_history = [{"role": "assistant", "content": "What next?"}]
+        state = self._get_base_state(
+            history=initial_history,
+            existing_assessment_ids=["q_existing"],  # Pre-populate with the ID
+        )
+
+        updated_state, generated_question, _ = nodes.generate_new_assessment(
+            cast(Dict[str, Any], state)
+        )
+
+        assert generated_question is not None
+        assert generated_question.id.startswith("as_")
+        assert updated_state["generated_assessment_question_ids"] == [
+            "q_existing", generated_question.id
+        ]
+        assert updated_state["generated_assessment_questions"] == [generated_question]
+
+    @patch("backend.ai.lessons.nodes.load_prompt")
+    @patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+    @patch("backend.ai.lessons.nodes.logger", MagicMock())
+    def test_generate_new_assessment_near_duplicate(
+        self, mock_call_llm: MagicMock, mock_load_prompt: MagicMock
+    ) -> None:
+        """Test discarding a question that repeats an earlier one under a new ID."""
+        mock_load_prompt.return_value = "mocked_gen_q_prompt"
+        earlier = AssessmentQuestion(
+            id="q_existing",
+            type="true_false",
+            question_text="A Python list can hold values of different types.",
+            correct_answer_id="True",
+        )
+        mock_call_llm.return_value = AssessmentQuestion(
+            id="q_new",
+            type="true_false",
+            question_text="A Python list can hold values of different types?",
+            correct_answer_id="True",
         )
-        mock_call_llm.return_value = mock_duplicate_question
 
         initial_history = [{"role": "assistant", "content": "What next?"}]
         state = self._get_base_state(
             history=initial_history,
             existing_assessment_ids=["q_existing"],  # Pre-populate with the ID
         )
+        state["generated_assessment_questions"] = [earlier]
 
         # Cast state before calling node
         updated_state, generated_question, assistant_message = (
             nodes.generate_new_assessment(cast(Dict[str, Any], state))
         )
 
-        mock_call_llm.assert_called_once()
+        # Every bounded retry produced the same repeat
+        assert mock_call_llm.call_count == 1 + nodes.NEAR_DUPLICATE_RETRIES
         assert generated_question is None
         assert updated_state["active_assessment"] is None
         assert updated_state["generated_assessment_question_ids"] == ["q_existing"]
         assert updated_state["current_interaction_mode"] == "chatting"
-        assert updated_state["error_message"] == "Duplicate assessment ID generated."
+        assert updated_state["error_message"] == "Near-duplicate assessment question generated."
 
         # Check the returned assistant message
         assert assistant_message is not None
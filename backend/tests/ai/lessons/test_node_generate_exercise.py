@@ -8,7 +8,7 @@ from typing import Optional, List, Dict, Any, cast # Added imports
 
 
 # Import the node functions directly
-from backend.ai.lessons import nodes
+from backend.ai.lessons import near_duplicates, nodes
 from backend.models import (
     Exercise,
     GeneratedLessonContent,
@@ -149,15 +149,14 @@ class TestGenerateExerciseNode:
     def test_generate_new_exercise_duplicate_id(
         self, mock_call_llm: MagicMock, mock_load_prompt: MagicMock
     ) -> None: # Added return type hint
-        """Test discarding exercise if LLM returns a duplicate ID."""
+        """A new exercise that reuses an earlier ID is kept under a fresh ID."""
         mock_load_prompt.return_value = "mocked_gen_ex_prompt"
-        mock_duplicate_exercise = Exercise(
+        mock_call_llm.return_value = Exercise(
             id="ex_existing",
             type="short_answer",
-            instructions="Duplicate?",
-            correct_answer="No",
+            instructions="Name two mutable built-in types.",
+            correct_answer="list, dict",
         )
-        mock_call_llm.return_value = mock_duplicate_exercise
 
         initial_history = [{"role": "assistant", "content": "What next?"}]
         state = self._get_base_state(
@@ -165,23 +164,126 @@ class TestGenerateExerciseNode:
             existing_exercise_ids=["ex_existing"] # Pre-populate with the ID
         )
 
-        # Cast state before calling node
+        updated_state, generated_exercise, _ = nodes.generate_new_exercise(
+            cast(Dict[str, Any], state)
+        )
+
+        assert generated_exercise is not None
+        assert generated_exercise.id.startswith("ex_")
+        assert generated_exercise.id != "ex_existing"
+        assert updated_state["generated_exercise_ids"] == ["ex_existing", generated_exercise.id]
+        assert updated_state["generated_exercises"] == [generated_exercise]
+        assert updated_state["current_interaction_mode"] == "awaiting_answer"
+
+    @patch("backend.ai.lessons.nodes.load_prompt")
+    @patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+    @patch("backend.ai.lessons.nodes.logger", MagicMock())
+    def test_generate_new_exercise_near_duplicate(
+        self, mock_call_llm: MagicMock, mock_load_prompt: MagicMock
+    ) -> None:
+        """Test discarding an exercise that rephrases an earlier one under a new ID."""
+        mock_load_prompt.return_value = "mocked_gen_ex_prompt"
+        earlier = Exercise(
+            id="ex_existing",
+            type="short_answer",
+            instructions="Explain why a recursive function needs a base case.",
+        )
+        mock_call_llm.return_value = Exercise(
+            id="ex_new",
+            type="short_answer",
+            instructions="Explain why a recursive function needs a base case!",
+        )
+
+        initial_history = [{"role": "assistant", "content": "What next?"}]
+        state = self._get_base_state(
+            history=initial_history, existing_exercise_ids=["ex_existing"]
+        )
+        state["generated_exercises"] = [earlier]
+
         updated_state, generated_exercise, assistant_message = nodes.generate_new_exercise(
             cast(Dict[str, Any], state)
         )
 
-        mock_call_llm.assert_called_once()
+        # The model was told what the earlier exercise asked
+        prompt_kwargs = mock_load_prompt.call_args.kwargs
+        assert "Explain why a recursive function" in (
+            prompt_kwargs["existing_exercise_descriptions_json"]
+        )
+        # Every bounded retry produced the same repeat
+        assert mock_call_llm.call_count == 1 + nodes.NEAR_DUPLICATE_RETRIES
         assert generated_exercise is None
         assert updated_state["active_exercise"] is None
         assert updated_state["generated_exercise_ids"] == ["ex_existing"] # Should not change
         assert updated_state["current_interaction_mode"] == "chatting"
-        assert updated_state["error_message"] == "Duplicate exercise ID generated."
+        assert updated_state["error_message"] == "Near-duplicate exercise generated."
 
         # Check the returned assistant message
         assert assistant_message is not None
         assert assistant_message["role"] == "assistant"
         assert "Sorry, I couldn't come up with a new exercise" in assistant_message["content"]
 
+    @patch("backend.ai.lessons.nodes.load_prompt")
+    @patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+    @patch("backend.ai.lessons.nodes.logger", MagicMock())
+    def test_generate_new_exercise_retries_after_near_duplicate(
+        self, mock_call_llm: MagicMock, mock_load_prompt: MagicMock
+    ) -> None:
+        """A near-duplicate is regenerated, with the discarded exercise listed in the prompt."""
+        mock_load_prompt.return_value = "mocked_gen_ex_prompt"
+        earlier = Exercise(
+            id="ex_existing",
+            type="short_answer",
+            instructions="Explain why a recursive function needs a base case.",
+        )
+        mock_call_llm.side_effect = [
+            Exercise(
+                id="ex_repeat",
+                type="short_answer",
+                instructions="Explain why every recursive function needs a base case.",
+            ),
+            Exercise(
+                id="ex_new", type="short_answer", instructions="Name two mutable built-in types."
+            ),
+        ]
+        state = self._get_base_state(existing_exercise_ids=["ex_existing"])
+        state["generated_exercises"] = [earlier]
+
+        updated_state, generated_exercise, _ = nodes.generate_new_exercise(
+            cast(Dict[str, Any], state)
+        )
+
+        assert mock_call_llm.call_count == 2
+        retry_descriptions = mock_load_prompt.call_args.kwargs[
+            "existing_exercise_descriptions_json"
+        ]
+        assert "every recursive function" in retry_descriptions
+        assert generated_exercise is not None and generated_exercise.id == "ex_new"
+        assert updated_state["generated_exercise_ids"] == ["ex_existing", "ex_new"]
+
+    @patch("backend.ai.lessons.nodes.load_prompt", MagicMock(return_value="prompt"))
+    @patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+    @patch("backend.ai.lessons.nodes.logger", MagicMock())
+    def test_generate_new_exercise_reuses_the_learners_index(
+        self, mock_call_llm: MagicMock
+    ) -> None:
+        """The learner's signatures are built once and extended with each new exercise."""
+        mock_call_llm.side_effect = [
+            Exercise(id="ex1", type="short_answer", instructions="Name two mutable types."),
+            Exercise(id="ex2", type="short_answer", instructions="Write a loop printing 1 to 10."),
+        ]
+        state = cast(Dict[str, Any], self._get_base_state())
+
+        with patch.object(
+            near_duplicates.NearDuplicateIndex,
+            "from_items",
+            wraps=near_duplicates.NearDuplicateIndex.from_items,
+        ) as mock_from_items:
+            state, _, _ = nodes.generate_new_exercise(state)
+            state, exercise, _ = nodes.generate_new_exercise(state)
+
+        assert exercise is not None and exercise.id == "ex2"
+        assert mock_from_items.call_count <= 1
+
     @patch("backend.ai.lessons.nodes.logger", MagicMock())
     def test_generate_new_exercise_missing_content(self) -> None: # Added return type hint
         """Test exercise generation fails if exposition content is missing."""
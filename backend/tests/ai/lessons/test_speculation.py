@@ -0,0 +1,138 @@
+# backend/tests/ai/lessons/test_speculation.py
+"""Tests for speculative chat generation in LessonAI (backend/ai/lessons/speculation.py)"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import time
+from typing import Any, Dict
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.ai.circuit_breaker import CircuitState
+from backend.ai.lessons import intent_fast_path, nodes, speculation
+from backend.ai.lessons.lessons_graph import LessonAI
+from backend.ai.llm_quota import QuotaBudget
+from backend.metrics import metrics
+from backend.models import GeneratedLessonContent, IntentClassificationResult
+
+LLM_DELAY = 0.15
+
+
+@pytest.fixture(autouse=True)
+def _isolate(monkeypatch):
+    """Resets metrics and routes every message through the LLM classifier."""
+    metrics.reset()
+    monkeypatch.setattr(intent_fast_path, "INTENT_FAST_PATH_ENABLED", False)
+    monkeypatch.setattr(speculation, "quota_budget", QuotaBudget())
+    yield
+    metrics.reset()
+
+
+def _slow(value: Any):
+    """Side effect returning `value` after a simulated LLM delay."""
+
+    def _call(*args: Any, **kwargs: Any) -> Any:
+        time.sleep(LLM_DELAY)
+        return value
+
+    return _call
+
+
+def _turn(lesson_ai: LessonAI, message: str) -> Dict[str, Any]:
+    """Runs one chat turn with a minimal lesson state."""
+    state: Dict[str, Any] = {
+        "lesson_title": "Recursion",
+        "generated_content": GeneratedLessonContent(exposition_content="Recursion is..."),
+        "user_id": "spec_user",
+        "current_interaction_mode": "chatting",
+        "active_exercise": None,
+        "active_assessment": None,
+    }
+    history = [{"role": "user", "content": message}]
+    return lesson_ai.process_chat_turn(state, message, history)
+
+
+def _outcomes() -> Dict[str, float]:
+    return speculation.get_speculation_stats()["outcomes"]
+
+
+@patch("backend.ai.lessons.nodes.load_prompt", MagicMock(return_value="prompt"))
+@patch("backend.ai.lessons.nodes.call_llm_plain_text")
+@patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+class TestSpeculativeChat:
+    """Tests for LessonAI(speculative=True)."""
+
+    def test_hit_overlaps_classification_and_reply(self, mock_json_llm, mock_plain_llm):
+        """A chatting turn takes about one LLM round trip instead of two."""
+        mock_json_llm.side_effect = _slow(IntentClassificationResult(intent="ask_question"))
+        mock_plain_llm.side_effect = _slow("Speculative reply")
+        lesson_ai = LessonAI(speculative=True)
+
+        start = time.monotonic()
+        final_state = _turn(lesson_ai, "Tell me more")
+        elapsed = time.monotonic() - start
+
+        assert final_state["new_assistant_message"]["content"] == "Speculative reply"
+        assert final_state["current_interaction_mode"] == "chatting"
+        assert elapsed < 2 * LLM_DELAY
+        assert _outcomes() == {"hit": 1}
+        assert speculation.get_speculation_stats()["saved_seconds_total"] > LLM_DELAY / 2
+
+    def test_miss_discards_reply(self, mock_json_llm, mock_plain_llm):
+        """A task intent discards the speculative reply and runs the task node."""
+        mock_json_llm.side_effect = _slow(IntentClassificationResult(intent="request_exercise"))
+        mock_plain_llm.side_effect = _slow("Unused reply")
+        message = {"role": "assistant", "content": "Here is an exercise."}
+        with patch.object(
+            nodes, "generate_new_exercise", MagicMock(return_value=({}, None, message))
+        ):
+            lesson_ai = LessonAI(speculative=True)
+            final_state = _turn(lesson_ai, "Tell me more")
+
+        assert final_state["new_assistant_message"] == message
+        assert final_state["current_interaction_mode"] == "request_exercise"
+        outcome = next(iter(_outcomes()))
+        assert outcome in ("cancelled", "discarded")
+        if outcome == "discarded":
+            time.sleep(LLM_DELAY * 1.5)
+            assert speculation.get_speculation_stats()["wasted_seconds_total"] > 0
+
+    def test_skipped_without_quota_headroom(self, mock_json_llm, mock_plain_llm, monkeypatch):
+        """No speculation when low-priority quota is exhausted."""
+        budget = QuotaBudget(requests_per_minute=1)
+        budget.record(10)
+        monkeypatch.setattr(speculation, "quota_budget", budget)
+        mock_json_llm.return_value = IntentClassificationResult(intent="request_exercise")
+        with patch.object(nodes, "generate_new_exercise", MagicMock(return_value=({}, None, None))):
+            _turn(LessonAI(speculative=True), "Tell me more")
+
+        mock_plain_llm.assert_not_called()
+        assert _outcomes() == {"skipped_quota": 1}
+
+    def test_skipped_when_breaker_not_closed(self, mock_json_llm, mock_plain_llm, monkeypatch):
+        """No speculation while the primary model's circuit is open."""
+        monkeypatch.setattr(speculation.llm_utils, "MODEL_NAME", "spec-model")
+        monkeypatch.setattr(
+            speculation, "get_breaker", MagicMock(return_value=MagicMock(state=CircuitState.OPEN))
+        )
+        mock_json_llm.return_value = IntentClassificationResult(intent="ask_question")
+        mock_plain_llm.return_value = "Normal reply"
+
+        final_state = _turn(LessonAI(speculative=True), "Tell me more")
+
+        assert final_state["new_assistant_message"]["content"] == "Normal reply"
+        assert _outcomes() == {"skipped_breaker_open": 1}
+
+    def test_fast_path_hit_skips_speculation(self, mock_json_llm, mock_plain_llm, monkeypatch):
+        """Locally classified task requests never start a speculative call."""
+        monkeypatch.setattr(intent_fast_path, "INTENT_FAST_PATH_ENABLED", True)
+        with patch.object(nodes, "generate_new_exercise", MagicMock(return_value=({}, None, None))):
+            _turn(LessonAI(speculative=True), "Give me an exercise")
+
+        mock_json_llm.assert_not_called()
+        mock_plain_llm.assert_not_called()
+        assert not _outcomes()
+
+    def test_fused_mode_disables_speculation(self, mock_json_llm, mock_plain_llm):
+        """Speculation only applies to the two-call graph."""
+        assert LessonAI(fused=True, speculative=True).speculative is False
@@ -0,0 +1 @@
+# backend/tests/ai/syllabus/__init__.py
@@ -0,0 +1,94 @@
+# backend/tests/ai/syllabus/test_syllabus_graph.py
+"""Tests for backend/ai/syllabus/syllabus_graph.py and concurrent syllabus creation"""
+# pylint: disable=protected-access, unused-argument, invalid-name, redefined-outer-name
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.ai.syllabus import nodes as syllabus_nodes
+from backend.ai.syllabus.syllabus_graph import SyllabusAI
+from backend.services.syllabus_service import SyllabusService
+
+
+@pytest.fixture
+def rendezvous():
+    """Two runs must both be inside generate_syllabus at once to pass it."""
+    return threading.Barrier(2, timeout=5)
+
+
+@pytest.fixture
+def syllabus_ai(monkeypatch, rendezvous):
+    """A SyllabusAI whose nodes skip the database, web search and LLM."""
+    def generate_syllabus(state: Dict[str, Any], llm_model: Any) -> Dict[str, Any]:
+        if state["topic"].startswith("parallel"):
+            rendezvous.wait()
+        return {"generated_syllabus": {"topic": state["topic"], "modules": [{"title": "M"}]}}
+
+    monkeypatch.setattr(
+        syllabus_nodes, "search_database", lambda state, db_service: {"existing_syllabus": None}
+    )
+    monkeypatch.setattr(
+        syllabus_nodes, "search_internet", lambda state, tavily_client: {"search_results": []}
+    )
+    monkeypatch.setattr(syllabus_nodes, "generate_syllabus", generate_syllabus)
+    return SyllabusAI(db_service=MagicMock())
+
+
+class TestSyllabusAI:
+    """Tests for per-run state on a shared compiled graph"""
+
+    def test_generate_keeps_no_state_on_the_instance(self, syllabus_ai):
+        syllabus = syllabus_ai.generate("Python", "beginner", user_id="u1")
+
+        assert syllabus["topic"] == "Python"
+        assert syllabus_ai.state is None
+
+    def test_run_does_not_modify_the_input_state(self, syllabus_ai):
+        state = syllabus_ai.create_state("Python", "beginner")
+
+        final_state = syllabus_ai.run(state)
+
+        assert state["generated_syllabus"] is None
+        assert final_state["generated_syllabus"]["topic"] == "Python"
+
+    def test_generations_run_in_parallel(self, syllabus_ai):
+        """Two runs overlap on the same graph and each gets its own result."""
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(syllabus_ai.generate, topic, "beginner")
+                for topic in ("parallel A", "parallel B")
+            ]
+            topics = [future.result()["topic"] for future in futures]
+
+        assert topics == ["parallel A", "parallel B"]
+
+    def test_stateful_methods_still_work(self, syllabus_ai):
+        syllabus_ai.initialize("Python", "beginner", user_id="u1")
+
+        syllabus = syllabus_ai.get_or_create_syllabus()
+
+        assert syllabus["topic"] == "Python"
+        assert syllabus_ai.get_syllabus()["topic"] == "Python"
+
+
+@pytest.mark.asyncio
+async def test_service_creates_syllabi_concurrently(syllabus_ai):
+    """create_syllabus runs the graph off the event loop, so requests overlap."""
+    db_service = MagicMock()
+    db_service.save_syllabus.side_effect = lambda topic, **kwargs: f"id-{topic}"
+    db_service.get_syllabus_by_id.side_effect = lambda syllabus_id: {
+        "topic": syllabus_id[3:], "level": "beginner", "content": {"modules": [{"title": "M"}]}
+    }
+    service = SyllabusService(db_service=db_service, syllabus_ai=syllabus_ai)
+
+    results = await asyncio.gather(
+        service.create_syllabus("parallel A", "beginner"),
+        service.create_syllabus("parallel B", "beginner"),
+    )
+
+    assert [r["topic"] for r in results] == ["parallel A", "parallel B"]
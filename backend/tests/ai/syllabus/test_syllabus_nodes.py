@@ -0,0 +1,52 @@
+# backend/tests/ai/syllabus/test_syllabus_nodes.py
+"""Tests for backend/ai/syllabus/nodes.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import threading
+from unittest.mock import MagicMock
+
+from requests import RequestException
+
+from backend.ai.syllabus import nodes as syllabus_nodes
+
+STATE = {"topic": "Python", "user_knowledge_level": "beginner"}
+
+
+class TestSearchInternet:
+    """Tests for search_internet()"""
+
+    def test_queries_run_concurrently(self):
+        """Both queries must be in flight at once to get past the barrier."""
+        barrier = threading.Barrier(2, timeout=2)
+
+        def search(query, **params):
+            barrier.wait()
+            return {"results": [{"content": f"result for {params['max_results']}"}]}
+
+        client = MagicMock()
+        client.search.side_effect = search
+
+        result = syllabus_nodes.search_internet(STATE, client)
+
+        # Results keep the order of the queries, not of completion
+        assert result["search_results"] == ["result for 2", "result for 3"]
+
+    def test_failed_query_keeps_the_other_results(self):
+        def search(query, **params):
+            if "include_domains" in params:
+                raise RequestException("connection reset")
+            return {"results": [{"content": "course outline"}, {"content": ""}]}
+
+        client = MagicMock()
+        client.search.side_effect = search
+
+        result = syllabus_nodes.search_internet(STATE, client)
+
+        assert result["search_results"] == [
+            "Error during web search: connection reset",
+            "course outline",
+        ]
+
+    def test_without_client(self):
+        result = syllabus_nodes.search_internet(STATE, None)
+        assert result == {"search_results": ["Tavily client not available."]}
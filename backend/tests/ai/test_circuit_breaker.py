@@ -0,0 +1,166 @@
+# backend/tests/ai/test_circuit_breaker.py
+"""Tests for backend/ai/circuit_breaker.py and breaker routing in llm_utils"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.ai import llm_utils
+from backend.ai.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _make_breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(
+        name="test-model",
+        failure_rate_threshold=0.5,
+        slow_call_seconds=2.0,
+        slow_call_rate_threshold=0.5,
+        window_size=4,
+        min_calls=4,
+        cooldown_seconds=10.0,
+        clock=clock,
+    )
+
+
+class TestCircuitBreaker:
+    """Tests for the CircuitBreaker state machine."""
+
+    def test_stays_closed_below_min_calls(self):
+        """A few failures below min_calls do not open the breaker."""
+        breaker = _make_breaker(FakeClock())
+        for _ in range(3):
+            breaker.record_failure(0.1)
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.allow_request() is True
+
+    def test_opens_on_error_rate(self):
+        """Breaker opens once the failure rate crosses the threshold."""
+        breaker = _make_breaker(FakeClock())
+        breaker.record_success(0.1)
+        breaker.record_success(0.1)
+        breaker.record_failure(0.1)
+        breaker.record_failure(0.1)
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.allow_request() is False
+
+    def test_opens_on_slow_calls(self):
+        """Breaker opens when too many calls exceed the latency threshold."""
+        breaker = _make_breaker(FakeClock())
+        breaker.record_success(0.1)
+        breaker.record_success(0.1)
+        breaker.record_success(5.0)
+        breaker.record_success(5.0)
+        assert breaker.state == CircuitState.OPEN
+
+    def test_half_open_probe_success_closes(self):
+        """After the cooldown a single probe is allowed; success closes the breaker."""
+        clock = FakeClock()
+        breaker = _make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure(0.1)
+        assert breaker.state == CircuitState.OPEN
+
+        clock.now = 11.0
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request() is True
+        # Only one probe at a time
+        assert breaker.allow_request() is False
+
+        breaker.record_success(0.1)
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.allow_request() is True
+
+    def test_half_open_probe_failure_reopens(self):
+        """A failed probe re-opens the breaker and restarts the cooldown."""
+        clock = FakeClock()
+        breaker = _make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure(0.1)
+        clock.now = 11.0
+        assert breaker.allow_request() is True
+        breaker.record_failure(0.1)
+        assert breaker.state == CircuitState.OPEN
+
+        clock.now = 15.0
+        assert breaker.state == CircuitState.OPEN
+        clock.now = 22.0
+        assert breaker.state == CircuitState.HALF_OPEN
+
+    def test_snapshot(self):
+        """Snapshot reports state and rates."""
+        breaker = _make_breaker(FakeClock())
+        breaker.record_success(0.1)
+        breaker.record_failure(0.1)
+        snapshot = breaker.snapshot()
+        assert snapshot["state"] == "closed"
+        assert snapshot["window_calls"] == 2
+        assert snapshot["failure_rate"] == pytest.approx(0.5)
+
+
+class TestGenerateContentRouting:
+    """Tests for breaker-aware routing in llm_utils.generate_content."""
+
+    @patch("backend.ai.llm_utils.get_breaker")
+    @patch("backend.ai.llm_utils.FALLBACK_MODEL_NAME", "fallback-model")
+    @patch("backend.ai.llm_utils.FALLBACK_MODEL")
+    @patch("backend.ai.llm_utils.MODEL_NAME", "primary-model")
+    @patch("backend.ai.llm_utils.MODEL")
+    def test_routes_to_fallback_when_primary_open(
+        self, mock_model, mock_fallback, mock_get_breaker
+    ):
+        """An open primary circuit routes the call to the fallback model without calling the primary."""
+        primary_breaker = MagicMock()
+        primary_breaker.allow_request.return_value = False
+        fallback_breaker = MagicMock()
+        fallback_breaker.allow_request.return_value = True
+        mock_get_breaker.side_effect = lambda name: (
+            primary_breaker if name == "primary-model" else fallback_breaker
+        )
+        mock_fallback.generate_content.return_value = MagicMock(text="from fallback")
+
+        response = llm_utils.generate_content("hello", max_retries=0)
+
+        assert response.text == "from fallback"
+        mock_model.generate_content.assert_not_called()
+        mock_fallback.generate_content.assert_called_once_with("hello")
+        fallback_breaker.record_success.assert_called_once()
+
+    @patch("backend.ai.llm_utils.get_breaker")
+    @patch("backend.ai.llm_utils.FALLBACK_MODEL", None)
+    @patch("backend.ai.llm_utils.MODEL_NAME", "primary-model")
+    @patch("backend.ai.llm_utils.MODEL")
+    def test_open_circuit_without_fallback_raises(self, mock_model, mock_get_breaker):
+        """Without a fallback, an open circuit fails fast."""
+        mock_get_breaker.return_value.allow_request.return_value = False
+
+        with pytest.raises(CircuitOpenError):
+            llm_utils.generate_content("hello", max_retries=0)
+        mock_model.generate_content.assert_not_called()
+
+    @patch("backend.ai.llm_utils.get_breaker")
+    @patch("backend.ai.llm_utils.FALLBACK_MODEL", None)
+    @patch("backend.ai.llm_utils.MODEL_NAME", "primary-model")
+    @patch("backend.ai.llm_utils.MODEL")
+    def test_failures_are_recorded(self, mock_model, mock_get_breaker):
+        """Errors from the model are recorded on the breaker."""
+        breaker = mock_get_breaker.return_value
+        breaker.allow_request.return_value = True
+        mock_model.generate_content.side_effect = ValueError("boom")
+
+        assert llm_utils.call_llm_plain_text("hello", max_retries=0) is None
+        breaker.record_failure.assert_called_once()
@@ -0,0 +1,202 @@
+# backend/tests/ai/test_llm_backends.py
+"""Tests for backend/ai/llm_backends.py (backend selection and the fake LLM)"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import glob
+import json
+import os
+import time
+
+import pytest
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+
+from backend.ai import llm_backends
+from backend.ai.llm_backends import (FakeGenerativeModel, FakeLLMConfig,
+                                     create_generative_model)
+from backend.ai.llm_utils import _parse_json_response
+from backend.ai.onboarding.prompts import (EVALUATE_ANSWER_PROMPT,
+                                           GENERATE_QUESTION_PROMPT)
+from backend.ai.prompt_loader import PROMPT_DIR, PromptRegistry
+from backend.ai.syllabus.nodes import _validate_syllabus_structure
+from backend.ai.syllabus.prompts import (GENERATION_PROMPT_TEMPLATE,
+                                         UPDATE_PROMPT_TEMPLATE)
+from backend.models import (AssessmentQuestion, EvaluationResult, Exercise,
+                            IntentAndResponseResult,
+                            IntentClassificationResult)
+
+# Lesson prompts whose responses must validate against a model
+JSON_PROMPT_MODELS = {
+    "intent_classification": IntentClassificationResult,
+    "classify_and_respond": IntentAndResponseResult,
+    "evaluate_answer": EvaluationResult,
+    "generate_exercises": Exercise,
+    "generate_assessment": AssessmentQuestion,
+}
+
+
+@pytest.fixture(name="fake_model")
+def fixture_fake_model() -> FakeGenerativeModel:
+    """A fake model with no latency or injected failures."""
+    return FakeGenerativeModel("fake-llm", FakeLLMConfig())
+
+
+class TestBackendSelection:
+    """Tests for choosing the backend from the environment."""
+
+    def test_fake_backend_selected_by_env(self, monkeypatch):
+        """LLM_BACKEND=fake creates the fake model."""
+        monkeypatch.setenv("LLM_BACKEND", "fake")
+        assert isinstance(create_generative_model("any"), FakeGenerativeModel)
+
+    def test_unknown_backend_raises(self, monkeypatch):
+        """An unknown backend name is rejected."""
+        monkeypatch.setenv("LLM_BACKEND", "mystery")
+        with pytest.raises(ValueError):
+            create_generative_model("any")
+
+
+class TestFakeResponses:
+    """Every prompt the application sends gets a usable canned response."""
+
+    @pytest.mark.parametrize(
+        "prompt_name",
+        sorted(os.path.splitext(os.path.basename(path))[0]
+               for path in glob.glob(os.path.join(PROMPT_DIR, "*.prompt"))),
+    )
+    def test_lesson_prompts(self, fake_model, prompt_name):
+        """Each lesson prompt yields a non-empty, schema-valid response."""
+        registry = PromptRegistry(PROMPT_DIR)
+        values = {name: "Sample" for name in registry.placeholders(prompt_name)}
+        prompt = registry.render(prompt_name, **values)
+
+        text = fake_model.generate_content(prompt).text
+
+        assert text
+        model_cls = JSON_PROMPT_MODELS.get(prompt_name)
+        if model_cls:
+            parsed, outcome = _parse_json_response(text, structured=True)
+            assert outcome == "ok"
+            model_cls.model_validate(parsed)
+
+    def test_marker_matching_without_prompt_name(self, fake_model):
+        """Plain strings are matched by their template text."""
+        prompt = (
+            "Analyze the user's latest message in the context of the conversation "
+            'history to determine their intent.\nUser\'s latest message: "Give me a quiz"'
+        )
+        assert json.loads(fake_model.generate_content(prompt).text) == {
+            "intent": "request_quiz"
+        }
+
+    def test_syllabus_prompts(self, fake_model):
+        """Generation and update prompts return a valid syllabus."""
+        prompt = GENERATION_PROMPT_TEMPLATE.format(
+            topic="Node.js", knowledge_level="beginner", search_context="None"
+        )
+        syllabus = json.loads(fake_model.generate_content(prompt).text)
+        assert _validate_syllabus_structure(syllabus)
+        assert syllabus["topic"] == "Node.js"
+
+        update = UPDATE_PROMPT_TEMPLATE.format(
+            topic="Node.js",
+            knowledge_level="beginner",
+            syllabus_json=json.dumps(syllabus, indent=2),
+            feedback="More examples please",
+        )
+        assert json.loads(fake_model.generate_content(update).text) == syllabus
+
+    def test_onboarding_prompts(self, fake_model):
+        """Question and evaluation prompts follow the expected text formats."""
+        question_prompt = GENERATE_QUESTION_PROMPT.format(
+            topic="Chemistry",
+            knowledge_level="beginner",
+            difficulty_name="hard",
+            target_difficulty=3,
+            search_context="",
+            questions_asked_str="None",
+        )
+        question = fake_model.generate_content(question_prompt).text
+        assert question.startswith("Difficulty: 3\nQuestion: ")
+
+        evaluation_prompt = EVALUATE_ANSWER_PROMPT.format(
+            topic="Chemistry", current_question="What is H2O?", answer="Water",
+            search_context="",
+        )
+        classification = fake_model.generate_content(evaluation_prompt).text.split(":", 1)[0]
+        assert float(classification) in (0.0, 0.5, 1.0)
+
+    def test_responses_are_deterministic(self, fake_model):
+        """The same prompt always produces the same response."""
+        other = FakeGenerativeModel("fake-llm", FakeLLMConfig(seed=99))
+        prompt = "You are evaluating a user's answer to the following Exercise."
+        assert fake_model.generate_content(prompt).text == other.generate_content(prompt).text
+
+    def test_register_fake_responder(self, monkeypatch, fake_model):
+        """New prompts can register a canned responder."""
+        monkeypatch.setattr(llm_backends, "_RESPONDERS", list(llm_backends._RESPONDERS))
+        llm_backends.register_fake_responder("custom", "CUSTOM MARKER", lambda _: "custom!")
+        assert fake_model.generate_content("a CUSTOM MARKER prompt").text == "custom!"
+
+    def test_usage_metadata(self, fake_model):
+        """Responses report token usage like the Gemini API."""
+        response = fake_model.generate_content("hello " * 40)
+        assert response.usage_metadata.prompt_token_count > 0
+        assert response.usage_metadata.candidates_token_count > 0
+
+
+class TestFaultInjection:
+    """Tests for latency and error injection."""
+
+    def test_resource_exhausted_rate(self):
+        """A rate of 1.0 always raises ResourceExhausted."""
+        model = FakeGenerativeModel("fake-llm", FakeLLMConfig(resource_exhausted_rate=1.0))
+        with pytest.raises(ResourceExhausted):
+            model.generate_content("hello")
+
+    def test_error_rate_is_seeded(self):
+        """Injected errors follow the seed, so runs are reproducible."""
+
+        def outcomes(seed: int) -> list:
+            model = FakeGenerativeModel("fake-llm", FakeLLMConfig(error_rate=0.3, seed=seed))
+            results = []
+            for _ in range(50):
+                try:
+                    model.generate_content("hello")
+                    results.append(True)
+                except ServiceUnavailable:
+                    results.append(False)
+            return results
+
+        first = outcomes(7)
+        assert first == outcomes(7)
+        assert 0 < first.count(False) < 50
+
+    @pytest.mark.parametrize("distribution", ["fixed", "uniform", "normal", "lognormal"])
+    def test_latency_distributions(self, distribution):
+        """Sampled latencies are non-negative and centred on the mean."""
+        model = FakeGenerativeModel(
+            "fake-llm",
+            FakeLLMConfig(
+                latency_ms=100, latency_jitter_ms=20, latency_distribution=distribution
+            ),
+        )
+        samples = [model._sample_latency(0) for _ in range(500)]
+        assert min(samples) >= 0
+        assert 0.08 < sum(samples) / len(samples) < 0.12
+
+    def test_latency_is_applied(self):
+        """generate_content sleeps for the sampled latency."""
+        model = FakeGenerativeModel("fake-llm", FakeLLMConfig(latency_ms=30))
+        start = time.monotonic()
+        model.generate_content("hello")
+        assert time.monotonic() - start >= 0.025
+
+    def test_config_from_env(self, monkeypatch):
+        """LLM_FAKE_* variables populate the config; bad values fall back."""
+        monkeypatch.setenv("LLM_FAKE_LATENCY_MS", "250")
+        monkeypatch.setenv("LLM_FAKE_LATENCY_DISTRIBUTION", "bogus")
+        monkeypatch.setenv("LLM_FAKE_ERROR_RATE", "not-a-number")
+        config = FakeLLMConfig.from_env()
+        assert config.latency_ms == 250
+        assert config.latency_distribution == "fixed"
+        assert config.error_rate == 0.0
@@ -0,0 +1,53 @@
+# backend/tests/ai/test_llm_quota.py
+"""Tests for backend/ai/llm_quota.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+from backend.ai.llm_quota import LOW_PRIORITY, QuotaBudget
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestQuotaBudget:
+    """Tests for the sliding-window quota budget."""
+
+    def test_unlimited_budget_always_has_headroom(self):
+        """Without limits the budget only tracks usage."""
+        budget = QuotaBudget()
+        for _ in range(100):
+            budget.record(1000)
+        assert budget.has_headroom(LOW_PRIORITY, estimated_tokens=10**6)
+        assert budget.usage() == (100, 100000)
+
+    def test_low_priority_backs_off_first(self):
+        """Low-priority work stops at its share; normal work uses the full limit."""
+        budget = QuotaBudget(requests_per_minute=10, low_priority_share=0.5)
+        for _ in range(5):
+            budget.record(10)
+        assert not budget.has_headroom(LOW_PRIORITY)
+        assert budget.has_headroom()
+
+    def test_token_limit(self):
+        """The estimated tokens of the next call count against the limit."""
+        budget = QuotaBudget(tokens_per_minute=1000, low_priority_share=1.0)
+        budget.record(600)
+        assert budget.has_headroom(LOW_PRIORITY, estimated_tokens=400)
+        assert not budget.has_headroom(LOW_PRIORITY, estimated_tokens=401)
+
+    def test_window_expiry(self):
+        """Usage older than the window no longer counts."""
+        clock = FakeClock()
+        budget = QuotaBudget(requests_per_minute=2, clock=clock, low_priority_share=1.0)
+        budget.record(10)
+        budget.record(10)
+        assert not budget.has_headroom()
+        clock.now = 61.0
+        assert budget.has_headroom()
+        assert budget.usage() == (0, 0)
@@ -0,0 +1,99 @@
+# backend/tests/ai/test_llm_telemetry.py
+"""Tests for backend/ai/llm_telemetry.py and its wiring into llm_utils"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+
+from backend.ai import llm_telemetry, llm_utils
+from backend.ai.prompt_loader import RenderedPrompt
+from backend.metrics import metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset_telemetry():
+    """Starts each test with empty metrics and summaries."""
+    metrics.reset()
+    llm_telemetry.reset_prompt_summaries()
+    yield
+    metrics.reset()
+    llm_telemetry.reset_prompt_summaries()
+
+
+def _response(text, prompt_tokens=120, response_tokens=30):
+    response = MagicMock(text=text)
+    response.usage_metadata.prompt_token_count = prompt_tokens
+    response.usage_metadata.candidates_token_count = response_tokens
+    return response
+
+
+@llm_telemetry.llm_node
+def sample_node(prompt):
+    """A stand-in graph node issuing one LLM call."""
+    return llm_utils.call_llm_plain_text(prompt, max_retries=2, initial_delay=0)
+
+
+@patch("backend.ai.llm_utils.get_breaker")
+@patch("backend.ai.llm_utils.FALLBACK_MODEL", None)
+@patch("backend.ai.llm_utils.MODEL_NAME", "primary-model")
+@patch("backend.ai.llm_utils.MODEL")
+class TestTelemetryWiring:
+    """Telemetry recorded by llm_utils calls."""
+
+    def test_call_is_tagged_with_prompt_and_node(
+        self, mock_model, mock_get_breaker, tmp_path, monkeypatch
+    ):
+        """Prompt name, node, tokens and retries are recorded and written to NDJSON."""
+        ndjson_path = tmp_path / "llm.ndjson"
+        monkeypatch.setenv("LLM_TELEMETRY_NDJSON_PATH", str(ndjson_path))
+        mock_get_breaker.return_value.allow_request.return_value = True
+        mock_model.generate_content.side_effect = [
+            ResourceExhausted("quota"),
+            _response("hello"),
+        ]
+
+        with patch("backend.ai.llm_utils.time.sleep"):
+            result = sample_node(RenderedPrompt("Say hello", "chat_response"))
+
+        assert result == "hello"
+        summary = llm_telemetry.get_prompt_summaries()["chat_response"]
+        assert summary["calls"] == 1
+        assert summary["retries"] == 1
+        assert summary["prompt_tokens"] == 120
+        assert summary["response_tokens"] == 30
+        assert summary["nodes"] == {"sample_node": 1}
+
+        labels = {"prompt": "chat_response", "node": "sample_node"}
+        assert metrics.get_histogram("llm_call_seconds", labels)["count"] == 1
+        assert metrics.get_counter("llm_calls_total", {**labels, "outcome": "ok"}) == 1
+
+        line = json.loads(ndjson_path.read_text().strip())
+        assert line["prompt_name"] == "chat_response"
+        assert line["model"] == "primary-model"
+        assert line["retries"] == 1
+
+    def test_parse_failure_is_recorded(self, mock_model, mock_get_breaker):
+        """A response with no JSON is recorded with a parse_failed outcome."""
+        mock_get_breaker.return_value.allow_request.return_value = True
+        mock_model.generate_content.return_value = _response("no json here")
+
+        result = llm_utils.call_llm_with_json_parsing(
+            RenderedPrompt("classify", "intent_classification"), max_retries=0
+        )
+
+        assert result is None
+        summary = llm_telemetry.get_prompt_summaries()["intent_classification"]
+        assert summary["failures"] == 1
+        assert summary["nodes"] == {"unknown": 1}
+
+
+def test_untagged_prompt_uses_unknown_name():
+    """Plain strings are attributed to the 'unknown' prompt."""
+    with llm_telemetry.track_llm_call("some prompt text") as record:
+        record.set_response(MagicMock(text="abcd" * 10, usage_metadata=None))
+    assert record.prompt_name == "unknown"
+    assert record.response_tokens == 10
+    assert "unknown" in llm_telemetry.get_prompt_summaries()
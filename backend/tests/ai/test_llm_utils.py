@@ -0,0 +1,162 @@
+# backend/tests/ai/test_llm_utils.py
+"""Tests for structured output handling in backend/ai/llm_utils.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import json
+from unittest.mock import MagicMock, patch
+
+from google.api_core.exceptions import InvalidArgument
+
+from backend.ai import llm_utils
+from backend.ai.response_schema import build_response_schema, restore_map_fields
+from backend.models import (AssessmentQuestion, Exercise,
+                            IntentClassificationResult)
+
+
+def _walk(schema):
+    """Yields every node of a schema tree."""
+    yield schema
+    for child in schema.get("properties", {}).values():
+        yield from _walk(child)
+    if "items" in schema:
+        yield from _walk(schema["items"])
+
+
+class TestBuildResponseSchema:
+    """Tests for converting Pydantic models into Gemini response schemas."""
+
+    def test_exercise_schema_uses_supported_subset(self):
+        """No refs, unions, titles or free-form maps survive conversion."""
+        schema = build_response_schema(Exercise)
+        for node in _walk(schema):
+            assert "$ref" not in node
+            assert "anyOf" not in node
+            assert "title" not in node
+            assert "default" not in node
+        assert schema["required"] == ["id", "type"]
+        # Optional fields become nullable
+        assert schema["properties"]["question"] == {"type": "string", "nullable": True}
+        # Nested models are inlined
+        option_schema = schema["properties"]["options"]["items"]
+        assert option_schema["properties"]["text"] == {"type": "string"}
+        # Dict[str, str] is requested as an array of named key/value entries
+        corrections_schema = schema["properties"]["misconception_corrections"]
+        assert corrections_schema["type"] == "array"
+        assert corrections_schema["items"]["required"] == ["option_id", "correction"]
+
+    def test_assessment_and_intent_schemas(self):
+        """Required fields are kept for the other JSON-producing models."""
+        assessment_schema = build_response_schema(AssessmentQuestion)
+        assert set(assessment_schema["required"]) == {"id", "type", "question_text"}
+        intent_schema = build_response_schema(IntentClassificationResult)
+        assert intent_schema == {
+            "type": "object",
+            "properties": {"intent": {"type": "string"}},
+            "required": ["intent"],
+        }
+
+
+    def test_restore_map_fields(self):
+        """Key/value arrays become dictionaries again; dictionaries pass through."""
+        data = {
+            "id": "ex1",
+            "type": "multiple_choice",
+            "misconception_corrections": [
+                {"option_id": "A", "correction": "Loops do not call themselves."},
+                {"option_id": "B"},
+            ],
+        }
+
+        restored = restore_map_fields(Exercise, data)
+
+        assert restored["misconception_corrections"] == {"A": "Loops do not call themselves."}
+        assert restore_map_fields(Exercise, restored) == restored
+        assert restore_map_fields(Exercise, {"id": "e", "type": "t"}) == {"id": "e", "type": "t"}
+
+
+@patch("backend.ai.llm_utils.MODEL", MagicMock())
+class TestStructuredOutput:
+    """Tests for the structured-output mode of call_llm_with_json_parsing."""
+
+    @patch("backend.ai.llm_utils.generate_content")
+    def test_structured_request_carries_schema(self, mock_generate):
+        """Structured mode sends a JSON MIME type and the model's schema."""
+        mock_generate.return_value = MagicMock(text=json.dumps({"intent": "ask_question"}))
+
+        result = llm_utils.call_llm_with_json_parsing(
+            "prompt", validation_model=IntentClassificationResult, structured_output=True
+        )
+
+        assert isinstance(result, IntentClassificationResult)
+        assert result.intent == "ask_question"
+        generation_config = mock_generate.call_args.kwargs["generation_config"]
+        assert generation_config["response_mime_type"] == "application/json"
+        assert generation_config["response_schema"] == build_response_schema(
+            IntentClassificationResult
+        )
+
+    @patch("backend.ai.llm_utils.generate_content")
+    def test_structured_exercise_keeps_misconception_corrections(self, mock_generate):
+        """Corrections returned as an array validate into the Exercise map."""
+        mock_generate.return_value = MagicMock(
+            text=json.dumps(
+                {
+                    "id": "ex1",
+                    "type": "multiple_choice",
+                    "options": [{"id": "A", "text": "Recursion"}, {"id": "B", "text": "Loop"}],
+                    "correct_answer_id": "B",
+                    "misconception_corrections": [
+                        {"option_id": "A", "correction": "Recursion calls itself."}
+                    ],
+                }
+            )
+        )
+
+        result = llm_utils.call_llm_with_json_parsing(
+            "prompt", validation_model=Exercise, structured_output=True
+        )
+
+        assert isinstance(result, Exercise)
+        assert result.misconception_corrections == {"A": "Recursion calls itself."}
+
+    @patch("backend.ai.llm_utils.generate_content")
+    def test_falls_back_to_text_parser(self, mock_generate):
+        """Non-JSON structured output is still recovered by the free-text extractor."""
+        mock_generate.return_value = MagicMock(
+            text='Sure! ```json\n{"intent": "request_exercise"}\n```'
+        )
+
+        result = llm_utils.call_llm_with_json_parsing(
+            "prompt", validation_model=IntentClassificationResult, structured_output=True
+        )
+
+        assert result.intent == "request_exercise"
+        mock_generate.assert_called_once()
+
+    @patch("backend.ai.llm_utils.generate_content")
+    def test_rejected_schema_retries_in_free_text_mode(self, mock_generate):
+        """If the API rejects the structured request, the call is repeated without a schema."""
+        mock_generate.side_effect = [
+            InvalidArgument("schema not supported"),
+            MagicMock(text='{"intent": "other_chat"}'),
+        ]
+
+        result = llm_utils.call_llm_with_json_parsing(
+            "prompt", validation_model=IntentClassificationResult, structured_output=True
+        )
+
+        assert result.intent == "other_chat"
+        assert mock_generate.call_count == 2
+        assert "generation_config" not in mock_generate.call_args_list[1].kwargs
+
+    @patch("backend.ai.llm_utils.generate_content")
+    def test_free_text_mode_has_no_generation_config(self, mock_generate):
+        """Disabling structured output keeps the original free-text behaviour."""
+        mock_generate.return_value = MagicMock(text='{"intent": "ask_question"}')
+
+        result = llm_utils.call_llm_with_json_parsing(
+            "prompt", validation_model=IntentClassificationResult, structured_output=False
+        )
+
+        assert result.intent == "ask_question"
+        assert "generation_config" not in mock_generate.call_args.kwargs
@@ -0,0 +1,82 @@
+# backend/tests/ai/test_prompt_loader.py
+"""Tests for the prompt template registry in backend/ai/prompt_loader.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from backend.ai.prompt_loader import (PROMPT_DIR, PromptRegistry,
+                                      RenderedPrompt)
+
+
+def _write(path, text, mtime=None):
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestPromptRegistry:
+    """Tests for PromptRegistry."""
+
+    def test_all_shipped_prompts_compile(self):
+        """Every template in lessons/prompts is valid."""
+        registry = PromptRegistry(prompt_dir=PROMPT_DIR)
+        assert registry.load_all() >= 6
+        assert {"task_type", "task_details", "correct_answer_details", "user_answer"} <= (
+            registry.placeholders("evaluate_answer")
+        )
+
+    def test_render_served_from_memory(self, tmp_path):
+        """After loading, rendering does not reopen the file."""
+        _write(tmp_path / "greet.prompt", "Hello ${name}!")
+        registry = PromptRegistry(prompt_dir=str(tmp_path), reload_interval=60)
+        registry.load_all()
+
+        with patch("builtins.open") as mock_open:
+            rendered = registry.render("greet", name="Ada", unused="x")
+
+        mock_open.assert_not_called()
+        assert rendered == "Hello Ada!"
+        assert isinstance(rendered, RenderedPrompt)
+        assert rendered.prompt_name == "greet"
+
+    def test_missing_placeholder_raises_key_error(self, tmp_path):
+        """A placeholder without a value raises KeyError naming it."""
+        _write(tmp_path / "greet.prompt", "Hello ${name} from ${place}")
+        registry = PromptRegistry(prompt_dir=str(tmp_path))
+        with pytest.raises(KeyError, match="place"):
+            registry.render("greet", name="Ada")
+
+    def test_malformed_template_rejected_at_load(self, tmp_path):
+        """Templates with malformed placeholders fail validation on load."""
+        _write(tmp_path / "bad.prompt", "Hello ${name")
+        registry = PromptRegistry(prompt_dir=str(tmp_path))
+        with pytest.raises(ValueError, match="bad"):
+            registry.load_all()
+
+    def test_unknown_prompt_raises_file_not_found(self, tmp_path):
+        """Requesting a non-existent prompt raises FileNotFoundError."""
+        registry = PromptRegistry(prompt_dir=str(tmp_path))
+        with pytest.raises(FileNotFoundError):
+            registry.render("nope")
+
+    def test_hot_reload_on_mtime_change(self, tmp_path):
+        """A changed file is recompiled once its mtime changes."""
+        prompt_path = tmp_path / "greet.prompt"
+        _write(prompt_path, "Hello ${name}!", mtime=1_000_000)
+        registry = PromptRegistry(prompt_dir=str(tmp_path), reload_interval=0)
+        assert registry.render("greet", name="Ada") == "Hello Ada!"
+
+        _write(prompt_path, "Goodbye ${name}.", mtime=1_000_100)
+        assert registry.render("greet", name="Ada") == "Goodbye Ada."
+
+    def test_reload_disabled(self, tmp_path):
+        """A negative interval never re-checks the file."""
+        prompt_path = tmp_path / "greet.prompt"
+        _write(prompt_path, "Hello ${name}!", mtime=1_000_000)
+        registry = PromptRegistry(prompt_dir=str(tmp_path), reload_interval=-1)
+        registry.load_all()
+        _write(prompt_path, "Goodbye ${name}.", mtime=1_000_100)
+        assert registry.render("greet", name="Ada") == "Hello Ada!"
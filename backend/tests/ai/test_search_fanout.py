@@ -0,0 +1,81 @@
+# backend/tests/ai/test_search_fanout.py
+"""Tests for backend/ai/search_fanout.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import threading
+import time
+
+from backend.ai.search_fanout import fan_out
+from backend.metrics import metrics
+
+
+class TestFanOut:
+    """Tests for fan_out()"""
+
+    def test_searches_run_concurrently(self):
+        """Each search waits for the other, so sequential execution would time out."""
+        barrier = threading.Barrier(2, timeout=2)
+
+        def search(name):
+            def run():
+                barrier.wait()
+                return name
+            return run
+
+        outcomes = fan_out({"a": search("a"), "b": search("b")}, timeout=5)
+
+        assert outcomes == {"a": "a", "b": "b"}
+
+    def test_errors_are_returned_per_search(self):
+        def failing():
+            raise ValueError("bad query")
+
+        outcomes = fan_out({"ok": lambda: 1, "bad": failing}, timeout=5)
+
+        assert outcomes["ok"] == 1
+        assert isinstance(outcomes["bad"], ValueError)
+
+    def test_slow_search_is_reported_as_timeout(self):
+        """The call returns at the deadline with the searches that finished."""
+        release = threading.Event()
+
+        started = time.monotonic()
+        outcomes = fan_out({"fast": lambda: "done", "slow": lambda: release.wait(5)}, timeout=0.2)
+        elapsed = time.monotonic() - started
+        release.set()
+
+        assert elapsed < 2
+        assert outcomes["fast"] == "done"
+        assert isinstance(outcomes["slow"], TimeoutError)
+
+    def test_searches_never_queue_behind_other_calls(self):
+        """Searches of concurrent steps all run at once instead of timing out in a queue."""
+        total = 12
+        barrier = threading.Barrier(total, timeout=2)
+        results = []
+
+        def step():
+            results.append(fan_out({str(i): barrier.wait for i in range(3)}, timeout=5))
+
+        threads = [threading.Thread(target=step) for _ in range(total // 3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == total // 3
+        assert all(
+            not isinstance(outcome, Exception) for result in results for outcome in result.values()
+        )
+
+    def test_queue_wait_is_recorded(self):
+        histogram = metrics.get_histogram("internet_search_queue_wait_seconds", {"graph": "test"})
+        before = histogram["count"] if histogram else 0
+
+        fan_out({"a": lambda: 1, "b": lambda: 2}, graph="test")
+
+        histogram = metrics.get_histogram("internet_search_queue_wait_seconds", {"graph": "test"})
+        assert histogram is not None and histogram["count"] == before + 2
+
+    def test_no_searches(self):
+        assert fan_out({}) == {}
@@ -0,0 +1,69 @@
+# backend/tests/routers/test_jobs_router.py
+# pylint: disable=missing-function-docstring,missing-module-docstring, redefined-outer-name
+
+from typing import Any, Dict, Generator, List
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.dependencies import get_current_user, get_job_queue
+from backend.main import app
+from backend.models import User
+
+client = TestClient(app)
+
+
+def _job(status: str, user_id: str = "test_user_id") -> Dict[str, Any]:
+    return {
+        "job_id": "job1", "user_id": user_id, "job_type": "exercise", "status": status,
+        "attempts": 1, "max_attempts": 3, "payload": {},
+        "result": {"exercise": None, "message": "Done"} if status == "succeeded" else None,
+        "error": None, "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-01T00:00:00",
+    }
+
+
+@pytest.fixture
+def mock_job_queue() -> Generator[MagicMock, None, None]:
+    app.dependency_overrides[get_current_user] = lambda: User(
+        user_id="test_user_id", email="test@example.com", name="Test User"
+    )
+    queue = MagicMock()
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    yield queue
+    app.dependency_overrides = {}
+
+
+def test_get_job_returns_status_and_result(mock_job_queue: MagicMock) -> None:
+    mock_job_queue.get_job.return_value = _job("succeeded")
+
+    response = client.get("/jobs/job1")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["result"]["message"] == "Done"
+
+
+def test_get_job_of_other_user_is_not_found(mock_job_queue: MagicMock) -> None:
+    mock_job_queue.get_job.return_value = _job("queued", user_id="someone_else")
+
+    assert client.get("/jobs/job1").status_code == 404
+
+
+def test_job_events_stream_until_done(mock_job_queue: MagicMock) -> None:
+    mock_job_queue.get_job.return_value = _job("queued")
+
+    async def watch(job_id: str):
+        for status in ("queued", "running", "succeeded"):
+            yield _job(status)
+
+    mock_job_queue.watch = watch
+
+    response = client.get("/jobs/job1/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events: List[str] = [
+        line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event:")
+    ]
+    assert events == ["queued", "running", "succeeded"]
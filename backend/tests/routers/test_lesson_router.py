@@ -18,6 +18,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 from backend.dependencies import get_exposition_service  # New
 from backend.dependencies import get_interaction_service  # New
 from backend.dependencies import get_current_user
+from backend.dependencies import get_job_queue
 from backend.main import app
 # Import models needed for tests
 from backend.models import User, GeneratedLessonContent, Exercise, AssessmentQuestion, Metadata
@@ -245,6 +246,35 @@ def test_handle_chat_message_state_not_found(mock_interaction_service: MagicMock
     print("test_handle_chat_message_state_not_found finished")
 
 
+def test_handle_chat_message_idempotent_replay(mock_interaction_service: MagicMock) -> None:
+    """Test that a retried chat message with the same Idempotency-Key is not re-processed."""
+    ai_response = [{"role": "assistant", "content": "Once only"}]
+    mock_interaction_service.handle_chat_turn.return_value = {"responses": ai_response}
+    headers = {"Idempotency-Key": "chat-replay-key"}
+
+    first = client.post("/lesson/chat/syllabus1/0/1", json={"message": "Hi"}, headers=headers)
+    second = client.post("/lesson/chat/syllabus1/0/1", json={"message": "Hi"}, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    mock_interaction_service.handle_chat_turn.assert_awaited_once()
+
+
+def test_handle_chat_message_idempotency_key_reused(mock_interaction_service: MagicMock) -> None:
+    """Test that reusing an Idempotency-Key for a different message is rejected."""
+    mock_interaction_service.handle_chat_turn.return_value = {"responses": []}
+    headers = {"Idempotency-Key": "chat-reused-key"}
+
+    client.post("/lesson/chat/syllabus1/0/1", json={"message": "Hi"}, headers=headers)
+    response = client.post(
+        "/lesson/chat/syllabus1/0/1", json={"message": "Something else"}, headers=headers
+    )
+
+    assert response.status_code == 422
+    assert "different request" in response.json()["detail"]
+    mock_interaction_service.handle_chat_turn.assert_awaited_once()
+
+
 # --- Tests for POST /exercise/{syllabus_id}/{module_index}/{lesson_index} ---
 def test_generate_exercise_success(mock_interaction_service: MagicMock) -> None:
     """Test successfully generating an exercise."""
@@ -326,6 +356,30 @@ def test_generate_exercise_runtime_error(mock_interaction_service: MagicMock) ->
     print("test_generate_exercise_runtime_error finished")
 
 
+def test_generate_exercise_background_returns_job(mock_interaction_service: MagicMock) -> None:
+    """Test that background=true queues an exercise job instead of generating inline."""
+    job = {
+        "job_id": "job1", "job_type": "exercise", "status": "queued", "attempts": 0,
+        "max_attempts": 3, "result": None, "error": None,
+        "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-01T00:00:00",
+    }
+    mock_queue = MagicMock()
+    mock_queue.enqueue = AsyncMock(return_value=job)
+    app.dependency_overrides[get_job_queue] = lambda: mock_queue
+
+    response = client.post("/lesson/exercise/syllabus1/0/1?background=true")
+
+    assert response.status_code == 202
+    assert response.json()["job_id"] == "job1"
+    assert response.headers["location"] == "/jobs/job1"
+    mock_queue.enqueue.assert_awaited_once_with(
+        "test_user_id",
+        "exercise",
+        {"user_id": "test_user_id", "syllabus_id": "syllabus1", "module_index": 0, "lesson_index": 1},
+    )
+    mock_interaction_service.generate_exercise.assert_not_awaited()
+
+
 # --- Tests for POST /assessment/{syllabus_id}/{module_index}/{lesson_index} ---
 def test_generate_assessment_question_success(mock_interaction_service: MagicMock) -> None:
     """Test successfully generating an assessment question."""
@@ -337,10 +391,11 @@ def test_generate_assessment_question_success(mock_interaction_service: MagicMoc
     mock_question_obj = AssessmentQuestion(
         id="q_gen_1", type="true_false", question_text="Generated Q?"
     )
-    # Mock should return a tuple (question_obj, message)
-    mock_interaction_service.generate_assessment_question.return_value = (
-        mock_question_obj, None
-    )
+    # The service returns a dictionary keyed by item type
+    mock_interaction_service.generate_assessment_question.return_value = {
+        "assessment": mock_question_obj.model_dump(mode="json"),
+        "message": "Here is a question.",
+    }
     response = client.post(
         f"/lesson/assessment/{syllabus_id}/{module_index}/{lesson_index}"
     )
@@ -348,6 +403,7 @@ def test_generate_assessment_question_success(mock_interaction_service: MagicMoc
     data = response.json()
     assert data["error"] is None
     assert data["question"] == mock_question_obj.model_dump(mode="json")
+    assert data["message"] == "Here is a question."
     mock_interaction_service.generate_assessment_question.assert_awaited_once_with(
         user_id="test_user_id",
         syllabus_id=syllabus_id,
@@ -357,6 +413,26 @@ def test_generate_assessment_question_success(mock_interaction_service: MagicMoc
     print("test_generate_assessment_question_success finished")
 
 
+def test_generate_assessment_question_idempotent_replay(
+    mock_interaction_service: MagicMock,
+) -> None:
+    """Test that a replayed assessment request returns the stored question."""
+    question = AssessmentQuestion(id="q_once", type="true_false", question_text="Once?")
+    mock_interaction_service.generate_assessment_question.return_value = {
+        "assessment": question.model_dump(mode="json"),
+        "message": None,
+    }
+    headers = {"Idempotency-Key": "assessment-replay-key"}
+
+    first = client.post("/lesson/assessment/syllabus1/0/1", headers=headers)
+    second = client.post("/lesson/assessment/syllabus1/0/1", headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["question"] == question.model_dump(mode="json")
+    assert second.json() == first.json()
+    mock_interaction_service.generate_assessment_question.assert_awaited_once()
+
+
 def test_generate_assessment_question_unauthenticated() -> None:
     """Test generating assessment question without authentication."""
     print("Running test_generate_assessment_question_unauthenticated")
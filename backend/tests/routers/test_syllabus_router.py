@@ -0,0 +1,60 @@
+# backend/tests/routers/test_syllabus_router.py
+# pylint: disable=missing-function-docstring,missing-module-docstring, redefined-outer-name
+
+from typing import Generator
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.dependencies import get_current_user, get_job_queue, get_syllabus_service
+from backend.main import app
+from backend.models import User
+
+client = TestClient(app)
+
+_REQUEST = {"topic": "Python", "level": "beginner"}
+
+
+@pytest.fixture
+def mock_job_queue() -> Generator[MagicMock, None, None]:
+    queue = MagicMock()
+    queue.enqueue = AsyncMock(return_value={
+        "job_id": "job1", "user_id": "test_user_id", "job_type": "syllabus",
+        "status": "queued", "attempts": 0, "max_attempts": 3, "payload": {},
+        "result": None, "error": None,
+        "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-01T00:00:00",
+    })
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    service = MagicMock()
+    app.dependency_overrides[get_syllabus_service] = lambda: service
+    yield queue
+    app.dependency_overrides = {}
+
+
+def test_generate_syllabus_background_returns_job(mock_job_queue: MagicMock) -> None:
+    app.dependency_overrides[get_current_user] = lambda: User(
+        user_id="test_user_id", email="test@example.com", name="Test User"
+    )
+
+    response = client.post("/syllabus/generate?background=true", json=_REQUEST)
+
+    assert response.status_code == 202
+    assert response.headers["location"] == "/jobs/job1"
+    mock_job_queue.enqueue.assert_awaited_once_with(
+        "test_user_id", "syllabus",
+        {"topic": "Python", "level": "beginner", "user_id": "test_user_id"},
+    )
+
+
+def test_generate_syllabus_background_requires_authentication(
+    mock_job_queue: MagicMock,
+) -> None:
+    app.dependency_overrides[get_current_user] = lambda: User(
+        user_id="no-auth", email="no-auth@example.com", name="No Auth User"
+    )
+
+    response = client.post("/syllabus/generate?background=true", json=_REQUEST)
+
+    assert response.status_code == 401
+    mock_job_queue.enqueue.assert_not_called()
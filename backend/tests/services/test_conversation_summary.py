@@ -0,0 +1,109 @@
+# backend/tests/services/test_conversation_summary.py
+"""Tests for the rolling conversation summary kept by LessonInteractionService"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import asyncio
+import json
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.models import GeneratedLessonContent, Metadata
+from backend.services.lesson_interaction_service import LessonInteractionService
+from backend.services.lesson_state_cache import LessonStateCache
+from backend.services.sqlite_db import UnitOfWork
+
+CONTENT = GeneratedLessonContent(
+    topic="Python", level="beginner", exposition_content="Loops repeat code.",
+    metadata=Metadata(title="Loops"),
+)
+KEY = ("u1", "syl1", 0, 0)
+
+
+def _messages(n: int) -> List[Dict[str, Any]]:
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+        for i in range(n)
+    ]
+
+
+def _service(stored_messages: List[Dict[str, Any]]):
+    """Interaction service over a mocked DB holding `stored_messages`."""
+    db_service = MagicMock()
+    db_service.get_lesson_progress.return_value = None
+    db_service.save_user_progress.return_value = "prog1"
+    db_service.get_conversation_history.side_effect = (
+        lambda progress_id, offset=0: [dict(m) for m in stored_messages[offset:]]
+    )
+    db_service.unit_of_work.side_effect = lambda: UnitOfWork(db_service)
+    db_service._transaction.side_effect = lambda func: func()
+    exposition_service = MagicMock()
+    exposition_service.get_or_generate_exposition = AsyncMock(return_value=(CONTENT, 7))
+    lesson_ai = MagicMock()
+    lesson_ai.start_chat.side_effect = lambda state: state
+    lesson_ai.process_chat_turn.side_effect = lambda current_state, user_message, history: {
+        **current_state,
+        "new_assistant_message": {"role": "assistant", "content": "Hi"},
+    }
+    service = LessonInteractionService(
+        db_service, exposition_service, lesson_ai, state_cache=LessonStateCache(),
+        summary_every_turns=2, summary_keep_recent=2,
+    )
+    return service, db_service, lesson_ai
+
+
+class TestConversationSummary:
+    """Tests for summary refresh and its use as chat context"""
+
+    @pytest.mark.asyncio
+    async def test_short_conversation_is_not_summarized(self):
+        service, _, _ = _service(_messages(2))
+
+        with patch(
+            "backend.services.lesson_interaction_service.summarize_conversation"
+        ) as summarize:
+            await service.handle_chat_turn(*KEY, "hello")
+
+        assert not service._summary_tasks
+        summarize.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_summary_refreshed_in_background_and_used_next_turn(self):
+        service, db_service, lesson_ai = _service(_messages(8))
+
+        with patch(
+            "backend.services.lesson_interaction_service.summarize_conversation",
+            return_value="The user learned about loops.",
+        ) as summarize:
+            await service.handle_chat_turn(*KEY, "hello")
+            await asyncio.gather(*service._summary_tasks.values())
+
+        # All stored messages except the two most recent were folded in
+        previous_summary, summarized, topic, title = summarize.call_args.args
+        assert previous_summary is None
+        assert [m["content"] for m in summarized] == [f"message {i}" for i in range(6)]
+        progress_id, state_json = db_service.update_lesson_state.call_args.args
+        assert progress_id == "prog1"
+        assert json.loads(state_json)["summary_message_count"] == 6
+
+        await service.handle_chat_turn(*KEY, "and now?")
+
+        state = lesson_ai.process_chat_turn.call_args.kwargs["current_state"]
+        history = lesson_ai.process_chat_turn.call_args.kwargs["history"]
+        assert state["conversation_summary"] == "The user learned about loops."
+        assert [m["content"] for m in history] == ["message 6", "message 7", "and now?"]
+
+    @pytest.mark.asyncio
+    async def test_failed_summary_keeps_previous_state(self):
+        service, db_service, _ = _service(_messages(8))
+
+        with patch(
+            "backend.services.lesson_interaction_service.summarize_conversation",
+            side_effect=RuntimeError("LLM down"),
+        ):
+            await service.handle_chat_turn(*KEY, "hello")
+            await asyncio.gather(*service._summary_tasks.values())
+
+        db_service.update_lesson_state.assert_not_called()
+        assert service.state_cache.get(KEY) is None
@@ -0,0 +1,124 @@
+# backend/tests/services/test_exposition_prefetcher.py
+"""Tests for backend/services/exposition_prefetcher.py and single-flight exposition generation"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import asyncio
+import time
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.ai.llm_quota import QuotaBudget
+from backend.models import GeneratedLessonContent
+from backend.services import exposition_prefetcher
+from backend.services.exposition_prefetcher import (ExpositionPrefetcher,
+                                                    upcoming_lessons)
+from backend.services.lesson_exposition_service import LessonExpositionService
+
+SYLLABUS: Dict[str, Any] = {
+    "syllabus_id": "syl1",
+    "topic": "Python",
+    "level": "beginner",
+    "modules": [
+        {"module_index": 0, "title": "Basics", "lessons": [
+            {"lesson_index": 0, "title": "Variables"},
+            {"lesson_index": 1, "title": "Types"},
+        ]},
+        {"module_index": 1, "title": "Control", "lessons": [
+            {"lesson_index": 0, "title": "If"},
+            {"lesson_index": 1, "title": "Loops"},
+        ]},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def _unlimited_quota(monkeypatch):
+    """Each test starts with an unlimited quota budget."""
+    monkeypatch.setattr(exposition_prefetcher, "quota_budget", QuotaBudget())
+
+
+def _prefetcher(existing=(), lookahead: int = 2):
+    """Prefetcher over a real exposition service with a mocked DB and syllabus."""
+    db_service = MagicMock()
+    db_service.get_lesson_content.side_effect = (
+        lambda s, m, l: {"exposition_content": "x"} if (m, l) in existing else None
+    )
+    syllabus_service = MagicMock()
+    syllabus_service.get_syllabus_by_id = AsyncMock(return_value=SYLLABUS)
+    service = LessonExpositionService(db_service, syllabus_service)
+    return ExpositionPrefetcher(service, syllabus_service, lookahead=lookahead), service
+
+
+def _fake_generation(delay: float = 0.0):
+    """Blocking generator stand-in recording the lessons it was asked for."""
+    calls = []
+
+    def _generate(syllabus, title, level, syllabus_id, module_index, lesson_index):
+        calls.append((module_index, lesson_index, title))
+        time.sleep(delay)
+        return GeneratedLessonContent(exposition_content=title), 100 + len(calls)
+
+    return _generate, calls
+
+
+def test_upcoming_lessons_cross_module_boundary():
+    """The lookahead continues into the next module."""
+    assert upcoming_lessons(SYLLABUS, 0, 1, 2) == [(1, 0, "If"), (1, 1, "Loops")]
+    assert upcoming_lessons(SYLLABUS, 1, 1, 2) == []
+
+
+@pytest.mark.asyncio
+async def test_prefetch_generates_missing_and_skips_existing():
+    """Lessons with lesson_content are skipped; the rest are generated in order."""
+    prefetcher, service = _prefetcher(existing={(0, 1)}, lookahead=2)
+    generate, calls = _fake_generation()
+    with patch.object(service, "_generate_and_save_exposition_blocking", side_effect=generate):
+        outcomes = await prefetcher.prefetch_after("syl1", 0, 0)
+
+    assert calls == [(1, 0, "If")]
+    assert outcomes["generated"] == 1
+    assert outcomes["skipped_existing"] == 1
+
+
+@pytest.mark.asyncio
+async def test_prefetch_stops_without_quota_headroom(monkeypatch):
+    """Prefetching is low priority and stops when the quota share is used up."""
+    budget = QuotaBudget(requests_per_minute=10, low_priority_share=0.5)
+    for _ in range(5):
+        budget.record(10)
+    monkeypatch.setattr(exposition_prefetcher, "quota_budget", budget)
+    prefetcher, service = _prefetcher(lookahead=2)
+    generate, calls = _fake_generation()
+    with patch.object(service, "_generate_and_save_exposition_blocking", side_effect=generate):
+        outcomes = await prefetcher.prefetch_after("syl1", 0, 0)
+
+    assert not calls
+    assert outcomes["skipped_quota"] == 2
+
+
+@pytest.mark.asyncio
+async def test_foreground_open_joins_inflight_prefetch():
+    """Opening a lesson being prefetched waits for it instead of generating twice."""
+    prefetcher, service = _prefetcher(lookahead=1)
+    generate, calls = _fake_generation(delay=0.1)
+    with patch.object(service, "_generate_and_save_exposition_blocking", side_effect=generate):
+        task = prefetcher.schedule("syl1", 0, 0)
+        await asyncio.sleep(0.02)
+        assert service.is_generating("syl1", 0, 1)
+        content, lesson_id = await service._generate_and_save_exposition(
+            SYLLABUS, "Types", "beginner", "syl1", 0, 1
+        )
+        await task
+
+    assert calls == [(0, 1, "Types")]
+    assert content.exposition_content == "Types"
+    assert lesson_id == 101
+    assert not service.is_generating("syl1", 0, 1)
+
+
+def test_schedule_disabled_with_zero_lookahead():
+    """A lookahead of 0 turns prefetching off."""
+    prefetcher, _ = _prefetcher(lookahead=0)
+    assert prefetcher.schedule("syl1", 0, 0) is None
@@ -0,0 +1,159 @@
+# backend/tests/services/test_exposition_retriever.py
+"""Tests for backend/services/exposition_retriever.py and its use in the chat nodes"""
+# pylint: disable=protected-access, unused-argument, invalid-name, redefined-outer-name
+
+from typing import Any, Dict
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.ai.lessons import nodes
+from backend.ai.lessons.exposition_index import index_record
+from backend.models import GeneratedLessonContent
+from backend.services.exposition_retriever import ExpositionRetriever
+from backend.services.lesson_exposition_service import LessonExpositionService
+from backend.services.sqlite_db import SQLiteDatabaseService
+
+LESSON_ID = 1
+
+EXPOSITION = "\n\n".join(
+    [
+        "# Loops\n\n" + "A for loop iterates over the items of a sequence. " * 12,
+        "A while loop repeats until its condition becomes false. " * 12,
+        "# Functions\n\n" + "A function groups statements under a name. " * 12,
+        "Recursion is a function calling itself and needs a base case. " * 12,
+    ]
+)
+
+
+@pytest.fixture
+def db_service(tmp_path):
+    """A fresh database with one syllabus/module/lesson."""
+    service = SQLiteDatabaseService(db_path=str(tmp_path / "retrieval.sqlite"))
+    now = "2026-01-01T00:00:00"
+    service.execute_query(
+        "INSERT INTO syllabi (syllabus_id, topic, level, created_at, updated_at) "
+        "VALUES ('syl1', 'Python', 'beginner', ?, ?)", (now, now), commit=True,
+    )
+    service.execute_query(
+        "INSERT INTO modules (syllabus_id, module_index, title, created_at, updated_at) "
+        "VALUES ('syl1', 0, 'Basics', ?, ?)", (now, now), commit=True,
+    )
+    service.execute_query(
+        "INSERT INTO lessons (module_id, lesson_index, title, created_at, updated_at) "
+        "VALUES (1, 0, 'Control flow', ?, ?)", (now, now), commit=True,
+    )
+    yield service
+    service.close()
+
+
+def _save_lesson(db_service, exposition: str = EXPOSITION) -> None:
+    db_service.save_lesson_content(
+        "syl1", 0, 0, {"exposition_content": exposition},
+        exposition_index=index_record(exposition),
+    )
+
+
+class TestExpositionRetriever:
+    """Tests for the stored index and ExpositionRetriever"""
+
+    def test_save_lesson_content_indexes_the_exposition(self, db_service):
+        _save_lesson(db_service)
+
+        row = db_service.get_exposition_index(LESSON_ID)
+
+        assert row is not None
+        assert len(row["chunks"]) == 4
+        assert isinstance(row["vectors"], bytes)
+
+    def test_content_saved_without_an_index_drops_the_old_one(self, db_service):
+        _save_lesson(db_service)
+
+        db_service.save_lesson_content("syl1", 0, 0, {"exposition_content": ""})
+
+        assert db_service.get_exposition_index(LESSON_ID) is None
+
+    @patch("backend.services.lesson_exposition_service.llm_model", "test-model")
+    @patch("backend.services.lesson_exposition_service.load_prompt", return_value="prompt")
+    @patch("backend.services.lesson_exposition_service.generate_content")
+    def test_exposition_service_saves_the_index(self, mock_generate, _, db_service):
+        mock_generate.return_value = MagicMock(text=EXPOSITION)
+        service = LessonExpositionService(db_service, MagicMock())
+
+        service._generate_and_save_exposition_blocking(
+            {"topic": "Python", "modules": []}, "Control flow", "beginner", "syl1", 0, 0
+        )
+
+        row = db_service.get_exposition_index(LESSON_ID)
+        assert row is not None and row["chunks"] == index_record(EXPOSITION)["chunks"]
+
+    def test_retrieves_the_relevant_chunk(self, db_service):
+        _save_lesson(db_service)
+        retriever = ExpositionRetriever(db_service, top_k=2)
+
+        chunks = retriever.retrieve(LESSON_ID, EXPOSITION, "Why does recursion need a base case?")
+
+        assert chunks and chunks[0].startswith("Recursion is a function")
+        assert len(chunks) <= 2
+
+    def test_indexes_lessons_saved_before_the_index(self, db_service):
+        """A lesson without a stored index is indexed on first use."""
+        retriever = ExpositionRetriever(db_service)
+        assert db_service.get_exposition_index(LESSON_ID) is None
+
+        assert retriever.retrieve(LESSON_ID, EXPOSITION, "while loop condition")
+        assert db_service.get_exposition_index(LESSON_ID) is not None
+
+    def test_cached_index_follows_the_exposition(self, db_service):
+        """A changed exposition is never answered from the old chunks."""
+        _save_lesson(db_service)
+        retriever = ExpositionRetriever(db_service)
+        retriever.retrieve(LESSON_ID, EXPOSITION, "loops")
+
+        updated = EXPOSITION + "\n\n" + "Generators yield values lazily. " * 12
+        chunks = retriever.retrieve(LESSON_ID, updated, "How do generators yield values?")
+
+        assert chunks[0].startswith("Generators yield")
+
+
+def _state(**overrides: Any) -> Dict[str, Any]:
+    state: Dict[str, Any] = {
+        "topic": "Python",
+        "lesson_title": "Control flow",
+        "knowledge_level": "beginner",
+        "user_id": "u1",
+        "lesson_db_id": LESSON_ID,
+        "generated_content": GeneratedLessonContent(exposition_content=EXPOSITION),
+        "history_context": [{"role": "user", "content": "What is a base case?"}],
+    }
+    state.update(overrides)
+    return state
+
+
+class TestChatNodesUseRetrieval:
+    """The chat nodes put the retrieved chunks in the prompt."""
+
+    @pytest.fixture
+    def retriever(self):
+        retriever = MagicMock()
+        retriever.retrieve.return_value = ["EXCERPT ABOUT BASE CASES"]
+        nodes.set_exposition_retriever(retriever)
+        yield retriever
+        nodes.set_exposition_retriever(None)
+
+    @patch("backend.ai.lessons.nodes.call_llm_plain_text", return_value="A base case stops it.")
+    def test_chat_prompt_carries_the_excerpts(self, mock_llm, retriever):
+        nodes.generate_chat_response(_state())
+
+        retriever.retrieve.assert_called_once_with(LESSON_ID, EXPOSITION, "What is a base case?")
+        prompt = mock_llm.call_args[0][0]
+        assert "EXCERPT ABOUT BASE CASES" in prompt
+        assert "A for loop iterates" not in prompt
+
+    @patch("backend.ai.lessons.nodes.call_llm_plain_text", return_value="Answer.")
+    def test_failed_retrieval_falls_back_to_the_head(self, mock_llm, retriever):
+        retriever.retrieve.side_effect = RuntimeError("index unreadable")
+
+        nodes.generate_chat_response(_state())
+
+        assert "A for loop iterates" in mock_llm.call_args[0][0]
@@ -0,0 +1,152 @@
+# backend/tests/services/test_idempotency.py
+"""Tests for backend/services/idempotency.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.services.idempotency import (IdempotencyKeyError,
+                                          IdempotencyStore,
+                                          request_fingerprint)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+FINGERPRINT = request_fingerprint("chat", "syl1", 0, 0, "hello")
+
+
+class TestIdempotencyStore:
+    """Tests for IdempotencyStore.run"""
+
+    @pytest.mark.asyncio
+    async def test_replay_returns_stored_result(self):
+        store = IdempotencyStore()
+        func = AsyncMock(return_value={"responses": ["Hi"]})
+
+        first = await store.run("u1", "k1", FINGERPRINT, func)
+        second = await store.run("u1", "k1", FINGERPRINT, func)
+
+        assert first is second
+        func.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_no_key_always_runs(self):
+        store = IdempotencyStore()
+        func = AsyncMock(return_value="ok")
+
+        await store.run("u1", None, FINGERPRINT, func)
+        await store.run("u1", None, FINGERPRINT, func)
+
+        assert func.await_count == 2
+        assert len(store) == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_joins_in_flight_request(self):
+        store = IdempotencyStore()
+        release = asyncio.Event()
+        calls = []
+
+        async def func():
+            calls.append(1)
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(store.run("u1", "k1", FINGERPRINT, func))
+        second = asyncio.create_task(store.run("u1", "k1", FINGERPRINT, func))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(first, second) == ["done", "done"]
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_to_user(self):
+        store = IdempotencyStore()
+        func = AsyncMock(return_value="ok")
+
+        await store.run("u1", "k1", FINGERPRINT, func)
+        await store.run("u2", "k1", FINGERPRINT, func)
+
+        assert func.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_key_reused_for_other_request_is_rejected(self):
+        store = IdempotencyStore()
+        await store.run("u1", "k1", FINGERPRINT, AsyncMock(return_value="ok"))
+        other = AsyncMock()
+
+        with pytest.raises(IdempotencyKeyError, match="different request"):
+            await store.run("u1", "k1", request_fingerprint("chat", "syl1", 0, 0, "bye"), other)
+        other.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_invalid_key_is_rejected(self):
+        store = IdempotencyStore()
+        with pytest.raises(IdempotencyKeyError):
+            await store.run("u1", "", FINGERPRINT, AsyncMock())
+        with pytest.raises(IdempotencyKeyError):
+            await store.run("u1", "k" * 256, FINGERPRINT, AsyncMock())
+
+    @pytest.mark.asyncio
+    async def test_failure_is_not_remembered(self):
+        store = IdempotencyStore()
+        func = AsyncMock(side_effect=[RuntimeError("LLM down"), "ok"])
+
+        with pytest.raises(RuntimeError):
+            await store.run("u1", "k1", FINGERPRINT, func)
+
+        assert await store.run("u1", "k1", FINGERPRINT, func) == "ok"
+        assert func.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_results_expire_after_ttl(self):
+        clock = FakeClock()
+        store = IdempotencyStore(ttl_seconds=60, clock=clock)
+        func = AsyncMock(return_value="ok")
+
+        await store.run("u1", "k1", FINGERPRINT, func)
+        clock.now = 61
+        await store.run("u1", "k1", FINGERPRINT, func)
+
+        assert func.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_oldest_results_dropped_beyond_max_entries(self):
+        store = IdempotencyStore(max_entries=2)
+        for key in ("k1", "k2", "k3"):
+            await store.run("u1", key, FINGERPRINT, AsyncMock(return_value=key))
+        await store.run("u1", "k4", FINGERPRINT, AsyncMock(return_value="k4"))
+
+        assert len(store) == 3
+        assert ("u1", "k1") not in store._entries
+
+    @pytest.mark.asyncio
+    async def test_max_entries_enforced_behind_in_flight_request(self):
+        """A fresh in-flight oldest entry does not stop eviction of finished ones."""
+        store = IdempotencyStore(max_entries=2)
+        release = asyncio.Event()
+
+        async def slow() -> str:
+            await release.wait()
+            return "slow"
+
+        in_flight = asyncio.create_task(store.run("u1", "k0", FINGERPRINT, slow))
+        await asyncio.sleep(0)
+        for key in ("k1", "k2", "k3", "k4"):
+            await store.run("u1", key, FINGERPRINT, AsyncMock(return_value=key))
+
+        assert len(store) <= 3
+        assert ("u1", "k0") in store._entries
+        assert ("u1", "k4") in store._entries
+        release.set()
+        assert await in_flight == "slow"
@@ -0,0 +1,133 @@
+# backend/tests/services/test_job_queue.py
+"""Tests for backend/services/job_queue.py and the generation_jobs table"""
+# pylint: disable=protected-access, unused-argument, invalid-name, redefined-outer-name
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from backend.services.job_queue import JobQueue, UnknownJobTypeError
+from backend.services.sqlite_db import SQLiteDatabaseService
+
+PAYLOAD = {"user_id": "u1", "syllabus_id": "syl1", "module_index": 0, "lesson_index": 0}
+
+
+@pytest.fixture
+def db_service(tmp_path):
+    """A fresh database with one user."""
+    service = SQLiteDatabaseService(db_path=str(tmp_path / "jobs.sqlite"))
+    service.execute_query(
+        "INSERT INTO users (user_id, email, name, password_hash, created_at, updated_at) "
+        "VALUES ('u1', 'u1@example.com', 'U', 'x', '2026-01-01', '2026-01-01')", commit=True,
+    )
+    yield service
+    service.close()
+
+
+def _queue(db_service, handler, **kwargs) -> JobQueue:
+    queue = JobQueue(db_service, retry_base_seconds=0, poll_seconds=0.01, **kwargs)
+    queue.register("exercise", handler)
+    return queue
+
+
+class TestJobQueue:
+    """Tests for JobQueue"""
+
+    @pytest.mark.asyncio
+    async def test_job_runs_and_stores_result(self, db_service):
+        handler = AsyncMock(return_value={"exercise": {"id": "ex1"}, "message": "Try this"})
+        queue = _queue(db_service, handler)
+
+        job = await queue.enqueue("u1", "exercise", PAYLOAD)
+        assert job["status"] == "queued"
+        assert await queue.run_pending() == 1
+
+        handler.assert_awaited_once_with(PAYLOAD)
+        done = queue.get_job(job["job_id"])
+        assert done["status"] == "succeeded"
+        assert done["attempts"] == 1
+        assert done["result"]["exercise"] == {"id": "ex1"}
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried(self, db_service):
+        handler = AsyncMock(side_effect=[HTTPException(status_code=500, detail="LLM down"), {}])
+        queue = _queue(db_service, handler)
+        job = await queue.enqueue("u1", "exercise", PAYLOAD)
+
+        await queue.run_pending()
+
+        done = queue.get_job(job["job_id"])
+        assert done["status"] == "succeeded"
+        assert done["attempts"] == 2
+        assert done["error"] is None
+
+    @pytest.mark.asyncio
+    async def test_job_fails_after_max_attempts(self, db_service):
+        queue = _queue(db_service, AsyncMock(side_effect=RuntimeError("LLM down")), max_attempts=2)
+        job = await queue.enqueue("u1", "exercise", PAYLOAD)
+
+        assert await queue.run_pending() == 2
+
+        done = queue.get_job(job["job_id"])
+        assert done["status"] == "failed"
+        assert done["error"] == "LLM down"
+
+    @pytest.mark.asyncio
+    async def test_permanent_error_is_not_retried(self, db_service):
+        handler = AsyncMock(side_effect=HTTPException(status_code=404, detail="No lesson"))
+        queue = _queue(db_service, handler)
+        job = await queue.enqueue("u1", "exercise", PAYLOAD)
+
+        assert await queue.run_pending() == 1
+        assert queue.get_job(job["job_id"])["status"] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_retry_waits_for_backoff(self, db_service):
+        queue = _queue(db_service, AsyncMock(side_effect=RuntimeError("LLM down")))
+        queue.retry_base_seconds = 60
+        job = await queue.enqueue("u1", "exercise", PAYLOAD)
+
+        assert await queue.run_pending() == 1
+        assert queue.get_job(job["job_id"])["status"] == "queued"
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_type_is_rejected(self, db_service):
+        queue = _queue(db_service, AsyncMock())
+        with pytest.raises(UnknownJobTypeError):
+            await queue.enqueue("u1", "podcast", {})
+
+    @pytest.mark.asyncio
+    async def test_jobs_survive_restart(self, db_service):
+        queue = _queue(db_service, AsyncMock())
+        queued = await queue.enqueue("u1", "exercise", PAYLOAD)
+        interrupted = await queue.enqueue("u1", "exercise", PAYLOAD)
+        db_service.claim_next_job()  # The first job was running when the process died
+
+        restarted = _queue(db_service, AsyncMock(return_value={"ok": True}))
+        await restarted.start()
+        try:
+            for _ in range(100):
+                statuses = {restarted.get_job(j["job_id"])["status"] for j in (queued, interrupted)}
+                if statuses == {"succeeded"}:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await restarted.stop()
+
+        assert statuses == {"succeeded"}
+
+    @pytest.mark.asyncio
+    async def test_watch_yields_each_status_until_done(self, db_service):
+        queue = _queue(db_service, AsyncMock(return_value={}))
+        job = await queue.enqueue("u1", "exercise", PAYLOAD)
+
+        async def collect():
+            return [j["status"] async for j in queue.watch(job["job_id"])]
+
+        watcher = asyncio.create_task(collect())
+        await asyncio.sleep(0.02)
+        await queue.run_pending()
+
+        assert await watcher == ["queued", "succeeded"]
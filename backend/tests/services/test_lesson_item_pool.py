@@ -0,0 +1,199 @@
+# backend/tests/services/test_lesson_item_pool.py
+"""Tests for backend/services/lesson_item_pool.py and its use in the generation nodes"""
+# pylint: disable=protected-access, unused-argument, invalid-name, redefined-outer-name
+
+import time
+from typing import Any, Dict
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.ai.lessons import nodes
+from backend.ai.lessons.near_duplicates import NearDuplicateIndex
+from backend.ai.llm_quota import QuotaBudget
+from backend.models import AssessmentQuestion, Exercise, GeneratedLessonContent
+from backend.services import lesson_item_pool
+from backend.services.lesson_item_pool import LessonItemPool
+from backend.services.sqlite_db import SQLiteDatabaseService
+
+LESSON_ID = 1
+
+
+@pytest.fixture
+def db_service(tmp_path):
+    """A fresh database with one syllabus/module/lesson."""
+    service = SQLiteDatabaseService(db_path=str(tmp_path / "pool.sqlite"))
+    now = "2026-01-01T00:00:00"
+    service.execute_query(
+        "INSERT INTO syllabi (syllabus_id, topic, level, created_at, updated_at) "
+        "VALUES ('syl1', 'Python', 'beginner', ?, ?)", (now, now), commit=True,
+    )
+    service.execute_query(
+        "INSERT INTO modules (syllabus_id, module_index, title, created_at, updated_at) "
+        "VALUES ('syl1', 0, 'Basics', ?, ?)", (now, now), commit=True,
+    )
+    service.execute_query(
+        "INSERT INTO lessons (module_id, lesson_index, title, created_at, updated_at) "
+        "VALUES (1, 0, 'Variables', ?, ?)", (now, now), commit=True,
+    )
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def pool(db_service, monkeypatch):
+    """A pool installed in the nodes module with an unlimited quota budget."""
+    monkeypatch.setattr(lesson_item_pool, "quota_budget", QuotaBudget())
+    item_pool = LessonItemPool(db_service, low_water_mark=2, target_size=3)
+    nodes.set_item_pool(item_pool)
+    yield item_pool
+    nodes.set_item_pool(None)
+    item_pool.shutdown()
+
+
+def _exercise(item_id: str = "ex1", instructions: str = "Define a variable.") -> Exercise:
+    return Exercise(id=item_id, type="short_answer", instructions=instructions)
+
+
+def _state(**overrides: Any) -> Dict[str, Any]:
+    state: Dict[str, Any] = {
+        "topic": "Python",
+        "lesson_title": "Variables",
+        "knowledge_level": "beginner",
+        "generated_content": GeneratedLessonContent(exposition_content="Variables hold values."),
+        "user_id": "pool_user",
+        "lesson_db_id": LESSON_ID,
+        "generated_exercise_ids": [],
+        "generated_assessment_question_ids": [],
+    }
+    state.update(overrides)
+    return state
+
+
+class TestLessonItemPool:
+    """Pool storage, selection and ID handling."""
+
+    def test_take_skips_seen_items(self, pool):
+        """Items the learner has already seen are skipped; items stay pooled."""
+        pool.add(LESSON_ID, "exercise", _exercise("ex1"))
+        pool.add(LESSON_ID, "exercise", _exercise("ex2", "Rename a variable."))
+        assert pool.take(LESSON_ID, "exercise").id == "ex1"
+        assert pool.take(LESSON_ID, "exercise", exclude_ids=["ex1"]).id == "ex2"
+        assert pool.take(LESSON_ID, "exercise", exclude_ids=["ex1", "ex2"]) is None
+        assert pool.size(LESSON_ID, "exercise") == 2
+
+    def test_take_reads_one_row_and_skips_invalid_items(self, pool, db_service):
+        """Selection happens in SQL; an invalid row is passed over for the next one."""
+        db_service.add_pool_item(LESSON_ID, "exercise", "broken", {"type": "short_answer"})
+        pool.add(LESSON_ID, "exercise", _exercise("ex1"))
+        pool.add(LESSON_ID, "exercise", _exercise("ex2", "Rename a variable."))
+        db_service.get_pool_items = MagicMock(wraps=db_service.get_pool_items)
+
+        assert pool.take(LESSON_ID, "exercise", exclude_ids=["ex1"]).id == "ex2"
+        assert all(c.kwargs.get("limit") == 1 for c in db_service.get_pool_items.call_args_list)
+        assert db_service.count_pool_items(LESSON_ID, "exercise") == 3
+        assert db_service.count_pool_items(LESSON_ID, "assessment") == 0
+
+    def test_duplicate_ids_are_made_unique(self, pool):
+        """A repeated LLM id is stored under a fresh id unless reassignment is off."""
+        assert pool.add(LESSON_ID, "exercise", _exercise("ex1")) == "ex1"
+        new_id = pool.add(LESSON_ID, "exercise", _exercise("ex1", "Another one."))
+        assert new_id and new_id != "ex1" and new_id.startswith("ex_")
+        assert pool.add(
+            LESSON_ID, "exercise", _exercise("ex1", "Print a variable."), reassign_duplicate_id=False
+        ) is None
+
+    def test_take_skips_rephrasings_of_seen_items(self, pool):
+        """A pooled item under a new ID that rewords one of the learner's items is passed over."""
+        pool.add(LESSON_ID, "exercise", _exercise("ex1", "Explain why a recursive function needs a base case."))
+        pool.add(LESSON_ID, "exercise", _exercise("ex2", "Rename a variable."))
+        seen = NearDuplicateIndex.from_items(
+            [_exercise("ex_mine", "Explain why every recursive function needs a base case.")]
+        )
+
+        assert pool.take(LESSON_ID, "exercise", exclude_ids=["ex_mine"], seen=seen).id == "ex2"
+
+    def test_add_rejects_rephrasings_of_pooled_items(self, pool):
+        """Only the first of two near-identical items is pooled, whoever generated it."""
+        assert pool.add(LESSON_ID, "exercise", _exercise("ex1", "Define a variable named total."))
+
+        assert pool.add(LESSON_ID, "exercise", _exercise("ex2", "Define a variable named total!")) is None
+        assert pool.add(LESSON_ID, "exercise", _exercise("ex3", "Rename a variable.")) == "ex3"
+        assert pool.size(LESSON_ID, "exercise") == 2
+
+    def test_pools_are_separate_per_type(self, pool):
+        """Exercises and assessment questions are pooled separately."""
+        pool.add(LESSON_ID, "exercise", _exercise("q1"))
+        question = AssessmentQuestion(id="q1", type="true_false", question_text="?")
+        assert pool.add(LESSON_ID, "assessment", question) == "q1"
+        assert isinstance(pool.take(LESSON_ID, "assessment"), AssessmentQuestion)
+
+    def test_refill_stops_without_quota(self, pool, monkeypatch):
+        """Refills are low priority."""
+        budget = QuotaBudget(requests_per_minute=1)
+        budget.record(10)
+        monkeypatch.setattr(lesson_item_pool, "quota_budget", budget)
+        with patch.object(nodes, "generate_new_exercise") as mock_generate:
+            assert pool._refill(LESSON_ID, "exercise", _state()) == 0
+        mock_generate.assert_not_called()
+
+    @patch("backend.ai.lessons.nodes.load_prompt", MagicMock(return_value="prompt"))
+    @patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+    def test_refill_rejects_repeats_of_pooled_items(self, mock_llm, pool):
+        """A generated item that rephrases a pooled one is not pooled."""
+        pool.add(LESSON_ID, "exercise", _exercise("ex_pooled", "Define a variable named total."))
+        mock_llm.return_value = _exercise("ex_new", "Define a variable named total!")
+
+        assert pool._refill(LESSON_ID, "exercise", _state()) == 0
+        assert pool.size(LESSON_ID, "exercise") == 1
+
+
+@patch("backend.ai.lessons.nodes.load_prompt", MagicMock(return_value="prompt"))
+@patch("backend.ai.lessons.nodes.call_llm_with_json_parsing")
+class TestNodesWithPool:
+    """generate_new_exercise serves from the pool and refills it."""
+
+    def test_pool_hit_skips_llm(self, mock_llm, pool):
+        """A pooled, unseen exercise is served without an LLM call."""
+        pool.add(LESSON_ID, "exercise", _exercise("ex_pooled"))
+        pool.add(LESSON_ID, "exercise", _exercise("ex_other", "Rename a variable."))
+        state, exercise, message = nodes.generate_new_exercise(_state())
+        mock_llm.assert_not_called()
+        assert exercise.id == "ex_pooled"
+        assert state["active_exercise"] == exercise
+        assert state["generated_exercise_ids"] == ["ex_pooled"]
+        assert state["current_interaction_mode"] == "awaiting_answer"
+        assert "exercise" in message["content"]
+
+    def test_miss_generates_shares_and_refills(self, mock_llm, pool):
+        """On a miss the LLM item is pooled for others and a refill tops up the pool."""
+        topics = iter(["integers", "strings", "lists", "dictionaries", "sets", "tuples"])
+        mock_llm.side_effect = lambda *a, **k: _exercise(
+            "ex1", f"Give an example of {next(topics)} in Python."
+        )
+
+        _, exercise, _ = nodes.generate_new_exercise(_state())
+
+        assert exercise is not None
+        deadline = time.monotonic() + 2
+        while pool.size(LESSON_ID, "exercise") < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pool.shutdown()
+        assert pool.size(LESSON_ID, "exercise") >= 3
+        # The learner's own item is never served back to them
+        served = pool.take(LESSON_ID, "exercise", exclude_ids=[exercise.id])
+        assert served is not None and served.id != exercise.id
+
+    def test_pool_skips_rephrasings_of_the_learners_items(self, mock_llm, pool):
+        """A pooled item rewording one the learner already did is not served to them."""
+        pool.add(LESSON_ID, "exercise", _exercise("ex_pooled", "Define a variable named total."))
+        mock_llm.return_value = _exercise("ex_new", "Rename a variable.")
+        state = _state(
+            generated_exercise_ids=["ex_mine"],
+            generated_exercises=[_exercise("ex_mine", "Define a variable named total!")],
+        )
+
+        _, exercise, _ = nodes.generate_new_exercise(state)
+
+        assert exercise.id == "ex_new"
+        assert state["generated_exercise_ids"] == ["ex_mine", "ex_new"]
@@ -0,0 +1,163 @@
+# backend/tests/services/test_lesson_state_cache.py
+"""Tests for backend/services/lesson_state_cache.py and its use by LessonInteractionService"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.models import GeneratedLessonContent, Metadata
+from backend.services.lesson_interaction_service import LessonInteractionService
+from backend.services.lesson_state_cache import LessonStateCache
+from backend.services.sqlite_db import UnitOfWork
+
+CONTENT = GeneratedLessonContent(
+    topic="Python", level="beginner", exposition_content="Variables hold values.",
+    metadata=Metadata(title="Variables"),
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _state(n: int = 0) -> Dict[str, Any]:
+    return {"lesson_db_id": 7, "current_interaction_mode": "chatting", "n": n}
+
+
+class TestLessonStateCache:
+    """Tests for LessonStateCache"""
+
+    def test_get_returns_copy_of_put_state(self):
+        cache = LessonStateCache(max_entries=4)
+        cache.put(("u", "s", 0, 0), _state(), CONTENT, "p1")
+
+        entry = cache.get(("u", "s", 0, 0))
+        assert entry is not None
+        assert entry.progress_id == "p1"
+        assert entry.lesson_db_id == 7
+        assert entry.lesson_content is CONTENT
+        entry.state["n"] = 99  # A failed turn must not leak into the cache
+        assert cache.get(("u", "s", 0, 0)).state["n"] == 0
+        assert cache.get(("u", "s", 0, 1)) is None
+
+    def test_evicts_least_recently_used(self):
+        cache = LessonStateCache(max_entries=2)
+        cache.put(("u", "s", 0, 0), _state(0), CONTENT, "p0")
+        cache.put(("u", "s", 0, 1), _state(1), CONTENT, "p1")
+        cache.get(("u", "s", 0, 0))
+        cache.put(("u", "s", 0, 2), _state(2), CONTENT, "p2")
+
+        assert len(cache) == 2
+        assert cache.get(("u", "s", 0, 1)) is None
+        assert cache.get(("u", "s", 0, 0)) is not None
+
+    def test_idle_entries_expire(self):
+        clock = FakeClock()
+        cache = LessonStateCache(max_entries=4, idle_seconds=60, clock=clock)
+        cache.put(("u", "s", 0, 0), _state(0), CONTENT, "p0")
+        clock.now = 50
+        cache.put(("u", "s", 0, 1), _state(1), CONTENT, "p1")
+        clock.now = 100
+
+        assert cache.evict_idle() == 1
+        assert cache.get(("u", "s", 0, 0)) is None
+        assert cache.get(("u", "s", 0, 1)) is not None
+        clock.now = 200
+        assert cache.get(("u", "s", 0, 1)) is None
+
+    def test_update_state_only_touches_cached_lessons(self):
+        cache = LessonStateCache(max_entries=4)
+        assert not cache.update_state(("u", "s", 0, 0), _state(1))
+        cache.put(("u", "s", 0, 0), _state(0), CONTENT, "p0")
+        assert cache.update_state(("u", "s", 0, 0), _state(1))
+        assert cache.get(("u", "s", 0, 0)).state["n"] == 1
+
+    def test_zero_size_disables_cache(self):
+        cache = LessonStateCache(max_entries=0)
+        cache.put(("u", "s", 0, 0), _state(), CONTENT, "p0")
+        assert cache.get(("u", "s", 0, 0)) is None
+
+
+def _service(cache: LessonStateCache):
+    """Interaction service over mocked DB, exposition and AI, with a cache."""
+    db_service = MagicMock()
+    db_service.get_lesson_progress.return_value = None
+    db_service.save_user_progress.return_value = "prog1"
+    db_service.get_conversation_history.side_effect = lambda progress_id, offset=0: []
+    db_service.unit_of_work.side_effect = lambda: UnitOfWork(db_service)
+    db_service._transaction.side_effect = lambda func: func()
+    exposition_service = MagicMock()
+    exposition_service.get_or_generate_exposition = AsyncMock(return_value=(CONTENT, 7))
+    lesson_ai = MagicMock()
+    lesson_ai.start_chat.side_effect = lambda state: state
+    lesson_ai.process_chat_turn.side_effect = lambda current_state, user_message, history: {
+        **current_state,
+        "turns": current_state.get("turns", 0) + 1,
+        "new_assistant_message": {"role": "assistant", "content": "Hi"},
+    }
+    service = LessonInteractionService(
+        db_service, exposition_service, lesson_ai, state_cache=cache
+    )
+    return service, db_service, exposition_service
+
+
+class TestInteractionServiceCaching:
+    """Tests for the state cache in LessonInteractionService"""
+
+    @pytest.mark.asyncio
+    async def test_second_load_skips_database(self):
+        service, db_service, exposition_service = _service(LessonStateCache())
+
+        first = await service._load_or_initialize_state("u1", "syl1", 0, 0)
+        second = await service._load_or_initialize_state("u1", "syl1", 0, 0)
+
+        assert first[2] == second[2] == "prog1"
+        assert second[1] is CONTENT
+        # Cached state has the same shape as one loaded from the database
+        assert isinstance(second[0]["generated_content"], GeneratedLessonContent)
+        db_service.get_lesson_progress.assert_called_once()
+        exposition_service.get_or_generate_exposition.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_chat_turns_write_through(self):
+        service, db_service, _ = _service(LessonStateCache())
+
+        await service.handle_chat_turn("u1", "syl1", 0, 0, "hello")
+        await service.handle_chat_turn("u1", "syl1", 0, 0, "again")
+
+        db_service.get_lesson_progress.assert_called_once()
+        # Initial save plus one state write per turn
+        db_service.save_user_progress.assert_called_once()
+        assert db_service._upsert_user_progress.call_count == 2
+        cached = service.state_cache.get(("u1", "syl1", 0, 0))
+        assert cached.state["turns"] == 2
+        assert "new_assistant_message" not in cached.state
+
+    @pytest.mark.asyncio
+    async def test_failed_save_invalidates_entry(self):
+        service, db_service, _ = _service(LessonStateCache())
+        await service._load_or_initialize_state("u1", "syl1", 0, 0)
+        db_service._upsert_user_progress.side_effect = RuntimeError("disk full")
+
+        result = await service.handle_chat_turn("u1", "syl1", 0, 0, "hello")
+
+        assert service.state_cache.get(("u1", "syl1", 0, 0)) is None
+        assert result["responses"][0]["content"] == "[Save Error] Hi"
+
+    @pytest.mark.asyncio
+    async def test_progress_update_invalidates_entry(self):
+        service, db_service, _ = _service(LessonStateCache())
+        service.state_cache.put(("u1", "syl1", 0, 0), _state(), CONTENT, "prog1")
+        db_service.get_lesson_id.return_value = 7
+
+        await service.update_lesson_progress("u1", "syl1", 0, 0, "completed")
+
+        assert service.state_cache.get(("u1", "syl1", 0, 0)) is None
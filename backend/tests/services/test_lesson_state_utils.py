@@ -0,0 +1,181 @@
+# backend/tests/services/test_lesson_state_utils.py
+"""Tests for schema-stamped and lazy (de)serialization in backend/services/lesson_state_utils.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import copy
+import json
+import os
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.ai.lessons import nodes
+from backend.exceptions import InternalDataValidationError
+from backend.metrics import metrics
+from backend.models import (AssessmentQuestion, Exercise,
+                            GeneratedLessonContent, Metadata, Option)
+from backend.services import lesson_interaction_service, lesson_state_utils
+from backend.services.lesson_state_utils import (STATE_SCHEMA_VERSION,
+                                                 STATE_SCHEMA_VERSION_KEY,
+                                                 LazyModel,
+                                                 deserialize_state_data,
+                                                 serialize_state_data,
+                                                 unwrap_model)
+
+
+def _stored_state() -> Dict[str, Any]:
+    """A state as loaded back from the database."""
+    exercise = Exercise(
+        id="ex1", type="multiple_choice", question="Pick one",
+        options=[Option(id="A", text="a"), Option(id="B", text="b")],
+        correct_answer_id="B",
+    )
+    state = {
+        "topic": "Python",
+        "generated_content": GeneratedLessonContent(
+            exposition_content={"content": [{"type": "paragraph", "text": "Hi"}]},
+            metadata=Metadata(title="Lists"),
+        ),
+        "active_exercise": exercise,
+        "active_assessment": None,
+        "generated_exercises": [exercise],
+        "generated_assessment_questions": [
+            AssessmentQuestion(id="as1", type="true_false", question_text="True?")
+        ],
+        "user_responses": [],
+    }
+    return json.loads(serialize_state_data(state))  # type: ignore[arg-type]
+
+
+def _deserialize_count(mode: str) -> float:
+    return metrics.get_counter("lesson_state_deserialize_total", {"mode": mode})
+
+
+class TestTrustedDeserialization:
+    """Tests for deserialize_state_data(trusted=True)"""
+
+    def test_serialized_state_carries_schema_stamp(self):
+        stored = _stored_state()
+        assert stored[STATE_SCHEMA_VERSION_KEY] == STATE_SCHEMA_VERSION
+
+        state = deserialize_state_data(stored, trusted=True)
+        assert STATE_SCHEMA_VERSION_KEY not in state
+
+    def test_trusted_load_matches_validated_load(self):
+        stored = _stored_state()
+        trusted_before = _deserialize_count("trusted")
+
+        trusted = deserialize_state_data(stored, trusted=True)
+        validated = deserialize_state_data(stored)
+
+        assert trusted == validated
+        assert isinstance(trusted["active_exercise"].options[0], Option)
+        assert trusted["generated_content"].metadata.title == "Lists"
+        assert _deserialize_count("trusted") == trusted_before + 1
+
+    def test_schema_mismatch_falls_back_to_validation(self):
+        stored = _stored_state()
+        stored[STATE_SCHEMA_VERSION_KEY] = "0ld"
+        validated_before = _deserialize_count("validated")
+
+        state = deserialize_state_data(stored, trusted=True)
+
+        assert isinstance(state["generated_exercises"][0], Exercise)
+        assert _deserialize_count("validated") == validated_before + 1
+
+    def test_invalid_trusted_blob_reports_field_error(self):
+        stored = _stored_state()
+        del stored["generated_exercises"][0]["type"]
+
+        with pytest.raises(InternalDataValidationError, match="generated_exercises"):
+            deserialize_state_data(stored, trusted=True)
+
+
+class TestLazyDeserialization:
+    """Tests for deserialize_state_data(trusted=True, lazy=True) and LazyModel"""
+
+    def test_models_hydrate_on_first_access(self):
+        stored = _stored_state()
+        state = deserialize_state_data(stored, trusted=True, lazy=True)
+        exercise = state["active_exercise"]
+
+        assert isinstance(exercise, LazyModel)
+        # No faked isinstance: callers needing the model unwrap it explicitly
+        assert not isinstance(exercise, Exercise)
+        assert not exercise.is_hydrated
+        assert exercise.options[1].text == "b"
+        assert exercise.is_hydrated
+        assert isinstance(unwrap_model(exercise), Exercise)
+        assert not state["generated_exercises"][0].is_hydrated
+        assert state == deserialize_state_data(stored)
+
+    def test_serialization_reuses_stored_json_of_unused_models(self):
+        stored = _stored_state()
+        state = deserialize_state_data(stored, trusted=True, lazy=True)
+        state["active_exercise"].question = "Changed"
+
+        reserialized = json.loads(serialize_state_data(state))
+
+        assert state["generated_content"].to_json_data() is stored["generated_content"]
+        assert reserialized["generated_exercises"] == stored["generated_exercises"]
+        assert reserialized["active_exercise"]["question"] == "Changed"
+
+    def test_stale_blob_is_hydrated_eagerly(self):
+        stored = _stored_state()
+        stored[STATE_SCHEMA_VERSION_KEY] = "0ld"
+
+        state = deserialize_state_data(stored, trusted=True, lazy=True)
+
+        assert type(state["active_exercise"]) is Exercise  # pylint: disable=unidiomatic-typecheck
+
+    def test_copies_and_unwrap_return_real_models(self):
+        state = deserialize_state_data(_stored_state(), trusted=True, lazy=True)
+        lazy_exercise = state["active_exercise"]
+
+        assert type(copy.deepcopy(lazy_exercise)) is Exercise  # pylint: disable=unidiomatic-typecheck
+        assert unwrap_model(lazy_exercise) is lazy_exercise.hydrate()
+        assert unwrap_model("text") == "text"
+
+
+class TestLazyHydrationFlag:
+    """The interaction service uses lazy hydration unless it is turned off."""
+
+    @pytest.mark.skipif(
+        "LESSON_STATE_LAZY_HYDRATION" in os.environ, reason="flag set in the environment"
+    )
+    def test_lazy_hydration_is_on_by_default(self):
+        assert lesson_state_utils.LAZY_STATE_HYDRATION is True
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("lazy, expected_type", [(False, Exercise), (True, LazyModel)])
+    async def test_service_follows_the_flag(self, monkeypatch, lazy, expected_type):
+        monkeypatch.setattr(lesson_interaction_service, "LAZY_STATE_HYDRATION", lazy)
+        db_service = MagicMock()
+        db_service.get_lesson_progress.return_value = {
+            "progress_id": "p1",
+            "lesson_state": json.loads(serialize_state_data({**_stored_state(), "lesson_db_id": 7})),
+        }
+        db_service.get_conversation_history.return_value = []
+        exposition_service = MagicMock()
+        exposition_service.get_or_generate_exposition = AsyncMock(
+            return_value=(_stored_state()["generated_content"], 7)
+        )
+        service = lesson_interaction_service.LessonInteractionService(
+            db_service, exposition_service, MagicMock(), state_cache=None
+        )
+
+        state, _, progress_id = await service._load_or_initialize_state("u1", "syl1", 0, 0)
+
+        assert progress_id == "p1"
+        assert type(state["active_exercise"]) is expected_type  # pylint: disable=unidiomatic-typecheck
+        assert unwrap_model(state["active_exercise"]).correct_answer_id == "B"
+
+    def test_generation_nodes_unwrap_lazy_items(self):
+        """Nodes reading the learner's items get real models from a lazy state."""
+        state = deserialize_state_data(_stored_state(), trusted=True, lazy=True)
+
+        items = nodes._generated_items(state, "generated_exercises")
+
+        assert [type(item) for item in items] == [Exercise]
+        assert items[0].id == "ex1"
@@ -0,0 +1,156 @@
+# backend/tests/services/test_session_lock.py
+"""Tests for backend/services/session_lock.py and its use by LessonInteractionService"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import asyncio
+import threading
+from typing import List
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.metrics import metrics
+from backend.services.lesson_interaction_service import LessonInteractionService
+from backend.services.session_lock import KeyedAsyncLock
+
+KEY = ("u1", "syl1", 0, 0)
+
+
+async def _hold(lock: KeyedAsyncLock, key, name: str, events: List[str]) -> None:
+    async with lock.acquire(key):
+        events.append(f"{name} start")
+        await asyncio.sleep(0.01)
+        events.append(f"{name} end")
+
+
+class TestKeyedAsyncLock:
+    """Tests for KeyedAsyncLock"""
+
+    @pytest.mark.asyncio
+    async def test_same_key_is_serialized(self):
+        lock = KeyedAsyncLock()
+        events: List[str] = []
+
+        await asyncio.gather(_hold(lock, KEY, "a", events), _hold(lock, KEY, "b", events))
+
+        assert events == ["a start", "a end", "b start", "b end"]
+        assert len(lock) == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_in_parallel(self):
+        lock = KeyedAsyncLock()
+        events: List[str] = []
+
+        await asyncio.gather(
+            _hold(lock, KEY, "a", events), _hold(lock, ("u2", "syl1", 0, 0), "b", events)
+        )
+
+        assert events[:2] == ["a start", "b start"]
+
+    @pytest.mark.asyncio
+    async def test_contention_is_counted(self):
+        lock = KeyedAsyncLock(name="test_session")
+        before = metrics.get_counter(
+            "test_session_lock_acquisitions_total", {"outcome": "contended"}
+        )
+
+        await asyncio.gather(*(_hold(lock, KEY, str(i), []) for i in range(3)))
+
+        assert metrics.get_counter(
+            "test_session_lock_acquisitions_total", {"outcome": "contended"}
+        ) == before + 2
+
+    @pytest.mark.asyncio
+    async def test_lock_released_when_block_raises(self):
+        lock = KeyedAsyncLock()
+
+        with pytest.raises(RuntimeError):
+            async with lock.acquire(KEY):
+                raise RuntimeError("LLM failed")
+
+        assert not lock.locked(KEY)
+        assert len(lock) == 0
+
+
+class TestInteractionServiceLocking:
+    """Tests for per-session serialization in LessonInteractionService"""
+
+    @pytest.mark.asyncio
+    async def test_chat_turn_and_exercise_of_one_session_do_not_overlap(self):
+        service = LessonInteractionService(MagicMock(), MagicMock(), MagicMock())
+        events: List[str] = []
+
+        async def fake_work(name: str):
+            assert service.session_lock.locked(KEY)
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+            return {}
+
+        service._process_chat_turn = lambda *args: fake_work("chat")
+        service._handle_generation_request = lambda **kwargs: fake_work("exercise")
+
+        await asyncio.gather(
+            service.handle_chat_turn(*KEY, "hello"), service.generate_exercise(*KEY)
+        )
+
+        assert events == ["chat start", "chat end", "exercise start", "exercise end"]
+
+    @pytest.mark.asyncio
+    async def test_generation_node_runs_off_the_event_loop(self):
+        service = LessonInteractionService(MagicMock(), MagicMock(), MagicMock())
+        service._load_or_initialize_state = AsyncMock(
+            return_value=({"lesson_db_id": 1}, None, "prog1")
+        )
+        loop_ran = threading.Event()
+        released: List[bool] = []
+
+        def blocking_node(state):
+            # Only returns early if the loop keeps running while the node blocks
+            released.append(loop_ran.wait(timeout=2))
+            return {}, None, {"role": "assistant", "content": "Sorry"}
+
+        async def tick():
+            await asyncio.sleep(0.01)
+            loop_ran.set()
+
+        result, _ = await asyncio.gather(
+            service._handle_generation_request(
+                user_id=KEY[0], syllabus_id=KEY[1], module_index=KEY[2],
+                lesson_index=KEY[3], node_function=blocking_node, model_cls=MagicMock,
+                format_function=str, item_type_name="exercise", metadata_key="exercise_id",
+            ),
+            tick(),
+        )
+
+        assert released == [True]
+        assert result == {"exercise": None, "message": "Sorry"}
+
+    @pytest.mark.asyncio
+    async def test_chat_turns_of_different_sessions_overlap(self):
+        """The chat graph runs off the event loop, so one session's turn never stalls another's."""
+        db_service = MagicMock()
+        db_service.get_conversation_history.return_value = []
+        lesson_ai = MagicMock()
+        both_inside = threading.Barrier(2, timeout=2)
+
+        def process_chat_turn(current_state, user_message, history):
+            # Blocks until the other session's turn is in the graph as well
+            both_inside.wait()
+            return {**current_state, "new_assistant_message": {"role": "assistant", "content": "Hi"}}
+
+        lesson_ai.process_chat_turn.side_effect = process_chat_turn
+        service = LessonInteractionService(
+            db_service, MagicMock(), lesson_ai, summary_every_turns=0
+        )
+        service._load_or_initialize_state = AsyncMock(
+            return_value=({"lesson_db_id": 1}, None, "prog1")
+        )
+
+        results = await asyncio.gather(
+            service.handle_chat_turn(*KEY, "hello"),
+            service.handle_chat_turn("u2", "syl1", 0, 0, "hello"),
+        )
+
+        assert lesson_ai.process_chat_turn.call_count == 2
+        assert all(result["responses"][0]["content"] == "Hi" for result in results)
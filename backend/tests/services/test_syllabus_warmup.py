@@ -0,0 +1,136 @@
+# backend/tests/services/test_syllabus_warmup.py
+"""Tests for backend/services/syllabus_warmup.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.ai.llm_quota import QuotaBudget
+from backend.models import GeneratedLessonContent
+from backend.services import syllabus_warmup
+from backend.services.lesson_exposition_service import LessonExpositionService
+from backend.services.syllabus_warmup import SyllabusWarmupService
+
+SYLLABUS: Dict[str, Any] = {
+    "syllabus_id": "syl1",
+    "topic": "Python",
+    "level": "beginner",
+    "modules": [
+        {"module_index": m, "title": f"Module {m}", "lessons": [
+            {"lesson_index": l, "title": f"Lesson {m}.{l}"} for l in range(3)
+        ]}
+        for m in range(2)
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def _unlimited_quota(monkeypatch):
+    monkeypatch.setattr(syllabus_warmup, "quota_budget", QuotaBudget())
+
+
+def _service(existing=(), max_concurrency: int = 2):
+    db_service = MagicMock()
+    db_service.get_lesson_content.side_effect = (
+        lambda s, m, l: {"exposition_content": "x"} if (m, l) in existing else None
+    )
+    syllabus_service = MagicMock()
+    syllabus_service.get_syllabus_by_id = AsyncMock(return_value=SYLLABUS)
+    exposition_service = LessonExpositionService(db_service, syllabus_service)
+    warmup = SyllabusWarmupService(
+        exposition_service, syllabus_service, max_concurrency=max_concurrency,
+        quota_poll_seconds=0.01,
+    )
+    return warmup, exposition_service
+
+
+class _ConcurrencyTracker:
+    """Blocking generator stand-in that records peak concurrency."""
+
+    def __init__(self, fail_on=()):
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+        self.fail_on = set(fail_on)
+        self._lock = threading.Lock()
+
+    def __call__(self, syllabus, title, level, syllabus_id, module_index, lesson_index):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.calls.append((module_index, lesson_index))
+        try:
+            time.sleep(0.03)
+            if (module_index, lesson_index) in self.fail_on:
+                raise RuntimeError("LLM failed")
+            return GeneratedLessonContent(exposition_content=title), 1
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_warm_up_generates_all_with_bounded_concurrency():
+    """Every lesson is generated, never more than max_concurrency at once."""
+    warmup, exposition_service = _service(max_concurrency=2)
+    tracker = _ConcurrencyTracker()
+    reports = []
+    with patch.object(exposition_service, "_generate_and_save_exposition_blocking", tracker):
+        progress = await warmup.warm_up("syl1", on_progress=lambda p: reports.append(p.done))
+
+    assert sorted(tracker.calls) == [(m, l) for m in range(2) for l in range(3)]
+    assert tracker.peak == 2
+    assert progress.status == "completed"
+    assert (progress.total, progress.generated) == (6, 6)
+    assert reports == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_resumes_and_reports_failures():
+    """Existing lessons are skipped; failures are listed and the run is marked failed."""
+    warmup, exposition_service = _service(existing={(0, 0), (0, 1)})
+    tracker = _ConcurrencyTracker(fail_on={(1, 2)})
+    with patch.object(exposition_service, "_generate_and_save_exposition_blocking", tracker):
+        progress = await warmup.warm_up("syl1")
+
+    assert (0, 0) not in tracker.calls and (0, 1) not in tracker.calls
+    assert progress.skipped_existing == 2
+    assert progress.generated == 3
+    assert progress.failed == 1
+    assert progress.status == "failed"
+    assert "1/2" in progress.errors[0]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_waits_for_quota(monkeypatch):
+    """Generation pauses while the budget has no low-priority headroom."""
+    budget = MagicMock()
+    budget.has_headroom.side_effect = [False, False] + [True] * 20
+    monkeypatch.setattr(syllabus_warmup, "quota_budget", budget)
+    warmup, exposition_service = _service(max_concurrency=1)
+    with patch.object(
+        exposition_service, "_generate_and_save_exposition_blocking", _ConcurrencyTracker()
+    ):
+        progress = await warmup.warm_up("syl1")
+
+    assert progress.quota_waits == 2
+    assert progress.generated == 6
+
+
+@pytest.mark.asyncio
+async def test_start_runs_in_background_once():
+    """start() returns immediately and does not start a second concurrent run."""
+    warmup, exposition_service = _service()
+    with patch.object(
+        exposition_service, "_generate_and_save_exposition_blocking", _ConcurrencyTracker()
+    ):
+        progress = warmup.start("syl1")
+        assert warmup.start("syl1") is progress
+        await warmup._tasks["syl1"]
+
+    assert warmup.get_progress("syl1").to_dict()["done"] == 6
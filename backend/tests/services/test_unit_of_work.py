@@ -0,0 +1,106 @@
+# backend/tests/services/test_unit_of_work.py
+"""Tests for UnitOfWork in backend/services/sqlite_db.py"""
+# pylint: disable=protected-access, unused-argument, invalid-name, redefined-outer-name
+
+import sqlite3
+
+import pytest
+
+from backend.services.sqlite_db import SQLiteDatabaseService
+
+
+@pytest.fixture
+def db_service(tmp_path):
+    """A fresh database with one user, one lesson and a progress row."""
+    service = SQLiteDatabaseService(db_path=str(tmp_path / "uow.sqlite"))
+    now = "2026-01-01T00:00:00"
+    service.execute_query(
+        "INSERT INTO users (user_id, email, name, password_hash, created_at, updated_at) "
+        "VALUES ('u1', 'u1@example.com', 'U', 'x', ?, ?)", (now, now), commit=True,
+    )
+    service.execute_query(
+        "INSERT INTO syllabi (syllabus_id, topic, level, created_at, updated_at) "
+        "VALUES ('syl1', 'Python', 'beginner', ?, ?)", (now, now), commit=True,
+    )
+    service.execute_query(
+        "INSERT INTO modules (syllabus_id, module_index, title, created_at, updated_at) "
+        "VALUES ('syl1', 0, 'Basics', ?, ?)", (now, now), commit=True,
+    )
+    service.execute_query(
+        "INSERT INTO lessons (module_id, lesson_index, title, created_at, updated_at) "
+        "VALUES (1, 0, 'Variables', ?, ?)", (now, now), commit=True,
+    )
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def progress_id(db_service):
+    return db_service.save_user_progress(
+        "u1", "syl1", 0, 0, "in_progress", lesson_id=1, lesson_state_json='{"turn": 0}'
+    )
+
+
+def _state_json(db_service, progress_id):
+    row = db_service.execute_query(
+        "SELECT lesson_state_json FROM user_progress WHERE progress_id = ?",
+        (progress_id,), fetch_one=True,
+    )
+    return row["lesson_state_json"]
+
+
+class TestUnitOfWork:
+    """Tests for SQLiteDatabaseService.unit_of_work()"""
+
+    def test_commit_writes_messages_and_state_together(self, db_service, progress_id):
+        with db_service.unit_of_work() as uow:
+            user_message = uow.save_conversation_message(progress_id, "user", "CHAT_USER", "Hi")
+            uow.save_conversation_message(
+                progress_id, "assistant", "CHAT_ASSISTANT", "Hello", metadata={"k": 1}
+            )
+            uow.save_user_progress(
+                "u1", "syl1", 0, 0, "in_progress", lesson_id=1, lesson_state_json='{"turn": 1}'
+            )
+            # Nothing is visible before the commit
+            assert db_service.get_conversation_history(progress_id) == []
+            assert uow.pending == 3
+
+        history = db_service.get_conversation_history(progress_id)
+        assert history[0] == user_message
+        assert [m["content"] for m in history] == ["Hi", "Hello"]
+        assert history[1]["metadata"] == {"k": 1}
+        assert _state_json(db_service, progress_id) == '{"turn": 1}'
+        assert not db_service.conn.in_transaction
+
+    def test_failing_write_rolls_back_the_whole_unit(self, db_service, progress_id):
+        uow = db_service.unit_of_work()
+        uow.save_conversation_message(progress_id, "user", "CHAT_USER", "Hi")
+        uow.save_user_progress(
+            "u1", "syl1", 0, 0, "in_progress", lesson_id=1, lesson_state_json='{"turn": 1}'
+        )
+        # Violates the foreign key to user_progress
+        uow.save_conversation_message("no-such-progress", "assistant", "CHAT_ASSISTANT", "x")
+
+        with pytest.raises(sqlite3.IntegrityError):
+            uow.commit()
+
+        assert db_service.get_conversation_history(progress_id) == []
+        assert _state_json(db_service, progress_id) == '{"turn": 0}'
+        assert uow.pending == 0
+
+    def test_exception_in_block_discards_writes(self, db_service, progress_id):
+        with pytest.raises(RuntimeError):
+            with db_service.unit_of_work() as uow:
+                uow.save_conversation_message(progress_id, "user", "CHAT_USER", "Hi")
+                raise RuntimeError("LLM failed")
+
+        assert db_service.get_conversation_history(progress_id) == []
+
+    def test_history_offset_skips_oldest_messages(self, db_service, progress_id):
+        with db_service.unit_of_work() as uow:
+            for i in range(4):
+                uow.save_conversation_message(progress_id, "user", "CHAT_USER", f"m{i}")
+
+        history = db_service.get_conversation_history(progress_id, offset=3)
+
+        assert [m["content"] for m in history] == ["m3"]